@@ -2,6 +2,7 @@ import os
 import re
 import secrets
 import sys
+import time
 from contextlib import asynccontextmanager
 from urllib.parse import parse_qs
 
@@ -27,9 +28,16 @@ from app.routes import validate as validate_routes
 from app.routes import review as review_routes
 from app.routes import auth as auth_routes
 from app.routes import admin as admin_routes
+from pipeline import metrics
 
-# Routes exempt from CSRF validation (stateless API endpoints polled by JS)
-_CSRF_EXEMPT = ("/api/jobs",)
+# Exact routes exempt from CSRF validation (read-only job endpoints polled by
+# JS). Anything that changes state, like POST /api/jobs/{id}/cancel, is checked.
+_CSRF_EXEMPT = (
+    re.compile(r"/api/jobs/[^/]+"),
+    re.compile(r"/api/jobs/[^/]+/events"),
+)
+
+_METRICS_PATH = "/metrics"
 
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
@@ -72,7 +80,7 @@ class CSRFMiddleware:
             session["csrf_token"] = secrets.token_hex(32)
 
         if request.method in ("POST", "PUT", "DELETE", "PATCH"):
-            if not any(request.url.path.startswith(p) for p in _CSRF_EXEMPT):
+            if not any(p.fullmatch(request.url.path) for p in _CSRF_EXEMPT):
                 body = await request.body()
                 content_type = request.headers.get("content-type", "")
                 submitted = ""
@@ -107,13 +115,76 @@ class CSRFMiddleware:
         await self.app(scope, receive, send)
 
 
+class MetricsMiddleware:
+    """Pure ASGI middleware — serves /metrics and times every other request.
+
+    Added last so it is the outermost layer: scrapes of /metrics never
+    touch the session or CSRF middleware. Set METRICS_TOKEN to require
+    ``Authorization: Bearer <token>`` on the endpoint.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.token = os.getenv("METRICS_TOKEN", "")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["path"] == _METRICS_PATH:
+            await self._serve_metrics(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template, not raw path, to bound cardinality
+            route = getattr(scope.get("route"), "path", None)
+            if route is None:
+                route = "/static" if scope["path"].startswith("/static/") else "unmatched"
+            method = scope["method"]
+            metrics.HTTP_REQUESTS.inc(method=method, route=route, status=status["code"])
+            metrics.HTTP_SECONDS.observe(time.monotonic() - start, method=method, route=route)
+
+    async def _serve_metrics(self, scope, receive, send):
+        if self.token:
+            headers = dict(scope.get("headers") or [])
+            supplied = headers.get(b"authorization", b"").decode("latin-1")
+            if not secrets.compare_digest(supplied, f"Bearer {self.token}"):
+                await Response("Unauthorized", status_code=401)(scope, receive, send)
+                return
+        resp = Response(metrics.render_latest(), media_type=metrics.CONTENT_TYPE)
+        await resp(scope, receive, send)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     from app.services.user_service import seed_demo_users
-    from orchestrator import migrate_gudid_not_found
+    from orchestrator import (
+        backfill_validation_companies, ensure_dashboard_indexes, migrate_gudid_not_found,
+    )
     seed_demo_users()
     migrate_gudid_not_found()
+    backfill_validation_companies()
+    ensure_dashboard_indexes()
+
+    # Jobs run in a separate `jobs/worker.py` process when JOB_WORKER_MODE=external
+    stop_workers = None
+    if os.getenv("JOB_WORKER_MODE", "embedded").lower() != "external":
+        from jobs.worker import start_embedded_workers
+        stop_workers = start_embedded_workers(int(os.getenv("JOB_WORKER_THREADS", "2")))
     yield
+    if stop_workers is not None:
+        stop_workers.set()
 
 
 app = FastAPI(title="Fivos Device Data Interface", lifespan=lifespan)
@@ -124,11 +195,10 @@ app.add_middleware(
     SessionMiddleware,
     secret_key=os.getenv("AUTH_SECRET_KEY", "change-me-in-env"),
 )
+app.add_middleware(MetricsMiddleware)
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
-app.state.jobs = {}
-
 app.include_router(dashboard.router)
 app.include_router(harvester.router)
 app.include_router(api_routes.router)
@@ -1,10 +1,26 @@
+import asyncio
+import time
+
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from database.serialization import dumps
 
 from app.services.auth_guard import require_api_login
+from app.services.json_response import FastJSONResponse
 
 router = APIRouter(prefix="/api", tags=["API"])
 
+# SSE tuning: how often the job store is re-read (status changes and
+# progress from workers in other processes), the minimum gap between two
+# progress frames (bursts from the hub are coalesced), and the keep-alive
+# comment interval for proxies that close idle connections.
+_SSE_STORE_POLL_SECONDS = 1.0
+_SSE_MIN_INTERVAL_SECONDS = 0.25
+_SSE_KEEPALIVE_SECONDS = 15.0
+_FINISHED = ("completed", "failed", "cancelled")
+
 
 @router.get("/jobs/{job_id}")
 def get_job_status(request: Request, job_id: str):
@@ -12,8 +28,157 @@ def get_job_status(request: Request, job_id: str):
     if error_response:
         return error_response
 
-    job = request.app.state.jobs.get(job_id)
+    from jobs.store import get_job_store
+    job = get_job_store().get(job_id)
     if job is None:
-        return JSONResponse({"error": "Job not found"}, status_code=404)
+        return FastJSONResponse({"error": "Job not found"}, status_code=404)
+
+    return FastJSONResponse(job)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+async def _job_events(store, hub, job_id: str, job: dict):
+    """Yield SSE frames for *job_id* until it finishes.
+
+    ``progress`` frames carry the same {job_id, status, result} shape as
+    GET /api/jobs/{job_id}; live snapshots come from the in-process
+    progress hub when the job runs on an embedded worker, otherwise from
+    the progress the worker writes to the job store. The final ``done``
+    frame is the full job view.
+    """
+    sub = hub.subscribe(job_id)
+    try:
+        sent = None
+        last_frame = last_poll = time.monotonic()
+        while True:
+            if job["status"] in _FINISHED:
+                yield _sse("done", job)
+                return
+            version, snapshot = sub.latest()
+            payload = {
+                "job_id": job_id,
+                "status": job["status"],
+                "result": snapshot if version else job.get("result"),
+            }
+            now = time.monotonic()
+            if payload != sent:
+                sent = payload
+                last_frame = now
+                yield _sse("progress", payload)
+            elif now - last_frame >= _SSE_KEEPALIVE_SECONDS:
+                last_frame = now
+                yield ": keep-alive\n\n"
+
+            await sub.wait(_SSE_STORE_POLL_SECONDS)
+            await asyncio.sleep(_SSE_MIN_INTERVAL_SECONDS)
+            if time.monotonic() - last_poll >= _SSE_STORE_POLL_SECONDS:
+                last_poll = time.monotonic()
+                job = await run_in_threadpool(store.get, job_id)
+                if job is None:
+                    yield _sse("done", {"job_id": job_id, "status": "failed", "error": "Job not found"})
+                    return
+    finally:
+        sub.close()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(request: Request, job_id: str):
+    """Server-Sent Events stream of a job's progress (replaces polling)."""
+    user, error_response = require_api_login(request)
+    if error_response:
+        return error_response
+
+    from jobs.store import get_job_store
+    from pipeline.progress import get_hub
+    store = get_job_store()
+    job = await run_in_threadpool(store.get, job_id)
+    if job is None:
+        return FastJSONResponse({"error": "Job not found"}, status_code=404)
+
+    return StreamingResponse(
+        _job_events(store, get_hub(), job_id, job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/dashboard/records")
+def dashboard_records(request: Request, status: str | None = None, company: str | None = None,
+                      sort: str = "recent", cursor: str | None = None, limit: int = 50):
+    """One keyset-paginated page of the dashboard table."""
+    user, error_response = require_api_login(request)
+    if error_response:
+        return error_response
+
+    from orchestrator import get_dashboard_page
+    try:
+        page = get_dashboard_page(status=status, company=company, sort=sort,
+                                  cursor=cursor, limit=limit)
+    except ValueError as e:
+        return FastJSONResponse({"error": str(e)}, status_code=400)
+
+    return FastJSONResponse(page)
+
+
+@router.get("/dashboard/stats")
+def dashboard_stats(request: Request, breakdown: str | None = None, limit: int = 50):
+    """Dashboard counters, or their per-run / per-manufacturer breakdown."""
+    user, error_response = require_api_login(request)
+    if error_response:
+        return error_response
+
+    from orchestrator import get_dashboard_stats, get_stats_breakdown
+    if breakdown is None:
+        return FastJSONResponse(get_dashboard_stats())
+    try:
+        rows = get_stats_breakdown(breakdown, limit=max(1, min(limit, 500)))
+    except ValueError as e:
+        return FastJSONResponse({"error": str(e)}, status_code=400)
+
+    return FastJSONResponse({"breakdown": breakdown, "items": rows})
+
+
+@router.get("/export/{collection}")
+def export_collection(request: Request, collection: str, format: str = "csv",
+                      run_id: str | None = None, status: str | None = None,
+                      company: str | None = None):
+    """Stream devices / validationResults / verified_devices as CSV, NDJSON or XLSX."""
+    user, error_response = require_api_login(request)
+    if error_response:
+        return error_response
+
+    from database.db_connection import get_db
+    from database.export import EXPORT_FORMATS, build_export_query, export_filename, stream_export
+    if format not in EXPORT_FORMATS:
+        return FastJSONResponse({"error": f"Unknown export format: {format}"}, status_code=400)
+    db = get_db()
+    try:
+        query = build_export_query(db, collection, run_id=run_id, status=status, company=company)
+    except ValueError as e:
+        return FastJSONResponse({"error": str(e)}, status_code=400)
+
+    # Sync generator: Starlette iterates it in the threadpool, one cursor batch per chunk
+    return StreamingResponse(
+        stream_export(db, collection, format, query),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(collection, format)}"'},
+    )
+
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_job(request: Request, job_id: str):
+    user, error_response = require_api_login(request)
+    if error_response:
+        return error_response
+    if user.get("role") != "admin":
+        return FastJSONResponse({"error": "Forbidden"}, status_code=403)
+
+    from jobs.store import get_job_store
+    status = get_job_store().cancel(job_id)
+    if status is None:
+        return FastJSONResponse({"error": "Job not found"}, status_code=404)
 
-    return JSONResponse(job)
\ No newline at end of file
+    return FastJSONResponse({"job_id": job_id, "status": status})
\ No newline at end of file
@@ -12,16 +12,19 @@ def dashboard(request: Request):
     if not user:
         return RedirectResponse(url="/auth/login", status_code=302)
 
-    from orchestrator import get_dashboard_stats, get_all_dashboard_records
+    from orchestrator import get_dashboard_stats, get_dashboard_page, get_dashboard_companies
     stats = get_dashboard_stats()
-    all_results = get_all_dashboard_records()
+    # First page only; the table pages through /api/dashboard/records
+    first_page = get_dashboard_page()
 
     return templates.TemplateResponse(
         request,
         "dashboard.html",
         context={
             "stats": stats,
-            "all_results": all_results,
+            "all_results": first_page["items"],
+            "next_cursor": first_page["next_cursor"],
+            "companies": get_dashboard_companies(),
             "current_user": user,
         },
     )
@@ -1,7 +1,5 @@
 #admin only
-import uuid
-
-from fastapi import APIRouter, BackgroundTasks, Request
+from fastapi import APIRouter, Request
 from fastapi.templating import Jinja2Templates
 
 from app.services.auth_guard import require_roles
@@ -16,19 +14,21 @@ def harvester_page(request: Request):
     if redirect:
         return redirect
 
+    from orchestrator import list_resumable_harvests
     return templates.TemplateResponse(
         request,
         "harvester.html",
         context={
             "job_id": None,
             "single_result": None,
+            "resumable_runs": list_resumable_harvests(),
             "current_user": user,
         },
     )
 
 
 @router.post("/run-single")
-async def run_single(request: Request, background_tasks: BackgroundTasks):
+async def run_single(request: Request):
     user, redirect = require_roles(request, ["admin"])
     if redirect:
         return redirect
@@ -47,9 +47,8 @@ async def run_single(request: Request, background_tasks: BackgroundTasks):
             },
         )
 
-    job_id = str(uuid.uuid4())
-    request.app.state.jobs[job_id] = {"status": "running", "result": None}
-    background_tasks.add_task(_do_harvest_single, request.app, job_id, url)
+    from jobs.store import get_job_store
+    job_id = get_job_store().enqueue("harvest_single", {"url": url}, created_by=user.get("email"))
 
     return templates.TemplateResponse(
         request,
@@ -64,7 +63,7 @@ async def run_single(request: Request, background_tasks: BackgroundTasks):
 
 
 @router.post("/run-batch")
-async def run_batch(request: Request, background_tasks: BackgroundTasks):
+async def run_batch(request: Request):
     user, redirect = require_roles(request, ["admin"])
     if redirect:
         return redirect
@@ -100,9 +99,12 @@ async def run_batch(request: Request, background_tasks: BackgroundTasks):
             },
         )
 
-    job_id = str(uuid.uuid4())
-    request.app.state.jobs[job_id] = {"status": "running", "result": None}
-    background_tasks.add_task(_do_harvest_batch, request.app, job_id, urls)
+    from jobs.store import get_job_store
+    from orchestrator import _get_run_id
+    # Run ID fixed at enqueue time so a retried job resumes from its checkpoints
+    job_id = get_job_store().enqueue(
+        "harvest_batch", {"urls": urls, "run_id": _get_run_id()}, created_by=user.get("email"),
+    )
 
     return templates.TemplateResponse(
         request,
@@ -117,19 +119,35 @@ async def run_batch(request: Request, background_tasks: BackgroundTasks):
     )
 
 
-def _do_harvest_single(app, job_id: str, url: str):
-    from orchestrator import run_harvest_single
-    try:
-        result = run_harvest_single(url)
-        app.state.jobs[job_id] = {"status": "completed", "result": result}
-    except Exception as e:
-        app.state.jobs[job_id] = {"status": "failed", "result": {"error": str(e)}}
+@router.post("/resume")
+async def resume_batch(request: Request):
+    user, redirect = require_roles(request, ["admin"])
+    if redirect:
+        return redirect
+
+    form = await request.form()
+    run_id = (form.get("run_id") or "").strip()
+    if not run_id:
+        return templates.TemplateResponse(
+            request,
+            "harvester.html",
+            context={
+                "job_id": None,
+                "single_result": {"error": "Missing harvest run ID"},
+                "current_user": user,
+            },
+        )
 
+    from jobs.store import get_job_store
+    job_id = get_job_store().enqueue("harvest_resume", {"run_id": run_id}, created_by=user.get("email"))
 
-def _do_harvest_batch(app, job_id: str, urls: list[str]):
-    from orchestrator import run_harvest_batch
-    try:
-        result = run_harvest_batch(urls, job_store=app.state.jobs, job_id=job_id)
-        app.state.jobs[job_id] = {"status": "completed", "result": result}
-    except Exception as e:
-        app.state.jobs[job_id] = {"status": "failed", "result": {"error": str(e)}}
\ No newline at end of file
+    return templates.TemplateResponse(
+        request,
+        "harvester.html",
+        context={
+            "job_id": job_id,
+            "single_result": None,
+            "mode": "batch",
+            "current_user": user,
+        },
+    )
\ No newline at end of file
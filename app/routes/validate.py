@@ -1,7 +1,5 @@
 #admin only
-import uuid
-
-from fastapi import APIRouter, BackgroundTasks, Request
+from fastapi import APIRouter, Request
 from fastapi.templating import Jinja2Templates
 
 from app.services.auth_guard import require_roles
@@ -65,14 +63,13 @@ def validate_page(request: Request):
 
 
 @router.post("/run")
-async def run_validation_route(request: Request, background_tasks: BackgroundTasks):
+async def run_validation_route(request: Request):
     user, redirect = require_roles(request, ["admin"])
     if redirect:
         return redirect
 
-    job_id = str(uuid.uuid4())
-    request.app.state.jobs[job_id] = {"status": "running", "result": None}
-    background_tasks.add_task(_do_validation, request.app, job_id)
+    from jobs.store import get_job_store
+    job_id = get_job_store().enqueue("validation", created_by=user.get("email"))
 
     return templates.TemplateResponse(
         request,
@@ -95,26 +92,4 @@ def backfill_verified(request: Request):
     from orchestrator import backfill_verified_devices
     result = backfill_verified_devices()
     from fastapi.responses import RedirectResponse
-    return RedirectResponse(url="/validate/", status_code=302)
-
-
-def _do_validation(app, job_id: str):
-    from orchestrator import (
-        run_validation,
-        backfill_verified_devices,
-        migrate_gudid_not_found,
-        get_latest_run_id,
-    )
-    try:
-        migrate_gudid_not_found()
-        latest_run_id = get_latest_run_id()
-        result = run_validation(run_id=latest_run_id)
-        result["run_id"] = latest_run_id
-        backfill = backfill_verified_devices()
-        result["verified_count"] = backfill.get("verified_count", 0)
-        app.state.jobs[job_id] = {"status": "completed", "result": result}
-    except Exception as e:
-        app.state.jobs[job_id] = {
-            "status": "failed",
-            "result": {"success": False, "error": str(e)},
-        }
\ No newline at end of file
+    return RedirectResponse(url="/validate/", status_code=302)
\ No newline at end of file
@@ -0,0 +1,15 @@
+from fastapi.responses import JSONResponse
+
+from database.serialization import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that encodes MongoDB documents directly.
+
+    Content goes through ``database.serialization.dumps`` (orjson when
+    installed), so ObjectId / datetime / Decimal128 values need no
+    pre-conversion and the body is produced in a single pass.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
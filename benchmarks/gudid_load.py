@@ -0,0 +1,133 @@
+"""Load-test run_validation against the local mock GUDID server.
+
+Seeds ``mock_gudid.MockGudidServer`` from the GUDID snapshots stored in
+``validationResults`` and copies the devices those snapshots validated
+into a scratch database. Then, for each ``--concurrency`` level, it runs
+``run_validation(workers=N)`` against a fresh copy. Nothing is sent to
+AccessGUDID, and nothing is written to the source database or to
+``harvester/output``.
+
+For each level it prints devices/s, the validation outcome counts and the
+mock's per-endpoint status counts.
+
+Usage:
+    python benchmarks/gudid_load.py                                  # 1 2 4 8 workers, 150 ms latency
+    python benchmarks/gudid_load.py --concurrency 1 16 --latency-ms 400 --jitter-ms 200
+    python benchmarks/gudid_load.py --error-rate 0.02 --throttle-rate 0.05 --limit 200
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+_BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _BENCH_DIR)
+sys.path.insert(0, os.path.join(_BENCH_DIR, os.pardir, "harvester", "src"))
+
+_RESULT_KEYS = ("full_matches", "partial_matches", "mismatches", "gudid_deactivated", "lookup_errors")
+
+
+def load_devices(db, seed: list[tuple]) -> list[dict]:
+    """The harvested devices validated against the seeded GUDID records."""
+    dis = [di for di, _, _ in seed]
+    device_ids = db["validationResults"].distinct("device_id", {"gudid_di": {"$in": dis}})
+    return list(db["devices"].find({"_id": {"$in": [i for i in device_ids if i is not None]}}))
+
+
+def _reset(scratch, devices: list[dict]) -> None:
+    for name in scratch.list_collection_names():
+        scratch.drop_collection(name)
+    if devices:
+        scratch["devices"].insert_many([dict(d) for d in devices])
+
+
+def run_level(scratch, devices: list[dict], mock, workers: int) -> dict:
+    """One run_validation pass over a fresh copy of *devices* with *workers* lookups in flight."""
+    from database import db_connection
+    import orchestrator
+
+    _reset(scratch, devices)
+    before = dict(mock.stats)
+    original_get_db = db_connection.get_db
+    db_connection.get_db = lambda db_name=None: scratch
+    try:
+        start = time.perf_counter()
+        result = orchestrator.run_validation(workers=workers)
+        seconds = time.perf_counter() - start
+    finally:
+        db_connection.get_db = original_get_db
+    return {
+        "workers": workers,
+        "devices": len(devices),
+        "seconds": round(seconds, 3),
+        "devices_per_s": round(len(devices) / seconds, 2) if seconds else 0.0,
+        **{key: result.get(key, 0) for key in _RESULT_KEYS},
+        "requests": {k: v - before.get(k, 0) for k, v in sorted(mock.stats.items()) if v - before.get(k, 0)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="GUDID lookup workers per run (default: 1 2 4 8)")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Mock GUDID latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="Extra per-request latency, 0..N ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered 429")
+    parser.add_argument("--limit", type=int, default=0, help="Newest N GUDID snapshots to seed from (0: all)")
+    parser.add_argument("--source-db", default="fivos-shared", help="Database holding the stored snapshots")
+    parser.add_argument("--scratch-db", default="fivos-gudid-load", help="Database run_validation writes to")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database afterwards")
+    parser.add_argument("--output", help="Also write the results JSON here")
+    args = parser.parse_args()
+
+    if args.scratch_db == args.source_db:
+        parser.error("--scratch-db must differ from --source-db")
+
+    from database import db_connection
+    from mock_gudid import MockGudidServer, load_seed
+    import orchestrator
+    from validators import gudid_client
+
+    # Injected failures are reported in the summary, not logged per device
+    logging.basicConfig(level=logging.ERROR)
+    source = db_connection.get_db(args.source_db)
+    seed = load_seed(source, args.limit)
+    devices = load_devices(source, seed)
+    if not devices:
+        sys.exit(f"No validated devices with GUDID snapshots in {args.source_db}")
+    print(f"Seeded {len(seed)} GUDID records; validating {len(devices)} devices per run")
+
+    scratch = db_connection._get_client()[args.scratch_db]
+    results = []
+    output_dir = orchestrator._DEFAULT_OUTPUT_DIR
+    urls = gudid_client.SEARCH_URL, gudid_client.LOOKUP_URL
+    with tempfile.TemporaryDirectory() as tmp, \
+            MockGudidServer(seed, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                            error_rate=args.error_rate, throttle_rate=args.throttle_rate) as mock:
+        # run_validation clears *.json from the output dir when it finishes
+        orchestrator._DEFAULT_OUTPUT_DIR = tmp
+        gudid_client.SEARCH_URL, gudid_client.LOOKUP_URL = mock.search_url, mock.lookup_url
+        try:
+            for workers in args.concurrency:
+                result = run_level(scratch, devices, mock, workers)
+                results.append(result)
+                print(f"\nworkers={workers:<3} {result['devices_per_s']:>8}/s  {result['seconds']}s  "
+                      + "  ".join(f"{key}={result[key]}" for key in _RESULT_KEYS))
+                print("    " + "  ".join(f"{k}={v}" for k, v in result["requests"].items()))
+        finally:
+            orchestrator._DEFAULT_OUTPUT_DIR = output_dir
+            gudid_client.SEARCH_URL, gudid_client.LOOKUP_URL = urls
+            if not args.keep:
+                scratch.client.drop_database(args.scratch_db)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "levels": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
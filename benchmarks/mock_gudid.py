@@ -0,0 +1,225 @@
+"""Local stand-in for AccessGUDID, for load-testing validation.
+
+Serves the two endpoints ``validators.gudid_client`` calls:
+
+    GET /devices/search?query=...         HTML results page; each hit is an
+                                          ``<a href="/devices/{di}">`` link,
+                                          which is all search_gudid_di reads
+    GET /api/v3/devices/lookup.json?di=   {"gudid": {"device": {...}}} in the
+                                          nested shape fetch_gudid_record
+                                          flattens
+
+Devices are seeded from the flattened ``gudid_record`` snapshots stored in
+``validationResults``. ``lookup_device`` rebuilds the nested API shape, so
+``fetch_gudid_record`` against the mock returns the stored snapshot
+unchanged. Search matches catalog and model numbers case-insensitively,
+including the harvested values of the device each snapshot validated.
+
+Every request waits ``latency`` seconds plus up to ``jitter``. A seeded
+random draw then fails a ``error_rate`` fraction of requests with 500 and
+a ``throttle_rate`` fraction with 429 + ``Retry-After``, so a run is
+repeatable for a given seed.
+"""
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SEARCH_PATH = "/devices/search"
+LOOKUP_PATH = "/api/v3/devices/lookup.json"
+
+_SEED_PROJECTION = {"gudid_di": 1, "gudid_record": 1, "device_id": 1, "versionModelNumber": 1}
+
+
+def lookup_device(di: str, record: dict) -> dict:
+    """The lookup.json ``device`` object that fetch_gudid_record flattens to *record*."""
+    gmdn = {k: record.get(k) for k in ("gmdnPTName", "gmdnCode") if record.get(k) is not None}
+    conditions = (record.get("environmentalConditions") or {}).get("conditions") or []
+    return {
+        **{k: record.get(k) for k in (
+            "brandName", "versionModelNumber", "catalogNumber", "companyName",
+            "deviceDescription", "MRISafetyStatus", "singleUse", "rx", "otc",
+            "labeledContainsNRL", "labeledNoNRL", "deviceKit", "deviceRecordStatus",
+            "lotBatch", "serialNumber", "manufacturingDate", "expirationDate",
+        )},
+        "publicDeviceRecordKey": di,
+        "deviceCount": record.get("deviceCountInBase"),
+        "devicePublishDate": record.get("publishDate"),
+        "sterilization": {
+            "sterilizationPriorToUse": record.get("sterilizationPriorToUse"),
+            "deviceSterile": record.get("deviceSterile"),
+        },
+        "premarketSubmissions": {
+            "premarketSubmission": [{"submissionNumber": n} for n in record.get("premarketSubmissions") or []],
+        },
+        "environmentalConditions": {
+            "storageHandling": [{"specialConditionText": text} for text in conditions],
+        },
+        "deviceSizes": {"deviceSize": record.get("deviceSizes") or []},
+        "gmdnTerms": {"gmdn": [gmdn] if gmdn else []},
+        "productCodes": {
+            "fdaProductCode": [{"productCode": code} for code in record.get("productCodes") or []],
+        },
+        "identifiers": {"identifier": [{
+            "deviceId": di,
+            "deviceIdType": "Primary",
+            "deviceIdIssuingAgency": record.get("issuingAgency"),
+        }]},
+    }
+
+
+def load_seed(db, limit: int = 0) -> list[tuple[str, dict, list[str]]]:
+    """(di, gudid_record, search terms) for each stored GUDID snapshot, one per DI.
+
+    Search terms are the record's catalog/model numbers plus those of the
+    harvested device, since run_validation searches with the harvested values.
+    """
+    seed: dict[str, tuple[dict, set]] = {}
+    di_by_device = {}
+    cursor = db["validationResults"].find(
+        {"gudid_record": {"$ne": None}, "gudid_di": {"$ne": None}}, _SEED_PROJECTION,
+    ).sort("_id", -1)
+    for doc in cursor.limit(limit) if limit else cursor:
+        di = str(doc["gudid_di"])
+        record, terms = seed.setdefault(di, (doc["gudid_record"], set()))
+        terms.update([record.get("catalogNumber"), record.get("versionModelNumber"), doc.get("versionModelNumber")])
+        if doc.get("device_id") is not None:
+            di_by_device[doc["device_id"]] = di
+
+    for device in db["devices"].find({"_id": {"$in": list(di_by_device)}},
+                                     {"catalogNumber": 1, "versionModelNumber": 1}):
+        seed[di_by_device[device["_id"]]][1].update([device.get("catalogNumber"), device.get("versionModelNumber")])
+
+    return [(di, record, sorted(t for t in terms if t)) for di, (record, terms) in seed.items()]
+
+
+class MockGudidServer:
+    """Threaded HTTP server on 127.0.0.1; use as a context manager."""
+
+    def __init__(self, seed=(), latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 retry_after: int = 1, random_seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.devices: dict[str, dict] = {}
+        self.index: dict[str, list[str]] = {}
+        self.stats: dict[str, int] = {}
+        self._random = random.Random(random_seed)
+        self._lock = threading.Lock()
+        for di, record, terms in seed:
+            self.add(di, record, terms)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self) -> str:
+        return self.base_url + SEARCH_PATH
+
+    @property
+    def lookup_url(self) -> str:
+        return self.base_url + LOOKUP_PATH
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-gudid", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def add(self, di: str, record: dict, terms=()) -> None:
+        """Serve *record* under *di*, found by searching any of *terms*."""
+        self.devices[di] = lookup_device(di, record)
+        for term in terms:
+            hits = self.index.setdefault(term.strip().lower(), [])
+            if di not in hits:
+                hits.append(di)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def _draw(self) -> tuple[float, int | None]:
+        """(delay, injected status or None) for one request."""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return delay, 429
+        if roll < self.throttle_rate + self.error_rate:
+            return delay, 500
+        return delay, None
+
+    def search_page(self, query: str) -> str:
+        hits = self.index.get(query.strip().lower(), [])
+        rows = "".join(
+            f'<li><a href="/devices/{html.escape(di)}">'
+            f'{html.escape(self.devices[di].get("brandName") or di)}</a></li>'
+            for di in hits
+        )
+        return (f"<html><body><h1>Search results for {html.escape(query)}</h1>"
+                f"<p>{len(hits)} results</p><ul>{rows}</ul></body></html>")
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status: int, body: str, content_type: str, headers=()):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                endpoint = {SEARCH_PATH: "search", LOOKUP_PATH: "lookup"}.get(url.path)
+                if endpoint is None:
+                    mock._count("not_found")
+                    self._send(404, "Not Found", "text/plain")
+                    return
+
+                delay, injected = mock._draw()
+                if delay:
+                    time.sleep(delay)
+                if injected == 429:
+                    mock._count(f"{endpoint}.429")
+                    self._send(429, "Too Many Requests", "text/plain",
+                               [("Retry-After", str(mock.retry_after))])
+                    return
+                if injected:
+                    mock._count(f"{endpoint}.{injected}")
+                    self._send(injected, "Internal Server Error", "text/plain")
+                    return
+
+                mock._count(f"{endpoint}.200")
+                if endpoint == "search":
+                    self._send(200, mock.search_page(params.get("query", "")), "text/html; charset=utf-8")
+                else:
+                    device = mock.devices.get(params.get("di", ""))
+                    if device is None:
+                        self._send(404, json.dumps({"error": "Device not found"}), "application/json")
+                    else:
+                        self._send(200, json.dumps({"gudid": {"device": device}}), "application/json")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,105 @@
+"""Compare Ollama prompt-eval cost across prompt template versions.
+
+Sends the page-fields and product-rows prompts for every saved page in
+harvester/src/web-scraper/out_html to a real Ollama server, once per
+``--versions`` entry (see pipeline.prompts). Each version starts with the
+model freshly loaded, so no cached prefix carries over. Requests are sent
+one at a time and are not streamed. The per-request numbers come from the
+response's prompt_eval_count / prompt_eval_duration. Ollama counts only
+the tokens it actually evaluated, so a reused prefix shows up as fewer
+prompt tokens and less prompt time.
+
+For each version and pass it prints the requests, the mean evaluated
+prompt tokens, and the mean, p50 and total prompt-eval seconds.
+
+Usage:
+    python benchmarks/prompt_cache.py                      # versions 1 and 2, all pages
+    python benchmarks/prompt_cache.py --limit 10 --model gemma4:e4b --output prompt_cache.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+_BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _BENCH_DIR)
+sys.path.insert(0, os.path.join(_BENCH_DIR, os.pardir, "harvester", "src"))
+
+_PASSES = ("page_fields", "product_rows")
+
+
+def _requests_for(version: int, pages: list[tuple[str, str | None]]):
+    """(pass, messages, schema) in pipeline order: page fields, then product rows."""
+    from pipeline import llm_extractor, prompts
+
+    for visible_text, table_text in pages:
+        system, user = prompts.get("page_fields", version).render(
+            visible_text=visible_text[:llm_extractor.PAGE_TEXT_LIMIT])
+        yield "page_fields", system, user, llm_extractor.PAGE_FIELDS_SCHEMA
+        system, user = prompts.get("product_rows", version).render(
+            device_name="", table_text=(table_text or visible_text)[:llm_extractor.TABLE_TEXT_LIMIT])
+        yield "product_rows", system, user, llm_extractor.PRODUCT_ROWS_SCHEMA
+
+
+def run_version(url: str, model: str, version: int, pages: list) -> dict:
+    import requests
+    from pipeline import llm_extractor, ollama_backend
+
+    ollama_backend.unload_model(url, model)
+    ollama_backend.load_model(url, model)
+    by_pass = {name: [] for name in _PASSES}
+    for name, system, user, schema in _requests_for(version, pages):
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": user}]
+        payload = ollama_backend.chat_payload(url, model, messages, schema, llm_extractor.OLLAMA_NUM_CTX)
+        response = requests.post(url, json=payload, timeout=600)
+        response.raise_for_status()
+        by_pass[name].append(ollama_backend.record_stats(model, response.json()))
+
+    summary = {}
+    for name, stats in by_pass.items():
+        seconds = [s["prompt_seconds"] for s in stats]
+        summary[name] = {
+            "requests": len(stats),
+            "prompt_tokens_mean": round(statistics.mean(s["prompt_tokens"] for s in stats), 1),
+            "prompt_seconds_mean": round(statistics.mean(seconds), 3),
+            "prompt_seconds_p50": round(statistics.median(seconds), 3),
+            "prompt_seconds_total": round(sum(seconds), 3),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--versions", type=int, nargs="+", default=[1, 2], help="Template versions to compare")
+    parser.add_argument("--url", help="Ollama /api/chat URL (default: the first OLLAMA_URLS endpoint)")
+    parser.add_argument("--model", help="Model (default: the Ollama entry of MODEL_CHAIN)")
+    parser.add_argument("--limit", type=int, default=0, help="First N saved pages (0: all)")
+    parser.add_argument("--output", help="Also write the results JSON here")
+    args = parser.parse_args()
+
+    from pipeline import llm_extractor, ollama_pool
+
+    from suites import _page_inputs, html_pages
+
+    url = args.url or ollama_pool.endpoints()[0].url
+    model = args.model or next(e["model"] for e in llm_extractor.MODEL_CHAIN if e["provider"] == "ollama")
+    paths = html_pages()[:args.limit or None]
+    pages = [_page_inputs(path) for path in paths]
+    print(f"{len(pages)} pages, {model} at {url}, num_ctx {llm_extractor.OLLAMA_NUM_CTX}")
+
+    results = {}
+    for version in args.versions:
+        results[version] = run_version(url, model, version, pages)
+        for name, row in results[version].items():
+            print(f"v{version} {name:<13} n={row['requests']:<4} tokens={row['prompt_tokens_mean']:>8}  "
+                  f"mean={row['prompt_seconds_mean']}s  p50={row['prompt_seconds_p50']}s  "
+                  f"total={row['prompt_seconds_total']}s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "model": model, "versions": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
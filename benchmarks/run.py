@@ -0,0 +1,270 @@
+"""Offline pipeline benchmarks with a stub LLM and a regression baseline.
+
+Runs each suite in ``suites.py`` in its own subprocess, so peak RSS is per
+suite. The LLM chain is served by ``stub_llm.StubLLMServer``, so nothing
+leaves the machine and results are repeatable. For each suite it prints
+throughput, per-stage p50/p95 and peak RSS, then compares against the
+JSON baseline.
+
+Each suite runs ``--repeat`` times (default 5), each in a fresh process,
+and the best figure of those runs is kept: the highest throughput, and
+per stage the lowest p50/p95. Scheduling noise and cache misses only ever
+make a run slower, so the best of several is stable where a single run
+is not.
+
+Timings are compared in units of a calibration workload, not seconds.
+Each suite process times a fixed stdlib-only workload (HTML parsing,
+regexes, JSON; see ``calibrate``) just before and just after the suite,
+and the comparison uses throughput x calibration and p95 / calibration.
+A host that is uniformly faster or slower, or a VM whose speed drifts
+between runs, moves both by the same factor, so the baseline carries
+across machines and host states. Time spent waiting on the stub LLM does
+not scale with the host, so latency-bound stages (``llm.*``) keep some
+residual drift.
+
+A suite regresses when its relative throughput drops, or a stage's
+relative p95 rises, by more than ``--tolerance`` (default 20%). Stages
+faster than 1 ms at p95 are not compared, nor stages with fewer than 50
+timings, whose p95 is just their largest value or two (raise ``--rounds``
+to gate those). The exit status is 1 on any regression, so the harness
+can gate CI. A different architecture or Python gets a warning: the
+calibration cancels out host speed, not interpreter changes.
+
+Usage:
+    python benchmarks/run.py                         # all suites vs benchmarks/baseline.json
+    python benchmarks/run.py --suite compare --rounds 50
+    python benchmarks/run.py --repeat 1              # quick single run
+    python benchmarks/run.py --latency-ms 200        # model a slower LLM
+    python benchmarks/run.py --save-baseline         # accept the current numbers
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import time
+from html.parser import HTMLParser
+
+_BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(_BENCH_DIR, "baseline.json")
+_MIN_STAGE_SECONDS = 0.001
+_MIN_STAGE_SAMPLES = 50
+_CALIBRATION_REPEAT = 10
+
+sys.path.insert(0, _BENCH_DIR)
+sys.path.insert(0, os.path.join(_BENCH_DIR, os.pardir, "harvester", "src"))
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class _TagCounter(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.tags = {}
+
+    def handle_starttag(self, tag, attrs):
+        self.tags[tag] = self.tags.get(tag, 0) + 1
+
+
+_CALIBRATION_PAGE = "".join(
+    f'<tr class="row-{i % 7}"><td>Stent {i}</td><td>{i * 3.5:.1f} mm</td>'
+    f'<td><a href="/p/{i}">REF-{i:05d}</a></td></tr>'
+    for i in range(400)
+)
+
+
+def _calibration_work() -> None:
+    parser = _TagCounter()
+    parser.feed(f"<html><body><table>{_CALIBRATION_PAGE}</table></body></html>")
+    rows = [{"ref": ref, "size": float(size)} for ref, size in
+            zip(re.findall(r"REF-(\d+)", _CALIBRATION_PAGE), re.findall(r"([\d.]+) mm", _CALIBRATION_PAGE))]
+    json.loads(json.dumps(sorted(rows, key=lambda r: (-r["size"], r["ref"]))))
+
+
+def calibrate() -> float:
+    """Seconds for a fixed stdlib-only workload, best of a few.
+
+    It exercises no project code, so it measures the host and the
+    interpreter: suites compared in these units do not change with them.
+    """
+    best = float("inf")
+    for _ in range(_CALIBRATION_REPEAT):
+        start = time.perf_counter()
+        _calibration_work()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_child(args) -> dict:
+    """Run one suite in this process and return its result."""
+    import logging
+
+    from stub_llm import StubLLMServer
+    from suites import SUITES, use_stub
+
+    logging.basicConfig(level=logging.ERROR)
+    with StubLLMServer(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                       upstream=args.record) as stub:
+        use_stub(stub)
+        before = calibrate()
+        result = SUITES[args.child](args.rounds)
+        # Bracket the suite, so a host that drifts during it is averaged
+        result["calibration"] = round((before + calibrate()) / 2, 6)
+    result["throughput"] = round(result["items"] / result["seconds"], 2) if result["seconds"] else 0.0
+    result["seconds"] = round(result["seconds"], 3)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    result["llm"] = stub.stats
+    return result
+
+
+def _run_once(name: str, args) -> dict:
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", name,
+           "--rounds", str(args.rounds), "--latency-ms", str(args.latency_ms),
+           "--jitter-ms", str(args.jitter_ms)]
+    if args.record:
+        cmd += ["--record", args.record]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"suite {name} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def relative(result: dict) -> dict:
+    """Throughput and stage p50/p95 of a result in calibration units."""
+    unit = result["calibration"]
+    return {
+        "throughput": round(result["throughput"] * unit, 6),
+        "stages": {stage: {"count": stats["count"],
+                           **{k: round(stats[k] / unit, 6) for k in ("p50", "p95")}}
+                   for stage, stats in result["stages"].items()},
+    }
+
+
+def best_of(runs: list[dict]) -> dict:
+    """One result from repeated runs of a suite: the fastest run, with each
+    stage's p50/p95/max the lowest seen in any run, in calibration units of
+    the fastest calibration seen. Best is paired with best: multiplying
+    each run by its own calibration would reward a noisy slow reading."""
+    result = dict(max(runs, key=lambda r: r["throughput"]))
+    stages = {}
+    for stage, stats in result["stages"].items():
+        seen = [r["stages"][stage] for r in runs if stage in r["stages"]]
+        stages[stage] = {**stats, **{k: min(s[k] for s in seen) for k in ("p50", "p95", "max")}}
+    result["stages"] = stages
+    result["calibration"] = min(r["calibration"] for r in runs)
+    result["relative"] = relative(result)
+    result["peak_rss_mb"] = min(r["peak_rss_mb"] for r in runs)
+    result["repeat"] = len(runs)
+    return result
+
+
+def _run_suite(name: str, args) -> dict:
+    return best_of([_run_once(name, args) for _ in range(max(1, args.repeat))])
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Human-readable regressions of *current* against *baseline*, in calibration units."""
+    regressions = []
+    for name, result in current["suites"].items():
+        base = baseline.get("suites", {}).get(name)
+        if not base or "relative" not in base:
+            continue
+        rel, base_rel = result["relative"], base["relative"]
+        if base_rel["throughput"] and rel["throughput"] < base_rel["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: relative throughput {rel['throughput']} vs baseline {base_rel['throughput']}")
+        for stage, stats in rel["stages"].items():
+            base_stage = base_rel["stages"].get(stage)
+            # The 1 ms floor applies to the absolute timings
+            if not base_stage or max(result["stages"][stage]["p95"], base["stages"][stage]["p95"]) < _MIN_STAGE_SECONDS:
+                continue
+            if min(stats["count"], base_stage["count"]) < _MIN_STAGE_SAMPLES:
+                continue
+            if stats["p95"] > base_stage["p95"] * (1 + tolerance):
+                regressions.append(f"{name}: {stage} relative p95 {stats['p95']} vs baseline {base_stage['p95']}")
+    return regressions
+
+
+def _print_result(name: str, result: dict) -> None:
+    print(f"\n{name}: {result['items']} items in {result['seconds']}s "
+          f"({result['throughput']}/s), peak RSS {result['peak_rss_mb']} MB, "
+          f"best of {result.get('repeat', 1)}, calibration {result['calibration'] * 1000:.2f} ms")
+    for stage, stats in result["stages"].items():
+        print(f"    {stage:<28} p50 {stats['p50'] * 1000:9.3f} ms   p95 {stats['p95'] * 1000:9.3f} ms   n={stats['count']}")
+
+
+def main():
+    from suites import SUITES
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", action="append", choices=list(SUITES),
+                        help="Suite to run (repeatable; default: all)")
+    parser.add_argument("--rounds", type=int, default=1, help="Passes over the inputs per suite")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Runs per suite, each in a fresh process; the best is kept")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Stub LLM latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra per-request latency, 0..N ms")
+    parser.add_argument("--record", metavar="OLLAMA_URL",
+                        help="Forward unrecorded prompts to this Ollama /api/chat URL and record them")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.20)
+    parser.add_argument("--output", help="Also write the results JSON here")
+    parser.add_argument("--child", choices=list(SUITES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args)))
+        return
+
+    current = {
+        "config": {"rounds": args.rounds, "repeat": args.repeat, "latency_ms": args.latency_ms,
+                   "jitter_ms": args.jitter_ms, "python": platform.python_version(),
+                   "machine": platform.machine()},
+        "suites": {},
+    }
+    for name in args.suite or list(SUITES):
+        current["suites"][name] = _run_suite(name, args)
+        _print_result(name, current["suites"][name])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    base_config = baseline.get("config", {})
+    for key in ("latency_ms", "rounds"):
+        if base_config.get(key) != current["config"][key]:
+            print(f"\nWarning: baseline was recorded with a different --{key.replace('_', '-')}")
+    if any(base_config.get(k) != current["config"][k] for k in ("machine", "python")):
+        print("\nWarning: baseline was recorded on another architecture or Python; timings may not compare")
+    if any("relative" not in s for s in baseline.get("suites", {}).values()):
+        print("\nWarning: baseline predates calibration and is not compared; re-save it with --save-baseline")
+    regressions = compare(current, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"    {line}")
+        sys.exit(1)
+    print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
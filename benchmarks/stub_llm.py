@@ -0,0 +1,225 @@
+"""Deterministic local LLM server for offline benchmarks.
+
+Speaks the two wire formats llm_extractor uses: Ollama ``POST /api/chat``
+and OpenAI-compatible ``POST /v1/chat/completions`` (Groq, NVIDIA NIM).
+Each request is keyed by a hash of its messages:
+
+    * recorded response for the key   -> replayed
+    * no recording, ``upstream`` set  -> forwarded to the real Ollama
+                                         server and recorded
+    * otherwise                       -> synthesized from the prompt
+                                         (same input, same output)
+
+Requests with ``"stream": true`` are answered in the streamed formats
+(Ollama NDJSON, OpenAI SSE), a few characters per chunk.
+
+Every response waits ``latency`` seconds, plus a per-key jitter derived
+from the key, so runs are repeatable. Recordings are JSON lines of
+``{"key": ..., "content": {...}}`` (default ``benchmarks/recordings/llm.jsonl``).
+
+Record real responses once, with Ollama running locally:
+    python benchmarks/run.py --suite llm_extract --record http://localhost:11434/api/chat
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RECORDINGS = os.path.join(os.path.dirname(__file__), "recordings", "llm.jsonl")
+
+_SKU_RE = re.compile(r"\b(?=[A-Z0-9-]*\d)(?=[A-Z0-9-]*[A-Z])[A-Z0-9][A-Z0-9-]{4,}\b")
+_MM_RE = re.compile(r"\d+(?:\.\d+)?\s*mm\b", re.IGNORECASE)
+_MAX_PRODUCTS = 25
+_STREAM_CHUNK = 16
+
+
+def request_key(messages: list[dict]) -> str:
+    data = json.dumps(messages, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_recordings(path: str) -> dict[str, dict]:
+    recordings = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    recordings[row["key"]] = row["content"]
+    return recordings
+
+
+def _after(marker: str, text: str) -> str:
+    _, _, tail = text.partition(marker)
+    return tail.strip()
+
+
+def synthesize(messages: list[dict]) -> dict:
+    """A plausible, deterministic response for one llm_extractor prompt."""
+    prompt = "\n\n".join(m["content"] for m in messages)
+    if "Table/specs text:" in prompt:
+        table = _after("Table/specs text:", prompt)
+        products, seen = [], set()
+        for line in table.splitlines():
+            match = _SKU_RE.search(line)
+            if not match or match.group(0) in seen:
+                continue
+            seen.add(match.group(0))
+            sizes = _MM_RE.findall(line)
+            products.append({
+                "model_number": match.group(0),
+                "catalog_number": None,
+                "diameter": sizes[0] if sizes else None,
+                "length": sizes[1] if len(sizes) > 1 else None,
+            })
+            if len(products) >= _MAX_PRODUCTS:
+                break
+        return {"products": products}
+
+    text = _after("Page text:", prompt)
+    words = text.split()
+    if "clinical device description" in prompt:
+        return {"deviceDescription": " ".join(words[:30]) or None}
+    sentence = text.split(". ")[0][:300]
+    return {
+        "device_name": " ".join(words[:3]) or None,
+        "manufacturer": "Stub Medical, Inc.",
+        "description": sentence or None,
+        "warning_text": "Rx only. Single use only. Sterile." if "sterile" in text.lower() else None,
+        "MRISafetyStatus": "MR Conditional" if "MR Conditional" in text else None,
+        "deviceKit": False,
+        "environmentalConditions": None,
+        "indicationsForUse": None,
+        "contraindications": None,
+        "deviceClass": None,
+    }
+
+
+class StubLLMServer:
+    """Threaded HTTP server on 127.0.0.1; use as a context manager."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 recordings_path: str = DEFAULT_RECORDINGS, upstream: str | None = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.recordings_path = recordings_path
+        self.recordings = load_recordings(recordings_path)
+        self.upstream = upstream
+        self.stats = {"replayed": 0, "recorded": 0, "synthesized": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def ollama_url(self) -> str:
+        return f"{self.base_url}/api/chat"
+
+    @property
+    def openai_url(self) -> str:
+        return f"{self.base_url}/v1/chat/completions"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, payload: dict) -> dict:
+        messages = payload.get("messages") or []
+        key = request_key(messages)
+        with self._lock:
+            content = self.recordings.get(key)
+        if content is not None:
+            outcome = "replayed"
+        elif self.upstream:
+            content = self._record(key, payload)
+            outcome = "recorded"
+        else:
+            content = synthesize(messages)
+            outcome = "synthesized"
+        with self._lock:
+            self.stats[outcome] += 1
+
+        delay = self.latency
+        if self.jitter:
+            delay += random.Random(key).uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        return content
+
+    def _record(self, key: str, payload: dict) -> dict:
+        import requests
+
+        response = requests.post(self.upstream, json={**payload, "stream": False}, timeout=600)
+        response.raise_for_status()
+        content = response.json()["message"]["content"]
+        content = json.loads(content) if isinstance(content, str) else content
+        with self._lock:
+            self.recordings[key] = content
+            os.makedirs(os.path.dirname(self.recordings_path), exist_ok=True)
+            with open(self.recordings_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "content": content}, ensure_ascii=False) + "\n")
+        return content
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                content = json.dumps(stub.respond(payload))
+                if payload.get("stream"):
+                    self._stream(payload, content)
+                    return
+                if self.path.startswith("/v1/"):
+                    body = {"choices": [{"message": {"role": "assistant", "content": content}}]}
+                else:
+                    body = {"model": payload.get("model"), "done": True,
+                            "message": {"role": "assistant", "content": content}}
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, payload, content):
+                chunks = [content[i:i + _STREAM_CHUNK] for i in range(0, len(content), _STREAM_CHUNK)]
+                if self.path.startswith("/v1/"):
+                    events = [{"choices": [{"delta": {"content": c}, "finish_reason": None}]} for c in chunks]
+                    events.append({"choices": [{"delta": {}, "finish_reason": "stop"}]})
+                    lines = [f"data: {json.dumps(e)}\n\n" for e in events] + ["data: [DONE]\n\n"]
+                    content_type = "text/event-stream"
+                else:
+                    events = [{"model": payload.get("model"), "done": False,
+                               "message": {"role": "assistant", "content": c}} for c in chunks]
+                    events.append({"model": payload.get("model"), "done": True,
+                                   "message": {"role": "assistant", "content": ""}})
+                    lines = [json.dumps(e) + "\n" for e in events]
+                    content_type = "application/x-ndjson"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.end_headers()
+                for line in lines:
+                    self.wfile.write(line.encode("utf-8"))
+                self.wfile.flush()
+                self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,212 @@
+"""Benchmark suites over the saved pages in harvester/src/web-scraper/out_html.
+
+Each suite prepares its inputs untimed, then runs the code under test for
+``rounds`` passes and returns ``{"items", "seconds", "stages"}``. Stages
+are per-item timings with the count/total/p50/p95/max shape of
+``pipeline.tracing.summarize_timings``, at microsecond resolution. The
+in-memory suites (normalizers, compare) repeat each round
+``MICRO_REPEAT`` times so the numbers are not dominated by timer noise.
+Suites timed per item report ``seconds`` as their fastest pass over the
+inputs times the number of passes, as ``timeit`` takes the minimum of its
+repeats: a slower pass measures the host, not the code.
+
+    llm_extract   _process_single_ollama via the parallel batch executor,
+                  every LLM call served by the stub server
+    css_extract   process_single with the YAML site adapters (pages
+                  without an adapter are skipped)
+    normalizers   normalize_record over the raw fields extracted per page
+    compare       compare_records over harvested/GUDID record pairs
+"""
+import copy
+import glob
+import json
+import os
+import time
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+SRC_DIR = os.path.join(_ROOT, "harvester", "src")
+OUT_HTML = os.path.join(SRC_DIR, "web-scraper", "out_html")
+ADAPTER_DIR = os.path.join(SRC_DIR, "site_adapters")
+FIXTURES = os.path.join(_ROOT, "tests", "fixtures")
+MICRO_REPEAT = 200
+
+
+def html_pages() -> list[str]:
+    return sorted(glob.glob(os.path.join(OUT_HTML, "*.html")))
+
+
+def use_stub(stub) -> None:
+    """Point every provider in llm_extractor.MODEL_CHAIN at *stub*.
+
+    Client-side pacing is switched off: the stub has no quota, and the
+    cloud token buckets would otherwise turn fallbacks into waits.
+    """
+    from pipeline import llm_extractor, ollama_pool, rate_limiter
+
+    ollama_pool.configure(stub.ollama_url)
+    llm_extractor.GROQ_URL = stub.openai_url
+    llm_extractor.NVIDIA_URL = stub.openai_url
+    # Cloud entries are skipped without a key; the stub ignores its value
+    os.environ["GROQ_API_KEY"] = "stub"
+    os.environ["NVIDIA_API_KEY"] = "stub"
+    rate_limiter.configure({"groq": 0, "nvidia": 0})
+
+
+def summarize(per_item: list[dict[str, float]]) -> dict[str, dict]:
+    """Per-stage count/total/p50/p95/max of per-item seconds."""
+    from pipeline.tracing import _percentile
+
+    by_stage: dict[str, list[float]] = {}
+    for timings in per_item:
+        for stage, seconds in timings.items():
+            by_stage.setdefault(stage, []).append(seconds)
+    summary = {}
+    for stage, values in sorted(by_stage.items()):
+        values.sort()
+        summary[stage] = {
+            "count": len(values),
+            "total": round(sum(values), 6),
+            "p50": round(_percentile(values, 50), 6),
+            "p95": round(_percentile(values, 95), 6),
+            "max": round(values[-1], 6),
+        }
+    return summary
+
+
+def _timed_items(items, rounds, func, stage) -> dict:
+    """Time *func* per item; nested pipeline spans are reported too."""
+    from pipeline.tracing import StageTimings, record_stages
+
+    per_item = []
+    best_pass = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for item in items:
+            with record_stages(StageTimings()) as timings:
+                item_start = time.perf_counter()
+                func(item)
+                elapsed = time.perf_counter() - item_start
+            per_item.append({**timings.as_dict(), stage: elapsed})
+        best_pass = min(best_pass, time.perf_counter() - start)
+    return {
+        "items": len(items) * rounds,
+        "seconds": best_pass * rounds,
+        "stages": summarize(per_item),
+    }
+
+
+def _page_inputs(path: str) -> tuple[str, str | None]:
+    """(visible text, best table text) exactly as _process_single_ollama builds them."""
+    from pipeline.parser import parse_html
+    from pipeline.runner import _select_best_table
+    from security.sanitizer import sanitize_html
+
+    with open(path, "r", encoding="utf-8") as f:
+        parsed = parse_html(sanitize_html(f.read()))
+    tables = parsed.find_all("table")
+    table_text = _select_best_table(tables).get_text(separator="\t") if tables else None
+    return parsed.get_text(separator=" ", strip=True), table_text
+
+
+def _raw_fields(paths: list[str]) -> list[dict]:
+    """Raw extractor output per page, from the stub's synthesized responses."""
+    from pipeline import llm_extractor
+
+    from stub_llm import synthesize
+
+    def fake_request(system_msg, user_msg, schema, timeout=60):
+        return synthesize([{"role": "system", "content": system_msg}, {"role": "user", "content": user_msg}])
+
+    original = llm_extractor._llm_request
+    llm_extractor._llm_request = fake_request
+    try:
+        records = []
+        for path in paths:
+            visible_text, table_text = _page_inputs(path)
+            records.extend(llm_extractor.extract_all_fields(visible_text, table_text))
+        return records
+    finally:
+        llm_extractor._llm_request = original
+
+
+# ---------------------------------------------------------------------------
+# Suites
+# ---------------------------------------------------------------------------
+
+def suite_llm_extract(rounds: int) -> dict:
+    from pipeline.parallel_batch import process_html_files_parallel
+
+    paths = html_pages()
+    per_file = []
+    records = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for result in process_html_files_parallel(paths, harvest_run_id="HR-BENCH"):
+            per_file.append(result.timings)
+            records += len(result.records)
+    return {
+        "items": len(paths) * rounds,
+        "seconds": time.perf_counter() - start,
+        "stages": summarize(per_file),
+        "records": records,
+    }
+
+
+def suite_css_extract(rounds: int) -> dict:
+    from pipeline.runner import load_adapters, process_single, resolve_adapter
+
+    adapters = load_adapters(ADAPTER_DIR)
+    jobs = [(p, resolve_adapter(p, adapters)) for p in html_pages()]
+    jobs = [(p, a) for p, a in jobs if a]
+    return _timed_items(jobs, rounds, lambda job: process_single(job[0], job[1], harvest_run_id="HR-BENCH"),
+                        "css.total")
+
+
+def suite_normalizers(rounds: int) -> dict:
+    from pipeline.runner import normalize_record
+
+    adapter = {"manufacturer": "unknown", "product_type": "ollama_extracted"}
+    raw = _raw_fields(html_pages())
+    return _timed_items(raw, rounds * MICRO_REPEAT, lambda fields: normalize_record(fields, adapter), "normalize")
+
+
+def _gudid_side(record: dict) -> dict:
+    """A GUDID-shaped counterpart with the differences real records show."""
+    gudid = copy.deepcopy(record)
+    gudid.pop("_harvest", None)
+    if gudid.get("brandName"):
+        gudid["brandName"] = gudid["brandName"].upper()
+    if gudid.get("companyName"):
+        gudid["companyName"] = f"{gudid['companyName']} LLC"
+    if gudid.get("deviceDescription"):
+        gudid["deviceDescription"] = f"{gudid.get('versionModelNumber') or ''} {gudid['brandName']}".strip()
+    gudid["productCodes"] = ["DYB", "NIQ"]
+    gudid["singleUse"] = "true"
+    return gudid
+
+
+def suite_compare(rounds: int) -> dict:
+    from pipeline.emitter import package_gudid_record
+    from pipeline.runner import normalize_record
+    from validators.comparison_validator import compare_records
+
+    adapter = {"manufacturer": "unknown", "product_type": "ollama_extracted"}
+    pairs = []
+    for raw in _raw_fields(html_pages()):
+        record = package_gudid_record(normalize_record(raw, adapter), "", "https://bench.local/",
+                                      "stub", harvest_run_id="HR-BENCH")
+        record["productCodes"] = ["DYB"]
+        pairs.append((record, _gudid_side(record)))
+    with open(os.path.join(FIXTURES, "pxb35_harvested.json"), encoding="utf-8") as f:
+        harvested = json.load(f)
+    with open(os.path.join(FIXTURES, "pxb35_gudid_response.json"), encoding="utf-8") as f:
+        pairs.append((harvested, json.load(f)))
+    return _timed_items(pairs, rounds * MICRO_REPEAT, lambda pair: compare_records(*pair), "compare")
+
+
+SUITES = {
+    "llm_extract": suite_llm_extract,
+    "css_extract": suite_css_extract,
+    "normalizers": suite_normalizers,
+    "compare": suite_compare,
+}
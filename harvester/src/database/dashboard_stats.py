@@ -0,0 +1,232 @@
+"""Materialized dashboard statistics, maintained incrementally.
+
+The ``dashboardStats`` collection holds one counter document per scope:
+
+    {_id: "global"}                       whole database
+    {_id: "run:<harvest_run_id>"}         devices harvested by one run
+    {_id: "company:<companyName>"}        one manufacturer
+
+Each document carries ``devices`` (harvested device count), ``matches``
+(verified_devices count), ``status.<validation status>`` counts and
+``last_run`` (latest harvested_at). Writers call the ``record_*`` helpers
+right after touching devices / validationResults / verified_devices; each
+call is one unordered bulk ``$inc`` upsert covering the global, run and
+company documents, so the dashboard reads its numbers with a single
+``_id`` lookup and breakdowns with one indexed query.
+
+Counter updates follow the data write rather than sharing a transaction
+with it, so a crash between the two can leave the counters off by the
+in-flight write. ``rebuild_stats()`` recomputes everything from the source
+collections; run it (``python harvester/src/database/dashboard_stats.py
+rebuild``) after bulk edits made outside the app or to repair drift.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+
+from pymongo import DESCENDING, ReplaceOne, UpdateOne
+
+# Ensure harvester/src is on sys.path for standalone runs
+_SRC_DIR = os.path.join(os.path.dirname(__file__), os.pardir)
+if os.path.abspath(_SRC_DIR) not in sys.path:
+    sys.path.insert(0, os.path.abspath(_SRC_DIR))
+
+logger = logging.getLogger(__name__)
+
+STATS_COLLECTION = "dashboardStats"
+GLOBAL_ID = "global"
+SCOPES = ("run", "company")
+
+
+def _scope_keys(device: dict | None) -> list[tuple[str, str | None]]:
+    """(scope, key) pairs a device's counters roll up into."""
+    keys = [("global", None)]
+    if device:
+        run_id = (device.get("_harvest") or {}).get("harvest_run_id")
+        if run_id:
+            keys.append(("run", run_id))
+        if device.get("companyName"):
+            keys.append(("company", device["companyName"]))
+    return keys
+
+
+def _doc_id(scope: str, key: str | None) -> str:
+    return GLOBAL_ID if scope == "global" else f"{scope}:{key}"
+
+
+def _apply(db, updates: dict[tuple[str, str | None], dict]) -> None:
+    """One unordered bulk upsert of ``{(scope, key): {"$inc": ..., ...}}``."""
+    now = datetime.now(timezone.utc)
+    ops = []
+    for (scope, key), update in updates.items():
+        update = dict(update)
+        update["$set"] = {"updated_at": now}
+        update["$setOnInsert"] = {"scope": scope, "key": key}
+        ops.append(UpdateOne({"_id": _doc_id(scope, key)}, update, upsert=True))
+    if not ops:
+        return
+    try:
+        db[STATS_COLLECTION].bulk_write(ops, ordered=False)
+    except Exception as e:
+        # Stats must never fail the write they describe; rebuild repairs them
+        logger.warning("dashboard_stats: counter update failed: %s", e)
+
+
+def _inc(device: dict | None, inc: dict) -> dict:
+    return {scope_key: {"$inc": dict(inc)} for scope_key in _scope_keys(device)}
+
+
+def record_devices_inserted(db, devices: list[dict]) -> None:
+    """Count newly inserted device documents."""
+    updates: dict = {}
+    for device in devices:
+        harvested_at = (device.get("_harvest") or {}).get("harvested_at")
+        for scope_key in _scope_keys(device):
+            update = updates.setdefault(scope_key, {"$inc": {"devices": 0}})
+            update["$inc"]["devices"] += 1
+            if harvested_at:
+                latest = update.setdefault("$max", {"last_run": harvested_at})
+                latest["last_run"] = max(latest["last_run"], harvested_at)
+    _apply(db, updates)
+
+
+def record_validation(db, device: dict | None, status: str, verified_upserted: bool = False) -> None:
+    """Count a new validation result (and a newly created verified device)."""
+    inc = {f"status.{status}": 1}
+    if verified_upserted:
+        inc["matches"] = 1
+    _apply(db, _inc(device, inc))
+
+
+def record_verified_upserted(db, devices: list[dict]) -> None:
+    """Count verified_devices documents created outside run_validation."""
+    updates: dict = {}
+    for device in devices:
+        for scope_key in _scope_keys(device):
+            update = updates.setdefault(scope_key, {"$inc": {"matches": 0}})
+            update["$inc"]["matches"] += 1
+    _apply(db, updates)
+
+
+def record_status_change(db, device: dict | None, old_status: str, new_status: str) -> None:
+    """Move one validation result between status counters (e.g. -> resolved)."""
+    if old_status == new_status:
+        return
+    _apply(db, _inc(device, {f"status.{old_status}": -1, f"status.{new_status}": 1}))
+
+
+def read_stats(db) -> dict | None:
+    """The global counter document, or None before the first write/rebuild."""
+    return db[STATS_COLLECTION].find_one({"_id": GLOBAL_ID})
+
+
+def read_breakdown(db, scope: str, limit: int = 50) -> list[dict]:
+    """Counter documents for one scope ("run" or "company"), largest first."""
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown stats scope: {scope}")
+    cursor = db[STATS_COLLECTION].find({"scope": scope}).sort("devices", DESCENDING).limit(limit)
+    return list(cursor)
+
+
+def ensure_indexes(db) -> None:
+    db[STATS_COLLECTION].create_index([("scope", 1), ("devices", -1)])
+
+
+def rebuild_stats(db) -> dict:
+    """Recompute every counter document from the source collections.
+
+    Concurrent writers may race with the rebuild; run it while no harvest
+    or validation is in progress.
+    """
+    docs: dict[tuple[str, str | None], dict] = {}
+
+    def _doc(scope_key):
+        return docs.setdefault(scope_key, {"devices": 0, "matches": 0, "status": {}, "last_run": None})
+
+    def _add(device, field, n, status=None, harvested_at=None):
+        for scope_key in _scope_keys(device):
+            doc = _doc(scope_key)
+            if status is not None:
+                doc["status"][status] = doc["status"].get(status, 0) + n
+            else:
+                doc[field] += n
+            if harvested_at and (doc["last_run"] is None or harvested_at > doc["last_run"]):
+                doc["last_run"] = harvested_at
+
+    def _as_device(group_id):
+        return {"companyName": group_id.get("company"),
+                "_harvest": {"harvest_run_id": group_id.get("run")}}
+
+    _doc(("global", None))
+    for row in db["devices"].aggregate([
+        {"$group": {
+            "_id": {"run": "$_harvest.harvest_run_id", "company": "$companyName"},
+            "n": {"$sum": 1},
+            "last_run": {"$max": "$_harvest.harvested_at"},
+        }},
+    ]):
+        _add(_as_device(row["_id"]), "devices", row["n"], harvested_at=row.get("last_run"))
+
+    for row in db["verified_devices"].aggregate([
+        {"$group": {
+            "_id": {"run": "$_harvest.harvest_run_id", "company": "$companyName"},
+            "n": {"$sum": 1},
+        }},
+    ]):
+        _add(_as_device(row["_id"]), "matches", row["n"])
+
+    for row in db["validationResults"].aggregate([
+        {"$group": {"_id": {"device": "$device_id", "status": "$status"}, "n": {"$sum": 1}}},
+        {"$lookup": {"from": "devices", "localField": "_id.device",
+                     "foreignField": "_id", "as": "device"}},
+        {"$unwind": {"path": "$device", "preserveNullAndEmptyArrays": True}},
+        {"$group": {
+            "_id": {"status": "$_id.status", "run": "$device._harvest.harvest_run_id",
+                    "company": "$device.companyName"},
+            "n": {"$sum": "$n"},
+        }},
+    ]):
+        _add(_as_device(row["_id"]), None, row["n"], status=row["_id"]["status"])
+
+    now = datetime.now(timezone.utc)
+    col = db[STATS_COLLECTION]
+    ids = []
+    ops = []
+    for (scope, key), counters in docs.items():
+        doc_id = _doc_id(scope, key)
+        ids.append(doc_id)
+        ops.append(ReplaceOne(
+            {"_id": doc_id},
+            {"_id": doc_id, "scope": scope, "key": key, **counters,
+             "updated_at": now, "rebuilt_at": now},
+            upsert=True,
+        ))
+    col.bulk_write(ops, ordered=False)
+    removed = col.delete_many({"_id": {"$nin": ids}}).deleted_count
+    ensure_indexes(db)
+    return {"documents": len(ids), "removed": removed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or rebuild the materialized dashboard statistics.")
+    parser.add_argument("command", choices=["rebuild", "show"])
+    parser.add_argument("--scope", choices=["global", *SCOPES], default="global",
+                        help="Counters to print with 'show'")
+    args = parser.parse_args()
+
+    from database.db_connection import get_db
+    db = get_db()
+    if args.command == "rebuild":
+        result = rebuild_stats(db)
+        print(f"Rebuilt {result['documents']} stats document(s), removed {result['removed']} stale")
+        return
+    docs = [read_stats(db)] if args.scope == "global" else read_breakdown(db, args.scope)
+    for doc in docs:
+        print(json.dumps(doc, default=str))
+
+
+if __name__ == "__main__":
+    main()
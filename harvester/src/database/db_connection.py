@@ -2,13 +2,14 @@ import logging
 import os
 import sys
 
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 
 # Ensure harvester/src is on sys.path so security.credentials resolves
 _SRC_DIR = os.path.join(os.path.dirname(__file__), os.pardir)
 if os.path.abspath(_SRC_DIR) not in sys.path:
     sys.path.insert(0, os.path.abspath(_SRC_DIR))
 
+from pipeline import metrics
 from security.credentials import CredentialManager
 
 logger = logging.getLogger(__name__)
@@ -17,11 +18,24 @@ _client = None
 _db = None
 
 
+class _CommandLatencyListener(monitoring.CommandListener):
+    """Feeds per-command latency into fivos_mongo_command_seconds."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        metrics.MONGO_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, outcome="ok")
+
+    def failed(self, event):
+        metrics.MONGO_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, outcome="error")
+
+
 def _get_client():
     global _client
     if _client is None:
         uri = CredentialManager.get_db_uri()
-        _client = MongoClient(uri)
+        _client = MongoClient(uri, event_listeners=[_CommandLatencyListener()])
     return _client
 
 
@@ -0,0 +1,260 @@
+"""Streaming export of devices, validation results and verified devices.
+
+``stream_export()`` reads a collection through a batched Mongo cursor and
+yields the encoded file chunk by chunk. The HTTP endpoint and the CLI
+both use it, and memory stays flat whatever the collection size:
+
+    csv     one header row, then one chunk per cursor batch
+    ndjson  one JSON document per line (full documents, BSON types
+            converted by ``database.serialization``)
+    xlsx    openpyxl write-only workbook; rows go to openpyxl's temp file
+            as they are appended, the finished zip is spooled to disk and
+            streamed out in fixed-size chunks
+
+CSV and XLSX use the fixed column list in ``EXPORT_COLUMNS``. Nested
+values such as deviceSizes or productCodes are written as JSON text.
+Text that a spreadsheet would run as a formula (leading ``=``, ``+``,
+``-``, ``@``, tab or CR) is prefixed with ``'`` in CSV and stored as a
+plain string cell in XLSX.
+Filters: ``run_id`` (harvest run), ``status`` (validationResults only) and
+``company`` (manufacturer, exact companyName).
+
+Usage:
+    python harvester/src/database/export.py devices --format csv --run-id HR-... -o devices.csv
+    python harvester/src/database/export.py validationResults --format xlsx --status mismatch -o out.xlsx
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Iterator
+
+# Ensure harvester/src is on sys.path for standalone runs
+_SRC_DIR = os.path.join(os.path.dirname(__file__), os.pardir)
+if os.path.abspath(_SRC_DIR) not in sys.path:
+    sys.path.insert(0, os.path.abspath(_SRC_DIR))
+
+from database.serialization import dumps, loads
+
+EXPORT_BATCH_SIZE = 500
+_XLSX_CHUNK_BYTES = 64 * 1024
+_XLSX_SPOOL_BYTES = 8 * 1024 * 1024
+_XLSX_MAX_CELL = 32767
+_CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_XLSX_FORMULA_PREFIXES = ("=", "+", "-", "@")
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+_DEVICE_COLUMNS = [
+    "_id", "brandName", "versionModelNumber", "catalogNumber", "companyName",
+    "deviceDescription", "MRISafetyStatus", "singleUse", "rx", "otc",
+    "deviceSterile", "sterilizationPriorToUse", "labeledContainsNRL", "labeledNoNRL",
+    "deviceKit", "premarketSubmissions", "environmentalConditions", "deviceSizes",
+    "gmdnPTName", "gmdnCode", "productCodes", "deviceCountInBase", "issuingAgency",
+    "lotBatch", "serialNumber", "manufacturingDate", "expirationDate",
+    "_harvest.harvest_run_id", "_harvest.harvested_at", "_harvest.source_url",
+]
+
+EXPORT_COLUMNS = {
+    "devices": _DEVICE_COLUMNS,
+    "validationResults": [
+        "_id", "device_id", "brandName", "companyName", "versionModelNumber",
+        "status", "matched_fields", "total_fields", "match_percent", "weighted_percent",
+        "description_similarity", "gudid_di", "created_at", "updated_at", "resolved_at",
+    ],
+    "verified_devices": _DEVICE_COLUMNS + ["gudid_di", "verified_at", "source_device_id"],
+}
+
+# Filter -> field per collection; a missing entry means the filter is not
+# supported there. validationResults filters run and company through the
+# devices they reference (see build_export_query).
+_FILTER_FIELDS = {
+    "devices": {"run_id": "_harvest.harvest_run_id", "company": "companyName"},
+    "validationResults": {"status": "status"},
+    "verified_devices": {"run_id": "_harvest.harvest_run_id", "company": "companyName"},
+}
+_DEVICE_LINK_FIELDS = {"run_id": "_harvest.harvest_run_id", "company": "companyName"}
+
+
+def build_export_query(db, collection: str, run_id: str | None = None,
+                       status: str | None = None, company: str | None = None) -> dict:
+    """Mongo filter for an export. Raises ValueError for unknown input."""
+    if collection not in EXPORT_COLUMNS:
+        raise ValueError(f"Unknown export collection: {collection}")
+    fields = _FILTER_FIELDS[collection]
+    query, device_query = {}, {}
+    for name, value in (("run_id", run_id), ("status", status), ("company", company)):
+        if not value:
+            continue
+        if name in fields:
+            query[fields[name]] = value
+        elif collection == "validationResults" and name in _DEVICE_LINK_FIELDS:
+            device_query[_DEVICE_LINK_FIELDS[name]] = value
+        else:
+            raise ValueError(f"{collection} cannot be filtered by {name}")
+    if device_query:
+        # Same device link as the dashboard, so legacy results without
+        # companyName are not dropped
+        from orchestrator import validation_device_filter
+        query.update(validation_device_filter(db, device_query))
+    return query
+
+
+def iter_documents(db, collection: str, query: dict, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list[dict]]:
+    """Documents matching *query* in cursor-sized batches (oldest first)."""
+    cursor = db[collection].find(query).sort("_id", 1).batch_size(batch_size)
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _lookup(doc: dict, column: str):
+    value = doc
+    for part in column.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode()
+    # ObjectId, datetime, Decimal128: the string form the JSON export uses
+    return str(loads(dumps(value)))
+
+
+def _xlsx_value(ws, value):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, datetime):
+        # Excel has no time zones; stored datetimes are UTC
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+    text = ILLEGAL_CHARACTERS_RE.sub("", _text(value))[:_XLSX_MAX_CELL]
+    if text.startswith(_XLSX_FORMULA_PREFIXES):
+        # Scraped text, not a formula
+        cell = WriteOnlyCell(ws, text)
+        cell.data_type = "s"
+        return cell
+    return text
+
+
+def _csv_value(value) -> str:
+    text = _text(value)
+    if text.startswith(_CSV_FORMULA_PREFIXES) and not isinstance(value, (int, float)):
+        # Scraped text, not a formula; numbers keep their sign
+        return "'" + text
+    return text
+
+
+def _csv_chunks(batches, columns) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for batch in batches:
+        for doc in batch:
+            writer.writerow([_csv_value(_lookup(doc, c)) for c in columns])
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def _ndjson_chunks(batches) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(dumps(doc) + b"\n" for doc in batch)
+
+
+def _xlsx_chunks(batches, columns, title: str) -> Iterator[bytes]:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=title[:31])
+    ws.append(columns)
+    for batch in batches:
+        for doc in batch:
+            ws.append([_xlsx_value(ws, _lookup(doc, c)) for c in columns])
+    with tempfile.SpooledTemporaryFile(max_size=_XLSX_SPOOL_BYTES) as out:
+        wb.save(out)
+        out.seek(0)
+        while chunk := out.read(_XLSX_CHUNK_BYTES):
+            yield chunk
+
+
+def stream_export(db, collection: str, fmt: str, query: dict,
+                  batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Encoded export of *collection* filtered by *query*, chunk by chunk."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    columns = EXPORT_COLUMNS[collection]
+    batches = iter_documents(db, collection, query, batch_size)
+    if fmt == "csv":
+        return _csv_chunks(batches, columns)
+    if fmt == "ndjson":
+        return _ndjson_chunks(batches)
+    return _xlsx_chunks(batches, columns, collection)
+
+
+def export_filename(collection: str, fmt: str) -> str:
+    return f"{collection}-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}.{fmt}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a collection as CSV, NDJSON or XLSX.")
+    parser.add_argument("collection", choices=list(EXPORT_COLUMNS))
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv")
+    parser.add_argument("--run-id", help="Harvest run ID")
+    parser.add_argument("--status", help="Validation status (validationResults only)")
+    parser.add_argument("--company", help="Manufacturer (exact companyName)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout; required for xlsx)")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.format == "xlsx" and not args.output:
+        parser.error("--output is required for xlsx")
+
+    from database.db_connection import get_db
+    db = get_db()
+    try:
+        query = build_export_query(db, args.collection, run_id=args.run_id,
+                                   status=args.status, company=args.company)
+    except ValueError as e:
+        parser.error(str(e))
+
+    chunks = stream_export(db, args.collection, args.format, query, batch_size=args.batch_size)
+    if args.output:
+        with open(args.output, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
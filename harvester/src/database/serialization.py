@@ -0,0 +1,83 @@
+"""JSON encoding of MongoDB documents in one pass.
+
+``dumps()`` turns a document (or any nesting of dicts and lists of them)
+straight into UTF-8 JSON bytes. ``to_jsonable()`` returns the same data as
+plain Python objects for templates and callers that still build on dicts.
+With ``orjson`` installed both run in C. The BSON types the driver hands
+back are converted inside the encoder:
+
+    ObjectId            -> "65f0c0ffee..."           (hex string)
+    datetime            -> "2026-05-01T10:00:00"     (isoformat)
+    Decimal128          -> "12.50"                   (exact decimal string)
+    Int64               -> 42
+    anything else       -> str(value)
+
+Without ``orjson`` the stdlib ``json`` module is used with the same
+conversions and orjson's limits applied first (NaN and +/-Infinity become
+null, integers outside the 64-bit range raise TypeError), so both produce
+the same JSON for MongoDB documents; the fallback is just slower.
+"""
+import json
+import math
+from datetime import date, datetime
+
+from bson import Decimal128, ObjectId
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+_INT_MIN, _INT_MAX = -(2 ** 63), 2 ** 64 - 1
+
+
+def _default(value):
+    """Encoder fallback for types JSON has no native form for."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def _orjson_compatible(obj):
+    """*obj* as orjson would see it: non-finite floats null, huge ints rejected."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, int) and not _INT_MIN <= obj <= _INT_MAX:
+        raise TypeError("Integer exceeds 64-bit range")
+    if isinstance(obj, dict):
+        return {key: _orjson_compatible(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_orjson_compatible(value) for value in obj]
+    return obj
+
+
+def _stdlib_default(value):
+    return _orjson_compatible(_default(value))
+
+
+def dumps(obj) -> bytes:
+    """Serialize *obj* (BSON types included) to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        _orjson_compatible(obj), default=_stdlib_default, allow_nan=False,
+        separators=(",", ":"), ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def loads(data: bytes | str):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def to_jsonable(obj):
+    """*obj* with every BSON value replaced by its JSON form."""
+    return loads(dumps(obj))
@@ -0,0 +1,49 @@
+"""Built-in job handlers: harvests and validation runs queued by the web UI,
+and distributed page extraction (opt-in, see pipeline.distributed)."""
+from jobs.worker import register_handler
+
+
+@register_handler("harvest_single")
+def harvest_single(payload: dict, ctx) -> dict:
+    from orchestrator import run_harvest_single
+    from pipeline.scheduler import INTERACTIVE, work_class
+    # An admin is waiting on this one: ahead of batches for browser and LLM slots
+    with work_class(INTERACTIVE):
+        return run_harvest_single(payload["url"])
+
+
+@register_handler("harvest_batch")
+def harvest_batch(payload: dict, ctx) -> dict:
+    from orchestrator import run_harvest_batch
+    return run_harvest_batch(payload["urls"], job_store=ctx, job_id=ctx.job_id,
+                             run_id=payload.get("run_id"))
+
+
+@register_handler("harvest_resume")
+def harvest_resume(payload: dict, ctx) -> dict:
+    from orchestrator import resume_harvest_batch
+    return resume_harvest_batch(payload["run_id"], job_store=ctx, job_id=ctx.job_id)
+
+
+@register_handler("validation")
+def validation(payload: dict, ctx) -> dict:
+    from orchestrator import (
+        run_validation,
+        backfill_verified_devices,
+        migrate_gudid_not_found,
+        get_latest_run_id,
+    )
+    migrate_gudid_not_found()
+    latest_run_id = get_latest_run_id()
+    ctx.check_cancelled()
+    result = run_validation(run_id=latest_run_id, cancel_check=ctx.check_cancelled)
+    result["run_id"] = latest_run_id
+    backfill = backfill_verified_devices()
+    result["verified_count"] = backfill.get("verified_count", 0)
+    return result
+
+
+@register_handler("extract_page", opt_in=True)
+def extract_page(payload: dict, ctx) -> dict:
+    from pipeline.distributed import run_extract_page_job
+    return run_extract_page_job(payload, ctx)
@@ -0,0 +1,470 @@
+"""Persistent job records with leases, heartbeats, retry and cancellation.
+
+Lifecycle::
+
+    queued --claim--> running --complete--> completed
+       ^                 |  \\--fail (attempts left)--> queued (after backoff)
+       |                 |   \\-fail (no attempts left)--> failed
+       |                 \\--lease expires--> reclaimed by another worker
+       \\--cancel (queued)--> cancelled;  cancel (running) sets cancel_requested
+
+A worker owns a running job only while its lease is current. It extends the
+lease with ``heartbeat()``; if the worker dies the lease lapses and the next
+``claim()`` picks the job up again (counting as a new attempt). Every
+state-changing call after ``claim()`` is conditional on the caller still
+holding the lease, so a worker that lost its job cannot overwrite the
+result of the one that took it over.
+
+Two backends share this logic:
+
+- ``MongoJobStore`` — the ``jobs`` collection, shared by all API processes
+  and workers (default).
+- ``SQLiteJobStore`` — a local file for single-host development.
+
+``get_job_store()`` picks one from ``JOB_STORE`` (``mongo``/``sqlite``).
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+DEFAULT_LEASE_SECONDS = 60
+DEFAULT_RETRY_DELAY_SECONDS = 30
+
+
+class JobStore:
+    """Backend-agnostic job lifecycle. Subclasses implement the _primitives."""
+
+    retry_delay_seconds = DEFAULT_RETRY_DELAY_SECONDS
+
+    # -- primitives -----------------------------------------------------
+
+    def _insert(self, doc: dict) -> None:
+        raise NotImplementedError
+
+    def _find(self, job_id: str) -> dict | None:
+        raise NotImplementedError
+
+    def _find_many(self, job_ids: list[str]) -> list[dict]:
+        return [doc for doc in map(self._find, job_ids) if doc is not None]
+
+    def _claim_next(self, worker_id: str, now: float, lease_until: float,
+                    job_types: list[str] | None) -> dict | None:
+        """Atomically take the oldest claimable job and return it post-update.
+
+        Claimable: queued with available_at <= now, or running with an
+        expired lease. The update sets status=running, lease_owner,
+        lease_expires_at, heartbeat_at, started_at and increments attempts.
+        """
+        raise NotImplementedError
+
+    def _update(self, job_id: str, fields: dict, *, worker_id: str | None = None,
+                statuses: tuple[str, ...] | None = None) -> bool:
+        """Set *fields* if the job matches the optional owner/status guard."""
+        raise NotImplementedError
+
+    def _purge(self, finished_before: float) -> int:
+        raise NotImplementedError
+
+    # -- public API -----------------------------------------------------
+
+    def enqueue(self, job_type: str, payload: dict | None = None, *,
+                max_attempts: int = 1, created_by: str | None = None) -> str:
+        now = time.time()
+        job_id = str(uuid.uuid4())
+        self._insert({
+            "job_id": job_id,
+            "type": job_type,
+            "payload": payload or {},
+            "status": QUEUED,
+            "result": None,
+            "error": None,
+            "attempts": 0,
+            "max_attempts": max(1, int(max_attempts)),
+            "cancel_requested": False,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "heartbeat_at": None,
+            "available_at": now,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "created_by": created_by,
+        })
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        """Public view of a job: status, result and bookkeeping, JSON-safe."""
+        doc = self._find(job_id)
+        return self._view(doc) if doc is not None else None
+
+    def get_many(self, job_ids: list[str]) -> list[dict]:
+        """``get`` for several jobs in one query; unknown ids are left out."""
+        return [self._view(doc) for doc in self._find_many(job_ids)]
+
+    @staticmethod
+    def _view(doc: dict) -> dict:
+        view = {
+            key: doc.get(key) for key in (
+                "job_id", "type", "status", "result", "error", "attempts",
+                "max_attempts", "cancel_requested", "created_by",
+            )
+        }
+        for key in ("created_at", "updated_at", "started_at", "finished_at", "heartbeat_at"):
+            ts = doc.get(key)
+            view[key] = datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+        return view
+
+    def claim(self, worker_id: str, *, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+              job_types: list[str] | None = None) -> dict | None:
+        """Lease the next runnable job to *worker_id*, or return None."""
+        while True:
+            now = time.time()
+            doc = self._claim_next(worker_id, now, now + lease_seconds, job_types)
+            if doc is None:
+                return None
+            if doc.get("cancel_requested"):
+                self._finish(doc["job_id"], worker_id, CANCELLED, error="Job cancelled")
+                continue
+            if doc["attempts"] > doc["max_attempts"]:
+                # Reclaimed after the last attempt's worker died mid-run
+                self._finish(doc["job_id"], worker_id, FAILED,
+                             error=f"Lease expired after {doc['max_attempts']} attempt(s)")
+                continue
+            return doc
+
+    def heartbeat(self, job_id: str, worker_id: str, *,
+                  lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                  progress: dict | None = None) -> bool:
+        """Extend the lease (and optionally publish progress).
+
+        Returns False if the worker no longer owns the job or cancellation
+        was requested — the worker should stop.
+        """
+        now = time.time()
+        fields = {"lease_expires_at": now + lease_seconds, "heartbeat_at": now, "updated_at": now}
+        if progress is not None:
+            fields["result"] = progress
+        if not self._update(job_id, fields, worker_id=worker_id, statuses=(RUNNING,)):
+            return False
+        doc = self._find(job_id)
+        return bool(doc) and not doc.get("cancel_requested")
+
+    def complete(self, job_id: str, worker_id: str, result) -> bool:
+        return self._finish(job_id, worker_id, COMPLETED, result=result)
+
+    def fail(self, job_id: str, worker_id: str, error: str, result=None) -> bool:
+        """Record a failed attempt; requeue with backoff if attempts remain."""
+        doc = self._find(job_id)
+        if doc is None or doc.get("lease_owner") != worker_id:
+            return False
+        if doc["attempts"] < doc["max_attempts"] and not doc.get("cancel_requested"):
+            now = time.time()
+            return self._update(job_id, {
+                "status": QUEUED,
+                "error": error,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "available_at": now + self.retry_delay_seconds * doc["attempts"],
+                "updated_at": now,
+            }, worker_id=worker_id, statuses=(RUNNING,))
+        return self._finish(job_id, worker_id, FAILED, error=error,
+                            result=result if result is not None else {"success": False, "error": error})
+
+    def mark_cancelled(self, job_id: str, worker_id: str) -> bool:
+        """Worker acknowledgement that it stopped a cancel-requested job."""
+        return self._finish(job_id, worker_id, CANCELLED, error="Job cancelled")
+
+    def cancel(self, job_id: str) -> str | None:
+        """Cancel a job. Returns its resulting status, or None if unknown.
+
+        Queued jobs are cancelled immediately; running jobs are flagged and
+        stop at their worker's next heartbeat.
+        """
+        now = time.time()
+        if self._update(job_id, {
+            "status": CANCELLED, "cancel_requested": True, "error": "Job cancelled",
+            "result": {"error": "Job cancelled"}, "finished_at": now, "updated_at": now,
+        }, statuses=(QUEUED,)):
+            return CANCELLED
+        self._update(job_id, {"cancel_requested": True, "updated_at": now}, statuses=(RUNNING,))
+        doc = self._find(job_id)
+        return doc["status"] if doc else None
+
+    def fail_expired(self, job_ids: list[str]) -> int:
+        """Fail running jobs among *job_ids* whose last attempt's lease lapsed.
+
+        ``claim()`` does this when a worker next polls; a caller waiting on
+        the jobs uses this so they finish even with no worker left to claim.
+        Returns the number of jobs failed.
+        """
+        now = time.time()
+        failed = 0
+        for doc in self._find_many(job_ids):
+            if (doc["status"] == RUNNING and (doc.get("lease_expires_at") or now) < now
+                    and doc["attempts"] >= doc["max_attempts"]):
+                failed += self._finish(doc["job_id"], doc["lease_owner"], FAILED,
+                                       error=f"Lease expired after {doc['max_attempts']} attempt(s)")
+        return failed
+
+    def purge_finished(self, older_than_seconds: float) -> int:
+        """Delete finished jobs older than the retention window."""
+        return self._purge(time.time() - older_than_seconds)
+
+    def _finish(self, job_id: str, worker_id: str, status: str, *, result=None,
+                error: str | None = None) -> bool:
+        now = time.time()
+        if result is None and status != COMPLETED:
+            result = {"error": error}
+        return self._update(job_id, {
+            "status": status,
+            "result": result,
+            "error": error,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "finished_at": now,
+            "updated_at": now,
+        }, worker_id=worker_id, statuses=(RUNNING,))
+
+
+# ---------------------------------------------------------------------------
+# MongoDB
+# ---------------------------------------------------------------------------
+
+class MongoJobStore(JobStore):
+    """Jobs in a Mongo collection; claims use find_one_and_update."""
+
+    def __init__(self, collection=None):
+        if collection is None:
+            from database.db_connection import get_db
+            collection = get_db()["jobs"]
+        self._col = collection
+        self._indexed = False
+
+    def _ensure_indexes(self) -> None:
+        if self._indexed:
+            return
+        self._col.create_index("job_id", unique=True)
+        self._col.create_index([("status", 1), ("available_at", 1), ("created_at", 1)])
+        self._col.create_index([("status", 1), ("lease_expires_at", 1)])
+        self._indexed = True
+
+    def _insert(self, doc):
+        self._ensure_indexes()
+        self._col.insert_one(dict(doc))
+
+    def _find(self, job_id):
+        return self._col.find_one({"job_id": job_id}, {"_id": 0})
+
+    def _find_many(self, job_ids):
+        return list(self._col.find({"job_id": {"$in": list(job_ids)}}, {"_id": 0}))
+
+    def _claim_next(self, worker_id, now, lease_until, job_types):
+        from pymongo import ReturnDocument
+
+        query = {"$or": [
+            {"status": QUEUED, "available_at": {"$lte": now}},
+            {"status": RUNNING, "lease_expires_at": {"$lt": now}},
+        ]}
+        if job_types:
+            query["type"] = {"$in": list(job_types)}
+        return self._col.find_one_and_update(
+            query,
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "lease_owner": worker_id,
+                    "lease_expires_at": lease_until,
+                    "heartbeat_at": now,
+                    "started_at": now,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _update(self, job_id, fields, *, worker_id=None, statuses=None):
+        query = {"job_id": job_id}
+        if worker_id is not None:
+            query["lease_owner"] = worker_id
+        if statuses:
+            query["status"] = {"$in": list(statuses)}
+        return self._col.update_one(query, {"$set": fields}).matched_count == 1
+
+    def _purge(self, finished_before):
+        return self._col.delete_many({
+            "status": {"$in": list(FINISHED_STATES)},
+            "finished_at": {"$lt": finished_before},
+        }).deleted_count
+
+
+# ---------------------------------------------------------------------------
+# SQLite
+# ---------------------------------------------------------------------------
+
+_SQLITE_COLUMNS = (
+    "job_id", "type", "payload", "status", "result", "error", "attempts",
+    "max_attempts", "cancel_requested", "lease_owner", "lease_expires_at",
+    "heartbeat_at", "available_at", "created_at", "updated_at", "started_at",
+    "finished_at", "created_by",
+)
+_SQLITE_JSON = ("payload", "result")
+
+
+class SQLiteJobStore(JobStore):
+    """Jobs in a local SQLite file; claims run inside BEGIN IMMEDIATE."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY, type TEXT NOT NULL, payload TEXT,
+                    status TEXT NOT NULL, result TEXT, error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL DEFAULT 1,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0, lease_owner TEXT,
+                    lease_expires_at REAL, heartbeat_at REAL, available_at REAL,
+                    created_at REAL, updated_at REAL, started_at REAL, finished_at REAL,
+                    created_by TEXT
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, available_at, created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _encode(fields: dict) -> dict:
+        out = dict(fields)
+        for key in _SQLITE_JSON:
+            if key in out:
+                out[key] = json.dumps(out[key], default=str)
+        if "cancel_requested" in out:
+            out["cancel_requested"] = int(bool(out["cancel_requested"]))
+        return out
+
+    @staticmethod
+    def _decode(row) -> dict | None:
+        if row is None:
+            return None
+        doc = dict(row)
+        for key in _SQLITE_JSON:
+            doc[key] = json.loads(doc[key]) if doc[key] is not None else None
+        doc["cancel_requested"] = bool(doc["cancel_requested"])
+        return doc
+
+    def _insert(self, doc):
+        row = self._encode(doc)
+        cols = ", ".join(_SQLITE_COLUMNS)
+        marks = ", ".join("?" for _ in _SQLITE_COLUMNS)
+        self._connect().execute(
+            f"INSERT INTO jobs ({cols}) VALUES ({marks})",
+            [row.get(c) for c in _SQLITE_COLUMNS],
+        )
+
+    def _find(self, job_id):
+        cur = self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+        return self._decode(cur.fetchone())
+
+    def _find_many(self, job_ids):
+        docs = []
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            cur = self._connect().execute(
+                f"SELECT * FROM jobs WHERE job_id IN ({', '.join('?' for _ in chunk)})", chunk)
+            docs.extend(self._decode(row) for row in cur.fetchall())
+        return docs
+
+    def _claim_next(self, worker_id, now, lease_until, job_types):
+        conn = self._connect()
+        sql = ("SELECT job_id FROM jobs WHERE ((status = ? AND available_at <= ?)"
+               " OR (status = ? AND lease_expires_at < ?))")
+        params: list = [QUEUED, now, RUNNING, now]
+        if job_types:
+            sql += f" AND type IN ({', '.join('?' for _ in job_types)})"
+            params += list(job_types)
+        sql += " ORDER BY created_at LIMIT 1"
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(sql, params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires_at = ?, heartbeat_at = ?,"
+                " started_at = ?, updated_at = ?, attempts = attempts + 1 WHERE job_id = ?",
+                (RUNNING, worker_id, lease_until, now, now, now, row["job_id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self._find(row["job_id"])
+
+    def _update(self, job_id, fields, *, worker_id=None, statuses=None):
+        row = self._encode(fields)
+        sets = ", ".join(f"{k} = ?" for k in row)
+        sql = f"UPDATE jobs SET {sets} WHERE job_id = ?"
+        params = list(row.values()) + [job_id]
+        if worker_id is not None:
+            sql += " AND lease_owner = ?"
+            params.append(worker_id)
+        if statuses:
+            sql += f" AND status IN ({', '.join('?' for _ in statuses)})"
+            params += list(statuses)
+        return self._connect().execute(sql, params).rowcount == 1
+
+    def _purge(self, finished_before):
+        marks = ", ".join("?" for _ in FINISHED_STATES)
+        return self._connect().execute(
+            f"DELETE FROM jobs WHERE status IN ({marks}) AND finished_at < ?",
+            [*FINISHED_STATES, finished_before],
+        ).rowcount
+
+
+_store: JobStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """Process-wide job store selected by JOB_STORE (mongo | sqlite)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            backend = os.getenv("JOB_STORE", "mongo").lower()
+            if backend == "sqlite":
+                _store = SQLiteJobStore(os.getenv("JOB_STORE_PATH", "fivos_jobs.sqlite3"))
+            else:
+                _store = MongoJobStore()
+        return _store
+
+
+def set_job_store(store: JobStore | None) -> None:
+    """Override the process-wide store (tests, embedded workers)."""
+    global _store
+    with _store_lock:
+        _store = store
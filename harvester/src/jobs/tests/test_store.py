@@ -0,0 +1,175 @@
+"""Job lifecycle tests against the SQLite backend, plus Mongo query shape."""
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from jobs.store import (
+    CANCELLED, COMPLETED, FAILED, QUEUED, RUNNING, MongoJobStore, SQLiteJobStore,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    s.retry_delay_seconds = 0
+    return s
+
+
+class TestLifecycle:
+    def test_enqueue_then_get(self, store):
+        job_id = store.enqueue("harvest_single", {"url": "https://x"}, created_by="a@b")
+        job = store.get(job_id)
+        assert job["status"] == QUEUED
+        assert job["type"] == "harvest_single"
+        assert job["created_by"] == "a@b"
+        assert job["created_at"].endswith("+00:00")
+
+    def test_unknown_job_is_none(self, store):
+        assert store.get("nope") is None
+
+    def test_get_many(self, store):
+        ids = [store.enqueue("validation") for _ in range(3)]
+        jobs = store.get_many(ids[:2] + ["nope"])
+        assert sorted(j["job_id"] for j in jobs) == sorted(ids[:2])
+        assert all("payload" not in j for j in jobs)
+        assert store.get_many([]) == []
+
+    def test_claim_complete(self, store):
+        job_id = store.enqueue("validation")
+        job = store.claim("w1")
+        assert job["job_id"] == job_id
+        assert job["attempts"] == 1
+        assert store.get(job_id)["status"] == RUNNING
+        assert store.claim("w2") is None
+        assert store.complete(job_id, "w1", {"validated": 3})
+        done = store.get(job_id)
+        assert done["status"] == COMPLETED
+        assert done["result"] == {"validated": 3}
+
+    def test_claims_oldest_first_and_filters_types(self, store):
+        first = store.enqueue("harvest_batch")
+        store.enqueue("validation")
+        assert store.claim("w", job_types=["validation"])["type"] == "validation"
+        assert store.claim("w")["job_id"] == first
+
+    def test_heartbeat_publishes_progress(self, store):
+        job_id = store.enqueue("harvest_batch")
+        store.claim("w1")
+        assert store.heartbeat(job_id, "w1", progress={"progress": 2, "total": 5})
+        assert store.get(job_id)["result"] == {"progress": 2, "total": 5}
+
+    def test_only_lease_owner_can_finish(self, store):
+        job_id = store.enqueue("validation")
+        store.claim("w1")
+        assert not store.complete(job_id, "intruder", {})
+        assert not store.heartbeat(job_id, "intruder")
+        assert store.get(job_id)["status"] == RUNNING
+
+
+class TestRetry:
+    def test_failure_requeues_until_attempts_exhausted(self, store):
+        job_id = store.enqueue("validation", max_attempts=2)
+        store.claim("w1")
+        store.fail(job_id, "w1", "boom")
+        assert store.get(job_id)["status"] == QUEUED
+        job = store.claim("w2")
+        assert job["attempts"] == 2
+        store.fail(job_id, "w2", "boom again")
+        failed = store.get(job_id)
+        assert failed["status"] == FAILED
+        assert failed["result"] == {"success": False, "error": "boom again"}
+
+    def test_expired_lease_is_reclaimed(self, store):
+        job_id = store.enqueue("harvest_batch", max_attempts=2)
+        store.claim("dead-worker", lease_seconds=0.01)
+        time.sleep(0.05)
+        job = store.claim("w2")
+        assert job["job_id"] == job_id
+        assert job["attempts"] == 2
+        # The dead worker can no longer write
+        assert not store.complete(job_id, "dead-worker", {})
+
+    def test_expired_lease_on_last_attempt_fails(self, store):
+        job_id = store.enqueue("harvest_batch")
+        store.claim("dead-worker", lease_seconds=0.01)
+        time.sleep(0.05)
+        assert store.claim("w2") is None
+        job = store.get(job_id)
+        assert job["status"] == FAILED
+        assert "Lease expired" in job["error"]
+
+    def test_fail_expired_without_a_claiming_worker(self, store):
+        last = store.enqueue("harvest_batch")
+        retryable = store.enqueue("harvest_batch", max_attempts=2)
+        live = store.enqueue("harvest_batch")
+        store.claim("dead-worker", lease_seconds=0.01)
+        store.claim("dead-worker", lease_seconds=0.01)
+        store.claim("live-worker", lease_seconds=60)
+        time.sleep(0.05)
+        assert store.fail_expired([last, retryable, live]) == 1
+        job = store.get(last)
+        assert job["status"] == FAILED
+        assert "Lease expired" in job["error"]
+        # Attempts left: still up for reclaiming; live lease: untouched
+        assert store.get(retryable)["status"] == RUNNING
+        assert store.get(live)["status"] == RUNNING
+
+    def test_backoff_delays_retry(self, store):
+        store.retry_delay_seconds = 60
+        job_id = store.enqueue("validation", max_attempts=2)
+        store.claim("w1")
+        store.fail(job_id, "w1", "boom")
+        assert store.claim("w1") is None
+
+
+class TestCancel:
+    def test_cancel_queued_job(self, store):
+        job_id = store.enqueue("validation")
+        assert store.cancel(job_id) == CANCELLED
+        assert store.claim("w") is None
+        assert store.get(job_id)["result"] == {"error": "Job cancelled"}
+
+    def test_cancel_running_job_stops_heartbeat(self, store):
+        job_id = store.enqueue("validation")
+        store.claim("w1")
+        assert store.cancel(job_id) == RUNNING
+        assert store.get(job_id)["cancel_requested"] is True
+        assert store.heartbeat(job_id, "w1") is False
+        assert store.mark_cancelled(job_id, "w1")
+        assert store.get(job_id)["status"] == CANCELLED
+
+    def test_cancel_unknown_job(self, store):
+        assert store.cancel("nope") is None
+
+
+def test_purge_finished(store):
+    old = store.enqueue("validation")
+    store.claim("w")
+    store.complete(old, "w", {})
+    pending = store.enqueue("validation")
+    assert store.purge_finished(-1) == 1
+    assert store.get(old) is None
+    assert store.get(pending) is not None
+
+
+class TestMongoBackend:
+    def test_claim_is_a_single_find_one_and_update(self):
+        col = MagicMock()
+        col.find_one_and_update.return_value = None
+        assert MongoJobStore(col).claim("w1", job_types=["validation"]) is None
+        query, update = col.find_one_and_update.call_args.args
+        assert {"status": QUEUED, "available_at": query["$or"][0]["available_at"]} == query["$or"][0]
+        assert query["$or"][1]["status"] == RUNNING
+        assert query["type"] == {"$in": ["validation"]}
+        assert update["$inc"] == {"attempts": 1}
+        assert update["$set"]["lease_owner"] == "w1"
+        assert col.find_one_and_update.call_args.kwargs["sort"] == [("created_at", 1)]
+
+    def test_updates_are_guarded_by_owner_and_status(self):
+        col = MagicMock()
+        col.update_one.return_value.matched_count = 1
+        assert MongoJobStore(col).complete("j1", "w1", {"ok": True})
+        query, update = col.update_one.call_args.args
+        assert query == {"job_id": "j1", "lease_owner": "w1", "status": {"$in": [RUNNING]}}
+        assert update["$set"]["status"] == COMPLETED
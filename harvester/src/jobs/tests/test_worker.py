@@ -0,0 +1,147 @@
+"""Worker tests: handler dispatch, failure, cancellation and heartbeats."""
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from jobs import worker as worker_mod
+from jobs.store import CANCELLED, COMPLETED, FAILED, SQLiteJobStore
+from jobs.worker import Worker, register_handler
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    s.retry_delay_seconds = 0
+    return s
+
+
+@pytest.fixture(autouse=True)
+def _test_handlers():
+    worker_mod._load_handlers()
+    saved = dict(worker_mod._handlers)
+    saved_opt_in = set(worker_mod._opt_in_types)
+    yield
+    worker_mod._handlers.clear()
+    worker_mod._handlers.update(saved)
+    worker_mod._opt_in_types.clear()
+    worker_mod._opt_in_types.update(saved_opt_in)
+
+
+def test_builtin_handlers_registered():
+    assert {"harvest_single", "harvest_batch", "validation"} <= set(worker_mod.registered_job_types())
+
+
+def test_single_harvest_runs_in_the_interactive_lane():
+    from pipeline import scheduler
+
+    with patch("orchestrator.run_harvest_single", side_effect=lambda url: scheduler.current_class()):
+        assert worker_mod._handlers["harvest_single"]({"url": "https://x"}, None) == scheduler.INTERACTIVE
+    assert scheduler.current_class() == scheduler.BULK
+
+
+def test_validation_checks_cancellation_per_device():
+    from unittest.mock import MagicMock
+
+    ctx = MagicMock()
+    with patch("orchestrator.migrate_gudid_not_found"), \
+         patch("orchestrator.get_latest_run_id", return_value="HR-1"), \
+         patch("orchestrator.run_validation", return_value={}) as run, \
+         patch("orchestrator.backfill_verified_devices", return_value={}):
+        worker_mod._handlers["validation"]({}, ctx)
+    assert run.call_args.kwargs["cancel_check"] == ctx.check_cancelled
+
+
+def test_opt_in_types_are_not_claimed_by_default(store):
+    register_handler("remote_only", opt_in=True)(lambda payload, ctx: None)
+    assert "remote_only" in worker_mod.registered_job_types()
+    assert "remote_only" not in worker_mod.default_job_types()
+    assert "extract_page" not in worker_mod.default_job_types()
+    store.enqueue("remote_only")
+    assert not Worker(store).run_once()
+    assert Worker(store, job_types=["remote_only"]).run_once()
+
+
+def test_runs_handler_and_completes(store):
+    register_handler("echo")(lambda payload, ctx: {"echo": payload["x"]})
+    job_id = store.enqueue("echo", {"x": 7})
+    assert Worker(store, job_types=["echo"]).run_once()
+    job = store.get(job_id)
+    assert job["status"] == COMPLETED
+    assert job["result"] == {"echo": 7}
+
+
+def test_empty_queue(store):
+    assert Worker(store).run_once() is False
+
+
+def test_handler_exception_fails_job(store):
+    def boom(payload, ctx):
+        raise RuntimeError("scrape failed")
+
+    register_handler("boom")(boom)
+    job_id = store.enqueue("boom")
+    Worker(store, job_types=["boom"]).run_once()
+    job = store.get(job_id)
+    assert job["status"] == FAILED
+    assert job["result"] == {"success": False, "error": "scrape failed"}
+
+
+def test_unknown_type_fails(store):
+    job_id = store.enqueue("mystery")
+    Worker(store, job_types=["mystery"]).run_once()
+    assert "No handler" in store.get(job_id)["error"]
+
+
+def test_progress_via_job_store_protocol(store):
+    seen = []
+
+    def batch(payload, ctx):
+        # run_harvest_batch publishes progress this way
+        ctx[ctx.job_id] = {"status": "running", "result": {"progress": 1, "total": 2}}
+        seen.append(store.get(ctx.job_id)["result"])
+        return {"total": 2}
+
+    register_handler("batch")(batch)
+    store.enqueue("batch")
+    Worker(store, job_types=["batch"]).run_once()
+    assert seen == [{"progress": 1, "total": 2}]
+
+
+def test_cancellation_stops_handler(store):
+    started = threading.Event()
+
+    def slow(payload, ctx):
+        started.set()
+        for _ in range(200):
+            ctx.check_cancelled()
+            time.sleep(0.01)
+        return {"finished": True}
+
+    register_handler("slow")(slow)
+    job_id = store.enqueue("slow")
+    w = Worker(store, job_types=["slow"], lease_seconds=0.15)
+    t = threading.Thread(target=w.run_once)
+    t.start()
+    started.wait(2)
+    store.cancel(job_id)
+    t.join(5)
+    assert store.get(job_id)["status"] == CANCELLED
+
+
+def test_heartbeat_keeps_long_job_leased(store):
+    def slow(payload, ctx):
+        time.sleep(0.4)
+        return {}
+
+    register_handler("slow")(slow)
+    job_id = store.enqueue("slow")
+    w = Worker(store, job_types=["slow"], lease_seconds=0.15)
+    t = threading.Thread(target=w.run_once)
+    t.start()
+    time.sleep(0.25)
+    # Lease would have expired without heartbeats
+    assert store.claim("other", job_types=["slow"]) is None
+    t.join(5)
+    assert store.get(job_id)["status"] == COMPLETED
@@ -0,0 +1,248 @@
+"""Job worker: pulls jobs from the store and runs their handlers.
+
+Run standalone (one process per core/host) with::
+
+    python harvester/src/jobs/worker.py --threads 2
+
+or embedded in the web app (``JOB_WORKER_MODE=embedded``, the default),
+where ``start_embedded_workers()`` runs the same loop on daemon threads.
+
+While a handler runs, a heartbeat thread extends the job's lease every
+third of the lease period. If the heartbeat reports the job was cancelled
+(or the lease was lost), the job's context is flagged and the handler stops
+at its next ``ctx.check_cancelled()`` / progress report.
+"""
+import argparse
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+
+# Ensure harvester/src is on sys.path for standalone runs
+_SRC_DIR = os.path.join(os.path.dirname(__file__), os.pardir)
+if os.path.abspath(_SRC_DIR) not in sys.path:
+    sys.path.insert(0, os.path.abspath(_SRC_DIR))
+
+from jobs.store import DEFAULT_LEASE_SECONDS, JobStore, get_job_store
+
+logger = logging.getLogger(__name__)
+
+_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_DAYS", "7")) * 86400
+_PURGE_INTERVAL_SECONDS = 3600
+
+_handlers: dict = {}
+# Types a Worker only takes when asked for them by name (``--types``)
+_opt_in_types: set[str] = set()
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job was cancelled or its lease lost."""
+
+
+def register_handler(job_type: str, *, opt_in: bool = False):
+    """Decorator: run *func(payload, ctx)* for jobs of *job_type*.
+
+    *opt_in* types are skipped by workers that were not given an explicit
+    type list (e.g. the web app's embedded workers).
+    """
+    def decorator(func):
+        _handlers[job_type] = func
+        if opt_in:
+            _opt_in_types.add(job_type)
+        return func
+    return decorator
+
+
+def registered_job_types() -> list[str]:
+    _load_handlers()
+    return sorted(_handlers)
+
+
+def default_job_types() -> list[str]:
+    _load_handlers()
+    return sorted(set(_handlers) - _opt_in_types)
+
+
+def _load_handlers() -> None:
+    import jobs.handlers  # noqa: F401  (registers the built-in handlers)
+
+
+class JobContext:
+    """Handed to handlers: job identity, progress reporting, cancellation.
+
+    Also usable as the ``job_store`` argument of run_harvest_batch, which
+    publishes progress with ``job_store[job_id] = {"status", "result"}``.
+    """
+
+    def __init__(self, store: JobStore, job: dict, worker_id: str, lease_seconds: float):
+        self.store = store
+        self.job_id = job["job_id"]
+        self.job = job
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check_cancelled(self) -> None:
+        if self._cancelled.is_set():
+            raise JobCancelled(self.job_id)
+
+    def report(self, progress: dict) -> None:
+        """Publish progress (shown by /api/jobs/{job_id}) and extend the lease."""
+        self.check_cancelled()
+        if not self.store.heartbeat(self.job_id, self.worker_id,
+                                    lease_seconds=self.lease_seconds, progress=progress):
+            self._cancelled.set()
+            raise JobCancelled(self.job_id)
+
+    def __setitem__(self, job_id: str, value: dict) -> None:
+        self.report((value or {}).get("result"))
+
+
+class Worker:
+    """Claims jobs from *store* one at a time and runs them to completion."""
+
+    def __init__(self, store: JobStore | None = None, *, worker_id: str | None = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS, poll_interval: float = 2.0,
+                 job_types: list[str] | None = None):
+        _load_handlers()
+        self.store = store or get_job_store()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.job_types = job_types or default_job_types()
+        self._last_purge = float("-inf")
+
+    def run_once(self) -> bool:
+        """Claim and run one job. Returns False when the queue was empty."""
+        job = self.store.claim(self.worker_id, lease_seconds=self.lease_seconds,
+                               job_types=self.job_types)
+        if job is None:
+            return False
+        self._run(job)
+        return True
+
+    def run_forever(self, stop: threading.Event | None = None) -> None:
+        stop = stop or threading.Event()
+        logger.info("Job worker %s started (types: %s)", self.worker_id, ", ".join(self.job_types))
+        while not stop.is_set():
+            try:
+                self._maybe_purge()
+                if not self.run_once():
+                    stop.wait(self.poll_interval)
+            except Exception as exc:
+                # Store unavailable etc. — back off, never exit the loop
+                logger.error("Job worker %s: %s", self.worker_id, exc)
+                stop.wait(self.poll_interval * 5)
+
+    def _run(self, job: dict) -> None:
+        ctx = JobContext(self.store, job, self.worker_id, self.lease_seconds)
+        handler = _handlers.get(job["type"])
+        logger.info("Job %s (%s) attempt %d on %s", ctx.job_id, job["type"], job["attempts"], self.worker_id)
+
+        done = threading.Event()
+        beat = threading.Thread(target=self._heartbeat_loop, args=(ctx, done),
+                                name=f"heartbeat-{ctx.job_id[:8]}", daemon=True)
+        beat.start()
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job type {job['type']!r}")
+            result = handler(job.get("payload") or {}, ctx)
+        except JobCancelled:
+            logger.info("Job %s cancelled", ctx.job_id)
+            self.store.mark_cancelled(ctx.job_id, self.worker_id)
+        except Exception as exc:
+            logger.error("Job %s failed: %s", ctx.job_id, exc, exc_info=True)
+            self.store.fail(ctx.job_id, self.worker_id, str(exc))
+        else:
+            self.store.complete(ctx.job_id, self.worker_id, result)
+        finally:
+            done.set()
+            beat.join()
+
+    def _heartbeat_loop(self, ctx: JobContext, done: threading.Event) -> None:
+        interval = max(self.lease_seconds / 3, 0.05)
+        while not done.wait(interval):
+            try:
+                if not self.store.heartbeat(ctx.job_id, self.worker_id, lease_seconds=self.lease_seconds):
+                    ctx._cancelled.set()
+                    return
+            except Exception as exc:
+                logger.warning("Heartbeat for job %s failed: %s", ctx.job_id, exc)
+
+    def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        if now - self._last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        purged = self.store.purge_finished(_RETENTION_SECONDS)
+        if purged:
+            logger.info("Purged %d finished job(s)", purged)
+
+
+def start_embedded_workers(threads: int = 2, store: JobStore | None = None) -> threading.Event:
+    """Run workers on daemon threads inside the current process.
+
+    Returns the stop event; set it on shutdown.
+    """
+    stop = threading.Event()
+    for i in range(threads):
+        worker = Worker(store)
+        threading.Thread(target=worker.run_forever, args=(stop,),
+                         name=f"job-worker-{i}", daemon=True).start()
+    return stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run harvest/validation jobs from the job store.")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("JOB_WORKER_THREADS", "1")),
+                        help="Jobs to run concurrently in this process")
+    parser.add_argument("--types", nargs="*", default=None,
+                        help=f"Job types to accept (default: {default_job_types()}; "
+                             f"registered: {registered_job_types()})")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="Lease length in seconds")
+    parser.add_argument("--poll", type=float, default=2.0, help="Idle poll interval in seconds")
+    parser.add_argument("--once", action="store_true", help="Drain the queue, then exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.once:
+        worker = Worker(lease_seconds=args.lease, poll_interval=args.poll, job_types=args.types)
+        while worker.run_once():
+            pass
+        return
+
+    stop = threading.Event()
+    workers = [
+        Worker(lease_seconds=args.lease, poll_interval=args.poll, job_types=args.types)
+        for _ in range(max(1, args.threads))
+    ]
+    threads = [
+        threading.Thread(target=w.run_forever, args=(stop,), name=f"job-worker-{i}")
+        for i, w in enumerate(workers)
+    ]
+    for t in threads:
+        t.start()
+    try:
+        while any(t.is_alive() for t in threads):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logger.info("Stopping workers after their current job...")
+        stop.set()
+        for t in threads:
+            t.join()
+
+
+if __name__ == "__main__":
+    # Re-enter through the package so handlers register on jobs.worker,
+    # not on this __main__ copy of the module.
+    from jobs.worker import main as _main
+    _main()
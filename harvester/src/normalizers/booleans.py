@@ -1,5 +1,7 @@
 """Normalize boolean and enum fields for GUDID alignment."""
 
+from normalizers.cache import cached_normalizer
+
 _TRUE_VALUES = {"yes", "true", "1", "y", "on"}
 _FALSE_VALUES = {"no", "false", "0", "n", "off"}
 
@@ -16,6 +18,7 @@ _MRI_STATUS_MAP = {
 _MRI_NO_INFO = "Labeling does not contain MRI Safety Information"
 
 
+@cached_normalizer("normalize_boolean")
 def normalize_boolean(raw: str) -> bool | None:
     """Normalize yes/no/true/false text to Python bool.
 
@@ -33,6 +36,7 @@ def normalize_boolean(raw: str) -> bool | None:
     return None
 
 
+@cached_normalizer("normalize_mri_status")
 def normalize_mri_status(raw: str) -> str | None:
     """Normalize MRI safety status to GUDID enum values.
 
@@ -0,0 +1,103 @@
+"""Bounded LRU memoization for the hot normalizers.
+
+Normalizers are pure functions of short strings and see the same values
+over and over within a run (every SKU on a page shares its manufacturer,
+brand and MRI text). Decorating them with ``cached_normalizer`` keeps a
+per-normalizer ``functools.lru_cache`` in front of the real function.
+
+Controls:
+- ``NORMALIZER_CACHE=false`` in the environment (or ``set_cache_enabled``)
+  bypasses every cache without touching call sites.
+- ``clear_caches()`` empties all caches and resets counters (tests).
+- ``cache_stats()`` reports hits/misses/hit ratio per normalizer.
+
+Only hashable, single-argument calls are cached; anything else falls
+through to the wrapped function. Dict results (normalize_measurement) are
+deep-copied on the way out so callers can never mutate a cached entry,
+including its nested ``components`` list or ``alternate`` dict.
+"""
+
+import copy
+import functools
+import os
+import threading
+
+DEFAULT_MAXSIZE = 4096
+
+_enabled = os.getenv("NORMALIZER_CACHE", "true").lower() != "false"
+_registry: dict = {}
+_bypassed: dict[str, int] = {}
+_bypass_lock = threading.Lock()
+
+
+def set_cache_enabled(enabled: bool) -> None:
+    """Globally enable or disable normalizer caching."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_cache_enabled() -> bool:
+    return _enabled
+
+
+def _count_bypass(name: str) -> None:
+    with _bypass_lock:
+        _bypassed[name] = _bypassed.get(name, 0) + 1
+
+
+def cached_normalizer(name: str, maxsize: int = DEFAULT_MAXSIZE):
+    """Decorator: memoize a one-argument normalizer under *name*."""
+    def decorator(func):
+        cached = functools.lru_cache(maxsize=maxsize, typed=True)(func)
+        _registry[name] = cached
+        _bypassed.setdefault(name, 0)
+
+        @functools.wraps(func)
+        def wrapper(raw):
+            if not _enabled:
+                return func(raw)
+            try:
+                result = cached(raw)
+            except TypeError:
+                # Unhashable input (list/dict) — not cacheable
+                _count_bypass(name)
+                return func(raw)
+            if isinstance(result, dict):
+                return copy.deepcopy(result)
+            return result
+
+        wrapper.uncached = func
+        wrapper.cache_info = cached.cache_info
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+    return decorator
+
+
+def clear_caches() -> None:
+    """Empty every normalizer cache and reset its counters."""
+    for cached in _registry.values():
+        cached.cache_clear()
+    with _bypass_lock:
+        for name in _bypassed:
+            _bypassed[name] = 0
+
+
+def cache_stats() -> dict[str, dict]:
+    """Per-normalizer cache counters.
+
+    Returns {name: {hits, misses, bypassed, size, maxsize, hit_ratio}}.
+    hit_ratio is hits / (hits + misses), or 0.0 before the first call.
+    """
+    stats = {}
+    for name, cached in sorted(_registry.items()):
+        info = cached.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "bypassed": _bypassed.get(name, 0),
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hit_ratio": round(info.hits / lookups, 4) if lookups else 0.0,
+        }
+    return stats
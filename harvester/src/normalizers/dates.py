@@ -1,7 +1,10 @@
 import re
 from datetime import datetime
 
+from normalizers.cache import cached_normalizer
 
+
+@cached_normalizer("normalize_date")
 def normalize_date(raw) -> str | None:
     if not isinstance(raw, str):
         return None
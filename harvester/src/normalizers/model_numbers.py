@@ -1,5 +1,7 @@
 import re
 
+from normalizers.cache import cached_normalizer
+
 MODEL_PREFIXES = [
     r"model\s*[-:.\\#]?\s*",
     r"cat\.?\s*no\.?\s*[-:.\\#]?\s*",
@@ -22,6 +24,7 @@ Example:
 - "cs-2000x" → "CS-2000X" ensures everything is uppercase
 - returns None if stripped string leaves nothing or empty string input
 """
+@cached_normalizer("clean_model_number")
 def clean_model_number(raw_model: str) -> str | None:
     if not raw_model or not isinstance(raw_model, str):
         return None
@@ -0,0 +1,94 @@
+import pytest
+
+from normalizers.cache import cache_stats, clear_caches, is_cache_enabled, set_cache_enabled
+from normalizers.text import normalize_text, clean_brand_name
+from normalizers.unit_conversions import normalize_measurement
+from normalizers.booleans import normalize_boolean
+from normalizers.dates import normalize_date  # noqa: F401  (registers its cache)
+from normalizers.model_numbers import clean_model_number  # noqa: F401
+from validators.company_aliases import canonical_company
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    previous = is_cache_enabled()
+    set_cache_enabled(True)
+    clear_caches()
+    yield
+    set_cache_enabled(previous)
+    clear_caches()
+
+
+class TestCacheHits:
+    def test_repeat_call_is_a_hit(self):
+        normalize_text("Medtronic &amp; Abbott")
+        normalize_text("Medtronic &amp; Abbott")
+        stats = cache_stats()["normalize_text"]
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_cached_result_matches_uncached(self):
+        raw = "IN.PACT™ Admiral drug-coated balloon"
+        assert clean_brand_name(raw) == clean_brand_name.uncached(raw)
+        assert clean_brand_name(raw) == clean_brand_name.uncached(raw)
+
+    def test_typed_keys_do_not_collide(self):
+        assert normalize_boolean("1") is True
+        assert normalize_boolean(1) is True
+        assert cache_stats()["normalize_boolean"]["misses"] == 2
+
+    def test_canonical_company_registered(self):
+        canonical_company("Covidien LP")
+        canonical_company("Covidien LP")
+        assert cache_stats()["canonical_company"]["hits"] == 1
+
+
+class TestCacheSafety:
+    def test_measurement_dict_is_copied(self):
+        first = normalize_measurement("10 cm")
+        first["value"] = -1
+        second = normalize_measurement("10 cm")
+        assert second["value"] == 100.0
+
+    def test_nested_measurement_values_are_copied(self):
+        compound = normalize_measurement("5.0 x 40 mm")
+        compound["components"].append(99.0)
+        assert normalize_measurement("5.0 x 40 mm")["components"] == [5.0, 40.0]
+
+        dual = normalize_measurement("6F/2.0 mm")
+        dual["alternate"]["value"] = -1
+        assert normalize_measurement("6F/2.0 mm")["alternate"]["value"] != -1
+
+    def test_unhashable_input_bypasses_cache(self):
+        assert normalize_text(["not", "a", "string"]) is None
+        stats = cache_stats()["normalize_text"]
+        assert stats["bypassed"] == 1
+        assert stats["misses"] == 0
+
+
+class TestCacheControls:
+    def test_disabled_cache_records_nothing(self):
+        set_cache_enabled(False)
+        normalize_text("abc")
+        normalize_text("abc")
+        stats = cache_stats()["normalize_text"]
+        assert stats["hits"] == 0
+        assert stats["misses"] == 0
+
+    def test_clear_resets_counters(self):
+        normalize_text("abc")
+        normalize_text("abc")
+        clear_caches()
+        stats = cache_stats()["normalize_text"]
+        assert stats == {
+            "hits": 0, "misses": 0, "bypassed": 0,
+            "size": 0, "maxsize": stats["maxsize"], "hit_ratio": 0.0,
+        }
+
+    def test_stats_cover_all_hot_normalizers(self):
+        assert set(cache_stats()) >= {
+            "clean_brand_name", "normalize_text", "clean_model_number",
+            "normalize_manufacturer", "normalize_measurement", "normalize_boolean",
+            "normalize_mri_status", "normalize_date", "canonical_company",
+        }
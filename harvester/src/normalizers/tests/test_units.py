@@ -1,4 +1,8 @@
-from normalizers.unit_conversions import normalize_measurement, normalize_manufacturer
+from normalizers.unit_conversions import (
+    normalize_measurement,
+    normalize_measurement_column,
+    normalize_manufacturer,
+)
 import pytest
 
 
@@ -347,3 +351,62 @@ class TestFrenchConversion:
         assert result['value'] == pytest.approx(2.0, abs=1e-3)
         assert result['range_low'] == pytest.approx(5 / 3, abs=1e-3)
         assert result['range_high'] == pytest.approx(7 / 3, abs=1e-3)
+
+
+class TestCompoundValues:
+
+    def test_shared_trailing_unit(self):
+        result = normalize_measurement('5.0 x 40 mm')
+        assert result['is_compound'] is True
+        assert result['components'] == [5.0, 40.0]
+        assert result['value'] == 5.0
+        assert result['unit'] == 'mm'
+
+    def test_per_component_units(self):
+        result = normalize_measurement('6 Fr x 135 cm')
+        assert result['components'] == [2.0, 1350.0]
+        assert result['unit'] == 'mm'
+
+    def test_no_spaces(self):
+        result = normalize_measurement('5x40mm')
+        assert result['components'] == [5.0, 40.0]
+
+    def test_mixed_dimensions_not_compound(self):
+        result = normalize_measurement('5 mm x 2 g')
+        assert 'is_compound' not in result
+
+
+class TestDualUnitValues:
+
+    def test_french_slash_mm(self):
+        result = normalize_measurement('6F/2.0 mm')
+        assert result['value'] == 2.0
+        assert result['unit'] == 'mm'
+        assert result['alternate'] == {'value': 2.0, 'unit': 'mm'}
+
+    def test_inch_with_parenthesized_mm_prefers_mm(self):
+        result = normalize_measurement('0.035 in (0.89 mm)')
+        assert result['value'] == 0.89
+        assert result['alternate']['value'] == pytest.approx(0.889)
+
+    def test_mm_hg_with_space(self):
+        result = normalize_measurement('120 mm Hg')
+        assert result['value'] == 120.0
+        assert result['unit'] == 'mmHg'
+
+
+class TestMeasurementColumn:
+
+    def test_counts(self):
+        column = normalize_measurement_column(['5 mm', None, '', 'abc', '5 xyz', '6F/2.0 mm'])
+        assert len(column.values) == 6
+        assert column.parsed == 2
+        assert column.empty == 2
+        assert column.unknown_unit == 1
+        assert column.failed == 1
+        assert column.failures == ['abc']
+
+    def test_values_match_single_calls(self):
+        cells = ['10 cm', '10-20 mm', '5.0 x 40 mm']
+        column = normalize_measurement_column(cells)
+        assert column.values == [normalize_measurement(c) for c in cells]
@@ -2,6 +2,8 @@ import re
 import html
 import unicodedata
 
+from normalizers.cache import cached_normalizer
+
 INVISIBLE_CHARS = re.compile(
     r"[\u200b\u200c\u200d\u200e\u200f"   # Zero-width spaces/joiners/marks
     r"\u00ad"                              # Soft hyphen
@@ -27,6 +29,7 @@ _TM_SYMBOLS_RE = re.compile(r"[™®©℠†°]|(?<=\w)TM(?=\s|$|\b)")
 _SMART_QUOTES_RE = re.compile(r"[‘’“”]")
 
 
+@cached_normalizer("clean_brand_name")
 def clean_brand_name(raw: str) -> str | None:
     """Clean a brand name for GUDID alignment.
 
@@ -47,6 +50,7 @@ def clean_brand_name(raw: str) -> str | None:
     return text if text else None
 
 
+@cached_normalizer("normalize_text")
 def normalize_text(raw: str) -> str | None:
     """Clean a general text field.
     Steps: HTML decode → NFKC normalize → strip invisible chars → collapse whitespace.
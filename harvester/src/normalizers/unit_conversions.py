@@ -1,44 +1,58 @@
 import re
+from dataclasses import dataclass, field
+from typing import Iterable
 
-unit_conversions = {
+from normalizers.cache import cached_normalizer
+
+# Unit -> (canonical unit, multiplicative factor). Every supported
+# conversion is linear, so a factor table replaces per-call lambdas.
+UNIT_FACTORS = {
     #convert to length and distacne to millimeters
-    'mm': ('mm', lambda x: x),
-    'cm': ('mm', lambda x: x* 10),
-    'm': ('mm', lambda x: x * 1000),
-    'in': ('mm', lambda x: x * 25.4),
-    'inches': ('mm', lambda x: x* 25.4),
-    'inch': ('mm', lambda x: x* 25.4),
-    '"': ('mm', lambda x: x*25.4),
-    'ft': ('mm', lambda x: x* 304.8),
-    'feet': ('mm', lambda x: x* 304.8),
-    'foot': ('mm', lambda x: x* 304.8),
+    'mm': ('mm', 1.0),
+    'cm': ('mm', 10.0),
+    'm': ('mm', 1000.0),
+    'in': ('mm', 25.4),
+    'inches': ('mm', 25.4),
+    'inch': ('mm', 25.4),
+    '"': ('mm', 25.4),
+    'ft': ('mm', 304.8),
+    'feet': ('mm', 304.8),
+    'foot': ('mm', 304.8),
 
     #French (catheter/sheath sizing): 1 Fr = 1/3 mm
-    'fr': ('mm', lambda x: x / 3),
-    'french': ('mm', lambda x: x / 3),
+    'fr': ('mm', 1 / 3),
+    'f': ('mm', 1 / 3),
+    'french': ('mm', 1 / 3),
 
     #converting weighted measurements to grams
-    'g': ('g', lambda x: x),
-    'grams': ('g', lambda x: x),
-    'kg': ('g', lambda x: x* 1000),
-    'lbs': ('g', lambda x: x*453.592),
-    'lb': ('g', lambda x: x * 453.592),
-    'ounces': ('g', lambda x: x * 28.3495),
-    'oz': ('g', lambda x: x * 28.3495),
-    
+    'g': ('g', 1.0),
+    'grams': ('g', 1.0),
+    'kg': ('g', 1000.0),
+    'lbs': ('g', 453.592),
+    'lb': ('g', 453.592),
+    'ounces': ('g', 28.3495),
+    'oz': ('g', 28.3495),
+
     #converting volume to ml
-    'ml': ('mL', lambda x: x),
-    'l': ('mL', lambda x: x*1000),
-    'liters': ('mL', lambda x: x*1000),
-    'cc': ('mL', lambda x: x),
-    'fl oz': ('mL', lambda x: x * 29.5735),
-    
+    'ml': ('mL', 1.0),
+    'l': ('mL', 1000.0),
+    'liters': ('mL', 1000.0),
+    'cc': ('mL', 1.0),
+    'fl oz': ('mL', 29.5735),
+
     #converting pressure to mmHg (millimeters of mecury)
-    'mmhg': ('mmHg', lambda x: x),
-    'kpa': ('mmHg', lambda x: x * 7.50062),
-    'psi': ('mmHg', lambda x: x * 51.7149),
-    'atm': ('mmHg', lambda x: x* 760),
-    'bar': ('mmHg', lambda x: x* 750.062)
+    'mmhg': ('mmHg', 1.0),
+    'mm hg': ('mmHg', 1.0),
+    'kpa': ('mmHg', 7.50062),
+    'psi': ('mmHg', 51.7149),
+    'atm': ('mmHg', 760.0),
+    'bar': ('mmHg', 750.062),
+}
+
+# Backward-compatible view: unit -> (canonical unit, converter callable).
+unit_conversions = {
+    unit: (canonical, (lambda factor: lambda x: x * factor)(factor))
+    for unit, (canonical, factor) in UNIT_FACTORS.items()
 }
 
 
@@ -118,6 +132,7 @@ manufacturer_aliases = {
     'terumo bct': 'TERUMO CORPORATION',
 }
 
+@cached_normalizer("normalize_manufacturer")
 def normalize_manufacturer(raw: str):
     if not raw or not isinstance(raw, str):
         return None
@@ -125,33 +140,144 @@ def normalize_manufacturer(raw: str):
     return manufacturer_aliases.get(cleaned, None)
 
 
-def normalize_measurement(raw_value: str):
-    if not raw_value or not isinstance(raw_value, str):
+# ---------------------------------------------------------------------------
+# Measurement parsing — patterns compiled once at import
+# ---------------------------------------------------------------------------
+
+_NUM = r"(\d+(?:\.\d*)?|\.\d+)"
+_UNIT = r"((?i:fl\s*oz|mm\s*hg)|[a-zA-Z°\"]+)"
+
+_RANGE_RE = re.compile(rf"{_NUM}\s*(?:[-–—]|to)+\s*{_NUM}\s*{_UNIT}")
+_SINGLE_RE = re.compile(rf"{_NUM}\s*{_UNIT}")
+_PART_RE = re.compile(rf"{_NUM}\s*{_UNIT}?\.?")
+# "5.0 x 40 mm", "6 Fr x 135 cm", "5x40mm" — separator must precede a number
+_COMPOUND_SEP_RE = re.compile(r"\s*(?:[x×*]|\bby\b)\s*(?=[\d.])", re.IGNORECASE)
+# "6F/2.0 mm", "0.035 in (0.89 mm)", '0.035" / 0.89 mm'
+_DUAL_RE = re.compile(
+    rf"{_NUM}\s*{_UNIT}\.?\s*(?:/|\()\s*{_NUM}\s*{_UNIT}\.?\s*\)?"
+)
+_WS_RE = re.compile(r"\s+")
+_NUMBER_START = frozenset("0123456789.")
+
+
+def _unit_factor(unit: str) -> tuple[str, float] | None:
+    key = unit.rstrip(".").lower()
+    factor = UNIT_FACTORS.get(key)
+    if factor is None and " " not in key:
+        return None
+    return factor or UNIT_FACTORS.get(_WS_RE.sub(" ", key))
+
+
+def _parse_part(text: str) -> tuple[float, str | None] | None:
+    match = _PART_RE.fullmatch(text.strip())
+    if not match:
+        return None
+    return float(match.group(1)), match.group(2)
+
+
+def _parse_dual(raw_value: str) -> dict | None:
+    match = _DUAL_RE.fullmatch(raw_value)
+    if not match:
+        return None
+    first = (float(match.group(1)), match.group(2))
+    second = (float(match.group(3)), match.group(4))
+    first_factor = _unit_factor(first[1])
+    second_factor = _unit_factor(second[1])
+    if not first_factor or not second_factor or first_factor[0] != second_factor[0]:
+        return None
+
+    canonical_unit = first_factor[0]
+    # Prefer the side already stated in the canonical unit: the label's
+    # own metric figure beats a converted imperial/French one.
+    if second_factor[1] == 1.0 and first_factor[1] != 1.0:
+        primary, alternate = (second, second_factor), (first, first_factor)
+    else:
+        primary, alternate = (first, first_factor), (second, second_factor)
+
+    return {
+        "value": round(primary[0][0] * primary[1][1], 4),
+        "unit": canonical_unit,
+        "raw": raw_value,
+        "alternate": {
+            "value": round(alternate[0][0] * alternate[1][1], 4),
+            "unit": canonical_unit,
+        },
+    }
+
+
+def _parse_compound(raw_value: str) -> dict | None:
+    parts = _COMPOUND_SEP_RE.split(raw_value)
+    if len(parts) < 2:
+        return None
+    parsed = [_parse_part(p) for p in parts]
+    if any(p is None for p in parsed):
+        return None
+
+    # A trailing unit applies to every bare number before it ("5.0 x 40 mm").
+    trailing_unit = parsed[-1][1]
+    if trailing_unit is None:
+        return None
+    components = []
+    canonical_unit = None
+    for value, unit in parsed:
+        factor = _unit_factor(unit or trailing_unit)
+        if factor is None:
+            return {
+                "value": parsed[0][0],
+                "unit": trailing_unit,
+                "raw": raw_value,
+                "is_compound": True,
+                "components": [v for v, _ in parsed],
+            }
+        if canonical_unit is not None and factor[0] != canonical_unit:
+            return None
+        canonical_unit = factor[0]
+        components.append(round(value * factor[1], 4))
+
+    return {
+        "value": components[0],
+        "unit": canonical_unit,
+        "raw": raw_value,
+        "is_compound": True,
+        "components": components,
+    }
+
+
+def _parse_measurement(raw_value: str) -> dict:
+    # Every supported shape starts with a number; reject the rest (model
+    # numbers, labels) before touching any pattern.
+    if not raw_value or raw_value[0] not in _NUMBER_START:
         return {"value": None, "unit": None, "raw": raw_value}
-    
-    raw_value = raw_value.strip()
-    range_match = re.match(r"([\d.]+)\s*[-–—to]+\s*([\d.]+)\s*(fl oz|[a-zA-Z°\"]+)", raw_value)
 
-    if range_match:
-        low = float(range_match.group(1))
-        high = float(range_match.group(2))
-        unit = range_match.group(3).strip().rstrip(".")
-        midpoint = round((low + high) / 2, 4)
+    # Cheap substring checks keep single values off the slower paths.
+    if "/" in raw_value or "(" in raw_value:
+        dual = _parse_dual(raw_value)
+        if dual is not None:
+            return dual
 
-        unit_key = unit.lower()
-        if unit_key in unit_conversions:
-            canonical_unit, converter = unit_conversions[unit_key]
+    lowered = raw_value.lower()
+    if "x" in lowered or "×" in raw_value or "*" in raw_value or "by" in lowered:
+        compound = _parse_compound(raw_value)
+        if compound is not None:
+            return compound
 
+    range_match = _RANGE_RE.match(raw_value)
+    if range_match:
+        factor = _unit_factor(range_match.group(3))
+        if factor is not None:
+            canonical_unit, multiplier = factor
+            low = float(range_match.group(1))
+            high = float(range_match.group(2))
+            midpoint = round((low + high) / 2, 4)
             return {
-                'value': round(converter(midpoint), 4),
+                'value': round(midpoint * multiplier, 4),
                 'unit': canonical_unit,
                 'is_range': True,
-                'range_low': round(converter(low), 4),
-                'range_high': round(converter(high), 4)
+                'range_low': round(low * multiplier, 4),
+                'range_high': round(high * multiplier, 4)
             }
 
-    match = re.match(r"([\d.]+)\s*(fl oz|[a-zA-Z°\"]+)", raw_value)
-    
+    match = _SINGLE_RE.match(raw_value)
     if not match:
         return {
             "value": None,
@@ -161,12 +287,11 @@ def normalize_measurement(raw_value: str):
 
     value = float(match.group(1))
     unit = match.group(2).strip().rstrip(".")
-
-    unit_key = unit.lower()
-    if unit_key in unit_conversions:
-        canonical_unit, converter = unit_conversions[unit_key]
+    factor = _unit_factor(unit)
+    if factor is not None:
+        canonical_unit, multiplier = factor
         return {
-            "value": round(converter(value), 4),
+            "value": round(value * multiplier, 4),
             "unit": canonical_unit,
             "raw": raw_value,
         }
@@ -175,4 +300,56 @@ def normalize_measurement(raw_value: str):
         "value": value,
         "unit": unit,
         "raw": raw_value,
-    }
\ No newline at end of file
+    }
+
+
+@cached_normalizer("normalize_measurement")
+def normalize_measurement(raw_value: str):
+    """Parse a measurement cell into {value, unit, raw} in canonical units.
+
+    Handles single values ("10 cm"), ranges ("10-20 mm", midpoint value plus
+    range_low/range_high), compound cells ("5.0 x 40 mm", first dimension as
+    value plus components) and dual-unit cells ("6F/2.0 mm",
+    "0.035 in (0.89 mm)", canonical-unit side as value plus alternate).
+    Unknown units pass through unconverted; unparseable input returns
+    value/unit None.
+    """
+    if not raw_value or not isinstance(raw_value, str):
+        return {"value": None, "unit": None, "raw": raw_value}
+    return _parse_measurement(raw_value.strip())
+
+
+@dataclass
+class MeasurementColumn:
+    """Result of converting one table column with normalize_measurement_column."""
+    values: list[dict] = field(default_factory=list)
+    parsed: int = 0
+    empty: int = 0
+    unknown_unit: int = 0
+    failed: int = 0
+    failures: list[str] = field(default_factory=list)
+
+
+def normalize_measurement_column(cells: Iterable[str | None]) -> MeasurementColumn:
+    """Convert a whole column of measurement cells at once.
+
+    Returns a MeasurementColumn with one normalized dict per input cell (in
+    order) and counters: parsed (canonical unit found), empty (None/blank),
+    unknown_unit (number found, unit not in UNIT_FACTORS) and failed (no
+    number/unit). Failing raw cells are listed in ``failures``.
+    """
+    column = MeasurementColumn()
+    canonical_units = {canonical for canonical, _ in UNIT_FACTORS.values()}
+    for cell in cells:
+        result = normalize_measurement(cell)
+        column.values.append(result)
+        if not cell or not isinstance(cell, str) or not cell.strip():
+            column.empty += 1
+        elif result["value"] is None:
+            column.failed += 1
+            column.failures.append(cell)
+        elif result["unit"] not in canonical_units:
+            column.unknown_unit += 1
+        else:
+            column.parsed += 1
+    return column
@@ -2,8 +2,9 @@
 
 Operations:
 1. run_harvest_single() / run_harvest_batch() — scrape + extract + append to DB
+   (resume_harvest_batch() continues an interrupted, checkpointed batch)
 2. run_validation() — compare harvested devices against GUDID API
-3. get_discrepancy_detail() / resolve_discrepancy() — human review of mismatches
+3. get_review_view() / resolve_discrepancy() — human review of mismatches
 4. lookup_gudid_device() — direct GUDID API lookup
 """
 
@@ -52,14 +53,19 @@ def _is_null_list(value) -> bool:
     return value is None or (isinstance(value, list) and len(value) == 0)
 
 
+def _gudid_fill(device: dict, gudid_record: dict) -> dict:
+    """GUDID values for the device's null MERGE_FIELDS."""
+    return {
+        field: gudid_record[field]
+        for field in MERGE_FIELDS
+        if device.get(field) is None and gudid_record.get(field) is not None
+    }
+
+
 def _merge_gudid_into_device(db, device: dict, gudid_record: dict) -> list[str]:
     """Fill null device fields with GUDID values. Returns list of fields filled."""
-    updates = {}
-    filled = []
-    for field in MERGE_FIELDS:
-        if device.get(field) is None and gudid_record.get(field) is not None:
-            updates[field] = gudid_record[field]
-            filled.append(field)
+    updates = _gudid_fill(device, gudid_record)
+    filled = list(updates)
 
     if updates:
         updates["gudid_sourced_fields"] = filled
@@ -71,21 +77,21 @@ def _merge_gudid_into_device(db, device: dict, gudid_record: dict) -> list[str]:
     return filled
 
 
+def _insert_validation_result(validation_col, device: dict, doc: dict) -> None:
+    """Insert a validation result with its precomputed review snapshot.
+
+    *device* is the device as the review page should show it (after any
+    GUDID merge that follows this insert).
+    """
+    from validators.review_snapshot import build_review_snapshot
+    doc["review_snapshot"] = build_review_snapshot(doc, device)
+    validation_col.insert_one(doc)
+
+
 def _serialize_record(record: dict) -> dict:
     """Make a MongoDB document JSON-serializable."""
-    out = {}
-    for k, v in record.items():
-        if isinstance(v, ObjectId):
-            out[k] = str(v)
-        elif isinstance(v, datetime):
-            out[k] = v.isoformat()
-        elif isinstance(v, dict):
-            out[k] = _serialize_record(v)
-        elif isinstance(v, list):
-            out[k] = [_serialize_record(i) if isinstance(i, dict) else i for i in v]
-        else:
-            out[k] = v
-    return out
+    from database.serialization import to_jsonable
+    return to_jsonable(record)
 
 
 def _get_run_id() -> str:
@@ -99,9 +105,12 @@ def _get_run_id() -> str:
 def run_harvest_single(url: str) -> dict:
     """Scrape one URL, extract with Ollama, append to devices collection.
 
-    Returns: {"url", "scraped", "devices_extracted", "db_inserted", "run_id", "error"}
+    Returns: {"url", "scraped", "devices_extracted", "db_inserted", "run_id",
+              "error", "timings"}
     """
     from pipeline.runner import scrape_urls, _process_single_ollama, write_record_json
+    from pipeline.tracing import record_stages, span
+    from database.dashboard_stats import record_devices_inserted
     from database.db_connection import get_db
 
     run_id = _get_run_id()
@@ -112,117 +121,242 @@ def run_harvest_single(url: str) -> dict:
         "db_inserted": 0,
         "run_id": run_id,
         "error": None,
+        "timings": {},
     }
 
-    try:
-        output_dir = os.path.abspath(_DEFAULT_OUTPUT_DIR)
-        os.makedirs(output_dir, exist_ok=True)
+    with record_stages() as timings:
+        try:
+            output_dir = os.path.abspath(_DEFAULT_OUTPUT_DIR)
+            os.makedirs(output_dir, exist_ok=True)
+
+            # 1. Scrape
+            with span("phase.scrape"):
+                saved = scrape_urls([url], _DEFAULT_HTML_DIR)
+            if not saved:
+                result["error"] = f"Failed to scrape {url}"
+                return result
+            result["scraped"] = True
 
-        # 1. Scrape
-        saved = scrape_urls([url], _DEFAULT_HTML_DIR)
-        if not saved:
-            result["error"] = f"Failed to scrape {url}"
-            return result
-        result["scraped"] = True
+            # 2. Extract via Ollama
+            with span("phase.extract"):
+                records = _process_single_ollama(saved[0], source_url=url, harvest_run_id=run_id)
+            result["devices_extracted"] = len(records)
 
-        # 2. Extract via Ollama
-        records = _process_single_ollama(saved[0], source_url=url, harvest_run_id=run_id)
-        result["devices_extracted"] = len(records)
+            if not records:
+                result["error"] = "Ollama extraction returned no records"
+                return result
 
-        if not records:
-            result["error"] = "Ollama extraction returned no records"
-            return result
+            # 3. Write JSON + append to DB
+            try:
+                with span("phase.persist"):
+                    db = get_db()
+                    inserted = []
+                    try:
+                        for record in records:
+                            write_record_json(record, output_dir)
+                            with span("db.insert"):
+                                db["devices"].insert_one(record)
+                            inserted.append(record)
+                            result["db_inserted"] += 1
+                    finally:
+                        record_devices_inserted(db, inserted)
+            except Exception as e:
+                logger.warning("run_harvest_single: MongoDB error: %s", e)
+                result["error"] = f"DB write error: {e}"
 
-        # 3. Write JSON + append to DB
-        try:
-            db = get_db()
-            for record in records:
-                write_record_json(record, output_dir)
-                db["devices"].insert_one(record)
-                result["db_inserted"] += 1
         except Exception as e:
-            logger.warning("run_harvest_single: MongoDB error: %s", e)
-            result["error"] = f"DB write error: {e}"
-
-    except Exception as e:
-        logger.error("run_harvest_single: %s", e)
-        result["error"] = str(e)
+            logger.error("run_harvest_single: %s", e)
+            result["error"] = str(e)
+        finally:
+            result["timings"] = timings.as_dict()
 
     return result
 
 
-def run_harvest_batch(urls: list[str], job_store: dict | None = None, job_id: str | None = None) -> dict:
+def run_harvest_batch(
+    urls: list[str],
+    job_store: dict | None = None,
+    job_id: str | None = None,
+    run_id: str | None = None,
+) -> dict:
     """Scrape + parallel-extract + DB insert, in three phases.
 
     Phase 1: sequential scrape (Playwright is already internally batched).
-    Phase 2: parallel LLM extraction via ThreadPoolExecutor.
-    Phase 3: sequential JSON writes + MongoDB inserts on the main thread.
+    Phase 2: parallel LLM extraction via ThreadPoolExecutor; each file's
+             records are written to JSON as soon as it finishes.
+    Phase 3: sequential MongoDB inserts on the main thread.
+
+    Every URL is checkpointed per stage in harvestCheckpoints (see
+    pipeline.checkpoints). Passing the ``run_id`` of an interrupted run
+    resumes it: only URLs that did not reach a stage are run through it.
 
     Returns the shape expected by app/templates/harvester.html:
-        {total, succeeded, failed, results: [...], run_id}
+        {total, succeeded, failed, incomplete, results: [...], run_id, resumed, timings}
     Each results entry: {url, scraped, devices_extracted, db_inserted, error}
+    ``timings`` holds wall-clock seconds per phase and per-stage
+    percentiles over the extracted files.
+
+    Live progress (per-stage counts, current URL, per-model success) is
+    published through pipeline.progress on the job's channel and, when a
+    ``job_store`` is given, written through to it about once a second.
     """
+    from pymongo.errors import DuplicateKeyError
     from pipeline.runner import _scrape_urls_with_meta, write_record_json
     from pipeline.parallel_batch import process_html_files_parallel
+    from pipeline.checkpoints import (
+        EXTRACTED, PENDING, PERSISTED, SCRAPED, HarvestCheckpoints, html_still_present,
+    )
+    from pipeline.progress import HarvestProgress, track
+    from pipeline.tracing import StageTimings, record_stages, span, summarize_timings
+    from web_scraper.scraper import dedupe_keep_order, is_pdf_url
+    from database.dashboard_stats import record_devices_inserted
     from database.db_connection import get_db
 
-    run_id = _get_run_id()
+    run_id = run_id or _get_run_id()
     output_dir = os.path.abspath(_DEFAULT_OUTPUT_DIR)
     os.makedirs(output_dir, exist_ok=True)
+    run_timings = StageTimings()
+    run_urls = [u for u in dedupe_keep_order(urls) if not is_pdf_url(u)]
+    progress = HarvestProgress(job_id or run_id, job_store=job_store, job_id=job_id)
 
-    # Phase 1: scrape (per-URL metadata preserves failures)
-    meta = _scrape_urls_with_meta(urls, _DEFAULT_HTML_DIR)
-    scraped = [m for m in meta if m["path"]]
-    source_urls = {m["path"]: m["url"] for m in scraped}
-
-    # Phase 2: parallel extraction
-    def _progress(completed: int, total: int) -> None:
-        if job_store is not None and job_id is not None:
-            job_store[job_id] = {
-                "status": "running",
-                "result": {"progress": completed, "total": total},
-            }
-
-    file_results = process_html_files_parallel(
-        [m["path"] for m in scraped],
-        harvest_run_id=run_id,
-        source_urls=source_urls,
-        progress_callback=_progress,
-    )
-    file_results_by_path = {r.path: r for r in file_results}
-
-    # Phase 3: JSON write + DB insert sequentially
     try:
         db = get_db()
     except Exception as e:
         logger.warning("run_harvest_batch: MongoDB unavailable: %s", e)
         db = None
 
-    results: list[dict] = []
-    for m in meta:
-        entry = {
-            "url": m["url"],
-            "scraped": m["path"] is not None,
-            "devices_extracted": 0,
-            "db_inserted": 0,
-            "error": m["error"],
-        }
-        fr = file_results_by_path.get(m["path"]) if m["path"] else None
-        if fr is not None:
-            entry["devices_extracted"] = len(fr.records)
-            if fr.error:
-                entry["error"] = fr.error
-            for record in fr.records:
-                write_record_json(record, output_dir)
-                if db is not None:
+    # Load (or create) checkpoints; without a DB the run is simply not resumable
+    checkpoints = None
+    state: dict[str, dict] = {}
+    if db is not None:
+        try:
+            checkpoints = HarvestCheckpoints(db, run_id)
+            state = checkpoints.start(run_urls)
+        except Exception as e:
+            logger.warning("run_harvest_batch: checkpoints unavailable: %s", e)
+            checkpoints = None
+    for url in run_urls:
+        state.setdefault(url, {
+            "url": url, "stage": PENDING, "path": None, "final_url": None, "error": None,
+            "record_ids": [], "record_files": [], "devices_extracted": 0, "db_inserted": 0,
+        })
+    resumed = any(state[u]["stage"] != PENDING for u in run_urls)
+
+    def _checkpoint(method: str, *args) -> None:
+        if checkpoints is None:
+            return
+        try:
+            getattr(checkpoints, method)(*args)
+        except Exception as e:
+            logger.warning("run_harvest_batch: checkpoint %s failed: %s", method, e)
+
+    # A resumed URL whose saved HTML is gone has to be scraped again
+    for url in run_urls:
+        cp = state[url]
+        if cp["stage"] == SCRAPED and not html_still_present(cp):
+            cp["stage"] = PENDING
+
+    # Phase 1: scrape (per-URL metadata preserves failures)
+    to_scrape = [u for u in run_urls if state[u]["stage"] == PENDING]
+    if to_scrape:
+        progress.begin_stage("scrape", len(to_scrape))
+        with record_stages(run_timings), span("phase.scrape"):
+            meta = _scrape_urls_with_meta(
+                to_scrape, _DEFAULT_HTML_DIR,
+                on_fetched=lambda url, ok: progress.item_done("scrape", url, ok),
+            )
+        for m in meta:
+            cp = state[m["url"]]
+            if m["path"]:
+                cp.update(stage=SCRAPED, path=m["path"], final_url=m["final_url"], error=None)
+                _checkpoint("mark_scraped", m["url"], m["path"], m["final_url"])
+            else:
+                cp["error"] = m["error"]
+                _checkpoint("mark_scrape_failed", m["url"], m["error"])
+
+    # Phase 2: parallel extraction, checkpointed per file
+    to_extract = [u for u in run_urls if state[u]["stage"] == SCRAPED]
+    url_by_path = {state[u]["path"]: u for u in to_extract}
+    records_by_url: dict[str, list[dict]] = {}
+
+    def _on_extracted(fr) -> None:
+        url = url_by_path[fr.path]
+        cp = state[url]
+        if not fr.records:
+            cp.update(error=fr.error, devices_extracted=0)
+            _checkpoint("mark_extract_failed", url, fr.error)
+            progress.item_done("extract", url, False)
+            return
+        ids, files = [], []
+        for record in fr.records:
+            # Pre-assigned so a resumed insert is idempotent
+            record["_id"] = ObjectId()
+            ids.append(str(record["_id"]))
+            files.append(write_record_json(
+                {k: v for k, v in record.items() if k != "_id"}, output_dir,
+            ))
+        records_by_url[url] = fr.records
+        cp.update(stage=EXTRACTED, record_ids=ids, record_files=files,
+                  devices_extracted=len(ids), error=None)
+        _checkpoint("mark_extracted", url, ids, files)
+        # Last: a cancelled job raises here, after the checkpoint is written
+        progress.item_done("extract", url, True)
+
+    progress.begin_stage("extract", len(to_extract))
+    with record_stages(run_timings), span("phase.extract"), track(progress):
+        file_results = process_html_files_parallel(
+            [state[u]["path"] for u in to_extract],
+            harvest_run_id=run_id,
+            source_urls={state[u]["path"]: u for u in to_extract},
+            result_callback=_on_extracted,
+        )
+
+    # Phase 3: DB insert sequentially
+    if db is not None:
+        to_persist = [u for u in run_urls if state[u]["stage"] == EXTRACTED]
+        progress.begin_stage("persist", len(to_persist))
+        with record_stages(run_timings), span("phase.persist"):
+            for url in to_persist:
+                cp = state[url]
+                records = records_by_url.get(url)
+                if records is None:
+                    records = _load_checkpointed_records(cp)
+                if records is None:
+                    cp["error"] = "Extracted record files are missing; re-extracting on next resume"
+                    cp["stage"] = SCRAPED
+                    _checkpoint("mark_scraped", url, cp["path"], cp["final_url"])
+                    continue
+                inserted, error = 0, None
+                new_records = []
+                for record in records:
                     try:
-                        db["devices"].insert_one(record)
-                        entry["db_inserted"] += 1
+                        with span("db.insert"):
+                            db["devices"].insert_one(record)
+                        inserted += 1
+                        new_records.append(record)
+                    except DuplicateKeyError:
+                        inserted += 1  # persisted (and counted) by an earlier attempt
                     except Exception as e:
-                        entry["error"] = f"DB error: {e}"
-        results.append(entry)
+                        error = f"DB error: {e}"
+                record_devices_inserted(db, new_records)
+                cp.update(db_inserted=inserted, error=error)
+                if error is None:
+                    cp["stage"] = PERSISTED
+                _checkpoint("mark_persisted", url, inserted, error)
+                progress.item_done("persist", url, error is None)
+
+    results: list[dict] = [
+        {
+            "url": url,
+            "scraped": state[url]["stage"] != PENDING,
+            "devices_extracted": state[url]["devices_extracted"],
+            "db_inserted": state[url]["db_inserted"],
+            "error": state[url]["error"],
+        }
+        for url in run_urls
+    ]
 
-    return {
+    summary = {
         "total": len(urls),
         "succeeded": sum(
             1 for r in results
@@ -232,9 +366,59 @@ def run_harvest_batch(urls: list[str], job_store: dict | None = None, job_id: st
             1 for r in results
             if r["devices_extracted"] == 0 or r["error"]
         ),
+        "incomplete": sum(1 for u in run_urls if state[u]["stage"] != PERSISTED),
         "results": results,
         "run_id": run_id,
+        "resumed": resumed,
+        "timings": {
+            "phases": run_timings.as_dict(),
+            "stages": summarize_timings([r.timings for r in file_results]),
+        },
     }
+    _checkpoint("finish", summary)
+    progress.finish()
+    return summary
+
+
+def _load_checkpointed_records(checkpoint: dict) -> list[dict] | None:
+    """Reload a URL's extracted records from their JSON files (resume path)."""
+    files = checkpoint.get("record_files") or []
+    ids = checkpoint.get("record_ids") or []
+    if not files or len(files) != len(ids):
+        return None
+    records = []
+    for path, record_id in zip(files, ids):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        record["_id"] = ObjectId(record_id)
+        records.append(record)
+    return records
+
+
+def resume_harvest_batch(run_id: str, job_store: dict | None = None, job_id: str | None = None) -> dict:
+    """Resume an interrupted batch harvest; only incomplete URLs are reprocessed."""
+    from pipeline.checkpoints import get_run_urls
+    from database.db_connection import get_db
+
+    urls = get_run_urls(get_db(), run_id)
+    if urls is None:
+        raise ValueError(f"Unknown harvest run: {run_id}")
+    return run_harvest_batch(urls, job_store=job_store, job_id=job_id, run_id=run_id)
+
+
+def list_resumable_harvests(limit: int = 10) -> list[dict]:
+    """Recent batch runs with URLs that have not been persisted yet."""
+    from pipeline.checkpoints import list_resumable_runs
+    from database.db_connection import get_db
+
+    try:
+        return list_resumable_runs(get_db(), limit=limit)
+    except Exception as e:
+        logger.warning("list_resumable_harvests: %s", e)
+        return []
 
 
 # ---------------------------------------------------------------------------
@@ -267,19 +451,26 @@ def run_pipeline_batch(file_paths: list[str] | None = None, overwrite: bool = Fa
     )
 
     records = []
+    from database.dashboard_stats import rebuild_stats, record_devices_inserted
     from database.db_connection import get_db
     try:
         db = get_db()
         if overwrite:
             db["devices"].drop()
+        inserted = []
         for json_path in summary.get("files", []):
             try:
                 with open(json_path, "r", encoding="utf-8") as f:
                     record = json.load(f)
                 db["devices"].insert_one(record)
+                inserted.append(record)
                 records.append(_serialize_record(record))
             except Exception as e:
                 logger.warning("run_pipeline_batch: failed to import %s: %s", json_path, e)
+        if overwrite:
+            rebuild_stats(db)
+        else:
+            record_devices_inserted(db, inserted)
     except Exception as e:
         logger.warning("run_pipeline_batch: MongoDB unavailable: %s", e)
 
@@ -329,11 +520,52 @@ def lookup_gudid_device(di: str | None = None, model_number: str | None = None)
 # Validation
 # ---------------------------------------------------------------------------
 
-def run_validation(run_id: str | None = None, overwrite: bool = False) -> dict:
-    """Validate harvested devices against GUDID. Default: append (no overwrite)."""
-    from database.db_connection import get_db
+# Concurrent GUDID lookups per validation run. AccessGUDID is a public
+# service, so the default stays sequential.
+GUDID_WORKERS = 1
+
+
+def _lookup_gudid(device: dict) -> tuple[str | None, dict | None, str | None]:
+    """(di, gudid_record, error) for one device; request failures become *error*."""
+    import requests
     from validators.gudid_client import fetch_gudid_record
+
+    try:
+        di, gudid_record = fetch_gudid_record(
+            catalog_number=device.get("catalogNumber"),
+            version_model_number=device.get("versionModelNumber"),
+        )
+    except requests.RequestException as e:
+        logger.warning("GUDID lookup failed for device %s: %s", device.get("_id"), e)
+        return None, None, str(e)
+    return di, gudid_record, None
+
+
+def _iter_gudid_lookups(devices: list[dict], workers: int):
+    """(device, lookup) pairs in device order, looked up on *workers* threads."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="gudid")
+    try:
+        yield from zip(devices, pool.map(_lookup_gudid, devices))
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def run_validation(run_id: str | None = None, overwrite: bool = False,
+                   workers: int | None = None, cancel_check=None) -> dict:
+    """Validate harvested devices against GUDID. Default: append (no overwrite).
+
+    GUDID lookups run on *workers* threads (default GUDID_WORKERS); results
+    are compared and written in device order on the calling thread. A
+    device whose lookup fails is counted in ``lookup_errors`` and left
+    unvalidated. *cancel_check* is called before each device and stops the
+    run by raising (a job's ``ctx.check_cancelled``); pending lookups are
+    dropped.
+    """
+    from database.db_connection import get_db
     from validators.comparison_validator import compare_records
+    from database.dashboard_stats import rebuild_stats, record_validation
 
     result = {
         "success": False,
@@ -345,6 +577,7 @@ def run_validation(run_id: str | None = None, overwrite: bool = False) -> dict:
         "gudid_deactivated": 0,
         "harvest_gap_product_codes": 0,
         "harvest_gap_premarket": 0,
+        "lookup_errors": 0,
         "error": None,
     }
 
@@ -370,17 +603,20 @@ def run_validation(run_id: str | None = None, overwrite: bool = False) -> dict:
         result["error"] = "No devices found to validate"
         return result
 
-    for device in devices:
-        di, gudid_record = fetch_gudid_record(
-            catalog_number=device.get("catalogNumber"),
-            version_model_number=device.get("versionModelNumber"),
-        )
+    for device, (di, gudid_record, lookup_error) in _iter_gudid_lookups(devices, workers or GUDID_WORKERS):
+        if cancel_check:
+            cancel_check()
+        if lookup_error:
+            result["lookup_errors"] += 1
+            continue
 
         if not gudid_record:
             result["mismatches"] += 1
-            validation_col.insert_one({
+            _insert_validation_result(validation_col, device, {
                 "device_id": device.get("_id"),
                 "brandName": device.get("brandName"),
+                "companyName": device.get("companyName"),
+                "versionModelNumber": device.get("versionModelNumber"),
                 "status": "mismatch",
                 "matched_fields": 0,
                 "total_fields": 0,
@@ -392,13 +628,16 @@ def run_validation(run_id: str | None = None, overwrite: bool = False) -> dict:
                 "created_at": datetime.now(timezone.utc),
                 "updated_at": datetime.now(timezone.utc),
             })
+            record_validation(db, device, "mismatch")
             continue
 
         record_status = (gudid_record or {}).get("deviceRecordStatus")
         if record_status == "Deactivated":
-            validation_col.insert_one({
+            _insert_validation_result(validation_col, device, {
                 "device_id": device["_id"],
                 "brandName": device.get("brandName"),
+                "companyName": device.get("companyName"),
+                "versionModelNumber": device.get("versionModelNumber"),
                 "status": "gudid_deactivated",
                 "matched_fields": None,
                 "total_fields": None,
@@ -413,6 +652,7 @@ def run_validation(run_id: str | None = None, overwrite: bool = False) -> dict:
                 "updated_at": datetime.now(timezone.utc),
             })
             result["gudid_deactivated"] = result.get("gudid_deactivated", 0) + 1
+            record_validation(db, device, "gudid_deactivated")
             continue
 
         comparison, summary = compare_records(device, gudid_record)
@@ -450,9 +690,11 @@ def run_validation(run_id: str | None = None, overwrite: bool = False) -> dict:
             )
             result["harvest_gap_premarket"] += 1
 
-        validation_col.insert_one({
+        _insert_validation_result(validation_col, {**device, **_gudid_fill(device, gudid_record)}, {
             "device_id": device.get("_id"),
             "brandName": device.get("brandName"),
+            "companyName": device.get("companyName"),
+            "versionModelNumber": device.get("versionModelNumber"),
             "status": status,
             "matched_fields": matched_fields,
             "total_fields": total_fields,
@@ -467,6 +709,7 @@ def run_validation(run_id: str | None = None, overwrite: bool = False) -> dict:
         })
 
         # Fully matched devices → store in verified_devices (harvested + GUDID extras)
+        verified_upserted = False
         if status == "matched":
             verified_record = dict(device)
             verified_record.pop("_id", None)
@@ -478,17 +721,21 @@ def run_validation(run_id: str | None = None, overwrite: bool = False) -> dict:
             verified_record["verified_at"] = datetime.now(timezone.utc)
             verified_record["source_device_id"] = device.get("_id")
             # Upsert by model+catalog to avoid duplicates on re-validation
-            verified_col.update_one(
+            upsert = verified_col.update_one(
                 {"versionModelNumber": verified_record.get("versionModelNumber"),
                  "catalogNumber": verified_record.get("catalogNumber")},
                 {"$set": verified_record},
                 upsert=True,
             )
+            verified_upserted = upsert.upserted_id is not None
+        record_validation(db, device, status, verified_upserted=verified_upserted)
 
         # Fill null device fields from GUDID (runs after comparison to preserve original diff)
         _merge_gudid_into_device(db, device, gudid_record)
 
     result["success"] = True
+    if overwrite:
+        rebuild_stats(db)
 
     # Remove JSON files from output dir so next validation only sees new harvests.
     output_dir = os.path.abspath(_DEFAULT_OUTPUT_DIR)
@@ -507,40 +754,34 @@ def run_validation(run_id: str | None = None, overwrite: bool = False) -> dict:
     return result
 
 
+_BACKFILL_CHUNK_SIZE = 500
+
+
 def backfill_verified_devices() -> dict:
-    """Process existing validation results and populate verified_devices for matched records."""
+    """Process existing validation results and populate verified_devices for matched records.
+
+    Works in chunks of matched results: one $in query fetches the chunk's
+    devices and one ordered bulk write upserts its verified records, so the
+    round trips grow with the number of chunks, not of results.
+    """
     from database.db_connection import get_db
     try:
         db = get_db()
         verified_col = db["verified_devices"]
-        matched_results = db["validationResults"].find({"status": "matched"})
+        matched_results = db["validationResults"].find(
+            {"status": "matched"},
+            {"device_id": 1, "gudid_record": 1, "gudid_di": 1},
+        ).batch_size(_BACKFILL_CHUNK_SIZE)
 
         count = 0
+        chunk = []
         for vr in matched_results:
-            device = db["devices"].find_one({"_id": vr.get("device_id")})
-            if not device:
-                continue
-
-            gudid_record = vr.get("gudid_record") or {}
-            verified_record = dict(device)
-            verified_record.pop("_id", None)
-
-            # Merge GUDID fields where harvested is null
-            for field in MERGE_FIELDS:
-                if verified_record.get(field) is None and gudid_record.get(field) is not None:
-                    verified_record[field] = gudid_record[field]
-
-            verified_record["gudid_di"] = vr.get("gudid_di")
-            verified_record["verified_at"] = datetime.now(timezone.utc)
-            verified_record["source_device_id"] = device.get("_id")
-
-            verified_col.update_one(
-                {"versionModelNumber": verified_record.get("versionModelNumber"),
-                 "catalogNumber": verified_record.get("catalogNumber")},
-                {"$set": verified_record},
-                upsert=True,
-            )
-            count += 1
+            chunk.append(vr)
+            if len(chunk) >= _BACKFILL_CHUNK_SIZE:
+                count += _backfill_chunk(db, verified_col, chunk)
+                chunk = []
+        if chunk:
+            count += _backfill_chunk(db, verified_col, chunk)
 
         return {"success": True, "verified_count": count}
     except Exception as e:
@@ -548,6 +789,50 @@ def backfill_verified_devices() -> dict:
         return {"success": False, "error": str(e)}
 
 
+def _backfill_chunk(db, verified_col, results: list[dict]) -> int:
+    """Upsert verified records for one chunk of matched validation results."""
+    from pymongo import UpdateOne
+    from database.dashboard_stats import record_verified_upserted
+
+    device_ids = [vr.get("device_id") for vr in results if vr.get("device_id") is not None]
+    devices_by_id = {d["_id"]: d for d in db["devices"].find({"_id": {"$in": device_ids}})}
+
+    ops, sources = [], []
+    for vr in results:
+        device = devices_by_id.get(vr.get("device_id"))
+        if not device:
+            continue
+
+        gudid_record = vr.get("gudid_record") or {}
+        verified_record = dict(device)
+        verified_record.pop("_id", None)
+
+        # Merge GUDID fields where harvested is null
+        for field in MERGE_FIELDS:
+            if verified_record.get(field) is None and gudid_record.get(field) is not None:
+                verified_record[field] = gudid_record[field]
+
+        verified_record["gudid_di"] = vr.get("gudid_di")
+        verified_record["verified_at"] = datetime.now(timezone.utc)
+        verified_record["source_device_id"] = device.get("_id")
+
+        ops.append(UpdateOne(
+            {"versionModelNumber": verified_record.get("versionModelNumber"),
+             "catalogNumber": verified_record.get("catalogNumber")},
+            {"$set": verified_record},
+            upsert=True,
+        ))
+        sources.append(device)
+
+    if not ops:
+        return 0
+    # Ordered: a later result for the same model+catalog updates the
+    # record an earlier one just upserted, as the sequential loop did.
+    bulk = verified_col.bulk_write(ops, ordered=True)
+    record_verified_upserted(db, [sources[i] for i in (bulk.upserted_ids or {})])
+    return len(ops)
+
+
 def migrate_gudid_not_found() -> dict:
     """One-time migration: rename existing gudid_not_found records to mismatch."""
     from database.db_connection import get_db
@@ -557,43 +842,108 @@ def migrate_gudid_not_found() -> dict:
             {"status": "gudid_not_found"},
             {"$set": {"status": "mismatch"}},
         )
+        if r.modified_count:
+            from database.dashboard_stats import rebuild_stats
+            rebuild_stats(db)
         return {"matched": r.matched_count, "modified": r.modified_count}
     except Exception as e:
         logger.warning("migrate_gudid_not_found: %s", e)
         return {"matched": 0, "modified": 0}
 
 
+def backfill_validation_companies() -> dict:
+    """One-time migration: copy companyName onto validation results written
+    before it was stored on them, so the dashboard's company sort sees it.
+
+    Chunked like backfill_verified_devices; results whose device is gone get
+    an explicit null so they are not revisited.
+    """
+    from database.db_connection import get_db
+    try:
+        db = get_db()
+        col = db["validationResults"]
+        legacy = col.find({"companyName": {"$exists": False}}, {"device_id": 1}).batch_size(_BACKFILL_CHUNK_SIZE)
+
+        modified = 0
+        chunk = []
+        for vr in legacy:
+            chunk.append(vr)
+            if len(chunk) < _BACKFILL_CHUNK_SIZE:
+                continue
+            modified += _backfill_companies_chunk(db, col, chunk)
+            chunk = []
+        if chunk:
+            modified += _backfill_companies_chunk(db, col, chunk)
+        return {"modified": modified}
+    except Exception as e:
+        logger.warning("backfill_validation_companies: %s", e)
+        return {"modified": 0}
+
+
+def _backfill_companies_chunk(db, col, results: list[dict]) -> int:
+    """Set companyName from the owning device for one chunk of validation results."""
+    from pymongo import UpdateOne
+
+    device_ids = [vr["device_id"] for vr in results if vr.get("device_id") is not None]
+    companies = {d["_id"]: d.get("companyName")
+                 for d in db["devices"].find({"_id": {"$in": device_ids}}, {"companyName": 1})}
+    ops = [UpdateOne({"_id": vr["_id"]}, {"$set": {"companyName": companies.get(vr.get("device_id"))}})
+           for vr in results]
+    return col.bulk_write(ops, ordered=False).modified_count
+
+
 # ---------------------------------------------------------------------------
 # Dashboard stats & discrepancy queries
 # ---------------------------------------------------------------------------
 
+def _stats_view(doc: dict) -> dict:
+    status = doc.get("status") or {}
+    return {
+        "device_count": doc.get("devices", 0),
+        "matches": doc.get("matches", 0),
+        "partial_matches": status.get("partial_match", 0),
+        "mismatches": status.get("mismatch", 0),
+        "deactivated": status.get("gudid_deactivated", 0),
+        "resolved": status.get("resolved", 0),
+        "last_run": doc.get("last_run") or "No runs yet",
+    }
+
+
 def get_dashboard_stats() -> dict:
+    """Dashboard counters from the materialized stats document (one read).
+
+    The first call on a database without stats builds them from scratch.
+    """
+    from database.dashboard_stats import read_stats, rebuild_stats
     from database.db_connection import get_db
     try:
         db = get_db()
-        device_count = db["devices"].count_documents({})
-        partial_matches = db["validationResults"].count_documents({"status": "partial_match"})
-        mismatches = db["validationResults"].count_documents({"status": "mismatch"})
-        matches = db["verified_devices"].count_documents({})
-        deactivated_count = db["validationResults"].count_documents({"status": "gudid_deactivated"})
-
-        last_device = db["devices"].find_one(sort=[("_harvest.harvested_at", -1)])
-        last_run = "No runs yet"
-        if last_device:
-            harvest = last_device.get("_harvest", {})
-            last_run = harvest.get("harvested_at", "Unknown")
+        doc = read_stats(db)
+        if doc is None:
+            rebuild_stats(db)
+            doc = read_stats(db) or {}
     except Exception as e:
         logger.warning("get_dashboard_stats: MongoDB unavailable: %s", e)
-        return {"device_count": 0, "matches": 0, "partial_matches": 0, "mismatches": 0, "deactivated": 0, "last_run": "DB unavailable"}
+        return {"device_count": 0, "matches": 0, "partial_matches": 0, "mismatches": 0, "deactivated": 0, "resolved": 0, "last_run": "DB unavailable"}
 
-    return {
-        "device_count": device_count,
-        "matches": matches,
-        "partial_matches": partial_matches,
-        "mismatches": mismatches,
-        "deactivated": deactivated_count,
-        "last_run": last_run,
-    }
+    return _stats_view(doc)
+
+
+def get_stats_breakdown(scope: str, limit: int = 50) -> list[dict]:
+    """Per-run ("run") or per-manufacturer ("company") dashboard counters.
+
+    Raises ValueError for an unknown scope.
+    """
+    from database.dashboard_stats import read_breakdown
+    from database.db_connection import get_db
+    try:
+        docs = read_breakdown(get_db(), scope, limit=limit)
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.warning("get_stats_breakdown: %s", e)
+        return []
+    return [{"key": doc.get("key"), **_stats_view(doc)} for doc in docs]
 
 
 def get_discrepancies(limit: int = 100) -> list[dict]:
@@ -601,18 +951,30 @@ def get_discrepancies(limit: int = 100) -> list[dict]:
     from database.db_connection import get_db
     try:
         db = get_db()
-        cursor = db["validationResults"].find(
-            {"status": {"$in": ["partial_match", "mismatch"]}}
-        ).sort("updated_at", -1).limit(limit)
+        # One round trip: the device join runs server-side, limited to the
+        # page and projected to the two identifying fields.
+        cursor = db["validationResults"].aggregate([
+            {"$match": {"status": {"$in": ["partial_match", "mismatch"]}}},
+            {"$sort": {"updated_at": -1}},
+            {"$limit": limit},
+            {"$lookup": {
+                "from": "devices",
+                "let": {"device_id": "$device_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$device_id"]}}},
+                    {"$project": {"_id": 0, "companyName": 1, "versionModelNumber": 1}},
+                ],
+                "as": "_device",
+            }},
+        ])
 
         results = []
         for doc in cursor:
-            # Join with device to get identifying info
-            device = db["devices"].find_one({"_id": doc.get("device_id")})
+            devices = doc.pop("_device", None) or []
             serialized = _serialize_record(doc)
-            if device:
-                serialized["companyName"] = device.get("companyName", "N/A")
-                serialized["versionModelNumber"] = device.get("versionModelNumber", "N/A")
+            if devices:
+                serialized["companyName"] = devices[0].get("companyName", "N/A")
+                serialized["versionModelNumber"] = devices[0].get("versionModelNumber", "N/A")
             results.append(serialized)
         return results
     except Exception as e:
@@ -620,64 +982,242 @@ def get_discrepancies(limit: int = 100) -> list[dict]:
         return []
 
 
-def get_all_dashboard_records() -> list[dict]:
-    """Get combined verified_devices + validation discrepancies for dashboard filtering.
+# Dashboard table sort options -> (sort key, direction). "ts" is the row's
+# timestamp: updated_at for validation results, verified_at for verified devices.
+DASHBOARD_SORTS = {
+    "recent": ("ts", -1),
+    "oldest": ("ts", 1),
+    "company_asc": ("companyName", 1),
+    "company_desc": ("companyName", -1),
+    "brand_asc": ("brandName", 1),
+    "brand_desc": ("brandName", -1),
+    "match_desc": ("match_percent", -1),
+    "match_asc": ("match_percent", 1),
+}
+DASHBOARD_STATUSES = ["matched", "partial_match", "mismatch", "gudid_deactivated"]
+DASHBOARD_PAGE_SIZE = 50
+_DASHBOARD_MAX_PAGE_SIZE = 500
+
+# Missing sort values compare as these so keyset comparisons stay within
+# one BSON type (null never sorts $gt/$lt anything). Rows without a
+# timestamp sort as the epoch, i.e. last on "recent".
+_SORT_KEY_DEFAULTS = {"companyName": "", "brandName": "", "match_percent": -1}
+_TS_DEFAULT = datetime(1970, 1, 1)
+
+# Only the columns the dashboard table shows
+_DASHBOARD_COLUMNS = {
+    "brandName": 1, "companyName": 1, "versionModelNumber": 1,
+    "matched_fields": 1, "total_fields": 1, "match_percent": 1, "weighted_percent": 1,
+}
+
+
+def ensure_dashboard_indexes() -> None:
+    """Indexes backing the keyset-paginated dashboard queries (idempotent)."""
+    from database.dashboard_stats import ensure_indexes as ensure_stats_indexes
+    from database.db_connection import get_db
+    try:
+        db = get_db()
+        ensure_stats_indexes(db)
+        db["validationResults"].create_index([("status", 1), ("updated_at", -1), ("_id", -1)])
+        db["validationResults"].create_index("device_id")
+        db["verified_devices"].create_index([("verified_at", -1), ("_id", -1)])
+        db["verified_devices"].create_index("source_device_id")
+        db["devices"].create_index("companyName")
+    except Exception as e:
+        logger.warning("ensure_dashboard_indexes: %s", e)
+
+
+def encode_dashboard_cursor(sort_key, row_id) -> str:
+    """Opaque keyset cursor: the last row's sort value and _id."""
+    import base64
+    from bson import json_util
+    raw = json_util.dumps({"k": sort_key, "id": row_id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
 
-    'matched' = records from verified_devices collection (confirmed GUDID matches).
-    'partial_match'/'mismatch' = records from validationResults with those statuses.
+def decode_dashboard_cursor(cursor: str) -> tuple:
+    """Inverse of encode_dashboard_cursor. Raises ValueError if malformed."""
+    import base64
+    from bson import json_util
+    try:
+        doc = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return doc["k"], doc["id"]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+
+
+def _dashboard_branch(match: dict, ts_field: str, key: str, direction: int,
+                      after: tuple | None, limit: int, extra_fields: dict) -> list[dict]:
+    """Aggregation stages for one source collection of the dashboard table.
+
+    The sort value is computed into ``sort_key`` with a null-safe default
+    (``ts`` reads the branch's own timestamp field), so the keyset match,
+    the sort and the final merge all compare values of one BSON type.
+    """
+    op = "$gt" if direction == 1 else "$lt"
+    if key == "ts":
+        sort_key = {"$ifNull": ["$" + ts_field, _TS_DEFAULT]}
+    else:
+        sort_key = {"$ifNull": ["$" + key, _SORT_KEY_DEFAULTS[key]]}
+    stages = [
+        {"$match": match},
+        {"$addFields": {"sort_key": sort_key}},
+    ]
+    if after is not None:
+        value, last_id = after
+        stages.append({"$match": {"$or": [
+            {"sort_key": {op: value}},
+            {"sort_key": value, "_id": {op: last_id}},
+        ]}})
+    stages += [
+        {"$sort": {"sort_key": direction, "_id": direction}},
+        {"$limit": limit},
+        {"$project": {
+            **_DASHBOARD_COLUMNS, **extra_fields,
+            ts_field: 1,
+            "sort_key": 1,
+        }},
+    ]
+    return stages
+
+
+def validation_device_filter(db, device_query: dict) -> dict:
+    """validationResults filter for the results of devices matching *device_query*.
+
+    Validation results carry companyName only since it was denormalized
+    and have no run id at all, so filter through the device link.
+    """
+    device_ids = [d["_id"] for d in db["devices"].find(device_query, {"_id": 1})]
+    return {"device_id": {"$in": device_ids}}
+
+
+def get_dashboard_page(status: str | None = None, company: str | None = None,
+                       sort: str = "recent", cursor: str | None = None,
+                       limit: int = DASHBOARD_PAGE_SIZE) -> dict:
+    """One page of the dashboard table, keyset-paginated.
+
+    'matched' rows come from verified_devices; 'partial_match', 'mismatch'
+    and 'gudid_deactivated' rows from validationResults. Both sources are
+    filtered, sorted and limited inside one aggregation ($unionWith), so a
+    page costs the same regardless of how far into the table it is.
+
+    Returns {"items": [...], "next_cursor": str | None}; pass next_cursor
+    back to get the following page. Raises ValueError for an unknown sort,
+    status or malformed cursor.
     """
     from database.db_connection import get_db
+
+    if sort not in DASHBOARD_SORTS:
+        raise ValueError(f"Unknown sort: {sort}")
+    if status in (None, "", "all"):
+        statuses = DASHBOARD_STATUSES
+    elif status in DASHBOARD_STATUSES:
+        statuses = [status]
+    else:
+        raise ValueError(f"Unknown status: {status}")
+    key, direction = DASHBOARD_SORTS[sort]
+    after = decode_dashboard_cursor(cursor) if cursor else None
+    limit = max(1, min(int(limit), _DASHBOARD_MAX_PAGE_SIZE))
+
     try:
         db = get_db()
-        results = []
+        validation_match: dict = {"status": {"$in": [s for s in statuses if s != "matched"]}}
+        verified_match: dict = {}
+        if company:
+            validation_match.update(validation_device_filter(db, {"companyName": company}))
+            verified_match["companyName"] = company
+
+        branches = []
+        if validation_match["status"]["$in"]:
+            branches.append(("validationResults", _dashboard_branch(
+                validation_match, "updated_at", key, direction, after, limit + 1,
+                {"device_id": 1, "status": 1},
+            )))
+        if "matched" in statuses:
+            branches.append(("verified_devices", _dashboard_branch(
+                verified_match, "verified_at", key, direction, after, limit + 1,
+                {"source_device_id": 1, "status": {"$literal": "matched"}},
+            )))
+
+        first_coll, pipeline = branches[0]
+        pipeline = list(pipeline)
+        for coll, stages in branches[1:]:
+            pipeline.append({"$unionWith": {"coll": coll, "pipeline": stages}})
+        if len(branches) > 1:
+            pipeline += [
+                {"$sort": {"sort_key": direction, "_id": direction}},
+                {"$limit": limit + 1},
+            ]
+        docs = list(db[first_coll].aggregate(pipeline))
+    except Exception as e:
+        logger.warning("get_dashboard_page: %s", e)
+        return {"items": [], "next_cursor": None}
+
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    next_cursor = (
+        encode_dashboard_cursor(docs[-1]["sort_key"], docs[-1]["_id"]) if has_more else None
+    )
+    return {"items": _dashboard_rows(db, docs), "next_cursor": next_cursor}
+
 
-        # Verified devices = "matched". Batch-fetch matching validation IDs so the
-        # dashboard's More Information link resolves to /review/{validation_id}.
-        verified_docs = list(db["verified_devices"].find().sort("verified_at", -1))
-        source_ids = [d["source_device_id"] for d in verified_docs if d.get("source_device_id") is not None]
-        matched_validations_by_device_id = {
+def _dashboard_rows(db, docs: list[dict]) -> list[dict]:
+    """Shape one page of projected docs into table rows (batched joins only)."""
+    # Matched rows link to their validation result for /review/{validation_id}
+    source_ids = [d["source_device_id"] for d in docs
+                  if d["status"] == "matched" and d.get("source_device_id") is not None]
+    validation_by_device_id = {}
+    if source_ids:
+        validation_by_device_id = {
             v["device_id"]: v["_id"]
             for v in db["validationResults"].find(
-                {"device_id": {"$in": source_ids}, "status": "matched"}
-            ).sort("updated_at", -1)
+                {"device_id": {"$in": source_ids}, "status": "matched"},
+                {"device_id": 1},
+            ).sort("updated_at", 1)  # newest wins
         }
-
-        for doc in verified_docs:
-            serialized = _serialize_record(doc)
-            serialized["status"] = "matched"
-            serialized["companyName"] = doc.get("companyName", "N/A")
-            serialized["versionModelNumber"] = doc.get("versionModelNumber", "N/A")
-            serialized["brandName"] = doc.get("brandName", "N/A")
-            serialized["matched_fields"] = None
-            serialized["total_fields"] = None
-            serialized["match_percent"] = None
-            serialized["weighted_percent"] = None
-            validation_id = matched_validations_by_device_id.get(doc.get("source_device_id"))
-            serialized["_id"] = str(validation_id) if validation_id else None
-            results.append(serialized)
-
-        # Partial match, mismatch, and deactivated from validation results
-        discrepancy_docs = list(db["validationResults"].find(
-            {"status": {"$in": ["partial_match", "mismatch", "gudid_deactivated"]}}
-        ).sort("updated_at", -1))
-
-        device_ids = [d["device_id"] for d in discrepancy_docs if d.get("device_id") is not None]
+    # Results written before companyName was denormalized need their device
+    missing_ids = [d["device_id"] for d in docs
+                   if d["status"] != "matched" and "companyName" not in d and d.get("device_id")]
+    devices_by_id = {}
+    if missing_ids:
         devices_by_id = {
             dev["_id"]: dev
-            for dev in db["devices"].find({"_id": {"$in": device_ids}})
+            for dev in db["devices"].find(
+                {"_id": {"$in": missing_ids}},
+                {"companyName": 1, "versionModelNumber": 1},
+            )
         }
 
-        for doc in discrepancy_docs:
+    rows = []
+    for doc in docs:
+        doc.pop("sort_key", None)
+        if doc["status"] == "matched":
+            validation_id = validation_by_device_id.get(doc.pop("source_device_id", None))
+            doc["_id"] = validation_id
+            doc.update(matched_fields=None, total_fields=None,
+                       match_percent=None, weighted_percent=None)
+        else:
             device = devices_by_id.get(doc.get("device_id"))
-            serialized = _serialize_record(doc)
             if device:
-                serialized["companyName"] = device.get("companyName", "N/A")
-                serialized["versionModelNumber"] = device.get("versionModelNumber", "N/A")
-            results.append(serialized)
-
-        return results
+                doc.setdefault("companyName", device.get("companyName"))
+                doc.setdefault("versionModelNumber", device.get("versionModelNumber"))
+            doc.pop("device_id", None)
+        row = _serialize_record(doc)
+        row["_id"] = str(doc["_id"]) if doc["_id"] else None
+        for field in ("brandName", "companyName", "versionModelNumber"):
+            if row.get(field) is None:
+                row[field] = "N/A"
+        rows.append(row)
+    return rows
+
+
+def get_dashboard_companies() -> list[str]:
+    """Distinct manufacturer names for the dashboard company filter."""
+    from database.db_connection import get_db
+    try:
+        return sorted(c for c in get_db()["devices"].distinct("companyName") if c)
     except Exception as e:
-        logger.warning("get_all_dashboard_records: %s", e)
+        logger.warning("get_dashboard_companies: %s", e)
         return []
 
 
@@ -727,25 +1267,47 @@ def get_validation_results(limit: int = 100, skip: int = 0) -> list[dict]:
 # Discrepancy review
 # ---------------------------------------------------------------------------
 
-def get_discrepancy_detail(validation_id: str) -> dict | None:
-    """Fetch a single validation result + linked device for review."""
+_REVIEW_PROJECTION = {
+    "status": 1, "gudid_di": 1, "matched_fields": 1, "total_fields": 1,
+    "match_percent": 1, "device_id": 1, "review_snapshot": 1,
+}
+
+
+def get_review_view(validation_id: str) -> dict | None:
+    """Everything /review/{id} renders, normally from one projected read.
+
+    Returns {"validation": {...summary}, "device": {...header fields},
+    "fields": [...rows]}. Results without a current review_snapshot
+    (written before snapshots existed, or invalidated by a resolve) are
+    rebuilt from the full documents once and the snapshot is stored.
+    """
     from database.db_connection import get_db
+    from validators.review_snapshot import REVIEW_SNAPSHOT_VERSION, build_review_snapshot
     try:
         db = get_db()
-        doc = db["validationResults"].find_one({"_id": ObjectId(validation_id)})
+        oid = ObjectId(validation_id)
+        doc = db["validationResults"].find_one({"_id": oid}, _REVIEW_PROJECTION)
         if not doc:
             return None
 
-        device = db["devices"].find_one({"_id": doc.get("device_id")})
-
-        return {
-            "validation": _serialize_record(doc),
-            "device": _serialize_record(device) if device else {},
-        }
+        snapshot = doc.get("review_snapshot")
+        if not snapshot or snapshot.get("schema_version") != REVIEW_SNAPSHOT_VERSION:
+            full = db["validationResults"].find_one({"_id": oid})
+            device = db["devices"].find_one({"_id": doc.get("device_id")}) or {}
+            snapshot = build_review_snapshot(full, device)
+            db["validationResults"].update_one({"_id": oid}, {"$set": {"review_snapshot": snapshot}})
     except Exception as e:
-        logger.warning("get_discrepancy_detail: %s", e)
+        logger.warning("get_review_view: %s", e)
         return None
 
+    validation = {k: doc.get(k) for k in _REVIEW_PROJECTION if k not in ("review_snapshot", "device_id")}
+    validation["gudid_publish_date"] = snapshot.get("gudid_publish_date")
+    return _serialize_record({
+        "validation": validation,
+        "device": snapshot.get("device") or {},
+        "fields": snapshot.get("fields") or [],
+    })
+
 
 def resolve_discrepancy(validation_id: str, field_choices: dict) -> dict:
     """Apply user's field choices to the devices collection.
@@ -753,6 +1315,7 @@ def resolve_discrepancy(validation_id: str, field_choices: dict) -> dict:
     field_choices: {"fieldName": "harvested" | "gudid", ...}
     For "gudid" choices, update the device with the GUDID value.
     """
+    from database.dashboard_stats import record_status_change
     from database.db_connection import get_db
 
     result = {"success": False, "error": None}
@@ -789,7 +1352,8 @@ def resolve_discrepancy(validation_id: str, field_choices: dict) -> dict:
                 {"$set": update_fields},
             )
 
-        # Mark validation as resolved
+        # Mark validation as resolved; the device may have changed, so the
+        # review snapshot is dropped and rebuilt on the next view
         db["validationResults"].update_one(
             {"_id": ObjectId(validation_id)},
             {"$set": {
@@ -797,8 +1361,12 @@ def resolve_discrepancy(validation_id: str, field_choices: dict) -> dict:
                 "resolved_at": datetime.now(timezone.utc),
                 "resolved_fields": resolved_fields,
                 "updated_at": datetime.now(timezone.utc),
-            }},
+            }, "$unset": {"review_snapshot": ""}},
+        )
+        device = db["devices"].find_one(
+            {"_id": device_id}, {"companyName": 1, "_harvest.harvest_run_id": 1},
         )
+        record_status_change(db, device, doc.get("status"), "resolved")
 
         result["success"] = True
 
@@ -0,0 +1,239 @@
+"""Ingest pre-captured HTML pages straight out of tar, zip and WARC archives.
+
+Pages are read one archive member / WARC record at a time and handed to
+the parallel extraction pipeline (``parallel_batch.iter_html_pages_parallel``,
+local threads or, with EXTRACT_MODE=distributed, extract_page workers)
+without being extracted to disk. Only a bounded number of pages is held in
+memory at once.
+
+    .tar .tar.gz .tgz .tar.bz2 .tar.xz   streamed with tarfile "r|*"
+    .zip                                 members opened one at a time
+    .warc .warc.gz                       ``response`` and ``resource`` records
+
+For WARC records the source URL is the ``WARC-Target-URI`` header. Only
+HTML payloads with a 2xx status are kept, and chunked / gzip / deflate
+HTTP bodies are decoded. For tar and zip members the host comes from the
+scraper filename convention (``{host}__{path}__{hash}.html``), the same
+as ``process_batch``.
+
+Usage:
+    python harvester/src/pipeline/runner.py --archive pages.warc.gz --db --validate
+"""
+import gzip
+import logging
+import os
+import re
+import tarfile
+import zipfile
+import zlib
+from typing import BinaryIO, Iterator
+
+from pipeline.parallel_batch import HtmlPage, iter_html_pages_parallel
+
+logger = logging.getLogger(__name__)
+
+# Members larger than this are skipped rather than read into memory
+MAX_PAGE_BYTES = 20 * 1024 * 1024
+_HTML_SUFFIXES = (".html", ".htm")
+_TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+_CHARSET_RE = re.compile(rb"charset=[\"']?([\w-]+)", re.IGNORECASE)
+
+
+def _decode(data: bytes, content_type: bytes = b"") -> str:
+    match = _CHARSET_RE.search(content_type)
+    encoding = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return data.decode(encoding, errors="replace")
+    except LookupError:
+        return data.decode("utf-8", errors="replace")
+
+
+def archive_kind(path: str) -> str:
+    """"tar", "zip" or "warc" from the file name. Raises ValueError otherwise."""
+    name = path.lower()
+    if name.endswith((".warc", ".warc.gz")):
+        return "warc"
+    if name.endswith(".zip"):
+        return "zip"
+    if name.endswith(_TAR_SUFFIXES):
+        return "tar"
+    raise ValueError(f"Unsupported archive type: {path}")
+
+
+# ---------------------------------------------------------------------------
+# tar / zip
+# ---------------------------------------------------------------------------
+
+def _iter_tar(path: str) -> Iterator[HtmlPage]:
+    # "r|*": sequential stream, no member index held in memory
+    with tarfile.open(path, mode="r|*") as tar:
+        for member in tar:
+            if not member.isfile() or not member.name.lower().endswith(_HTML_SUFFIXES):
+                continue
+            if member.size > MAX_PAGE_BYTES:
+                logger.warning("archive_ingest: skipping %s (%d bytes)", member.name, member.size)
+                continue
+            f = tar.extractfile(member)
+            if f is None:
+                continue
+            yield HtmlPage(name=os.path.basename(member.name), source_url=None, html=_decode(f.read()))
+
+
+def _iter_zip(path: str) -> Iterator[HtmlPage]:
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(_HTML_SUFFIXES):
+                continue
+            if info.file_size > MAX_PAGE_BYTES:
+                logger.warning("archive_ingest: skipping %s (%d bytes)", info.filename, info.file_size)
+                continue
+            with zf.open(info) as f:
+                yield HtmlPage(name=os.path.basename(info.filename), source_url=None, html=_decode(f.read()))
+
+
+# ---------------------------------------------------------------------------
+# WARC
+# ---------------------------------------------------------------------------
+
+def _read_headers(stream: BinaryIO) -> dict[bytes, bytes]:
+    headers = {}
+    while True:
+        line = stream.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        key, _, value = line.partition(b":")
+        headers[key.strip().lower()] = value.strip()
+
+
+def _skip(stream: BinaryIO, length: int) -> None:
+    while length > 0:
+        chunk = stream.read(min(length, 1024 * 1024))
+        if not chunk:
+            return
+        length -= len(chunk)
+
+
+def iter_warc_records(stream: BinaryIO) -> Iterator[tuple[dict[bytes, bytes], bytes | None]]:
+    """(headers, block) per WARC record; block is None for skipped records.
+
+    Header names are lowercased. Blocks are only read for response and
+    resource records up to MAX_PAGE_BYTES; everything else is skipped
+    without buffering.
+    """
+    while True:
+        line = stream.readline()
+        if not line:
+            return
+        if not line.strip():
+            continue  # blank lines between records
+        if not line.startswith(b"WARC/"):
+            raise ValueError(f"Not a WARC record header: {line[:40]!r}")
+        headers = _read_headers(stream)
+        length = int(headers.get(b"content-length", b"0"))
+        if headers.get(b"warc-type") in (b"response", b"resource") and length <= MAX_PAGE_BYTES:
+            yield headers, stream.read(length)
+        else:
+            _skip(stream, length)
+            yield headers, None
+
+
+def _dechunk(body: bytes) -> bytes:
+    out = []
+    pos = 0
+    while True:
+        end = body.find(b"\r\n", pos)
+        if end < 0:
+            break
+        size = int(body[pos:end].split(b";")[0].strip() or b"0", 16)
+        if size == 0:
+            break
+        out.append(body[end + 2:end + 2 + size])
+        pos = end + 2 + size + 2
+    return b"".join(out)
+
+
+def _http_payload(block: bytes) -> tuple[int, dict[bytes, bytes], bytes] | None:
+    """(status, headers, decoded body) of a WARC response block."""
+    head, sep, body = block.partition(b"\r\n\r\n")
+    if not sep:
+        head, sep, body = block.partition(b"\n\n")
+    lines = head.splitlines()
+    if not lines or not lines[0].startswith(b"HTTP/"):
+        return None
+    try:
+        status = int(lines[0].split()[1])
+    except (IndexError, ValueError):
+        return None
+    headers = {}
+    for line in lines[1:]:
+        key, _, value = line.partition(b":")
+        headers[key.strip().lower()] = value.strip()
+
+    if b"chunked" in headers.get(b"transfer-encoding", b"").lower():
+        body = _dechunk(body)
+    encoding = headers.get(b"content-encoding", b"").lower()
+    try:
+        if encoding in (b"gzip", b"x-gzip"):
+            body = gzip.decompress(body)
+        elif encoding == b"deflate":
+            body = zlib.decompress(body, -zlib.MAX_WBITS if body[:1] != b"\x78" else zlib.MAX_WBITS)
+    except (OSError, zlib.error, EOFError) as exc:
+        logger.warning("archive_ingest: cannot decode %s body: %s", encoding.decode(), exc)
+        return None
+    return status, headers, body
+
+
+def _iter_warc(path: str) -> Iterator[HtmlPage]:
+    # gzip.open reads per-record gzip members as one continuous stream
+    opener = gzip.open if path.lower().endswith(".gz") else open
+    with opener(path, "rb") as stream:
+        for headers, block in iter_warc_records(stream):
+            if block is None:
+                continue
+            url = headers.get(b"warc-target-uri", b"").decode("utf-8", errors="replace").strip("<>")
+            if headers.get(b"warc-type") == b"resource":
+                content_type = headers.get(b"content-type", b"")
+                body = block
+            else:
+                payload = _http_payload(block)
+                if payload is None:
+                    continue
+                status, http_headers, body = payload
+                if not 200 <= status < 300:
+                    continue
+                content_type = http_headers.get(b"content-type", b"")
+            if b"html" not in content_type.lower():
+                continue
+            yield HtmlPage(name=url or "warc-record", source_url=url or None,
+                           html=_decode(body, content_type))
+
+
+def iter_archive_pages(path: str) -> Iterator[HtmlPage]:
+    """HTML pages in the archive at *path*, one at a time."""
+    kind = archive_kind(path)
+    if kind == "warc":
+        return _iter_warc(path)
+    if kind == "zip":
+        return _iter_zip(path)
+    return _iter_tar(path)
+
+
+def ingest_archive(
+    path: str,
+    output_dir: str = "harvester/output",
+    harvest_run_id: str | None = None,
+    max_pending: int | None = None,
+) -> dict:
+    """Extract records from every HTML page in an archive.
+
+    Records are written to *output_dir* as JSON as each page finishes.
+    Returns the same summary shape as ``runner.process_batch``.
+    """
+    from pipeline.runner import write_batch_results
+
+    results = iter_html_pages_parallel(
+        iter_archive_pages(path),
+        harvest_run_id=harvest_run_id or "",
+        max_pending=max_pending,
+    )
+    return write_batch_results(results, output_dir)
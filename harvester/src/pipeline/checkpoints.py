@@ -0,0 +1,169 @@
+"""Per-URL checkpoints for resumable batch harvests.
+
+A batch run (``harvest_run_id``) is recorded in ``harvestRuns`` with its
+ordered URL list, and every URL gets a ``harvestCheckpoints`` document that
+advances through three stages:
+
+    pending   -> scraped    HTML saved (path, final_url)
+    scraped   -> extracted  records written to JSON, _ids pre-assigned
+    extracted -> persisted  records inserted into ``devices``
+
+Each stage transition is written as soon as that URL finishes it, so a run
+that dies part-way can be resumed with the same run ID and only the URLs
+that did not reach ``persisted`` are reprocessed. Scrape or extraction
+failures leave the URL at its previous stage (with the error recorded) so
+a resume retries them.
+
+Record ``_id``s are assigned at extraction time and reused on insert; a
+resume that re-inserts an already-persisted record hits a duplicate key
+and is counted as inserted instead of creating a second copy.
+"""
+import logging
+import os
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SCRAPED = "scraped"
+EXTRACTED = "extracted"
+PERSISTED = "persisted"
+
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class HarvestCheckpoints:
+    """Checkpoint reads/writes for one harvest run."""
+
+    def __init__(self, db, run_id: str):
+        self.db = db
+        self.run_id = run_id
+        self._runs = db["harvestRuns"]
+        self._points = db["harvestCheckpoints"]
+
+    def start(self, urls: list[str], created_by: str | None = None) -> dict[str, dict]:
+        """Register the run (idempotent) and return {url: checkpoint}.
+
+        On resume the stored URL list wins, so the run covers the same URLs
+        in the same order as the original attempt.
+        """
+        now = _now()
+        self._points.create_index([("harvest_run_id", 1), ("url", 1)], unique=True)
+        self._runs.update_one(
+            {"harvest_run_id": self.run_id},
+            {
+                "$setOnInsert": {
+                    "harvest_run_id": self.run_id,
+                    "urls": list(urls),
+                    "total": len(urls),
+                    "created_at": now,
+                    "created_by": created_by,
+                },
+                "$set": {"status": RUN_RUNNING, "updated_at": now},
+                "$inc": {"attempts": 1},
+            },
+            upsert=True,
+        )
+        if urls:
+            self._points.bulk_write([
+                UpdateOne(
+                    {"harvest_run_id": self.run_id, "url": url},
+                    {"$setOnInsert": {
+                        "harvest_run_id": self.run_id, "url": url, "stage": PENDING,
+                        "path": None, "final_url": None, "error": None,
+                        "record_ids": [], "record_files": [],
+                        "devices_extracted": 0, "db_inserted": 0, "updated_at": now,
+                    }},
+                    upsert=True,
+                )
+                for url in urls
+            ], ordered=False)
+        return self.load()
+
+    def load(self) -> dict[str, dict]:
+        return {
+            doc["url"]: doc
+            for doc in self._points.find({"harvest_run_id": self.run_id}, {"_id": 0})
+        }
+
+    def _set(self, url: str, fields: dict) -> None:
+        fields["updated_at"] = _now()
+        self._points.update_one({"harvest_run_id": self.run_id, "url": url}, {"$set": fields})
+
+    def mark_scraped(self, url: str, path: str, final_url: str | None) -> None:
+        self._set(url, {"stage": SCRAPED, "path": path, "final_url": final_url, "error": None})
+
+    def mark_scrape_failed(self, url: str, error: str | None) -> None:
+        self._set(url, {"error": error or "Scrape failed"})
+
+    def mark_extracted(self, url: str, record_ids: list[str], record_files: list[str]) -> None:
+        self._set(url, {
+            "stage": EXTRACTED, "record_ids": record_ids, "record_files": record_files,
+            "devices_extracted": len(record_ids), "error": None,
+        })
+
+    def mark_extract_failed(self, url: str, error: str | None) -> None:
+        self._set(url, {"error": error, "devices_extracted": 0})
+
+    def mark_persisted(self, url: str, db_inserted: int, error: str | None = None) -> None:
+        fields = {"db_inserted": db_inserted, "error": error}
+        if error is None:
+            fields["stage"] = PERSISTED
+        self._set(url, fields)
+
+    def finish(self, summary: dict) -> None:
+        self._runs.update_one(
+            {"harvest_run_id": self.run_id},
+            {"$set": {
+                "status": RUN_COMPLETED,
+                "succeeded": summary.get("succeeded", 0),
+                "failed": summary.get("failed", 0),
+                "incomplete": summary.get("incomplete", 0),
+                "updated_at": _now(),
+            }},
+        )
+
+
+def get_run_urls(db, run_id: str) -> list[str] | None:
+    """Ordered URL list of a recorded run, or None if the run is unknown."""
+    run = db["harvestRuns"].find_one({"harvest_run_id": run_id}, {"urls": 1})
+    return list(run["urls"]) if run else None
+
+
+def list_resumable_runs(db, limit: int = 10) -> list[dict]:
+    """Most recent runs that still have URLs short of ``persisted``."""
+    remaining = {
+        row["_id"]: row["remaining"]
+        for row in db["harvestCheckpoints"].aggregate([
+            {"$match": {"stage": {"$ne": PERSISTED}}},
+            {"$group": {"_id": "$harvest_run_id", "remaining": {"$sum": 1}}},
+        ])
+    }
+    if not remaining:
+        return []
+    runs = db["harvestRuns"].find(
+        {"harvest_run_id": {"$in": list(remaining)}},
+        {"_id": 0, "urls": 0},
+    ).sort("created_at", -1).limit(limit)
+    return [
+        {
+            "harvest_run_id": run["harvest_run_id"],
+            "status": run.get("status"),
+            "total": run.get("total", 0),
+            "remaining": remaining[run["harvest_run_id"]],
+            "created_at": run.get("created_at"),
+        }
+        for run in runs
+    ]
+
+
+def html_still_present(checkpoint: dict) -> bool:
+    path = checkpoint.get("path")
+    return bool(path) and os.path.isfile(path)
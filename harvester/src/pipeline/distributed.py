@@ -0,0 +1,260 @@
+"""Distributed page extraction over the job store.
+
+With ``EXTRACT_MODE=distributed``, ``parallel_batch.process_html_files_parallel``
+hands the batch to ``process_html_files_distributed`` instead of its local
+thread pool, and ``parallel_batch.iter_html_pages_parallel`` (archive
+ingest) hands its page stream to ``iter_html_pages_distributed``. The
+coordinator enqueues one ``extract_page`` job per page in the job store
+(see jobs.store; Mongo for several hosts, or ``JOB_STORE=sqlite`` as a
+single-host stand-in), keeping at most ``max_pending`` pages queued at
+once. The page HTML travels in the job, zlib-compressed, so workers need
+no shared filesystem.
+
+Extraction workers run on the hosts that have their own Ollama:
+
+    python harvester/src/jobs/worker.py --types extract_page --threads 1
+
+Each job runs ``_process_single_ollama`` against the worker's local model
+(the same ``_extract_one`` the local pool uses). The FileExtractionResult
+comes back as the job result. Use as many threads as that host's
+OLLAMA_NUM_PARALLEL. ``extract_page`` is opt-in, so the web app's
+embedded workers never take these jobs.
+
+Failure handling comes from the job store:
+- A worker that dies stops heartbeating. Its lease lapses and another
+  worker reclaims the page, up to DISTRIBUTED_MAX_ATTEMPTS attempts.
+- A worker whose Ollama endpoints are all down fails the job instead of returning
+  no records. The page is requeued for another worker.
+- The coordinator polls the jobs and turns each finished one into a
+  FileExtractionResult, keeping its worker's error.
+- A page whose last attempt's worker died is failed by the coordinator
+  (``JobStore.fail_expired``), so it does not wait for another worker to
+  come along and reclaim it.
+- Pages still unfinished after ``timeout`` seconds (DISTRIBUTED_TIMEOUT
+  for harvests) are cancelled and reported as errors. This also bounds a
+  batch when no extract_page worker is running.
+- If the coordinator itself stops (an exception, a progress callback
+  raising, or an archive ingest that stops reading results), it cancels
+  the pages that have not finished.
+"""
+import base64
+import logging
+import os
+import time
+import zlib
+from typing import Callable, Iterable, Iterator
+
+from dotenv import load_dotenv
+from pipeline import metrics
+from pipeline.parallel_batch import FileExtractionResult, HtmlPage, _extract_one
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPE = "extract_page"
+EXTRACT_MODE = (os.getenv("EXTRACT_MODE") or "local").lower()
+DISTRIBUTED_MAX_ATTEMPTS = int(os.getenv("DISTRIBUTED_MAX_ATTEMPTS") or 3)
+DISTRIBUTED_POLL_SECONDS = float(os.getenv("DISTRIBUTED_POLL_SECONDS") or 2.0)
+# Upper bound for one batch, in seconds; 0 means no limit
+DISTRIBUTED_TIMEOUT = float(os.getenv("DISTRIBUTED_TIMEOUT") or 3600)
+# Pages queued and not yet collected; bounds job-store size and memory for long streams
+DISTRIBUTED_MAX_PENDING = 256
+
+
+def enabled() -> bool:
+    return EXTRACT_MODE == "distributed"
+
+
+def encode_html(html: str) -> str:
+    return base64.b64encode(zlib.compress(html.encode("utf-8"), 6)).decode("ascii")
+
+
+def decode_html(data: str) -> str:
+    return zlib.decompress(base64.b64decode(data)).decode("utf-8")
+
+
+def _result_from_job(job: dict, path: str, source_url: str | None) -> FileExtractionResult:
+    result = job.get("result") or {}
+    if job["status"] == "completed":
+        return FileExtractionResult(
+            path=path,
+            source_url=source_url,
+            records=result.get("records") or [],
+            error=result.get("error"),
+            timings=result.get("timings") or {},
+        )
+    return FileExtractionResult(path=path, source_url=source_url,
+                                error=job.get("error") or f"extraction job {job['status']}")
+
+
+def _iter_results(
+    pages: Iterable[HtmlPage | FileExtractionResult],
+    harvest_run_id: str,
+    store,
+    poll_interval: float,
+    timeout: float | None,
+    max_pending: int,
+) -> Iterator[FileExtractionResult]:
+    """Queue *pages* as extract_page jobs, yielding results as they finish.
+
+    A FileExtractionResult in *pages* (a page that could not be read) is
+    passed straight through. Closing the generator cancels what is queued.
+    """
+    from jobs.store import FINISHED_STATES
+
+    pages = iter(pages)
+    pending: dict[str, HtmlPage] = {}
+    queued = 0
+    exhausted = False
+    deadline = time.monotonic() + timeout if timeout else None
+    try:
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                page = next(pages, None)
+                if page is None:
+                    exhausted = True
+                    logger.info("distributed: %d page(s) queued for %s", queued, harvest_run_id)
+                elif isinstance(page, FileExtractionResult):
+                    metrics.DISTRIBUTED_PAGES.inc(outcome="failed")
+                    yield page
+                else:
+                    job_id = store.enqueue(JOB_TYPE, {
+                        "name": page.name,
+                        "source_url": page.source_url,
+                        "harvest_run_id": harvest_run_id,
+                        "html_z": encode_html(page.html),
+                    }, max_attempts=DISTRIBUTED_MAX_ATTEMPTS, created_by=f"coordinator:{harvest_run_id}")
+                    pending[job_id] = page
+                    queued += 1
+            if not pending:
+                if exhausted:
+                    break
+                continue
+
+            store.fail_expired(list(pending))
+            finished = [job for job in store.get_many(list(pending)) if job["status"] in FINISHED_STATES]
+            for job in finished:
+                page = pending.pop(job["job_id"])
+                result = _result_from_job(job, page.name, page.source_url)
+                if result.error:
+                    logger.warning("distributed: %s failed: %s", page.name, result.error)
+                metrics.DISTRIBUTED_PAGES.inc(outcome=job["status"])
+                yield result
+
+            if deadline and time.monotonic() > deadline:
+                error = f"no worker finished it within {timeout}s"
+                for job_id in list(pending):
+                    store.cancel(job_id)
+                    page = pending.pop(job_id)
+                    metrics.DISTRIBUTED_PAGES.inc(outcome="timeout")
+                    yield FileExtractionResult(path=page.name, source_url=page.source_url, error=error)
+                # Pages not queued yet are reported the same way, without a job
+                for page in pages:
+                    if isinstance(page, FileExtractionResult):
+                        metrics.DISTRIBUTED_PAGES.inc(outcome="failed")
+                        yield page
+                    else:
+                        metrics.DISTRIBUTED_PAGES.inc(outcome="timeout")
+                        yield FileExtractionResult(path=page.name, source_url=page.source_url, error=error)
+                break
+            if not finished:
+                time.sleep(poll_interval)
+    except BaseException:
+        # Cancelled batch, consumer stopped early or coordinator error:
+        # do not leave work queued
+        for job_id in pending:
+            try:
+                store.cancel(job_id)
+            except Exception as exc:
+                logger.warning("distributed: could not cancel job %s: %s", job_id, exc)
+        raise
+
+
+def _read_pages(html_paths: list[str], source_urls: dict[str, str]) -> Iterator[HtmlPage | FileExtractionResult]:
+    for path in html_paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                html = f.read()
+        except OSError as exc:
+            yield FileExtractionResult(path=path, source_url=source_urls.get(path), error=f"cannot read: {exc}")
+            continue
+        yield HtmlPage(path, source_urls.get(path), html)
+
+
+def process_html_files_distributed(
+    html_paths: list[str],
+    harvest_run_id: str,
+    source_urls: dict[str, str] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+    result_callback: Callable[[FileExtractionResult], None] | None = None,
+    store=None,
+    poll_interval: float | None = None,
+    timeout: float | None = None,
+    max_pending: int | None = None,
+) -> list[FileExtractionResult]:
+    """Extract records from HTML files on remote workers.
+
+    Same contract as parallel_batch.process_html_files_parallel: one
+    FileExtractionResult per path, callbacks on the calling thread in
+    completion order. *timeout* bounds the whole batch (None: no limit).
+    """
+    from jobs.store import get_job_store
+
+    source_urls = source_urls or {}
+    total = len(html_paths)
+    results: list[FileExtractionResult] = []
+    stream = _iter_results(
+        _read_pages(html_paths, source_urls), harvest_run_id, store or get_job_store(),
+        DISTRIBUTED_POLL_SECONDS if poll_interval is None else poll_interval,
+        timeout, max_pending or DISTRIBUTED_MAX_PENDING,
+    )
+    try:
+        for result in stream:
+            results.append(result)
+            if result_callback:
+                result_callback(result)
+            if progress_callback:
+                progress_callback(len(results), total)
+    finally:
+        stream.close()
+    return results
+
+
+def iter_html_pages_distributed(
+    pages: Iterable[HtmlPage],
+    harvest_run_id: str,
+    max_pending: int | None = None,
+    store=None,
+    poll_interval: float | None = None,
+    timeout: float | None = None,
+) -> Iterator[FileExtractionResult]:
+    """Extract records from in-memory pages on remote workers.
+
+    Same contract as parallel_batch.iter_html_pages_parallel: *pages* is
+    consumed lazily, with at most *max_pending* (default
+    DISTRIBUTED_MAX_PENDING) queued at once, and results come back in
+    completion order.
+    """
+    from jobs.store import get_job_store
+
+    yield from _iter_results(
+        pages, harvest_run_id, store or get_job_store(),
+        DISTRIBUTED_POLL_SECONDS if poll_interval is None else poll_interval,
+        timeout, max_pending or DISTRIBUTED_MAX_PENDING,
+    )
+
+
+def run_extract_page_job(payload: dict, ctx) -> dict:
+    """Worker side of an ``extract_page`` job: extract locally, return the result as a dict."""
+    from dataclasses import asdict
+
+    from pipeline import ollama_pool
+
+    ctx.check_cancelled()
+    result = _extract_one(payload["name"], payload.get("source_url"), payload["harvest_run_id"],
+                          raw_html=decode_html(payload["html_z"]))
+    if not result.records and not ollama_pool.available():
+        # Let a worker with a working model retry the page
+        raise RuntimeError(f"Ollama is unavailable on worker {ctx.worker_id}")
+    return {**asdict(result), "worker": ctx.worker_id}
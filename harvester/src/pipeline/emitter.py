@@ -5,6 +5,8 @@ import os
 import re
 from datetime import datetime, timezone
 
+from pipeline.tracing import span
+
 logger = logging.getLogger(__name__)
 
 NORMALIZATION_VERSION = "1.0.0"
@@ -196,7 +198,7 @@ def write_record_json(record: dict, output_dir: str = "harvester/output") -> str
         filename = f"{manufacturer}_{model_number}_{timestamp}.json"
         filepath = os.path.join(output_dir, filename)
 
-        with open(filepath, "w", encoding="utf-8") as f:
+        with span("write_json"), open(filepath, "w", encoding="utf-8") as f:
             json.dump(record, f, indent=2, ensure_ascii=False)
 
         logger.info("Wrote record to %s", filepath)
@@ -1,13 +1,17 @@
 import json
 import logging
 import os
-import re
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 from dotenv import load_dotenv
+from pipeline import (
+    llm_replay, llm_stream, metrics, ollama_backend, ollama_pool, progress, prompts, rate_limiter, scheduler,
+)
 from pipeline.regulatory_parser import extract_premarket_submissions
+from pipeline.tracing import span
 
 load_dotenv()
 
@@ -15,7 +19,6 @@ logger = logging.getLogger(__name__)
 
 GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
 NVIDIA_URL = "https://integrate.api.nvidia.com/v1/chat/completions"
-OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/chat")
 
 MODEL_CHAIN = [
     {"provider": "ollama", "model": "gemma4:e4b"},
@@ -26,30 +29,66 @@ MODEL_CHAIN = [
 ]
 
 # Concurrency knobs — gemma4:e4b is primary (local-first, capability-ordered chain).
-# OLLAMA_CONCURRENCY=1 keeps CPU hosts safe; cloud workers absorb overflow when
-# the Ollama semaphore is saturated. Groq/NVIDIA caps match free-tier rate limits.
+# Ollama requests are capped per endpoint by pipeline.ollama_pool (each cap
+# defaults to OLLAMA_NUM_PARALLEL, and 1 keeps CPU hosts safe); cloud workers
+# absorb overflow when every endpoint is saturated. OLLAMA_CONCURRENCY, the
+# pool's total at startup, only sizes the worker pool so a larger pool stays
+# busy. Groq/NVIDIA caps match free-tier rate limits.
 # See docs/superpowers/specs/2026-04-21-llm-chain-gemma4-swap-design.md
-EXTRACT_WORKERS = 4
-OLLAMA_CONCURRENCY = 1   # serialize on CPU-only hosts
+OLLAMA_CONCURRENCY = ollama_pool.capacity()
+EXTRACT_WORKERS = max(4, OLLAMA_CONCURRENCY)
 GROQ_CONCURRENCY = 3     # ~30 RPM free tier
 NVIDIA_CONCURRENCY = 4   # 40 RPM free tier
 
+# Chains walked at once: EXTRACT_WORKERS for bulk work (LLM_BULK_SLOTS), plus
+# slots reserved for interactive single harvests (see pipeline.scheduler)
+_llm_scheduler = scheduler.PriorityScheduler("llm", int(os.getenv("LLM_BULK_SLOTS") or EXTRACT_WORKERS))
+
 _provider_sems: dict[str, threading.Semaphore] = {
-    "ollama": threading.Semaphore(OLLAMA_CONCURRENCY),
     "groq":   threading.Semaphore(GROQ_CONCURRENCY),
     "nvidia": threading.Semaphore(NVIDIA_CONCURRENCY),
 }
 
-# Track which models have been confirmed unavailable this session.
+# Track which models have been confirmed unavailable this session, or
+# until a rate-limit reset (_disabled_until, monotonic time).
 # Writes go through _disable_model() which holds _disabled_lock;
 # reads are lockless and tolerate brief staleness.
 _disabled_models: set[str] = set()
+_disabled_until: dict[str, float] = {}
 _disabled_lock = threading.Lock()
 
 
-def _disable_model(model: str) -> None:
+def _disable_model(model: str, seconds: float | None = None) -> None:
+    """Drop *model* from the chain: for good, or for *seconds* (e.g. until its quota resets)."""
     with _disabled_lock:
+        if seconds is None:
+            _disabled_until.pop(model, None)
+        else:
+            _disabled_until[model] = time.monotonic() + seconds
+        if model in _disabled_models:
+            return
         _disabled_models.add(model)
+    metrics.LLM_MODELS_DISABLED.inc(model=model)
+
+
+def _is_disabled(model: str) -> bool:
+    if model not in _disabled_models:
+        return False
+    until = _disabled_until.get(model)
+    if until is None or time.monotonic() < until:
+        return True
+    with _disabled_lock:
+        if _disabled_until.get(model) == until:
+            _disabled_models.discard(model)
+            del _disabled_until[model]
+    logger.info("%s re-enabled: its rate limit has reset", model)
+    return False
+
+
+metrics.gauge_callback(
+    "fivos_llm_disabled_models", "Models currently disabled in the fallback chain.",
+    lambda: sum(1 for model in list(_disabled_models) if _is_disabled(model)),
+)
 
 # ---------------------------------------------------------------------------
 # Schemas for structured output
@@ -114,99 +153,76 @@ PRODUCT_ROWS_SCHEMA = {
 }
 
 # ---------------------------------------------------------------------------
-# Prompts
+# Prompts (templates: see pipeline.prompts)
 # ---------------------------------------------------------------------------
 
-DESCRIPTION_PROMPT = """\
-You are extracting a clinical device description for a medical device regulatory database (FDA GUDID).
-
-Device: {device_name} by {manufacturer}, model {model_number}
-
-Write a factual, clinical description of this device based on the page text below.
-- Focus on: what the device IS, what it DOES, what anatomy/condition it treats
-- Ignore: marketing claims, clinical trial results, ordering info, testimonials
-- Style: one sentence, clinical terminology, no brand superlatives
-- If the page does not contain enough info to write a clinical description, return null
-
-Page text:
-{visible_text}"""
-
-PAGE_FIELDS_PROMPT = """\
-You are extracting medical device data from a manufacturer's product page for the FDA GUDID database.
-
-Extract these fields from the page text below. Return valid JSON.
-
-Rules:
-- device_name: The commercial product name / brand name (e.g., "IN.PACT ADMIRAL", "ZILVER PTX"). \
-NOT the manufacturer name. NOT a description or tagline.
-- manufacturer: The company that makes this device. Use the legal entity name if visible \
-(e.g., "Medtronic, Inc." not just "Medtronic").
-- description: One factual, clinical sentence describing what this device IS and what it DOES. \
-Focus on: device type, anatomy/condition treated, mechanism of action. \
-Ignore: marketing claims, clinical trial results, testimonials.
-- warning_text: Copy any warning, caution, or regulatory text verbatim from the page. \
-Include text about single-use, Rx only, sterility, contraindications. null if none found.
-- MRISafetyStatus: One of "MR Safe", "MR Conditional", "MR Unsafe", or null if not stated on the page.
-- deviceKit: true if this product is sold as a kit or system containing multiple distinct components \
-packaged together, false if it is a single standalone device, null if unclear.
-- environmentalConditions: An object with a "conditions" array of storage/handling condition strings \
-found on the page (e.g. {{"conditions": ["Store between 15-30°C", "Keep away from humidity > 85%"]}}). \
-null if storage conditions are not stated on the page.
-- indicationsForUse: Copy the "Indications for Use" section verbatim as free text. \
-Typically appears as a paragraph near the top of the page. null if not present.
-- contraindications: Copy the "Contraindications" section verbatim as free text. \
-null if not present.
-- deviceClass: FDA device class ("I", "II", or "III") if explicitly stated on the page. \
-null if not stated. Only return one of those three literal values.
-
-Page text:
-{visible_text}"""
-
-PRODUCT_ROWS_PROMPT = """\
-You are extracting individual product SKUs from a medical device ordering/specifications table.
-
-The device is: {device_name}
-
-For EACH distinct product row in the table below, extract:
-- model_number: The SKU, part number, catalog number, or model identifier \
-(e.g., "IPU04004013P", "1012528-20", "G38404"). This is an alphanumeric code, NOT a dimension.
-- catalog_number: A separate catalog/reference number if present and different from model_number. null otherwise.
-- diameter: Diameter with unit as a string (e.g., "8.0 mm"). null if not listed.
-- length: Length with unit as a string (e.g., "40.0 mm"). null if not listed.
-- width: Width with unit. null if not listed.
-- height: Height with unit. null if not listed.
-- weight: Weight with unit. null if not listed.
-- volume: Volume with unit. null if not listed.
-- pressure: Pressure with unit. null if not listed.
-
-Return a JSON object with a "products" array. Each element is one product row.
-If there is only one product (not a table), return an array with one element.
-Do NOT include rows where model_number is null or clearly a header/footer.
-
-Table/specs text:
-{table_text}"""
+# Input truncation per prompt
+DESCRIPTION_TEXT_LIMIT = 4000
+PAGE_TEXT_LIMIT = 6000
+TABLE_TEXT_LIMIT = 8000
+# Device/model names substituted into the templates
+_PROMPT_FIELD_CHARS = 400
+
+# One Ollama context window that fits the longest prompt any pass can send
+OLLAMA_NUM_CTX = ollama_backend.context_size(_PROMPT_FIELD_CHARS + max(
+    prompts.get("description").static_chars + DESCRIPTION_TEXT_LIMIT,
+    prompts.get("page_fields").static_chars + PAGE_TEXT_LIMIT,
+    prompts.get("product_rows").static_chars + TABLE_TEXT_LIMIT,
+))
 
 # ---------------------------------------------------------------------------
 # HTTP helpers
 # ---------------------------------------------------------------------------
 
 
+def _read_stream(response, provider: str, model: str, schema: dict | None, timeout: int,
+                 on_done=None) -> dict | None:
+    """Parse a streamed reply (see pipeline.llm_stream); None when it was abandoned."""
+    try:
+        return llm_stream.read_json_stream(
+            response.iter_lines(), schema, ollama_backend.num_predict(schema), timeout,
+            sse=provider != "ollama", on_done=on_done,
+            on_first_token=lambda: llm_stream.set_stall_timeout(response, timeout),
+        )
+    except llm_stream.StreamAbort as exc:
+        metrics.LLM_STREAM_ABORTS.inc(provider=provider, reason=exc.reason)
+        logger.warning("%s stream aborted, moving to next model: %s", model, exc)
+        return None
+    except ValueError as exc:
+        logger.warning("Failed to parse %s streamed response: %s", model, exc)
+        return None
+    finally:
+        # Drops the connection if the reply was cut short, so generation stops
+        response.close()
+
+
 def _openai_request(url: str, api_key: str, model: str, messages: list[dict],
-                    timeout: int = 60, _retry: bool = False) -> dict | None:
-    """Send a request to an OpenAI-compatible API (Groq, NVIDIA NIM)."""
+                    timeout: int = 60, schema: dict | None = None,
+                    provider: str = "openai") -> dict | None:
+    """Send a request to an OpenAI-compatible API (Groq, NVIDIA NIM).
+
+    Rate-limit headers feed pipeline.rate_limiter. A 429 returns None at once;
+    the model is held until it may be retried (see _llm_request), or
+    disabled until its quota resets when that is further off.
+    """
+    stream = llm_stream.streams(provider)
     payload = {
         "model": model,
         "messages": messages,
         "response_format": {"type": "json_object"},
         "temperature": 0,
     }
+    if stream:
+        payload["stream"] = True
 
     try:
         response = requests.post(
             url, json=payload,
             headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-            timeout=timeout,
+            timeout=llm_stream.http_timeout(timeout) if stream else timeout,
+            stream=stream,
         )
+        rate_limiter.observe(model, response.headers)
         response.raise_for_status()
     except requests.HTTPError as exc:
         try:
@@ -214,16 +230,16 @@ def _openai_request(url: str, api_key: str, model: str, messages: list[dict],
         except Exception:
             detail = str(exc)
 
-        if "rate limit" in detail.lower() and not _retry:
-            match = re.search(r"try again in (\d+\.?\d*)s", detail)
-            if match and float(match.group(1)) < 60:
-                wait = float(match.group(1))
-                logger.info("%s rate limited, retrying in %.1fs", model, wait)
-                time.sleep(wait)
-                return _openai_request(url, api_key, model, messages, timeout, _retry=True)
-            # Daily limit or long wait — skip this model
-            logger.warning("%s rate limited (long wait), moving to next model: %s", model, detail)
-            _disable_model(model)
+        if exc.response.status_code == 429 or "rate limit" in detail.lower():
+            wait = rate_limiter.observe(model, exc.response.headers, 429, detail)
+            if wait > rate_limiter.MAX_DEFER_SECONDS:
+                # Daily limit — skip this model until the quota resets
+                logger.warning("%s rate limited for %.0fs, disabling until then: %s", model, wait, detail)
+                metrics.LLM_RATE_LIMITED.inc(provider=provider, action="quota")
+                _disable_model(model, wait)
+            else:
+                logger.info("%s rate limited, holding it for %.1fs", model, wait)
+                metrics.LLM_RATE_LIMITED.inc(provider=provider, action="throttled")
             return None
 
         logger.warning("%s request failed: %s", model, detail)
@@ -232,6 +248,9 @@ def _openai_request(url: str, api_key: str, model: str, messages: list[dict],
         logger.warning("%s request failed: %s", model, exc)
         return None
 
+    if stream:
+        return _read_stream(response, provider, model, schema, timeout)
+
     try:
         data = response.json()
         content = data["choices"][0]["message"]["content"]
@@ -244,28 +263,37 @@ def _openai_request(url: str, api_key: str, model: str, messages: list[dict],
 
 
 def _ollama_request(model: str, messages: list[dict], schema: dict,
-                    timeout: int = 60) -> dict | None:
-    """Send a request to local Ollama."""
-    payload = {
-        "model": model,
-        "messages": messages,
-        "stream": False,
-        "format": schema,
-    }
+                    timeout: int = 60, endpoint: ollama_pool.Endpoint | None = None) -> dict | None:
+    """Send a request to an Ollama server (options and keep_alive: see pipeline.ollama_backend).
+
+    *endpoint* is the pool slot _walk_chain acquired (default: the first
+    configured server). A refused connection takes only that endpoint out
+    of rotation (see pipeline.ollama_pool).
+    """
+    endpoint = endpoint or ollama_pool.endpoints()[0]
+    payload = ollama_backend.chat_payload(endpoint.url, model, messages, schema, OLLAMA_NUM_CTX)
+    stream = llm_stream.streams("ollama")
+    payload["stream"] = stream
 
     try:
-        response = requests.post(OLLAMA_URL, json=payload, timeout=timeout)
+        response = requests.post(endpoint.url, json=payload,
+                                 timeout=llm_stream.http_timeout(timeout) if stream else timeout,
+                                 stream=stream)
         response.raise_for_status()
     except requests.ConnectionError:
-        logger.warning("Ollama not available at %s", OLLAMA_URL)
-        _disable_model("ollama")
+        ollama_pool.mark_down(endpoint)
         return None
     except Exception as exc:
         logger.warning("Ollama %s request failed: %s", model, exc)
         return None
 
+    if stream:
+        return _read_stream(response, "ollama", model, schema, timeout,
+                            on_done=lambda event: ollama_backend.record_stats(model, event))
+
     try:
         data = response.json()
+        ollama_backend.record_stats(model, data)
         content = data["message"]["content"]
         if isinstance(content, dict):
             return content
@@ -287,6 +315,31 @@ def get_last_model() -> str | None:
     return getattr(_thread_state, "last_model", None)
 
 
+def warm_local_model() -> float | None:
+    """Load the chain's Ollama model on every endpoint in rotation ahead of a batch;
+    returns the slowest load time.
+
+    The first page then does not pay for the load, and keep_alive holds
+    the model resident for the rest of the batch.
+    """
+    if llm_replay.get_mode() == "replay" or not ollama_pool.available():
+        return None
+    model = next((e["model"] for e in MODEL_CHAIN if e["provider"] == "ollama"), None)
+    if model is None:
+        return None
+    urls = [e.url for e in ollama_pool.endpoints() if e.up]
+    if len(urls) > 1:
+        with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+            loads = list(pool.map(lambda url: ollama_backend.load_model(url, model), urls))
+    else:
+        loads = [ollama_backend.load_model(url, model) for url in urls]
+    loads = [seconds for seconds in loads if seconds is not None]
+    if not loads:
+        return None
+    logger.info("Ollama %s resident on %d endpoint(s) (load took %.1fs)", model, len(loads), max(loads))
+    return max(loads)
+
+
 def get_first_available_model() -> str:
     """Return the name of the first model in the chain that has credentials configured."""
     for entry in MODEL_CHAIN:
@@ -298,22 +351,75 @@ def get_first_available_model() -> str:
 
 
 def _llm_request(system_msg: str, user_msg: str, schema: dict, timeout: int = 60) -> dict | None:
-    """Try each model in MODEL_CHAIN until one succeeds."""
+    """Try each model in MODEL_CHAIN until one succeeds.
+
+    Cloud models the rate limiter defers are skipped. If none of the rest
+    succeeds, the chain is walked again once the earliest deferred model
+    frees up, for as long as *timeout* allows.
+
+    The walk holds an "llm" scheduler slot for the current work class;
+    interactive requests are admitted ahead of bulk ones (see pipeline.scheduler).
+
+    In LLM_REPLAY=replay mode the response comes from the replay log
+    instead (see pipeline.llm_replay); in record mode successful responses
+    are appended to it.
+    """
 
     messages = [
         {"role": "system", "content": system_msg},
         {"role": "user", "content": user_msg},
     ]
 
+    replay_key = None
+    if llm_replay.get_mode() != "off":
+        replay_key = llm_replay.request_key(messages, schema)
+        if llm_replay.get_mode() == "replay":
+            entry = llm_replay.replay(replay_key)
+            if entry is not None:
+                _set_last_model(entry["m"])
+                return entry["r"]
+
     provider_urls = {"groq": GROQ_URL, "nvidia": NVIDIA_URL}
+    failed: set[str] = set()
+    work_class = scheduler.current_class()
 
+    with span("llm.queue", work_class=work_class):
+        _llm_scheduler.acquire(work_class)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            result, next_slot = _walk_chain(messages, schema, timeout, provider_urls, failed, replay_key)
+            if result is not None:
+                return result
+            if next_slot is None or time.monotonic() + next_slot > deadline:
+                break
+            # Every remaining model is rate limited: wait, holding no provider slot
+            metrics.LLM_RATE_LIMIT_WAIT.observe(next_slot)
+            with span("llm.rate_limit_sleep", seconds=round(next_slot, 3)):
+                time.sleep(next_slot)
+    finally:
+        _llm_scheduler.release(work_class)
+
+    metrics.LLM_CHAIN_EXHAUSTED.inc()
+    logger.error("All models in chain exhausted, extraction failed")
+    return None
+
+
+def _walk_chain(messages: list[dict], schema: dict, timeout: int, provider_urls: dict,
+                failed: set[str], replay_key: str | None) -> tuple[dict | None, float | None]:
+    """One pass over MODEL_CHAIN: (result, None) on success, else (None, seconds until
+    the earliest rate-limited model may be tried, or None if there is none).
+
+    Models that fail for other reasons are added to *failed* and skipped by later passes.
+    """
+    next_slot = None
     for entry in MODEL_CHAIN:
         model = entry["model"]
         provider = entry["provider"]
 
-        if model in _disabled_models:
+        if model in failed or _is_disabled(model):
             continue
-        if provider == "ollama" and "ollama" in _disabled_models:
+        if provider == "ollama" and not ollama_pool.available():
             continue
 
         env_key = entry.get("env_key")
@@ -325,29 +431,68 @@ def _llm_request(system_msg: str, user_msg: str, schema: dict, timeout: int = 60
 
         # Non-blocking acquire: if the provider pool is saturated, fall
         # through to the next model instead of queueing. Preserves
-        # quality-first fallback ordering.
-        sem = _provider_sems[provider]
-        if not sem.acquire(blocking=False):
+        # quality-first fallback ordering. An Ollama slot is a free place
+        # on an endpoint that is up (see pipeline.ollama_pool).
+        sem = endpoint = None
+        if provider == "ollama":
+            endpoint = ollama_pool.acquire()
+            acquired = endpoint is not None
+        else:
+            sem = _provider_sems[provider]
+            acquired = sem.acquire(blocking=False)
+        if not acquired:
             logger.debug("%s provider saturated, falling through", provider)
+            metrics.LLM_SATURATED.inc(provider=provider)
             continue
 
+        if provider in rate_limiter.PROVIDERS:
+            wait = rate_limiter.reserve(provider, model)
+            if wait:
+                sem.release()
+                logger.debug("%s rate limited for %.1fs, falling through", model, wait)
+                metrics.LLM_RATE_LIMITED.inc(provider=provider, action="deferred")
+                next_slot = wait if next_slot is None else min(next_slot, wait)
+                continue
+
+        metrics.LLM_INFLIGHT.inc(provider=provider)
+        start = time.monotonic()
         try:
-            if provider in ("groq", "nvidia"):
-                result = _openai_request(provider_urls[provider], api_key, model, messages, timeout)
-            else:
-                result = _ollama_request(model, messages, schema, timeout)
+            with span(f"llm.request.{provider}", model=model):
+                if provider in ("groq", "nvidia"):
+                    result = _openai_request(provider_urls[provider], api_key, model, messages, timeout,
+                                             schema, provider=provider)
+                else:
+                    result = _ollama_request(model, messages, schema, timeout, endpoint=endpoint)
         finally:
-            sem.release()
+            if endpoint is not None:
+                ollama_pool.release(endpoint)
+            else:
+                sem.release()
+            metrics.LLM_INFLIGHT.dec(provider=provider)
+            elapsed = time.monotonic() - start
+            metrics.LLM_SECONDS.observe(elapsed, provider=provider)
 
         if result is not None:
+            if replay_key and llm_replay.should_record():
+                llm_replay.record(replay_key, provider, model, result, elapsed)
+            metrics.LLM_REQUESTS.inc(provider=provider, model=model, outcome="success")
+            progress.note_model_result(model, True)
             _set_last_model(model)
             logger.info("Extraction succeeded with %s (%s)", model, provider)
-            return result
+            return result, None
 
+        metrics.LLM_REQUESTS.inc(provider=provider, model=model, outcome="failure")
+        progress.note_model_result(model, False)
+        metrics.LLM_FALLBACKS.inc(provider=provider, model=model)
         logger.info("Model %s failed, trying next in chain", model)
+        held = rate_limiter.held_for(model) if provider in rate_limiter.PROVIDERS else 0.0
+        if held and not _is_disabled(model):
+            # Answered 429: worth another try once the hold expires
+            next_slot = held if next_slot is None else min(next_slot, held)
+        else:
+            failed.add(model)
 
-    logger.error("All models in chain exhausted, extraction failed")
-    return None
+    return None, next_slot
 
 
 # ---------------------------------------------------------------------------
@@ -359,15 +504,15 @@ def extract_description(visible_text, device_name="", model_number="", manufactu
     if not visible_text or not visible_text.strip():
         return None
 
-    prompt = DESCRIPTION_PROMPT.format(
+    system_msg, prompt = prompts.get("description").render(
         device_name=device_name,
         manufacturer=manufacturer,
         model_number=model_number,
-        visible_text=visible_text[:4000],
+        visible_text=visible_text[:DESCRIPTION_TEXT_LIMIT],
     )
 
     parsed = _llm_request(
-        "Extract only the requested field. Return valid JSON.",
+        system_msg,
         prompt,
         DESCRIPTION_SCHEMA,
         timeout=120,
@@ -388,10 +533,10 @@ def extract_page_fields(visible_text: str, model: str | None = None) -> dict | N
     if not visible_text or not visible_text.strip():
         return None
 
-    prompt = PAGE_FIELDS_PROMPT.format(visible_text=visible_text[:6000])
+    system_msg, prompt = prompts.get("page_fields").render(visible_text=visible_text[:PAGE_TEXT_LIMIT])
 
     parsed = _llm_request(
-        "Extract medical device fields from the page. Return valid JSON.",
+        system_msg,
         prompt,
         PAGE_FIELDS_SCHEMA,
         timeout=300,
@@ -410,13 +555,13 @@ def extract_product_rows(table_text: str, device_name: str = "", model: str | No
     if not table_text or not table_text.strip():
         return []
 
-    prompt = PRODUCT_ROWS_PROMPT.format(
+    system_msg, prompt = prompts.get("product_rows").render(
         device_name=device_name,
-        table_text=table_text[:8000],
+        table_text=table_text[:TABLE_TEXT_LIMIT],
     )
 
     parsed = _llm_request(
-        "Extract product rows from the table. Return valid JSON.",
+        system_msg,
         prompt,
         PRODUCT_ROWS_SCHEMA,
         timeout=300,
@@ -437,12 +582,14 @@ _PAGE_LEVEL_FIELDS = (
 
 def extract_all_fields(visible_text: str, table_text: str | None = None, model: str | None = None) -> list[dict]:
     # Pass 1: page-level fields
-    page_fields = extract_page_fields(visible_text)
+    with span("llm.page_fields"):
+        page_fields = extract_page_fields(visible_text)
     if page_fields is None:
         return []
 
     # Pass 2: product rows from table
-    products = extract_product_rows(table_text or visible_text, page_fields.get("device_name", ""))
+    with span("llm.product_rows"):
+        products = extract_product_rows(table_text or visible_text, page_fields.get("device_name", ""))
 
     source = get_last_model() or "unknown"
 
@@ -0,0 +1,185 @@
+"""Record/replay of LLM chain responses for deterministic, cost-free reruns.
+
+``_llm_request`` consults this module before walking MODEL_CHAIN:
+
+    off      (default) every request goes to the chain
+    record   every request goes to the chain; each successful response is
+             appended to the log
+    replay   requests are answered from the log; a miss is handled by the
+             miss policy
+
+Controls (environment, or ``configure()``):
+- ``LLM_REPLAY=off|record|replay``
+- ``LLM_REPLAY_LOG``: the log file (default ``llm_replay.jsonl``)
+- ``LLM_REPLAY_MISS``: ``fail`` raises ReplayMiss (default); ``live`` falls
+  through to the chain; ``record`` falls through and appends the response
+- ``LLM_REPLAY_LATENCY``: ``0`` (default), a fixed delay in ms, or
+  ``recorded`` to sleep as long as the original call took
+
+The log is append-only JSON lines, one compact entry per response:
+
+    {"k": <sha256 of messages + schema>, "p": provider, "m": model,
+     "s": seconds, "r": response}
+
+Prompts are keyed by hash rather than stored, so the log stays small. The
+same key recorded twice replays the later entry. A replayed response sets
+the last-model marker to the recorded model, so ``_description_source``
+provenance matches the original run.
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from pipeline import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "record", "replay")
+MISS_POLICIES = ("fail", "live", "record")
+
+
+class ReplayMiss(LookupError):
+    """Replay mode found no recorded response and the miss policy is ``fail``."""
+
+
+def request_key(messages: list[dict], schema: dict | None) -> str:
+    """Stable hash of one chain request; independent of which model answers it."""
+    data = json.dumps({"messages": messages, "schema": schema}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ReplayLog:
+    """Append-only JSON-lines log of responses, indexed by request key."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: dict[str, dict] | None = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, dict]:
+        entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn final line from an interrupted write
+                        logger.warning("llm_replay: skipping unreadable line %d of %s", number, self.path)
+                        continue
+                    entries[entry["k"]] = entry
+        return entries
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            return self._entries.get(key)
+
+    def append(self, key: str, provider: str, model: str, response: dict, seconds: float) -> None:
+        entry = {"k": key, "p": provider, "m": model, "s": round(seconds, 3), "r": response}
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            # A copy: callers go on to mutate the response they returned
+            self._entries[key] = json.loads(line)
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            return len(self._entries)
+
+
+_mode = "off"
+_miss = "fail"
+_latency: float | str = 0.0
+_log: ReplayLog | None = None
+
+
+def configure(mode: str | None = None, path: str | None = None,
+              miss: str | None = None, latency: float | str | None = None) -> None:
+    """Set the replay mode, log path, miss policy or latency (seconds or "recorded").
+
+    Arguments left as None keep their current value.
+    """
+    global _mode, _miss, _latency, _log
+    if mode is not None:
+        if mode not in MODES:
+            raise ValueError(f"LLM replay mode must be one of {MODES}, got {mode!r}")
+        _mode = mode
+    if miss is not None:
+        if miss not in MISS_POLICIES:
+            raise ValueError(f"LLM replay miss policy must be one of {MISS_POLICIES}, got {miss!r}")
+        _miss = miss
+    if latency is not None:
+        if latency != "recorded":
+            latency = float(latency)
+        _latency = latency
+    if path is not None:
+        _log = ReplayLog(path)
+
+
+def _configure_from_env() -> None:
+    latency = os.getenv("LLM_REPLAY_LATENCY", "0").strip().lower()
+    configure(
+        mode=os.getenv("LLM_REPLAY", "off").strip().lower() or "off",
+        path=os.getenv("LLM_REPLAY_LOG") or "llm_replay.jsonl",
+        miss=os.getenv("LLM_REPLAY_MISS", "fail").strip().lower() or "fail",
+        latency=latency if latency == "recorded" else float(latency or 0) / 1000,
+    )
+
+
+def get_mode() -> str:
+    return _mode
+
+
+def get_log() -> ReplayLog | None:
+    return _log
+
+
+def replay(key: str) -> dict | None:
+    """A copy of the recorded entry for *key*, after the simulated latency.
+
+    Returns None on a miss the policy lets through; raises ReplayMiss
+    when the policy is ``fail``.
+    """
+    entry = _log.get(key)
+    if entry is None:
+        metrics.LLM_REPLAY.inc(outcome="miss")
+        if _miss == "fail":
+            raise ReplayMiss(f"No recorded LLM response for request {key[:12]} in {_log.path}")
+        return None
+    metrics.LLM_REPLAY.inc(outcome="hit")
+    delay = entry.get("s", 0.0) if _latency == "recorded" else _latency
+    if delay:
+        time.sleep(delay)
+    return copy.deepcopy(entry)
+
+
+def should_record() -> bool:
+    """Whether live chain responses are appended to the log."""
+    return _mode == "record" or (_mode == "replay" and _miss == "record")
+
+
+def record(key: str, provider: str, model: str, response: dict, seconds: float) -> None:
+    _log.append(key, provider, model, response, seconds)
+    metrics.LLM_REPLAY.inc(outcome="recorded")
+
+
+_configure_from_env()
@@ -0,0 +1,325 @@
+"""Streamed LLM responses, validated as they arrive.
+
+``LLM_STREAM`` lists the providers whose replies are streamed: ``ollama``
+(the default), a comma list such as ``ollama,groq,nvidia``, ``all`` or
+``off``. Cloud providers are opt-in because not every OpenAI-compatible
+API accepts JSON mode together with streaming. For a streamed provider,
+``_ollama_request`` / ``_openai_request`` feed each text delta to a
+``JsonStreamValidator``. The stream is abandoned with ``StreamAbort`` as
+soon as the reply cannot succeed:
+
+    schema       the reply is not a JSON object, or a top-level value (or
+                 an item of a top-level array) starts with a type the
+                 schema does not allow
+    length       more text than the schema's reply budget
+    repetition   the tail of the reply is one short unit repeated (the
+                 newline/whitespace loops of constrained decoding)
+    stall        no bytes for LLM_STREAM_STALL_SECONDS between tokens (the
+                 socket read timeout once the first token is in; until
+                 then the whole request timeout applies, so a cold model
+                 load or a long prompt evaluation is not cut short)
+    timeout      the request's overall timeout ran out
+
+Once the root object closes, reading goes on only for a few whitespace-only
+events (to catch Ollama's final stats line), so trailing filler is not
+waited for. Either way the caller closes the response, which drops the
+connection (Ollama stops generating) and releases the provider slot,
+so the next model in MODEL_CHAIN starts right away.
+
+Two wire formats are read: Ollama's NDJSON (``message.content`` per line,
+stats on the ``done`` line) and OpenAI-compatible SSE
+(``data: {"choices": [{"delta": {"content": ...}}]}`` ... ``data: [DONE]``).
+"""
+import json
+import os
+import time
+from typing import Callable, Iterable
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROVIDERS = ("ollama", "groq", "nvidia")
+STALL_SECONDS = float(os.getenv("LLM_STREAM_STALL_SECONDS") or 120)
+CONNECT_SECONDS = 10
+
+# Reply budget: tokens (see ollama_backend.num_predict) times a generous
+# characters-per-token allowance
+_MAX_CHARS_PER_TOKEN = 5
+_REPEAT_WINDOW = 400
+_REPEAT_MAX_PERIOD = 100
+_REPEAT_CHECK_EVERY = 256
+# Whitespace-only events read after the root object closes, hoping for the done event
+_TRAILING_EVENTS = 8
+
+_TYPE_BY_FIRST_CHAR = {"{": "object", "[": "array", '"': "string", "t": "boolean", "f": "boolean", "n": "null"}
+
+
+class StreamAbort(Exception):
+    """The streamed reply was abandoned; ``reason`` is one of the module's abort reasons."""
+
+    def __init__(self, reason: str, detail: str):
+        super().__init__(f"{reason}: {detail}")
+        self.reason = reason
+
+
+def _parse_providers(value: str) -> frozenset[str]:
+    value = value.strip().lower()
+    if value in ("off", "false", "none", "0"):
+        return frozenset()
+    if value in ("all", "true", "1"):
+        return frozenset(PROVIDERS)
+    return frozenset(p.strip() for p in value.split(",") if p.strip())
+
+
+STREAM_PROVIDERS = _parse_providers(os.getenv("LLM_STREAM") or "ollama")
+
+
+def streams(provider: str) -> bool:
+    """Whether *provider*'s replies are streamed and validated incrementally."""
+    return provider in STREAM_PROVIDERS
+
+
+def http_timeout(timeout: float) -> tuple[float, float]:
+    """requests (connect, read) timeout for a streamed call.
+
+    The read timeout starts as the whole request timeout, which covers the
+    wait for the headers and the first token; set_stall_timeout tightens it.
+    """
+    return CONNECT_SECONDS, timeout
+
+
+def set_stall_timeout(response, timeout: float) -> None:
+    """Limit each further socket read of a streamed *response* to the stall limit.
+
+    Best effort: a response without a live connection (already read, or a
+    test double) keeps its original read timeout.
+    """
+    sock = getattr(getattr(response.raw, "connection", None), "sock", None)
+    if sock is None:
+        return
+    try:
+        sock.settimeout(min(timeout, STALL_SECONDS))
+    except OSError:
+        pass
+
+
+def _allowed_types(schema: dict | None) -> set[str] | None:
+    if not schema or "type" not in schema:
+        return None
+    types = schema["type"]
+    types = {types} if isinstance(types, str) else set(types)
+    if "integer" in types:
+        types.add("number")
+    return types
+
+
+def _value_type(char: str) -> str:
+    if char in _TYPE_BY_FIRST_CHAR:
+        return _TYPE_BY_FIRST_CHAR[char]
+    return "number" if char == "-" or char.isdigit() else "invalid"
+
+
+def _repeating_tail(text: str) -> int | None:
+    """Period of the repeated unit filling the last _REPEAT_WINDOW chars, if any."""
+    if len(text) < _REPEAT_WINDOW:
+        return None
+    tail = text[-_REPEAT_WINDOW:]
+    for period in range(1, _REPEAT_MAX_PERIOD + 1):
+        if tail[period:] == tail[:-period]:
+            return period
+    return None
+
+
+class JsonStreamValidator:
+    """Incremental structural check of one JSON object reply against *schema*.
+
+    Only the root and the first two nesting levels are typed against the
+    schema; the full reply is parsed with json.loads once complete.
+    """
+
+    def __init__(self, schema: dict | None, max_chars: int):
+        self.schema = schema or {}
+        self.max_chars = max_chars
+        self.parts: list[str] = []
+        self.length = 0
+        self.complete = False
+        self._end = 0
+        self._checked_at = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._key_chars: list[str] | None = None
+        self._key: str | None = None
+        self._expect = "root"  # root | key | value | None
+
+    def _schema_at(self, depth: int) -> dict | None:
+        """Schema for a value starting at *depth* (1: root property, 2: item of a root array)."""
+        props = self.schema.get("properties") or {}
+        prop = props.get(self._key) if self._key is not None else None
+        if depth == 1:
+            return prop
+        if depth == 2 and prop and self._stack[-1] == "[":
+            return prop.get("items")
+        return None
+
+    def _check_value(self, char: str) -> None:
+        depth = len(self._stack)
+        allowed = _allowed_types(self._schema_at(depth))
+        found = _value_type(char)
+        if found == "invalid" or (allowed and found not in allowed):
+            where = self._key if depth == 1 else f"{self._key}[]"
+            raise StreamAbort("schema", f"{where} starts a {found} value, schema allows {sorted(allowed or [])}")
+
+    def feed(self, text: str) -> None:
+        """Consume the next delta; raises StreamAbort when the reply cannot succeed."""
+        if self.complete:
+            return
+        offset = self.length
+        self.parts.append(text)
+        self.length += len(text)
+        if self.length > self.max_chars:
+            raise StreamAbort("length", f"reply exceeds {self.max_chars} chars")
+
+        for index, char in enumerate(text):
+            if self.complete:
+                # Whatever follows the root object is not part of the reply
+                self._end = offset + index
+                return
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_chars is not None:
+                        self._key = "".join(self._key_chars)
+                        self._key_chars = None
+                elif self._key_chars is not None:
+                    self._key_chars.append(char)
+                continue
+            if char.isspace():
+                continue
+
+            if self._expect == "root":
+                if char != "{":
+                    raise StreamAbort("schema", f"reply starts with {char!r}, not a JSON object")
+                self._stack.append("{")
+                self._expect = "key"
+                continue
+            if self._expect == "key":
+                if char == "}":
+                    self._close()
+                elif char == '"':
+                    self._in_string = True
+                    if len(self._stack) == 1:
+                        self._key_chars = []
+                    self._expect = None
+                else:
+                    raise StreamAbort("schema", f"expected an object key, got {char!r}")
+                continue
+            if self._expect == "value":
+                if char == "]" and self._stack[-1] == "[":
+                    self._close()
+                    continue
+                self._check_value(char)
+                self._expect = None
+                if char in "{[":
+                    self._stack.append(char)
+                    self._expect = "key" if char == "{" else "value"
+                elif char == '"':
+                    self._in_string = True
+                continue
+
+            if char == ":":
+                self._expect = "value"
+            elif char == ",":
+                self._expect = "key" if self._stack[-1] == "{" else "value"
+            elif char in "}]":
+                self._close()
+            elif char == '"':
+                self._in_string = True
+
+        if self.complete:
+            self._end = self.length
+        elif self.length - self._checked_at >= _REPEAT_CHECK_EVERY:
+            self._checked_at = self.length
+            period = _repeating_tail("".join(self.parts))
+            if period:
+                raise StreamAbort("repetition", f"last {_REPEAT_WINDOW} chars repeat a {period}-char unit")
+
+    def _close(self) -> None:
+        self._stack.pop()
+        self._expect = None
+        if not self._stack:
+            self.complete = True
+
+    def result(self) -> dict:
+        """The parsed reply; ValueError when it is incomplete or invalid."""
+        text = "".join(self.parts)
+        return json.loads(text[:self._end] if self.complete else text)
+
+
+def _ndjson_delta(event: dict) -> tuple[str, bool]:
+    return (event.get("message") or {}).get("content") or "", bool(event.get("done"))
+
+
+def _sse_delta(event: dict) -> tuple[str, bool]:
+    choices = event.get("choices") or [{}]
+    return (choices[0].get("delta") or {}).get("content") or "", choices[0].get("finish_reason") is not None
+
+
+def read_json_stream(
+    lines: Iterable[bytes | str],
+    schema: dict | None,
+    max_tokens: int,
+    timeout: float,
+    sse: bool = False,
+    on_done: Callable[[dict], None] | None = None,
+    on_first_token: Callable[[], None] | None = None,
+) -> dict:
+    """Assemble and validate a streamed JSON reply from response lines.
+
+    *lines* is ``response.iter_lines()``; *sse* selects the OpenAI-compatible
+    format over Ollama's NDJSON. *on_done* gets the final event (Ollama's
+    stats); *on_first_token* is called once, when the first text arrives.
+    Raises StreamAbort, or ValueError for a reply that ended incomplete.
+    """
+    import requests
+
+    validator = JsonStreamValidator(schema, max_tokens * _MAX_CHARS_PER_TOKEN)
+    deadline = time.monotonic() + timeout
+    delta = _sse_delta if sse else _ndjson_delta
+    trailing = 0
+    try:
+        for line in lines:
+            if time.monotonic() > deadline:
+                raise StreamAbort("timeout", f"no complete reply after {timeout}s")
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            if sse:
+                if not line.startswith("data:"):
+                    continue
+                line = line[5:].strip()
+                if line == "[DONE]":
+                    break
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            text, done = delta(event)
+            if validator.complete:
+                trailing += 1
+                if text.strip() or trailing > _TRAILING_EVENTS:
+                    break
+            elif text:
+                if on_first_token and not validator.length:
+                    on_first_token()
+                validator.feed(text)
+            if done:
+                if on_done:
+                    on_done(event)
+                break
+    except requests.RequestException as exc:
+        raise StreamAbort("stall", str(exc)) from exc
+    return validator.result()
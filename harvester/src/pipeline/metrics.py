@@ -0,0 +1,379 @@
+"""In-process Prometheus metrics for the pipeline and the web app.
+
+Metrics are declared once at module level with ``counter()``, ``gauge()``
+or ``histogram()`` and updated from hot paths (scrape, LLM chain, GUDID,
+Mongo). Updates never take a shared lock: each thread writes into its own
+shard, and ``render_latest()`` sums the shards when ``/metrics`` is
+scraped. Shards of threads that have exited are folded into a retired
+total so short-lived executor threads do not accumulate.
+
+``gauge_callback()`` registers a value computed at scrape time instead
+(e.g. the number of disabled models), which costs nothing on the hot path.
+
+Output follows the Prometheus text exposition format 0.0.4, so no client
+library is required.
+"""
+import bisect
+import math
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a fast Mongo op to a slow CPU-only Ollama call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class _Shards:
+    """Per-thread dicts of values, merged on read."""
+
+    def __init__(self, merge):
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()  # taken only on shard creation and collection
+        self._live: list[tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+
+    def mine(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._live.append((threading.current_thread(), shard))
+        return shard
+
+    def collect(self) -> dict:
+        with self._lock:
+            live = []
+            for thread, shard in self._live:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self._merge(self._retired, shard.copy())
+            self._live = live
+            total: dict = {}
+            self._merge(total, self._retired)
+            for _, shard in live:
+                self._merge(total, shard.copy())
+        return total
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, shard in self._live:
+                shard.clear()
+            self._retired.clear()
+
+
+def _merge_sums(into: dict, shard: dict) -> None:
+    for key, value in shard.items():
+        into[key] = into.get(key, 0.0) + value
+
+
+def _merge_buckets(into: dict, shard: dict) -> None:
+    for key, values in shard.items():
+        current = into.get(key)
+        if current is None:
+            into[key] = list(values)
+        else:
+            for i, v in enumerate(values):
+                current[i] += v
+
+
+def _label_key(labelnames: tuple[str, ...], labels: dict) -> tuple:
+    try:
+        if len(labels) == len(labelnames):
+            return tuple(str(labels[name]) for name in labelnames)
+    except KeyError:
+        pass
+    raise ValueError(f"expected labels {labelnames}, got {tuple(labels)}")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, key, extra: tuple = ()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(labelnames, key)]
+    pairs += [f'{n}="{_escape(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._shards = _Shards(_merge_sums)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if amount < 0:
+            raise ValueError("counters can only increase")
+        key = _label_key(self.labelnames, labels)
+        shard = self._shards.mine()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def values(self) -> dict[tuple, float]:
+        return self._shards.collect()
+
+    def value(self, **labels) -> float:
+        return self.values().get(_label_key(self.labelnames, labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def clear(self) -> None:
+        self._shards.clear()
+
+
+class Gauge(Counter):
+    """Up/down gauge built from per-thread deltas (inc/dec only)."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        shard = self._shards.mine()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose samples are computed by *func* at scrape time.
+
+    *func* returns a number (no labels) or a {label tuple: value} dict.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, func, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._func = func
+
+    def values(self) -> dict[tuple, float]:
+        result = self._func()
+        if isinstance(result, dict):
+            return {tuple(str(v) for v in k): float(v) for k, v in result.items()}
+        return {(): float(result)}
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def clear(self) -> None:
+        pass
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _Shards(_merge_buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        shard = self._shards.mine()
+        slots = shard.get(key)
+        if slots is None:
+            # one slot per bucket, then +Inf, sum
+            slots = shard[key] = [0.0] * (len(self.buckets) + 2)
+        slots[bisect.bisect_left(self.buckets, value)] += 1
+        slots[-1] += value
+
+    def snapshot(self, **labels) -> dict:
+        """{count, sum, buckets: {le: cumulative count}} for one label set."""
+        slots = self._shards.collect().get(_label_key(self.labelnames, labels))
+        if slots is None:
+            return {"count": 0, "sum": 0.0, "buckets": {}}
+        cumulative, running = {}, 0.0
+        for le, n in zip(self.buckets + (math.inf,), slots[:-1]):
+            running += n
+            cumulative[le] = running
+        return {"count": running, "sum": slots[-1], "buckets": cumulative}
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for key, slots in sorted(self._shards.collect().items()):
+            running = 0.0
+            for le, n in zip(self.buckets + (math.inf,), slots[:-1]):
+                running += n
+                labels = _format_labels(self.labelnames, key, (("le", _format_value(le)),))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(running)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(slots[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(running)}")
+        return lines
+
+    def clear(self) -> None:
+        self._shards.clear()
+
+
+_registry: dict[str, _Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"metric {metric.name} already registered with a different shape")
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name: str, documentation: str, labelnames=()) -> Counter:
+    return _register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames=()) -> Gauge:
+    return _register(Gauge(name, documentation, labelnames))
+
+
+def gauge_callback(name: str, documentation: str, func, labelnames=()) -> CallbackGauge:
+    return _register(CallbackGauge(name, documentation, func, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render_latest() -> str:
+    """All registered metrics in Prometheus text format."""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda m: m.name)
+    lines = []
+    for metric in metrics:
+        try:
+            lines.extend(metric.render())
+        except Exception:  # a failing callback must not break the scrape
+            continue
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    """Zero every metric (tests)."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    for metric in metrics:
+        metric.clear()
+
+
+# ---------------------------------------------------------------------------
+# Shared pipeline metrics
+# ---------------------------------------------------------------------------
+
+PAGES_SCRAPED = counter(
+    "fivos_pages_scraped_total", "Pages fetched by the browser engine.", ("outcome",),
+)
+SCRAPE_SECONDS = histogram(
+    "fivos_scrape_fetch_seconds", "Browser fetch time per page, including retries.",
+)
+LLM_REQUESTS = counter(
+    "fivos_llm_requests_total", "LLM calls by model, provider and outcome.",
+    ("provider", "model", "outcome"),
+)
+LLM_SECONDS = histogram(
+    "fivos_llm_request_seconds", "LLM call latency by provider.", ("provider",),
+)
+LLM_FALLBACKS = counter(
+    "fivos_llm_fallbacks_total", "Model failures that fell through to the next model in the chain.",
+    ("provider", "model"),
+)
+LLM_CHAIN_EXHAUSTED = counter(
+    "fivos_llm_chain_exhausted_total", "Extractions where every model in the chain failed.",
+)
+LLM_MODELS_DISABLED = counter(
+    "fivos_llm_models_disabled_total",
+    "Models disabled in the fallback chain, for the process or until a rate-limit reset.", ("model",),
+)
+LLM_SATURATED = counter(
+    "fivos_llm_provider_saturated_total",
+    "Requests that skipped a provider because its semaphore was full.", ("provider",),
+)
+LLM_RATE_LIMITED = counter(
+    "fivos_llm_rate_limited_total",
+    "Cloud LLM requests deferred by the rate limiter, throttled (429) or out of quota.",
+    ("provider", "action"),
+)
+LLM_RATE_LIMIT_WAIT = histogram(
+    "fivos_llm_rate_limit_wait_seconds", "Time an extraction waited for a rate-limited chain.",
+)
+LLM_INFLIGHT = gauge(
+    "fivos_llm_inflight_requests", "LLM calls currently holding a provider slot.", ("provider",),
+)
+OLLAMA_TOKENS = counter(
+    "fivos_ollama_tokens_total", "Tokens evaluated by the local model, by kind (prompt/completion).",
+    ("model", "kind"),
+)
+OLLAMA_TOKENS_PER_SECOND = histogram(
+    "fivos_ollama_tokens_per_second", "Local model evaluation rate per request, by phase.",
+    ("model", "phase"), buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+)
+OLLAMA_LOAD_SECONDS = histogram(
+    "fivos_ollama_load_seconds", "Time Ollama spent loading the model for a request.", ("model",),
+)
+OLLAMA_ENDPOINT_EJECTIONS = counter(
+    "fivos_ollama_endpoint_ejections_total", "Ollama endpoints taken out of rotation after a failure.",
+    ("endpoint",),
+)
+LLM_STREAM_ABORTS = counter(
+    "fivos_llm_stream_aborts_total", "Streamed LLM replies abandoned early, by provider and reason.",
+    ("provider", "reason"),
+)
+LLM_REPLAY = counter(
+    "fivos_llm_replay_total", "LLM record/replay log hits, misses and writes.", ("outcome",),
+)
+SCHEDULER_WAIT = histogram(
+    "fivos_scheduler_wait_seconds", "Time work waited for a scheduler slot, by resource and class.",
+    ("resource", "work_class"),
+)
+DISTRIBUTED_PAGES = counter(
+    "fivos_distributed_pages_total", "Pages extracted by remote workers, by job outcome.", ("outcome",),
+)
+GUDID_REQUESTS = counter(
+    "fivos_gudid_requests_total", "AccessGUDID calls by endpoint and outcome.", ("endpoint", "outcome"),
+)
+GUDID_SECONDS = histogram(
+    "fivos_gudid_request_seconds", "AccessGUDID call latency by endpoint.", ("endpoint",),
+)
+MONGO_SECONDS = histogram(
+    "fivos_mongo_command_seconds", "MongoDB command latency by command and outcome.",
+    ("command", "outcome"),
+)
+HTTP_REQUESTS = counter(
+    "fivos_http_requests_total", "HTTP requests by method, route template and status.",
+    ("method", "route", "status"),
+)
+HTTP_SECONDS = histogram(
+    "fivos_http_request_seconds", "HTTP request latency by method and route template.",
+    ("method", "route"),
+)
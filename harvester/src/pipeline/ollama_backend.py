@@ -0,0 +1,208 @@
+"""Ollama request options, model residency and throughput stats.
+
+``llm_extractor._ollama_request`` builds its payload with ``chat_payload``:
+
+    keep_alive   OLLAMA_KEEP_ALIVE (default 30m) on every request, so the
+                 model stays loaded between bursts instead of being evicted
+                 after Ollama's 5 minute default
+    num_ctx      one window for the process, sized by ``context_size`` from
+                 the longest prompt llm_extractor can send (its inputs are
+                 truncated) plus the largest reply budget; OLLAMA_NUM_CTX
+                 overrides it
+    num_predict  reply budget per schema (product tables need the most)
+    num_thread   OLLAMA_NUM_THREAD, or the physical cores this process may
+                 run on when the server is local; omitted for a remote
+                 server, which knows its own hardware better
+
+num_ctx and num_thread stay fixed across requests on purpose: Ollama
+reloads the model whenever either changes, so sizing them per prompt
+would evict the model between the page and product-table passes.
+
+``record_stats`` turns the timing fields of a response, or of the final
+event of a streamed one (load_duration, prompt_eval_*, eval_*; nanoseconds), into metrics and
+returns them. ``load_model``, ``unload_model`` and ``loaded_models`` manage
+residency explicitly through ``/api/chat`` and ``/api/ps``; ``is_up`` is the
+health check used by pipeline.ollama_pool.
+
+Concurrent requests to each Ollama server are bounded by OLLAMA_NUM_PARALLEL
+(the same variable the Ollama server reads, so set it on both sides) unless
+OLLAMA_URLS gives the server its own cap.
+"""
+import logging
+import math
+import os
+from urllib.parse import urlparse
+
+import requests
+from dotenv import load_dotenv
+from pipeline import metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE") or "30m"
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX") or 0)
+OLLAMA_MAX_CTX = 32768
+OLLAMA_NUM_PARALLEL = max(1, int(os.getenv("OLLAMA_NUM_PARALLEL") or 1))
+
+_CTX_STEP = 2048
+# Conservative for English page text; over-estimating only costs KV cache
+_CHARS_PER_TOKEN = 3
+# Chat template and role markers around the messages
+_TEMPLATE_TOKENS = 64
+_NUM_PREDICT_DEFAULT = 1024
+_NUM_PREDICT_ROWS = 4096
+_LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "0.0.0.0"}
+
+
+def _physical_cores() -> int:
+    """Physical cores among the CPUs this process may run on."""
+    try:
+        allowed = os.sched_getaffinity(0)
+    except AttributeError:  # not on Linux
+        return max(1, (os.cpu_count() or 2) // 2)
+    cores = set()
+    try:
+        with open("/proc/cpuinfo", encoding="ascii", errors="replace") as f:
+            processor = physical = None
+            for line in f:
+                key, _, value = line.partition(":")
+                key = key.strip()
+                if key == "processor":
+                    processor = int(value)
+                elif key == "physical id":
+                    physical = value.strip()
+                elif key == "core id" and processor in allowed:
+                    cores.add((physical, value.strip()))
+    except (OSError, ValueError):
+        pass
+    return len(cores) or len(allowed)
+
+
+def num_thread(url: str) -> int | None:
+    """Threads to request from the Ollama server at *url*, or None to let it choose."""
+    configured = os.getenv("OLLAMA_NUM_THREAD")
+    if configured:
+        return int(configured)
+    if urlparse(url).hostname in _LOCAL_HOSTS:
+        return _physical_cores()
+    return None
+
+
+def num_predict(schema: dict | None) -> int:
+    """Reply token budget: product tables list many rows, everything else is short."""
+    if schema and "products" in (schema.get("properties") or {}):
+        return _NUM_PREDICT_ROWS
+    return _NUM_PREDICT_DEFAULT
+
+
+def context_size(max_prompt_chars: int) -> int:
+    """Context window for prompts up to *max_prompt_chars* plus the largest reply."""
+    if OLLAMA_NUM_CTX:
+        return OLLAMA_NUM_CTX
+    needed = math.ceil(max_prompt_chars / _CHARS_PER_TOKEN) + _TEMPLATE_TOKENS + _NUM_PREDICT_ROWS
+    return min(OLLAMA_MAX_CTX, math.ceil(needed / _CTX_STEP) * _CTX_STEP)
+
+
+def chat_payload(url: str, model: str, messages: list[dict], schema: dict | None, num_ctx: int) -> dict:
+    """Non-streamed /api/chat request body with residency and sizing options."""
+    options = {"num_ctx": num_ctx, "num_predict": num_predict(schema)}
+    threads = num_thread(url)
+    if threads:
+        options["num_thread"] = threads
+    return {
+        "model": model,
+        "messages": messages,
+        "stream": False,
+        "format": schema,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": options,
+    }
+
+
+def _rate(count, duration_ns) -> float | None:
+    if not count or not duration_ns:
+        return None
+    return round(count / (duration_ns / 1e9), 2)
+
+
+def record_stats(model: str, data: dict) -> dict:
+    """Throughput stats from an /api/chat response; also fed into metrics."""
+    stats = {
+        "load_seconds": round((data.get("load_duration") or 0) / 1e9, 3),
+        "total_seconds": round((data.get("total_duration") or 0) / 1e9, 3),
+        "prompt_seconds": round((data.get("prompt_eval_duration") or 0) / 1e9, 3),
+        "prompt_tokens": data.get("prompt_eval_count") or 0,
+        "completion_tokens": data.get("eval_count") or 0,
+        "prompt_tokens_per_s": _rate(data.get("prompt_eval_count"), data.get("prompt_eval_duration")),
+        "completion_tokens_per_s": _rate(data.get("eval_count"), data.get("eval_duration")),
+    }
+    if data.get("load_duration") is not None:
+        metrics.OLLAMA_LOAD_SECONDS.observe(stats["load_seconds"], model=model)
+    metrics.OLLAMA_TOKENS.inc(stats["prompt_tokens"], model=model, kind="prompt")
+    metrics.OLLAMA_TOKENS.inc(stats["completion_tokens"], model=model, kind="completion")
+    for phase in ("prompt", "completion"):
+        rate = stats[f"{phase}_tokens_per_s"]
+        if rate is not None:
+            metrics.OLLAMA_TOKENS_PER_SECOND.observe(rate, model=model, phase=phase)
+    logger.debug("Ollama %s: %s", model, stats)
+    return stats
+
+
+def _endpoint(url: str, path: str) -> str:
+    """*url* (any Ollama API URL) with its path replaced by *path*."""
+    return urlparse(url)._replace(path=path, query="").geturl()
+
+
+def load_model(url: str, model: str, timeout: int = 300) -> float | None:
+    """Load *model* and pin it for OLLAMA_KEEP_ALIVE. Returns the load time in seconds."""
+    try:
+        response = requests.post(
+            _endpoint(url, "/api/chat"),
+            json={"model": model, "messages": [], "keep_alive": OLLAMA_KEEP_ALIVE},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return round((response.json().get("load_duration") or 0) / 1e9, 3)
+    except (requests.RequestException, ValueError) as exc:
+        logger.warning("Could not load Ollama model %s: %s", model, exc)
+        return None
+
+
+def unload_model(url: str, model: str, timeout: int = 30) -> bool:
+    """Evict *model* from memory now (keep_alive 0)."""
+    try:
+        response = requests.post(
+            _endpoint(url, "/api/chat"),
+            json={"model": model, "messages": [], "keep_alive": 0},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return True
+    except requests.RequestException as exc:
+        logger.warning("Could not unload Ollama model %s: %s", model, exc)
+        return False
+
+
+def is_up(url: str, timeout: float = 2) -> bool:
+    """Whether the Ollama server at *url* answers /api/version."""
+    try:
+        requests.get(_endpoint(url, "/api/version"), timeout=timeout).raise_for_status()
+        return True
+    except requests.RequestException:
+        return False
+
+
+def loaded_models(url: str, timeout: int = 5) -> list[dict]:
+    """Models resident on the server, from /api/ps: name, size_vram, expires_at."""
+    try:
+        response = requests.get(_endpoint(url, "/api/ps"), timeout=timeout)
+        response.raise_for_status()
+        return [
+            {k: m.get(k) for k in ("name", "size", "size_vram", "expires_at")}
+            for m in response.json().get("models", [])
+        ]
+    except (requests.RequestException, ValueError) as exc:
+        logger.warning("Could not list Ollama models: %s", exc)
+        return []
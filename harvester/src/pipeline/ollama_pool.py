@@ -0,0 +1,203 @@
+"""Load balancing over one or more Ollama servers.
+
+OLLAMA_URLS lists the servers, comma separated. An entry may end in
+``*N`` to allow N concurrent requests on that server (default
+OLLAMA_NUM_PARALLEL); a bare ``http://host:port`` means its /api/chat:
+
+    OLLAMA_URLS=http://gpu1:11434*2,http://gpu2:11434,http://localhost:11435
+
+Without it the pool is the single OLLAMA_URL.
+
+``acquire`` reserves a slot on the healthy endpoint with the fewest
+requests in flight for its cap, and never blocks. None means every
+endpoint is full or down, and _llm_request falls through to the next
+model, as it does for a full provider semaphore. These per-endpoint caps
+are the only limit on Ollama requests, so ``configure`` takes effect at once.
+
+An endpoint that refuses connections is taken out of rotation
+(``mark_down``) for OLLAMA_RETRY_SECONDS. The other endpoints carry on.
+When that time is up, the next ``acquire`` probes it (GET /api/version)
+and re-admits it if it answers. Each failed probe doubles the wait, up to
+ten minutes. ``check_health`` probes every endpoint at once.
+"""
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+from pipeline import metrics, ollama_backend
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URL = "http://localhost:11434/api/chat"
+OLLAMA_RETRY_SECONDS = float(os.getenv("OLLAMA_RETRY_SECONDS") or 30)
+_MAX_RETRY_SECONDS = 600.0
+
+
+class Endpoint:
+    """One Ollama server: its /api/chat URL, concurrency cap and health."""
+
+    def __init__(self, url: str, capacity: int):
+        self.url = url
+        self.capacity = capacity
+        self.inflight = 0
+        self.up = True
+        self.retry_at = 0.0
+        self.backoff = OLLAMA_RETRY_SECONDS
+        self.probing = False
+
+    def __repr__(self) -> str:
+        return f"Endpoint({self.url!r}, {self.inflight}/{self.capacity}, {'up' if self.up else 'down'})"
+
+
+def parse_endpoints(spec: str, default_capacity: int) -> list[Endpoint]:
+    """Endpoints from an OLLAMA_URLS value ("url[*N], ...")."""
+    endpoints = []
+    for item in spec.split(","):
+        url, _, capacity = item.strip().partition("*")
+        if not url:
+            continue
+        if urlparse(url).path in ("", "/"):
+            url = url.rstrip("/") + "/api/chat"
+        endpoints.append(Endpoint(url, max(1, int(capacity or default_capacity))))
+    return endpoints
+
+
+class OllamaPool:
+    def __init__(self, endpoints: list[Endpoint]):
+        if not endpoints:
+            raise ValueError("no Ollama endpoints configured")
+        self.endpoints = endpoints
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return sum(e.capacity for e in self.endpoints)
+
+    def acquire(self) -> Endpoint | None:
+        """Reserve a slot on the least loaded healthy endpoint, or None if all are full or down."""
+        self._probe_due()
+        with self._lock:
+            ready = [e for e in self.endpoints if e.up and e.inflight < e.capacity]
+            if not ready:
+                return None
+            # Ties go to the endpoint listed first
+            endpoint = min(ready, key=lambda e: e.inflight / e.capacity)
+            endpoint.inflight += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint) -> None:
+        with self._lock:
+            endpoint.inflight -= 1
+
+    def available(self) -> bool:
+        """False while every endpoint is down and none is due for a probe."""
+        now = time.monotonic()
+        return any(e.up or now >= e.retry_at for e in self.endpoints)
+
+    def mark_down(self, endpoint: Endpoint) -> None:
+        """Take *endpoint* out of rotation after a failed request."""
+        with self._lock:
+            if not endpoint.up:
+                return
+            endpoint.up = False
+            endpoint.backoff = OLLAMA_RETRY_SECONDS
+            endpoint.retry_at = time.monotonic() + endpoint.backoff
+        metrics.OLLAMA_ENDPOINT_EJECTIONS.inc(endpoint=endpoint.url)
+        logger.warning("Ollama not available at %s, retrying it in %.0fs", endpoint.url, endpoint.backoff)
+
+    def check_health(self) -> dict[str, bool]:
+        """Probe every endpoint now and update its state; returns url -> up."""
+        for endpoint in self.endpoints:
+            with self._lock:
+                endpoint.probing = True
+            self._probe(endpoint)
+        return {e.url: e.up for e in self.endpoints}
+
+    def _probe_due(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            due = [e for e in self.endpoints if not e.up and not e.probing and now >= e.retry_at]
+            for endpoint in due:
+                endpoint.probing = True
+        for endpoint in due:
+            self._probe(endpoint)
+
+    def _probe(self, endpoint: Endpoint) -> None:
+        """Health-check an endpoint claimed with ``probing`` (outside the lock: it is an HTTP call)."""
+        ok = ollama_backend.is_up(endpoint.url)
+        with self._lock:
+            endpoint.probing = False
+            was_up = endpoint.up
+            if ok:
+                endpoint.up = True
+                endpoint.backoff = OLLAMA_RETRY_SECONDS
+            elif was_up:
+                endpoint.up = False
+                endpoint.retry_at = time.monotonic() + endpoint.backoff
+            else:
+                endpoint.backoff = min(endpoint.backoff * 2, _MAX_RETRY_SECONDS)
+                endpoint.retry_at = time.monotonic() + endpoint.backoff
+        if ok and not was_up:
+            logger.info("Ollama at %s is back, re-admitting it", endpoint.url)
+        elif not ok and was_up:
+            metrics.OLLAMA_ENDPOINT_EJECTIONS.inc(endpoint=endpoint.url)
+            logger.warning("Ollama at %s failed its health check", endpoint.url)
+
+
+def _endpoints_from_env() -> list[Endpoint]:
+    spec = os.getenv("OLLAMA_URLS") or os.getenv("OLLAMA_URL") or DEFAULT_URL
+    return parse_endpoints(spec, ollama_backend.OLLAMA_NUM_PARALLEL)
+
+
+_pool = OllamaPool(_endpoints_from_env())
+
+
+def configure(spec: str | None = None) -> None:
+    """Replace the pool (*spec* as OLLAMA_URLS; default from the environment)."""
+    global _pool
+    _pool = OllamaPool(
+        parse_endpoints(spec, ollama_backend.OLLAMA_NUM_PARALLEL) if spec else _endpoints_from_env()
+    )
+
+
+def endpoints() -> list[Endpoint]:
+    return list(_pool.endpoints)
+
+
+def capacity() -> int:
+    return _pool.capacity
+
+
+def acquire() -> Endpoint | None:
+    return _pool.acquire()
+
+
+def release(endpoint: Endpoint) -> None:
+    _pool.release(endpoint)
+
+
+def available() -> bool:
+    return _pool.available()
+
+
+def mark_down(endpoint: Endpoint) -> None:
+    _pool.mark_down(endpoint)
+
+
+def check_health() -> dict[str, bool]:
+    return _pool.check_health()
+
+
+metrics.gauge_callback(
+    "fivos_ollama_endpoint_up", "Whether each Ollama endpoint is in rotation.",
+    lambda: {(e.url,): int(e.up) for e in _pool.endpoints}, ("endpoint",),
+)
+metrics.gauge_callback(
+    "fivos_ollama_endpoint_inflight", "Requests in flight on each Ollama endpoint.",
+    lambda: {(e.url,): e.inflight for e in _pool.endpoints}, ("endpoint",),
+)
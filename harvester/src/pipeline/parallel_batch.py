@@ -4,23 +4,83 @@ Shared by CLI batch (runner.process_batch) and UI batch
 (orchestrator.run_harvest_batch). Each worker runs _process_single_ollama
 on one file; per-provider concurrency caps live inside llm_extractor
 (semaphores). Exceptions in workers are caught and returned as error
-results so one bad file cannot crash the batch.
+results so one bad file cannot crash the batch. Each result carries the
+worker's per-stage timing breakdown (see pipeline.tracing). Workers run in
+a copy of the caller's context, so a progress tracker set with
+pipeline.progress.track() sees their per-file and per-model events.
+
+With EXTRACT_MODE=distributed, process_html_files_parallel sends the files
+to extraction workers on other hosts instead (see pipeline.distributed).
 """
+import contextvars
 import logging
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass, field
-from typing import Callable
+from typing import Callable, Iterable, Iterator
+
+from pipeline.progress import note_file_started
+from pipeline.tracing import record_stages, span
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class HtmlPage:
+    """A page held in memory (e.g. streamed out of an archive)."""
+    name: str
+    source_url: str | None
+    html: str
+
+
 @dataclass
 class FileExtractionResult:
     path: str
     source_url: str | None
     records: list[dict] = field(default_factory=list)
     error: str | None = None
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+def _extract_one(
+    path: str,
+    source_url: str | None,
+    harvest_run_id: str,
+    raw_html: str | None = None,
+) -> FileExtractionResult:
+    """Run _process_single_ollama on one page; never raises."""
+    # Lazy import: runner.process_batch imports from this module, which
+    # would create a circular import at module load time.
+    from pipeline.runner import _process_single_ollama
+
+    kwargs = {"source_url": source_url, "harvest_run_id": harvest_run_id}
+    if raw_html is not None:
+        kwargs["raw_html"] = raw_html
+
+    note_file_started(source_url or path)
+    with record_stages() as timings:
+        try:
+            with span("extract.total"):
+                records = _process_single_ollama(path, **kwargs)
+            return FileExtractionResult(
+                path=path,
+                source_url=source_url,
+                records=records,
+                error=None,
+                timings=timings.as_dict(),
+            )
+        except Exception as exc:
+            logger.error(
+                "parallel_batch: worker crashed on %s: %s",
+                path, exc, exc_info=True,
+            )
+            return FileExtractionResult(
+                path=path,
+                source_url=source_url,
+                records=[],
+                error=str(exc),
+                timings=timings.as_dict(),
+            )
 
 
 def process_html_files_parallel(
@@ -28,6 +88,7 @@ def process_html_files_parallel(
     harvest_run_id: str,
     source_urls: dict[str, str] | None = None,
     progress_callback: Callable[[int, int], None] | None = None,
+    result_callback: Callable[[FileExtractionResult], None] | None = None,
 ) -> list[FileExtractionResult]:
     """Extract records from HTML files in parallel.
 
@@ -36,59 +97,104 @@ def process_html_files_parallel(
         harvest_run_id: ID threaded through to each record for traceability.
         source_urls: Optional path -> source URL map (propagated to _process_single_ollama).
         progress_callback: Called as (completed, total) whenever any worker finishes.
+        result_callback: Called with each FileExtractionResult as it completes,
+            on the calling thread (used to checkpoint per file).
 
     Returns:
         One FileExtractionResult per input path, regardless of success.
     """
-    # Lazy imports: Task 6 will have runner.process_batch import from this
-    # module, which would create a circular import at module load time.
+    from pipeline import distributed
     from pipeline.llm_extractor import EXTRACT_WORKERS
-    from pipeline.runner import _process_single_ollama
 
     total = len(html_paths)
     if total == 0:
         return []
+    if distributed.enabled():
+        return distributed.process_html_files_distributed(
+            html_paths, harvest_run_id, source_urls, progress_callback, result_callback,
+            timeout=distributed.DISTRIBUTED_TIMEOUT,
+        )
 
     source_urls = source_urls or {}
     completed = 0
     progress_lock = threading.Lock()
 
     def _work(path: str) -> FileExtractionResult:
-        try:
-            records = _process_single_ollama(
-                path,
-                source_url=source_urls.get(path),
-                harvest_run_id=harvest_run_id,
-            )
-            return FileExtractionResult(
-                path=path,
-                source_url=source_urls.get(path),
-                records=records,
-                error=None,
-            )
-        except Exception as exc:
-            logger.error(
-                "parallel_batch: worker crashed on %s: %s",
-                path, exc, exc_info=True,
-            )
-            return FileExtractionResult(
-                path=path,
-                source_url=source_urls.get(path),
-                records=[],
-                error=str(exc),
-            )
+        return _extract_one(path, source_urls.get(path), harvest_run_id)
 
     results: list[FileExtractionResult] = []
     with ThreadPoolExecutor(
         max_workers=EXTRACT_WORKERS,
         thread_name_prefix="extract",
     ) as pool:
-        futures = {pool.submit(_work, p): p for p in html_paths}
-        for future in as_completed(futures):
-            results.append(future.result())
-            with progress_lock:
-                completed += 1
-                if progress_callback:
-                    progress_callback(completed, total)
+        # One context copy per task: a Context cannot be entered by two
+        # threads at once.
+        futures = {
+            pool.submit(contextvars.copy_context().run, _work, p): p
+            for p in html_paths
+        }
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if result_callback:
+                    result_callback(result)
+                with progress_lock:
+                    completed += 1
+                    if progress_callback:
+                        progress_callback(completed, total)
+        except BaseException:
+            # A raising progress_callback (e.g. job cancelled) stops the
+            # batch: drop files that have not started yet.
+            for future in futures:
+                future.cancel()
+            raise
 
     return results
+
+
+def iter_html_pages_parallel(
+    pages: Iterable[HtmlPage],
+    harvest_run_id: str,
+    max_pending: int | None = None,
+) -> Iterator[FileExtractionResult]:
+    """Extract records from in-memory pages, yielding results as they finish.
+
+    *pages* is consumed lazily: at most *max_pending* pages (default twice
+    the worker count) are submitted and not yet yielded back, so memory
+    stays bounded however long the input stream is. Results come back in
+    completion order. With EXTRACT_MODE=distributed the pages go to
+    extract_page workers instead (``distributed.iter_html_pages_distributed``).
+    """
+    from pipeline import distributed
+    from pipeline.llm_extractor import EXTRACT_WORKERS
+
+    if distributed.enabled():
+        yield from distributed.iter_html_pages_distributed(
+            pages, harvest_run_id, max_pending=max_pending, timeout=distributed.DISTRIBUTED_TIMEOUT,
+        )
+        return
+
+    max_pending = max_pending or EXTRACT_WORKERS * 2
+    pending = set()
+    with ThreadPoolExecutor(
+        max_workers=EXTRACT_WORKERS,
+        thread_name_prefix="extract",
+    ) as pool:
+        try:
+            for page in pages:
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(pool.submit(
+                    contextvars.copy_context().run, _extract_one,
+                    page.name, page.source_url, harvest_run_id, page.html,
+                ))
+            for future in as_completed(pending):
+                yield future.result()
+        except BaseException:
+            # Consumer stopped early or the page stream raised
+            for future in pending:
+                future.cancel()
+            raise
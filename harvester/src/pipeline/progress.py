@@ -0,0 +1,241 @@
+"""Structured harvest progress and a non-blocking publish/subscribe hub.
+
+``HarvestProgress`` tracks one batch run: per-stage done/failed/total
+counts, the URL currently being worked on and per-model LLM success rates.
+Every change is published to the process-wide ``ProgressHub`` under the
+run's channel (the job ID). Changes reported by the run's own thread
+(stage transitions, finished items) are also written through to the job
+store, throttled, so workers in another process still surface progress;
+the per-file and per-model notes from extraction threads only reach the
+hub and ride along with the next store write, so those threads never wait
+on the database.
+
+The hub keeps only the latest event per channel. ``publish()`` swaps it in
+under a short lock and wakes subscribers; it never waits on a consumer, so
+extraction threads are never slowed by a slow browser tab. Subscribers
+(the SSE endpoint) read the newest snapshot when woken, which coalesces
+bursts of updates into one message.
+
+Extraction threads find the active tracker through a ContextVar, so
+``note_model_result()`` in llm_extractor and ``note_file_started()`` in
+parallel_batch cost one lookup when no run is being tracked.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+_MAX_CHANNELS = 256
+
+STAGES = ("scrape", "extract", "persist")
+
+
+class _Subscription:
+    """One consumer of a hub channel, woken from any thread."""
+
+    def __init__(self, hub: "ProgressHub", channel: str):
+        self.hub = hub
+        self.channel = channel
+        self._loop = None
+        self._async_event = None
+        self._thread_event = threading.Event()
+        try:
+            self._loop = asyncio.get_running_loop()
+            self._async_event = asyncio.Event()
+        except RuntimeError:
+            pass
+
+    def _notify(self) -> None:
+        self._thread_event.set()
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._async_event.set)
+            except RuntimeError:
+                pass  # loop closed; the subscriber is gone
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait (async) until something is published; False on timeout."""
+        try:
+            await asyncio.wait_for(self._async_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._async_event.clear()
+        return True
+
+    def wait_sync(self, timeout: float) -> bool:
+        fired = self._thread_event.wait(timeout)
+        self._thread_event.clear()
+        return fired
+
+    def latest(self) -> tuple[int, dict | None]:
+        return self.hub.latest(self.channel)
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+
+class ProgressHub:
+    """Latest-value pub/sub keyed by channel (job ID)."""
+
+    def __init__(self, max_channels: int = _MAX_CHANNELS):
+        self._lock = threading.Lock()
+        self._latest: OrderedDict[str, tuple[int, dict]] = OrderedDict()
+        self._subscribers: dict[str, set[_Subscription]] = {}
+        self._max_channels = max_channels
+
+    def publish(self, channel: str, event: dict) -> int:
+        with self._lock:
+            version = self._latest.get(channel, (0, None))[0] + 1
+            self._latest[channel] = (version, event)
+            self._latest.move_to_end(channel)
+            while len(self._latest) > self._max_channels:
+                self._latest.popitem(last=False)
+            subscribers = list(self._subscribers.get(channel, ()))
+        for sub in subscribers:
+            sub._notify()
+        return version
+
+    def latest(self, channel: str) -> tuple[int, dict | None]:
+        with self._lock:
+            return self._latest.get(channel, (0, None))
+
+    def subscribe(self, channel: str) -> _Subscription:
+        sub = _Subscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: _Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.channel]
+
+
+_hub = ProgressHub()
+
+
+def get_hub() -> ProgressHub:
+    return _hub
+
+
+class HarvestProgress:
+    """Progress of one batch harvest, published on every change."""
+
+    def __init__(self, channel: str | None, job_store=None, job_id: str | None = None,
+                 hub: ProgressHub | None = None, store_interval: float = 1.0):
+        self.channel = channel
+        self.job_store = job_store
+        self.job_id = job_id
+        self.hub = hub or _hub
+        self.store_interval = store_interval
+        self._lock = threading.Lock()
+        self._stage = None
+        self._stages = {s: {"done": 0, "failed": 0, "total": 0} for s in STAGES}
+        self._current_url = None
+        self._models: dict[str, list[int]] = {}
+        self._last_store_write = 0.0
+
+    # -- updates ----------------------------------------------------------
+
+    def begin_stage(self, stage: str, total: int) -> None:
+        with self._lock:
+            self._stage = stage
+            self._stages[stage]["total"] = total
+        self._emit(force=True)
+
+    def item_done(self, stage: str, url: str | None, ok: bool) -> None:
+        with self._lock:
+            self._stages[stage]["done" if ok else "failed"] += 1
+            if url:
+                self._current_url = url
+        self._emit()
+
+    def file_started(self, url: str | None) -> None:
+        with self._lock:
+            self._current_url = url
+        self._emit(store=False)
+
+    def model_result(self, model: str, ok: bool) -> None:
+        with self._lock:
+            counts = self._models.setdefault(model, [0, 0])
+            counts[0 if ok else 1] += 1
+        self._emit(store=False)
+
+    def finish(self) -> None:
+        with self._lock:
+            self._stage = "done"
+        self._emit(force=True)
+
+    # -- output -----------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            extract = self._stages["extract"]
+            return {
+                "stage": self._stage,
+                "stages": {s: dict(c) for s, c in self._stages.items()},
+                "current_url": self._current_url,
+                "models": {
+                    model: {
+                        "success": ok,
+                        "failure": bad,
+                        "success_rate": round(ok / (ok + bad), 3) if ok + bad else None,
+                    }
+                    for model, (ok, bad) in sorted(self._models.items())
+                },
+                # Legacy counter read by the polling UI
+                "progress": extract["done"] + extract["failed"],
+                "total": extract["total"],
+            }
+
+    def _store_write_due(self, force: bool) -> bool:
+        """Claim the next store write; at most one caller per interval wins."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_store_write < self.store_interval:
+                return False
+            self._last_store_write = now
+            return True
+
+    def _emit(self, force: bool = False, store: bool = True) -> None:
+        snap = self.snapshot()
+        if self.channel:
+            self.hub.publish(self.channel, snap)
+        if not store or self.job_store is None or self.job_id is None:
+            return
+        if not self._store_write_due(force):
+            return
+        # May raise (e.g. JobCancelled) — deliberately propagated to the run
+        self.job_store[self.job_id] = {"status": "running", "result": snap}
+
+
+_current: contextvars.ContextVar[HarvestProgress | None] = contextvars.ContextVar(
+    "harvest_progress", default=None,
+)
+
+
+@contextmanager
+def track(progress: HarvestProgress):
+    """Make *progress* the tracker seen by note_* calls in this context."""
+    token = _current.set(progress)
+    try:
+        yield progress
+    finally:
+        _current.reset(token)
+
+
+def note_file_started(url: str | None) -> None:
+    progress = _current.get()
+    if progress is not None:
+        progress.file_started(url)
+
+
+def note_model_result(model: str, ok: bool) -> None:
+    progress = _current.get()
+    if progress is not None:
+        progress.model_result(model, ok)
@@ -0,0 +1,183 @@
+"""Versioned prompt templates for the llm_extractor passes.
+
+Each pass (``description``, ``page_fields``, ``product_rows``) has one or
+more registered versions. ``get(name)`` returns the pinned version, or the
+newest one:
+
+    1   the original layout: a one-line system message, and every
+        instruction in the user message around the interpolated device
+        name and page text
+    2   a static prefix: all instructions in the system message, and only
+        the per-page values in the user message, page text last
+
+With version 2 every call of a pass starts with the same tokens. Ollama
+then reuses the evaluated prefix from its KV cache, and cloud providers
+can apply prompt caching. Ollama keeps one cache per parallel slot and
+picks the slot with the longest matching prefix. Give each pass a slot
+(``OLLAMA_NUM_PARALLEL`` of at least 2) so the page-fields and
+product-rows passes don't evict each other's prefix.
+
+``LLM_PROMPT_VERSIONS`` pins versions, e.g. ``page_fields:1,product_rows:1``.
+Replay logs are keyed by the rendered prompt, so pin version 1 to replay a
+log recorded before version 2. Other modules can add versions with
+``register``.
+"""
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    version: int
+    system: str
+    # str.format template over the per-call fields
+    user: str
+
+    def render(self, **fields) -> tuple[str, str]:
+        """(system message, user message) for one call."""
+        return self.system, self.user.format(**fields)
+
+    @property
+    def static_chars(self) -> int:
+        """Template length without the fields (for context sizing)."""
+        return len(self.system) + len(self.user)
+
+
+_templates: dict[str, dict[int, PromptTemplate]] = {}
+_pinned: dict[str, int] = {}
+
+
+def register(template: PromptTemplate) -> PromptTemplate:
+    versions = _templates.setdefault(template.name, {})
+    if template.version in versions:
+        raise ValueError(f"Prompt {template.name!r} version {template.version} is already registered")
+    versions[template.version] = template
+    return template
+
+
+def versions(name: str) -> list[int]:
+    return sorted(_templates.get(name, {}))
+
+
+def pin(name: str, version: int | None) -> None:
+    """Use *version* of *name* from now on; None goes back to the newest."""
+    if version is None:
+        _pinned.pop(name, None)
+    else:
+        _pinned[name] = version
+
+
+def get(name: str, version: int | None = None) -> PromptTemplate:
+    """*version* of template *name*, else the pinned version, else the newest."""
+    available = _templates.get(name)
+    if not available:
+        raise KeyError(f"No prompt template named {name!r}")
+    version = version or _pinned.get(name) or max(available)
+    if version not in available:
+        raise KeyError(f"Prompt {name!r} has no version {version} (registered: {sorted(available)})")
+    return available[version]
+
+
+def active_versions() -> dict[str, int]:
+    return {name: get(name).version for name in sorted(_templates)}
+
+
+def _pin_from_env() -> None:
+    for item in (os.getenv("LLM_PROMPT_VERSIONS") or "").split(","):
+        name, sep, version = item.partition(":")
+        if sep:
+            pin(name.strip(), int(version))
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _register_layouts(name: str, v1_system: str, intro: str, rules: str, context: str, body: str) -> None:
+    """Register version 1 (original layout) and version 2 (static prefix) of a pass.
+
+    *context* (may be empty) and *body* are str.format templates; *intro*
+    and *rules* are plain text.
+    """
+    head = f"{intro}\n\n{context}" if context else intro
+    register(PromptTemplate(name, 1, v1_system, f"{head}\n\n{_escape(rules)}\n\n{body}"))
+    register(PromptTemplate(name, 2, f"{intro}\n\n{rules}", f"{context}\n\n{body}" if context else body))
+
+
+_register_layouts(
+    "description",
+    v1_system="Extract only the requested field. Return valid JSON.",
+    intro="You are extracting a clinical device description for a medical device regulatory database (FDA GUDID).",
+    rules="""\
+Write a factual, clinical description of this device based on the page text below.
+- Focus on: what the device IS, what it DOES, what anatomy/condition it treats
+- Ignore: marketing claims, clinical trial results, ordering info, testimonials
+- Style: one sentence, clinical terminology, no brand superlatives
+- If the page does not contain enough info to write a clinical description, return null""",
+    context="Device: {device_name} by {manufacturer}, model {model_number}",
+    body="Page text:\n{visible_text}",
+)
+
+_register_layouts(
+    "page_fields",
+    v1_system="Extract medical device fields from the page. Return valid JSON.",
+    intro="You are extracting medical device data from a manufacturer's product page for the FDA GUDID database.",
+    rules="""\
+Extract these fields from the page text below. Return valid JSON.
+
+Rules:
+- device_name: The commercial product name / brand name (e.g., "IN.PACT ADMIRAL", "ZILVER PTX"). \
+NOT the manufacturer name. NOT a description or tagline.
+- manufacturer: The company that makes this device. Use the legal entity name if visible \
+(e.g., "Medtronic, Inc." not just "Medtronic").
+- description: One factual, clinical sentence describing what this device IS and what it DOES. \
+Focus on: device type, anatomy/condition treated, mechanism of action. \
+Ignore: marketing claims, clinical trial results, testimonials.
+- warning_text: Copy any warning, caution, or regulatory text verbatim from the page. \
+Include text about single-use, Rx only, sterility, contraindications. null if none found.
+- MRISafetyStatus: One of "MR Safe", "MR Conditional", "MR Unsafe", or null if not stated on the page.
+- deviceKit: true if this product is sold as a kit or system containing multiple distinct components \
+packaged together, false if it is a single standalone device, null if unclear.
+- environmentalConditions: An object with a "conditions" array of storage/handling condition strings \
+found on the page (e.g. {"conditions": ["Store between 15-30°C", "Keep away from humidity > 85%"]}). \
+null if storage conditions are not stated on the page.
+- indicationsForUse: Copy the "Indications for Use" section verbatim as free text. \
+Typically appears as a paragraph near the top of the page. null if not present.
+- contraindications: Copy the "Contraindications" section verbatim as free text. \
+null if not present.
+- deviceClass: FDA device class ("I", "II", or "III") if explicitly stated on the page. \
+null if not stated. Only return one of those three literal values.""",
+    context="",
+    body="Page text:\n{visible_text}",
+)
+
+_register_layouts(
+    "product_rows",
+    v1_system="Extract product rows from the table. Return valid JSON.",
+    intro="You are extracting individual product SKUs from a medical device ordering/specifications table.",
+    rules="""\
+For EACH distinct product row in the table below, extract:
+- model_number: The SKU, part number, catalog number, or model identifier \
+(e.g., "IPU04004013P", "1012528-20", "G38404"). This is an alphanumeric code, NOT a dimension.
+- catalog_number: A separate catalog/reference number if present and different from model_number. null otherwise.
+- diameter: Diameter with unit as a string (e.g., "8.0 mm"). null if not listed.
+- length: Length with unit as a string (e.g., "40.0 mm"). null if not listed.
+- width: Width with unit. null if not listed.
+- height: Height with unit. null if not listed.
+- weight: Weight with unit. null if not listed.
+- volume: Volume with unit. null if not listed.
+- pressure: Pressure with unit. null if not listed.
+
+Return a JSON object with a "products" array. Each element is one product row.
+If there is only one product (not a table), return an array with one element.
+Do NOT include rows where model_number is null or clearly a header/footer.""",
+    context="The device is: {device_name}",
+    body="Table/specs text:\n{table_text}",
+)
+
+_pin_from_env()
@@ -0,0 +1,149 @@
+"""Request scheduling for the cloud LLM providers (Groq, NVIDIA NIM).
+
+``_llm_request`` calls ``reserve(provider, model)`` before it sends a
+request. A non-zero answer means "not before this many seconds": the
+provider slot is released at once, and the chain moves on to the next
+model. When every model is deferred, ``_llm_request`` sleeps until the
+earliest one frees up, without holding any slot. There are two kinds of
+limit:
+
+    bucket   a token bucket per provider refilled at ``<PROVIDER>_RPM``
+             requests per minute (defaults: the free tiers, groq 30 and
+             nvidia 40), with bursts of up to a tenth of that
+    hold     per model, fed by ``observe`` from every response:
+             x-ratelimit-remaining-requests/-tokens of 0 hold the model
+             until x-ratelimit-reset-requests/-tokens; a 429 holds it for
+             its retry-after header, or the "try again in" hint of the
+             error message
+
+A hold longer than MAX_DEFER_SECONDS is a spent daily quota. ``observe``
+returns it so that the caller can disable the model until the reset,
+instead of waiting for it.
+"""
+import os
+import re
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROVIDERS = ("groq", "nvidia")
+DEFAULT_RPM = {"groq": 30, "nvidia": 40}
+MAX_DEFER_SECONDS = 60.0
+# Hold after a 429 that says nothing about when to retry
+_DEFAULT_HOLD_SECONDS = 5.0
+
+_DURATION_RE = re.compile(
+    r"^(?:(?P<h>\d+(?:\.\d+)?)h)?(?:(?P<m>\d+(?:\.\d+)?)m(?!s))?"
+    r"(?:(?P<s>\d+(?:\.\d+)?)s)?(?:(?P<ms>\d+(?:\.\d+)?)ms)?$"
+)
+_TRY_AGAIN_RE = re.compile(r"try again in ((?:\d+(?:\.\d+)?(?:h|ms|m|s))+)", re.IGNORECASE)
+
+
+def parse_duration(value) -> float | None:
+    """Seconds from a retry-after / x-ratelimit-reset-* value ("7.66s", "2m59.5s", "120ms", "30")."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    match = _DURATION_RE.match(text)
+    if not text or not match:
+        return None
+    parts = {k: float(v) for k, v in match.groupdict().items() if v}
+    return parts.get("h", 0) * 3600 + parts.get("m", 0) * 60 + parts.get("s", 0) + parts.get("ms", 0) / 1000
+
+
+class TokenBucket:
+    """``rate`` tokens per second, up to ``capacity`` banked."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Take a token and return 0, or return the seconds until one is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    def __init__(self, rpm: dict[str, float]):
+        self._buckets = {p: TokenBucket(r / 60, max(1.0, r / 10)) for p, r in rpm.items() if r > 0}
+        self._holds: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, provider: str, model: str) -> float:
+        """0 if *model* may be called now (a token is taken), else the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            held = self._holds.get(model, 0.0) - now
+            if held > 0:
+                return held
+            bucket = self._buckets.get(provider)
+            return bucket.take(now) if bucket else 0.0
+
+    def hold(self, model: str, seconds: float) -> None:
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._holds.get(model, 0.0):
+                self._holds[model] = until
+
+    def held_for(self, model: str) -> float:
+        with self._lock:
+            return max(0.0, self._holds.get(model, 0.0) - time.monotonic())
+
+    def observe(self, model: str, headers, status: int | None = None, message: str | None = None) -> float:
+        """Hold *model* as the response's rate-limit headers ask; returns the hold in seconds."""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        waits = []
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is not None and str(remaining).strip() in ("0", "0.0"):
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    waits.append(reset)
+        if status == 429:
+            retry_after = parse_duration(headers.get("retry-after"))
+            match = _TRY_AGAIN_RE.search(message or "")
+            hint = parse_duration(match.group(1)) if match else None
+            waits.append(retry_after or hint or _DEFAULT_HOLD_SECONDS)
+        wait = max(waits, default=0.0)
+        if wait:
+            self.hold(model, wait)
+        return wait
+
+
+def _rpm_from_env() -> dict[str, float]:
+    return {p: float(os.getenv(f"{p.upper()}_RPM") or DEFAULT_RPM[p]) for p in PROVIDERS}
+
+
+_limiter = RateLimiter(_rpm_from_env())
+
+
+def configure(rpm: dict[str, float] | None = None) -> None:
+    """Start over with fresh buckets and no holds (*rpm* per provider; default from the environment)."""
+    global _limiter
+    _limiter = RateLimiter(rpm or _rpm_from_env())
+
+
+def reserve(provider: str, model: str) -> float:
+    return _limiter.reserve(provider, model)
+
+
+def held_for(model: str) -> float:
+    return _limiter.held_for(model)
+
+
+def observe(model: str, headers, status: int | None = None, message: str | None = None) -> float:
+    return _limiter.observe(model, headers, status, message)
@@ -2,10 +2,21 @@
 
 Extracts GUDID-compatible fields from free-text warnings and precautions
 found on manufacturer pages. Only produces results when patterns are matched.
+
+The per-field pattern lists below are the source of truth; they are folded
+into one alternation regex with a named group per field so the text is
+scanned once, left to right. Free-text spans are bounded
+(``_MAX_SPAN`` chars, single line) so long verbatim IFU text cannot make
+a pattern backtrack quadratically.
 """
 
+import functools
 import re
 
+# Upper bound on the free text allowed between the anchor words of a
+# multi-part pattern ("Federal law ... restricts ... physician").
+_MAX_SPAN = 200
+
 _SINGLE_USE_PATTERNS = [
     re.compile(r"single[\s-]?use", re.IGNORECASE),
     re.compile(r"single\s+patient\s+use", re.IGNORECASE),
@@ -15,14 +26,18 @@ _SINGLE_USE_PATTERNS = [
 ]
 
 _RX_PATTERNS = [
-    re.compile(r"federal\s+(?:\(usa\)\s+)?law.*?restricts.*?(?:physician|practitioner)", re.IGNORECASE),
+    re.compile(
+        r"federal\s+(?:\(usa\)\s+)?law(?:(?!restricts).){0,%d}restricts.{0,%d}?(?:physician|practitioner)"
+        % (_MAX_SPAN, _MAX_SPAN),
+        re.IGNORECASE,
+    ),
     re.compile(r"\bprescription\s+(?:use\s+)?only\b", re.IGNORECASE),
     re.compile(r"\bRx\s+only\b", re.IGNORECASE),
 ]
 
 _STERILE_PATTERNS = [
     re.compile(r"supplied\s+sterile", re.IGNORECASE),
-    re.compile(r"contents\s+are\s*.*?\bsterile\b", re.IGNORECASE),
+    re.compile(r"contents\s+are\s*.{0,%d}?\bsterile\b" % _MAX_SPAN, re.IGNORECASE),
     re.compile(r"sterile[\s-]*packag", re.IGNORECASE),
     re.compile(r"provided\s+sterile", re.IGNORECASE),
 ]
@@ -51,6 +66,61 @@ _OTC_PATTERNS = [
     re.compile(r"without\s+a\s+prescription", re.IGNORECASE),
 ]
 
+# Field name -> patterns, in the order results were historically checked.
+_FIELD_PATTERNS = {
+    "singleUse": _SINGLE_USE_PATTERNS,
+    "rx": _RX_PATTERNS,
+    "deviceSterile": _STERILE_PATTERNS,
+    "labeledContainsNRL": _NRL_PRESENT_PATTERNS,
+    "labeledNoNRL": _NRL_ABSENT_PATTERNS,
+    "sterilizationPriorToUse": _STERILE_BEFORE_USE_PATTERNS,
+    "otc": _OTC_PATTERNS,
+}
+
+
+def _alternation(patterns: list[re.Pattern]) -> str:
+    """Join compiled patterns into one source string, keeping each one's case flag."""
+    return "|".join(
+        f"(?i:{p.pattern})" if p.flags & re.IGNORECASE else f"(?:{p.pattern})"
+        for p in patterns
+    )
+
+
+# Anchored per-field matchers, used to confirm every field at a hit position.
+_FIELD_RES = {
+    field: re.compile(_alternation(patterns))
+    for field, patterns in _FIELD_PATTERNS.items()
+}
+
+
+def _first_chars(patterns: list[re.Pattern]) -> set[str]:
+    """Literal first characters of *patterns* (both cases when IGNORECASE)."""
+    chars = set()
+    for p in patterns:
+        source = p.pattern[2:] if p.pattern.startswith(r"\b") else p.pattern
+        if not source[:1].isalpha():
+            raise ValueError(f"regulatory pattern must start with a letter: {p.pattern!r}")
+        first = source[0]
+        chars.update({first.lower(), first.upper()} if p.flags & re.IGNORECASE else {first})
+    return chars
+
+
+@functools.lru_cache(maxsize=2 ** len(_FIELD_PATTERNS))
+def _scanner(fields: frozenset[str]) -> re.Pattern:
+    """One named-group alternation over the still-unresolved *fields*.
+
+    A leading lookahead on the alternatives' first letters lets the regex
+    engine skip most positions without trying every branch.
+    """
+    selected = [field for field in _FIELD_PATTERNS if field in fields]
+    first = set().union(*(_first_chars(_FIELD_PATTERNS[f]) for f in selected))
+    return re.compile(
+        f"(?=[{''.join(sorted(first))}])(?:"
+        + "|".join(f"(?P<{field}>{_alternation(_FIELD_PATTERNS[field])})" for field in selected)
+        + ")"
+    )
+
+
 _PREMARKET_RE = re.compile(r"\b(K\d{6,7}|P\d{6}|DEN\d{6})\b")
 _REG_KEYWORDS = re.compile(
     r"510\s*\(\s*k\s*\)|premarket|\bPMA\b|FDA\s+clearance|K[- ]number|cleared\s+by\s+FDA",
@@ -63,6 +133,8 @@ def extract_premarket_submissions(text: str | None) -> list[str] | None:
         return None
     found = set()
     for match in _PREMARKET_RE.finditer(text):
+        if match.group(1) in found:
+            continue
         start, end = match.span()
         window = text[max(0, start - 40):min(len(text), end + 40)]
         if _REG_KEYWORDS.search(window):
@@ -79,41 +151,23 @@ def parse_regulatory_from_text(warning_text: str | None) -> dict:
     if not warning_text or not warning_text.strip():
         return {}
 
-    result = {}
-
-    for pattern in _SINGLE_USE_PATTERNS:
-        if pattern.search(warning_text):
-            result["singleUse"] = True
-            break
-
-    for pattern in _RX_PATTERNS:
-        if pattern.search(warning_text):
-            result["rx"] = True
-            break
-
-    for pattern in _STERILE_PATTERNS:
-        if pattern.search(warning_text):
-            result["deviceSterile"] = True
-            break
-
-    for pattern in _NRL_PRESENT_PATTERNS:
-        if pattern.search(warning_text):
-            result["labeledContainsNRL"] = True
-            break
-
-    for pattern in _NRL_ABSENT_PATTERNS:
-        if pattern.search(warning_text):
-            result["labeledNoNRL"] = True
-            break
-
-    for pattern in _STERILE_BEFORE_USE_PATTERNS:
-        if pattern.search(warning_text):
-            result["sterilizationPriorToUse"] = True
-            break
-
-    for pattern in _OTC_PATTERNS:
-        if pattern.search(warning_text):
-            result["otc"] = True
+    found = set()
+    remaining = frozenset(_FIELD_PATTERNS)
+    pos = 0
+    while remaining:
+        match = _scanner(remaining).search(warning_text, pos)
+        if match is None:
             break
-
-    return result
+        # Several fields may match at the same position; the alternation
+        # only reports the first, so confirm the rest with anchored matches.
+        start = match.start()
+        hits = {match.lastgroup}
+        hits.update(
+            field for field in remaining
+            if field != match.lastgroup and _FIELD_RES[field].match(warning_text, start)
+        )
+        found |= hits
+        remaining = remaining - hits
+        pos = start + 1
+
+    return {field: True for field in _FIELD_PATTERNS if field in found}
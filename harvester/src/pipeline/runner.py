@@ -13,6 +13,9 @@ Usage:
 
     # Extract + DB
     python harvester/src/pipeline/runner.py --db --overwrite --validate
+
+    # Extract pages straight out of a tar / zip / WARC archive
+    python harvester/src/pipeline/runner.py --archive pages.warc.gz --db --validate
 """
 
 import argparse
@@ -24,6 +27,7 @@ import os
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable, Iterable
 from urllib.parse import urlparse
 
 # Ensure harvester/src is on sys.path so imports resolve the same way pytest does.
@@ -50,6 +54,7 @@ from pipeline.emitter import package_gudid_record, write_record_json
 from pipeline.dimension_parser import parse_dimensions_from_specs
 from pipeline.regulatory_parser import parse_regulatory_from_text
 from normalizers.booleans import normalize_mri_status
+from pipeline.tracing import record_stages, span, summarize_timings
 
 logger = logging.getLogger(__name__)
 
@@ -342,33 +347,40 @@ def _process_single_ollama(
     html_path: str,
     source_url: str | None = None,
     harvest_run_id: str | None = None,
+    raw_html: str | None = None,
 ) -> list[dict]:
     """Run Ollama-based extraction on one HTML file (no adapter needed).
 
+    *raw_html* supplies the page for in-memory inputs (archive members);
+    *html_path* then only names it.
+
     Returns a list of packaged GUDID record dicts (one per product/SKU found).
     Returns empty list if extraction fails. Never raises.
     """
-    try:
-        with open(html_path, "r", encoding="utf-8") as f:
-            raw_html = f.read()
-    except Exception as exc:
-        logger.error("_process_single_ollama: cannot read %s: %s", html_path, exc)
-        return []
+    if raw_html is None:
+        try:
+            with span("extract.read"), open(html_path, "r", encoding="utf-8") as f:
+                raw_html = f.read()
+        except Exception as exc:
+            logger.error("_process_single_ollama: cannot read %s: %s", html_path, exc)
+            return []
 
     try:
         from pipeline.llm_extractor import extract_all_fields, get_last_model
 
-        sanitized = sanitize_html(raw_html)
-        parsed = parse_html(sanitized)
-
-        visible_text = parsed.get_text(separator=" ", strip=True)
+        with span("extract.sanitize"):
+            sanitized = sanitize_html(raw_html)
+        with span("extract.parse"):
+            parsed = parse_html(sanitized)
+            visible_text = parsed.get_text(separator=" ", strip=True)
 
         # Find the best product table for Pass 2
-        tables = parsed.find_all("table")
-        table_text = None
-        if tables:
-            best = _select_best_table(tables)
-            table_text = best.get_text(separator="\t")
+        with span("extract.table_select"):
+            tables = parsed.find_all("table")
+            table_text = None
+            if tables:
+                best = _select_best_table(tables)
+                table_text = best.get_text(separator="\t")
 
         raw_fields_list = extract_all_fields(visible_text, table_text)
         if not raw_fields_list:
@@ -384,41 +396,44 @@ def _process_single_ollama(
         records = []
 
         for raw_fields in raw_fields_list:
-            normalized = normalize_record(raw_fields, pseudo_adapter)
-
-            # Parse regulatory fields from warning_text
-            warning_text = normalized.get("warning_text")
-            if warning_text:
-                regulatory = parse_regulatory_from_text(warning_text)
-                for field, value in regulatory.items():
-                    if field not in normalized:
-                        normalized[field] = value
-
-            # Normalize MRI safety status
-            mri_raw = normalized.get("MRISafetyStatus")
-            if mri_raw and isinstance(mri_raw, str):
-                normalized["MRISafetyStatus"] = normalize_mri_status(mri_raw)
+            with span("normalize"):
+                normalized = normalize_record(raw_fields, pseudo_adapter)
+
+                # Parse regulatory fields from warning_text
+                warning_text = normalized.get("warning_text")
+                if warning_text:
+                    regulatory = parse_regulatory_from_text(warning_text)
+                    for field, value in regulatory.items():
+                        if field not in normalized:
+                            normalized[field] = value
+
+                # Normalize MRI safety status
+                mri_raw = normalized.get("MRISafetyStatus")
+                if mri_raw and isinstance(mri_raw, str):
+                    normalized["MRISafetyStatus"] = normalize_mri_status(mri_raw)
 
             normalized["source_url"] = source_url
             if not normalized.get("manufacturer") or normalized["manufacturer"] is None:
                 normalized["manufacturer"] = "unknown"
 
-            is_valid, issues = validate_record(normalized)
+            with span("validate"):
+                is_valid, issues = validate_record(normalized)
             if not is_valid:
                 logger.warning("_process_single_ollama: record rejected: %s", issues)
                 continue
 
             last_model = get_last_model() or "unknown"
-            record = package_gudid_record(
-                normalized_record=normalized,
-                raw_html=raw_html,
-                source_url=source_url,
-                adapter_version=last_model,
-                harvest_run_id=harvest_run_id,
-                validation_issues=issues,
-                extraction_method="llm",
-                extraction_model=last_model,
-            )
+            with span("package"):
+                record = package_gudid_record(
+                    normalized_record=normalized,
+                    raw_html=raw_html,
+                    source_url=source_url,
+                    adapter_version=last_model,
+                    harvest_run_id=harvest_run_id,
+                    validation_issues=issues,
+                    extraction_method="llm",
+                    extraction_model=last_model,
+                )
             records.append(record)
 
         return records
@@ -436,7 +451,7 @@ def process_batch(
     """Process all HTML files in a directory using parallel LLM extraction.
 
     Returns a summary dict with keys: processed, succeeded, failed,
-    ollama_extracted, output_dir, files.
+    ollama_extracted, output_dir, files, timings (per-stage p50/p95).
     """
     # Lazy import: parallel_batch lazy-imports _process_single_ollama
     # from this module, so the two-way dependency is kept at call time only.
@@ -446,33 +461,46 @@ def process_batch(
         glob.glob(os.path.join(input_dir, "*.html"))
         + glob.glob(os.path.join(input_dir, "*.htm"))
     )
+    if not html_files:
+        return write_batch_results([], output_dir)
+
+    results = process_html_files_parallel(
+        html_files,
+        harvest_run_id=harvest_run_id or "",
+    )
+    return write_batch_results(results, output_dir)
+
+
+def write_batch_results(results: Iterable, output_dir: str) -> dict:
+    """Write each FileExtractionResult's records as JSON, as it arrives.
 
+    Shared by process_batch and archive_ingest.ingest_archive; returns
+    their summary dict (processed, succeeded, failed, ollama_extracted,
+    output_dir, files, timings).
+    """
     summary = {
-        "processed": len(html_files),
+        "processed": 0,
         "succeeded": 0,
         "failed": 0,
         "ollama_extracted": 0,
         "output_dir": output_dir,
         "files": [],
+        "timings": {},
     }
-
-    if not html_files:
-        return summary
-
-    results = process_html_files_parallel(
-        html_files,
-        harvest_run_id=harvest_run_id or "",
-    )
-
+    per_file = []
     for r in results:
-        if r.records:
+        summary["processed"] += 1
+        with record_stages() as write_timings:
             for record in r.records:
                 summary["files"].append(write_record_json(record, output_dir))
+        per_file.append({**r.timings, **write_timings.as_dict()})
+        if r.records:
             summary["succeeded"] += len(r.records)
             summary["ollama_extracted"] += len(r.records)
         else:
             summary["failed"] += 1
 
+    summary["timings"] = summarize_timings(per_file)
     return summary
 
 
@@ -490,12 +518,17 @@ def _parse_urls(urls_arg: str) -> list[str]:
     return [u.strip() for u in urls_arg.split(",") if u.strip()]
 
 
-def _scrape_urls_with_meta(urls: list[str], output_dir: str) -> list[dict]:
+def _scrape_urls_with_meta(
+    urls: list[str],
+    output_dir: str,
+    on_fetched: Callable[[str, bool], None] | None = None,
+) -> list[dict]:
     """Scrape URLs, return per-URL metadata (preserves input order and failures).
 
     Each entry is a dict: {url, final_url, path, error}. For successful
     URLs, final_url and path are set and error is None. For failed URLs,
     final_url and path are None and error contains the failure reason.
+    ``on_fetched(url, ok)`` is called as each fetch finishes (progress).
     """
     from web_scraper.scraper import (
         BrowserEngine, safe_filename_from_url, is_pdf_url, dedupe_keep_order,
@@ -521,7 +554,13 @@ def _scrape_urls_with_meta(urls: list[str], output_dir: str) -> list[dict]:
             ),
             headless=True,
         ) as engine:
-            return await asyncio.gather(*(engine.fetch(u) for u in urls))
+            async def _fetch(u):
+                r = await engine.fetch(u)
+                if on_fetched:
+                    on_fetched(u, bool(r.ok and r.html))
+                return r
+
+            return await asyncio.gather(*(_fetch(u) for u in urls))
 
     results = asyncio.run(_run())
     meta: list[dict] = []
@@ -564,6 +603,7 @@ def scrape_urls(urls: list[str], output_dir: str) -> list[str]:
 
 def write_records_to_db(json_paths: list[str], overwrite: bool = False) -> int:
     """Load JSON files and insert into MongoDB devices collection."""
+    from database.dashboard_stats import rebuild_stats, record_devices_inserted
     from database.db_connection import get_db
 
     try:
@@ -577,20 +617,51 @@ def write_records_to_db(json_paths: list[str], overwrite: bool = False) -> int:
         db["devices"].drop()
         logger.info("Dropped devices collection (--overwrite)")
 
-    count = 0
+    inserted = []
     for path in json_paths:
         try:
             with open(path, "r", encoding="utf-8") as f:
                 record = json.load(f)
             db["devices"].insert_one(record)
-            count += 1
+            inserted.append(record)
         except Exception as e:
             logger.warning("DB insert failed for %s: %s", path, e)
 
+    try:
+        if overwrite:
+            rebuild_stats(db)
+        else:
+            record_devices_inserted(db, inserted)
+    except Exception as e:
+        logger.warning("Dashboard stats update failed: %s", e)
+
+    count = len(inserted)
     logger.info("Inserted %d/%d records into MongoDB (overwrite=%s).", count, len(json_paths), overwrite)
     return count
 
 
+def resume_harvest(run_id: str) -> dict:
+    """Resume an interrupted checkpointed batch harvest by its harvest_run_id.
+
+    URLs that already reached ``persisted`` are skipped; the rest pick up
+    from their last completed stage (scrape, extraction or DB insert).
+    """
+    from orchestrator import resume_harvest_batch
+    return resume_harvest_batch(run_id)
+
+
+def _print_harvest_summary(summary: dict) -> None:
+    print(f"\n{'='*40}")
+    print(f"  Run ID:           {summary['run_id']}{' (resumed)' if summary.get('resumed') else ''}")
+    print(f"  URLs:             {summary['total']}")
+    print(f"  Succeeded:        {summary['succeeded']}")
+    print(f"  Failed:           {summary['failed']}")
+    print(f"  Incomplete:       {summary['incomplete']}")
+    print(f"{'='*40}")
+    if summary["incomplete"]:
+        print(f"Resume with: python harvester/src/pipeline/runner.py --resume {summary['run_id']}")
+
+
 def run_gudid_validation(run_id: str | None = None, overwrite: bool = False) -> dict:
     """Run GUDID validation on devices in DB. Returns result dict."""
     from orchestrator import run_validation
@@ -607,6 +678,8 @@ def main():
     parser.add_argument("--input", dest="input_file", help="Single HTML file to process")
     parser.add_argument("--input-dir", dest="input_dir", default=str(DEFAULT_INPUT_DIR),
                         help="Directory of HTML files to process (default: web-scraper/out_html)")
+    parser.add_argument("--archive",
+                        help="tar/zip/WARC archive of HTML pages to process without extracting to disk")
     parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR),
                         help="Output directory for JSON records (default: harvester/output)")
     parser.add_argument("--adapter", help="Path to a YAML adapter config (CSS extraction override)")
@@ -621,6 +694,10 @@ def main():
     parser.add_argument("--validate", action="store_true", help="Run GUDID validation after extraction")
     parser.add_argument("--no-validate", action="store_true", dest="no_validate",
                         help="Skip GUDID validation (only relevant with --urls)")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="With --urls: run as a checkpointed batch that can be resumed after a crash")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Resume an interrupted checkpointed batch harvest")
     args = parser.parse_args()
 
     logging.basicConfig(
@@ -636,6 +713,22 @@ def main():
     run_id = args.run_id or f"HR-LOCAL-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}"
     output_files = []
 
+    # Checkpointed batch: scrape → extract → DB per URL, resumable by run ID
+    if args.resume or (args.urls and args.checkpoint):
+        if args.resume:
+            summary = resume_harvest(args.resume)
+        else:
+            from orchestrator import run_harvest_batch
+            urls = _parse_urls(args.urls)
+            if not urls:
+                print("No URLs found in --urls argument.")
+                sys.exit(1)
+            summary = run_harvest_batch(urls, run_id=run_id)
+        _print_harvest_summary(summary)
+        if not args.no_validate:
+            _run_and_print_validation(summary["run_id"])
+        return
+
     # Step 1: Scrape (if --urls provided)
     if args.urls:
         urls = _parse_urls(args.urls)
@@ -667,11 +760,17 @@ def main():
                 print(f"Record written to: {out_path}")
     else:
         # Batch mode
-        summary = process_batch(
-            args.input_dir,
-            output_dir=args.output_dir,
-            harvest_run_id=run_id,
-        )
+        from pipeline.llm_extractor import warm_local_model
+        warm_local_model()
+        if args.archive:
+            from pipeline.archive_ingest import ingest_archive
+            summary = ingest_archive(args.archive, output_dir=args.output_dir, harvest_run_id=run_id)
+        else:
+            summary = process_batch(
+                args.input_dir,
+                output_dir=args.output_dir,
+                harvest_run_id=run_id,
+            )
         output_files = summary.get("files", [])
         print(f"\n{'='*40}")
         print(f"  Processed:        {summary['processed']}")
@@ -687,16 +786,20 @@ def main():
 
     # Step 4: GUDID validation
     if do_validate:
-        print("\nRunning GUDID validation...")
-        val = run_gudid_validation(run_id=run_id, overwrite=args.overwrite)
-        if val.get("success"):
-            print(f"  Total:            {val['total']}")
-            print(f"  Full matches:     {val['full_matches']}")
-            print(f"  Partial matches:  {val['partial_matches']}")
-            print(f"  Mismatches:       {val['mismatches']}")
-            print(f"  Not found:        {val['not_found']}")
-        else:
-            print(f"  Validation error: {val.get('error')}")
+        _run_and_print_validation(run_id, overwrite=args.overwrite)
+
+
+def _run_and_print_validation(run_id: str, overwrite: bool = False) -> None:
+    print("\nRunning GUDID validation...")
+    val = run_gudid_validation(run_id=run_id, overwrite=overwrite)
+    if val.get("success"):
+        print(f"  Total:            {val['total']}")
+        print(f"  Full matches:     {val['full_matches']}")
+        print(f"  Partial matches:  {val['partial_matches']}")
+        print(f"  Mismatches:       {val['mismatches']}")
+        print(f"  Not found:        {val['not_found']}")
+    else:
+        print(f"  Validation error: {val.get('error')}")
 
 
 if __name__ == "__main__":
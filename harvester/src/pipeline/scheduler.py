@@ -0,0 +1,204 @@
+"""Priority lanes for shared harvest resources: LLM chains and browser fetches.
+
+Work runs in one of two classes, carried in a context variable:
+
+    interactive  a single-URL harvest an admin is waiting on
+                 (``with work_class(INTERACTIVE):`` in the harvest_single job)
+    bulk         everything else: batches, resumes, CLI runs, remote workers
+
+A ``PriorityScheduler`` admits up to ``bulk_slots`` bulk holders at once,
+plus ``reserved`` slots (INTERACTIVE_RESERVED_SLOTS, default 1) that only
+interactive work may use. A batch keeps the concurrency it had, and a
+single harvest started during one still finds a free slot.
+
+When a slot frees up, interactive waiters go first. A bulk waiter that
+has queued for longer than BULK_AGING_SECONDS moves into the interactive
+ordering, so a steady stream of single harvests cannot starve a batch.
+It still cannot take a reserved slot.
+
+``llm_extractor._llm_request`` holds an "llm" slot for its whole chain
+walk. ``BrowserEngine.fetch`` holds a "scrape" slot per page, shared by
+every engine in the process; ``slot_async`` waits without blocking the
+event loop. Queue depth and holders per class are exported as
+``fivos_scheduler_*`` metrics.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from dotenv import load_dotenv
+from pipeline import metrics
+
+load_dotenv()
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+CLASSES = (INTERACTIVE, BULK)
+
+INTERACTIVE_RESERVED_SLOTS = int(os.getenv("INTERACTIVE_RESERVED_SLOTS") or 1)
+BULK_AGING_SECONDS = float(os.getenv("BULK_AGING_SECONDS") or 30)
+
+_work_class: contextvars.ContextVar[str] = contextvars.ContextVar("work_class", default=BULK)
+
+
+@contextmanager
+def work_class(name: str):
+    """Run the enclosed work (and threads started with a copy of this context) in class *name*."""
+    if name not in CLASSES:
+        raise ValueError(f"unknown work class {name!r}")
+    token = _work_class.set(name)
+    try:
+        yield
+    finally:
+        _work_class.reset(token)
+
+
+def current_class() -> str:
+    return _work_class.get()
+
+
+class _Waiter:
+    __slots__ = ("cls", "enqueued", "granted", "notify")
+
+    def __init__(self, cls: str, notify):
+        self.cls = cls
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.notify = notify
+
+
+class PriorityScheduler:
+    """Slots for *bulk_slots* bulk holders, plus *reserved* for interactive work only."""
+
+    def __init__(self, name: str, bulk_slots: int, reserved: int | None = None,
+                 aging_seconds: float | None = None):
+        self.name = name
+        self.bulk_slots = max(1, bulk_slots)
+        self.reserved = INTERACTIVE_RESERVED_SLOTS if reserved is None else max(0, reserved)
+        self.aging_seconds = BULK_AGING_SECONDS if aging_seconds is None else aging_seconds
+        self._active = {cls: 0 for cls in CLASSES}
+        self._waiters: list[_Waiter] = []
+        self._lock = threading.Lock()
+        _schedulers[name] = self
+
+    @property
+    def capacity(self) -> int:
+        return self.bulk_slots + self.reserved
+
+    def queue_depth(self) -> dict[str, int]:
+        with self._lock:
+            return {cls: sum(1 for w in self._waiters if w.cls == cls) for cls in CLASSES}
+
+    def active(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._active)
+
+    def _eligible(self, cls: str) -> bool:
+        if sum(self._active.values()) >= self.capacity:
+            return False
+        return cls == INTERACTIVE or self._active[BULK] < self.bulk_slots
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiters in priority order (caller holds the lock)."""
+        now = time.monotonic()
+
+        def priority(waiter):
+            urgent = waiter.cls == INTERACTIVE or now - waiter.enqueued >= self.aging_seconds
+            return not urgent, waiter.enqueued
+
+        for waiter in sorted(self._waiters, key=priority):
+            if not self._eligible(waiter.cls):
+                continue
+            self._waiters.remove(waiter)
+            self._active[waiter.cls] += 1
+            waiter.granted = True
+            metrics.SCHEDULER_WAIT.observe(now - waiter.enqueued, resource=self.name, work_class=waiter.cls)
+            waiter.notify()
+
+    def _enqueue(self, cls: str, notify) -> _Waiter:
+        waiter = _Waiter(cls, notify)
+        with self._lock:
+            self._waiters.append(waiter)
+            self._dispatch()
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Withdraw *waiter*; a slot granted in the meantime is handed on."""
+        with self._lock:
+            if waiter.granted:
+                self._active[waiter.cls] -= 1
+            else:
+                self._waiters.remove(waiter)
+            self._dispatch()
+
+    def acquire(self, cls: str | None = None, timeout: float | None = None) -> bool:
+        """Wait for a slot for *cls* (default: the current work class); False on timeout."""
+        event = threading.Event()
+        waiter = self._enqueue(cls or current_class(), event.set)
+        if event.wait(timeout):
+            return True
+        with self._lock:
+            if waiter.granted:  # granted as the wait timed out
+                return True
+            self._waiters.remove(waiter)
+        return False
+
+    async def acquire_async(self, cls: str | None = None) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._enqueue(cls or current_class(), notify)
+        try:
+            await future
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def release(self, cls: str) -> None:
+        with self._lock:
+            self._active[cls] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, cls: str | None = None):
+        cls = cls or current_class()
+        self.acquire(cls)
+        try:
+            yield
+        finally:
+            self.release(cls)
+
+    @asynccontextmanager
+    async def slot_async(self, cls: str | None = None):
+        cls = cls or current_class()
+        await self.acquire_async(cls)
+        try:
+            yield
+        finally:
+            self.release(cls)
+
+
+_schedulers: dict[str, PriorityScheduler] = {}
+
+
+def queue_depths() -> dict[str, dict[str, int]]:
+    """Waiters per resource and class, e.g. {"llm": {"interactive": 0, "bulk": 3}}."""
+    return {name: s.queue_depth() for name, s in list(_schedulers.items())}
+
+
+metrics.gauge_callback(
+    "fivos_scheduler_queue_depth", "Work waiting for a scheduler slot, by resource and class.",
+    lambda: {(name, cls): n for name, depth in queue_depths().items() for cls, n in depth.items()},
+    ("resource", "work_class"),
+)
+metrics.gauge_callback(
+    "fivos_scheduler_active", "Scheduler slots held, by resource and class.",
+    lambda: {(name, cls): n for name, s in list(_schedulers.items()) for cls, n in s.active().items()},
+    ("resource", "work_class"),
+)
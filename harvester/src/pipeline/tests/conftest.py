@@ -0,0 +1,20 @@
+"""Shared fixtures for the pipeline tests."""
+import pytest
+
+from pipeline import ollama_pool
+
+
+@pytest.fixture(autouse=True)
+def _fresh_ollama_pool():
+    """A test that reaches for a real Ollama takes its endpoint out of rotation; start each test with it back."""
+    ollama_pool.configure()
+    yield
+
+
+@pytest.fixture
+def saturated_ollama():
+    """Every Ollama endpoint slot held, as if other pages were mid-extraction."""
+    held = [ollama_pool.acquire() for _ in range(ollama_pool.capacity())]
+    yield
+    for endpoint in held:
+        ollama_pool.release(endpoint)
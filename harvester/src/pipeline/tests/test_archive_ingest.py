@@ -0,0 +1,211 @@
+"""Archive ingest: tar/zip/WARC readers and bounded parallel extraction.
+
+_process_single_ollama is mocked; archives are built in tmp_path.
+"""
+import gzip
+import io
+import tarfile
+import threading
+import time
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from pipeline import archive_ingest
+from pipeline.archive_ingest import archive_kind, ingest_archive, iter_archive_pages
+from pipeline.parallel_batch import HtmlPage, iter_html_pages_parallel
+
+PAGE = "<html><body><h1>Stent</h1></body></html>"
+
+
+def _warc_record(warc_type: str, uri: str, block: bytes, content_type: str) -> bytes:
+    head = (
+        "WARC/1.0\r\n"
+        f"WARC-Type: {warc_type}\r\n"
+        f"WARC-Target-URI: {uri}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(block)}\r\n"
+        "\r\n"
+    ).encode()
+    return head + block + b"\r\n\r\n"
+
+
+def _http(status: int, body: bytes, *headers: str) -> bytes:
+    head = "\r\n".join([f"HTTP/1.1 {status} X", *headers]) + "\r\n\r\n"
+    return head.encode() + body
+
+
+def _write_warc(path, records, compress=False):
+    data = b"".join(records)
+    if compress:
+        # One gzip member per record, as WARC writers produce
+        data = b"".join(gzip.compress(r) for r in records)
+    path.write_bytes(data)
+    return str(path)
+
+
+class TestArchiveKind:
+    @pytest.mark.parametrize("name,kind", [
+        ("a.warc", "warc"), ("a.WARC.gz", "warc"), ("a.zip", "zip"),
+        ("a.tar", "tar"), ("a.tar.gz", "tar"), ("a.tgz", "tar"),
+    ])
+    def test_detects_by_suffix(self, name, kind):
+        assert archive_kind(name) == kind
+
+    def test_rejects_unknown(self):
+        with pytest.raises(ValueError):
+            archive_kind("pages.rar")
+
+
+class TestReaders:
+    def test_tar_streams_html_members_only(self, tmp_path):
+        path = tmp_path / "pages.tar.gz"
+        with tarfile.open(path, "w:gz") as tar:
+            for name, data in [("out/medtronic.com__stent__ab12.html", PAGE),
+                               ("out/notes.txt", "skip"), ("out/b.htm", "<p>b</p>")]:
+                info = tarfile.TarInfo(name)
+                info.size = len(data.encode())
+                tar.addfile(info, io.BytesIO(data.encode()))
+
+        pages = list(iter_archive_pages(str(path)))
+
+        assert [p.name for p in pages] == ["medtronic.com__stent__ab12.html", "b.htm"]
+        assert pages[0].html == PAGE
+        assert pages[0].source_url is None
+
+    def test_zip_members(self, tmp_path):
+        path = tmp_path / "pages.zip"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("a.html", PAGE)
+            zf.writestr("dir/", "")
+            zf.writestr("img.png", b"\x89PNG")
+        assert [p.name for p in iter_archive_pages(str(path))] == ["a.html"]
+
+    def test_oversized_members_are_skipped(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(archive_ingest, "MAX_PAGE_BYTES", 10)
+        path = tmp_path / "pages.zip"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("big.html", PAGE)
+        assert list(iter_archive_pages(str(path))) == []
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_warc_source_url_from_headers(self, tmp_path, compress):
+        gz_body = gzip.compress(PAGE.encode())
+        records = [
+            _warc_record("warcinfo", "", b"software: test", "application/warc-fields"),
+            _warc_record("request", "https://a.com/p", b"GET /p HTTP/1.1\r\n\r\n", "application/http"),
+            _warc_record("response", "https://www.medtronic.com/stent",
+                         _http(200, gz_body, "Content-Type: text/html; charset=utf-8",
+                               "Content-Encoding: gzip"),
+                         "application/http; msgtype=response"),
+            _warc_record("response", "https://a.com/missing",
+                         _http(404, b"<html>404</html>", "Content-Type: text/html"),
+                         "application/http; msgtype=response"),
+            _warc_record("response", "https://a.com/logo.png",
+                         _http(200, b"\x89PNG", "Content-Type: image/png"),
+                         "application/http; msgtype=response"),
+            _warc_record("response", "https://b.com/chunked",
+                         _http(200, b"5\r\n<p>hi\r\n4\r\n</p>\r\n0\r\n\r\n",
+                               "Content-Type: text/html", "Transfer-Encoding: chunked"),
+                         "application/http; msgtype=response"),
+            _warc_record("resource", "https://c.com/saved", "<p>é</p>".encode("latin-1"),
+                         "text/html; charset=latin-1"),
+        ]
+        name = "pages.warc.gz" if compress else "pages.warc"
+        pages = list(iter_archive_pages(_write_warc(tmp_path / name, records, compress)))
+
+        assert [p.source_url for p in pages] == [
+            "https://www.medtronic.com/stent", "https://b.com/chunked", "https://c.com/saved"]
+        assert pages[0].html == PAGE
+        assert pages[1].html == "<p>hi</p>"
+        assert pages[2].html == "<p>é</p>"
+
+    def test_warc_garbage_raises(self, tmp_path):
+        path = tmp_path / "bad.warc"
+        path.write_bytes(b"not a warc\r\n")
+        with pytest.raises(ValueError):
+            list(iter_archive_pages(str(path)))
+
+
+class TestIterHtmlPagesParallel:
+    def test_pending_pages_are_bounded(self):
+        pulled = []
+        in_flight = []
+        lock = threading.Lock()
+
+        def pages():
+            for i in range(20):
+                pulled.append(i)
+                yield HtmlPage(name=f"p{i}.html", source_url=f"https://x.com/{i}", html=PAGE)
+
+        def fake_worker(path, source_url=None, harvest_run_id=None, raw_html=None):
+            time.sleep(0.005)
+            return [{"source": source_url, "html": raw_html}]
+
+        with patch("pipeline.runner._process_single_ollama", side_effect=fake_worker), \
+             patch("pipeline.llm_extractor.EXTRACT_WORKERS", 2):
+            for result in iter_html_pages_parallel(pages(), harvest_run_id="HR-1", max_pending=3):
+                with lock:
+                    # Pages pulled from the stream but not yet yielded back
+                    in_flight.append(len(pulled) - (len(in_flight) + 1))
+                assert result.records[0]["html"] == PAGE
+
+        assert len(in_flight) == 20
+        assert max(in_flight) <= 3
+
+    def test_worker_errors_become_results(self):
+        def fake_worker(path, source_url=None, harvest_run_id=None, raw_html=None):
+            raise RuntimeError("boom")
+
+        with patch("pipeline.runner._process_single_ollama", side_effect=fake_worker):
+            results = list(iter_html_pages_parallel(
+                [HtmlPage(name="a.html", source_url=None, html=PAGE)], harvest_run_id="HR-1"))
+
+        assert results[0].error == "boom"
+        assert results[0].records == []
+
+
+class TestIngestArchive:
+    def test_writes_records_and_summarizes(self, tmp_path):
+        path = tmp_path / "pages.zip"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("a.com__p__1.html", PAGE)
+            zf.writestr("b.com__p__2.html", "<p>empty</p>")
+        seen = {}
+
+        def fake_worker(path, source_url=None, harvest_run_id=None, raw_html=None):
+            seen[path] = (source_url, harvest_run_id)
+            return [{"brandName": "Stent"}] if "Stent" in raw_html else []
+
+        with patch("pipeline.runner._process_single_ollama", side_effect=fake_worker), \
+             patch("pipeline.runner.write_record_json", return_value="out/a.json") as write:
+            summary = ingest_archive(str(path), output_dir="out", harvest_run_id="HR-9")
+
+        assert summary["processed"] == 2
+        assert summary["succeeded"] == 1
+        assert summary["failed"] == 1
+        assert summary["files"] == ["out/a.json"]
+        write.assert_called_once_with({"brandName": "Stent"}, "out")
+        assert seen["a.com__p__1.html"] == (None, "HR-9")
+
+    def test_real_worker_extracts_members_in_memory(self, tmp_path):
+        """Only the LLM call is mocked: members reach _process_single_ollama as raw_html."""
+        path = tmp_path / "pages.tar"
+        body = PAGE.encode()
+        with tarfile.open(path, "w") as tf:
+            info = tarfile.TarInfo("cookmedical.com__zilver__1.html")
+            info.size = len(body)
+            tf.addfile(info, io.BytesIO(body))
+        fields = {"device_name": "Zilver PTX", "manufacturer": "Cook Medical", "model_number": "ZISV6-35"}
+
+        with patch("pipeline.llm_extractor.extract_all_fields", return_value=[fields]) as extract, \
+             patch("pipeline.runner.write_record_json", return_value="out/a.json") as write:
+            summary = ingest_archive(str(path), output_dir="out", harvest_run_id="HR-9")
+
+        assert summary["failed"] == 0, summary
+        assert summary["succeeded"] == 1
+        assert extract.call_args.args[0] == "Stent"
+        record = write.call_args.args[0]
+        assert record["brandName"] == "Zilver PTX"
+        assert record["_harvest"]["harvest_run_id"] == "HR-9"
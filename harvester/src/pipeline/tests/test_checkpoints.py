@@ -0,0 +1,223 @@
+"""Checkpoint store tests (query shapes) and resumable run_harvest_batch."""
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from pipeline import checkpoints as cp_mod
+from pipeline.checkpoints import EXTRACTED, PENDING, PERSISTED, SCRAPED, HarvestCheckpoints
+from pipeline.parallel_batch import FileExtractionResult
+
+
+def _db(collections):
+    db = MagicMock()
+    db.__getitem__ = MagicMock(side_effect=lambda key: collections.setdefault(key, MagicMock()))
+    return db
+
+
+class TestHarvestCheckpoints:
+    def test_start_upserts_run_and_one_checkpoint_per_url(self):
+        cols = {}
+        store = HarvestCheckpoints(_db(cols), "HR-1")
+        cols["harvestCheckpoints"].find.return_value = []
+        store.start(["https://a", "https://b"])
+
+        run_query, run_update = cols["harvestRuns"].update_one.call_args.args
+        assert run_query == {"harvest_run_id": "HR-1"}
+        assert run_update["$setOnInsert"]["urls"] == ["https://a", "https://b"]
+        assert cols["harvestRuns"].update_one.call_args.kwargs["upsert"] is True
+        ops = cols["harvestCheckpoints"].bulk_write.call_args.args[0]
+        assert len(ops) == 2
+
+    def test_stage_transitions(self):
+        cols = {}
+        store = HarvestCheckpoints(_db(cols), "HR-1")
+        store.mark_scraped("https://a", "/tmp/a.html", "https://a/")
+        store.mark_extracted("https://a", ["id1"], ["/tmp/a.json"])
+        store.mark_persisted("https://a", 1)
+        stages = [c.args[1]["$set"].get("stage") for c in cols["harvestCheckpoints"].update_one.call_args_list]
+        assert stages == [SCRAPED, EXTRACTED, PERSISTED]
+
+    def test_persist_error_keeps_stage(self):
+        cols = {}
+        HarvestCheckpoints(_db(cols), "HR-1").mark_persisted("https://a", 0, "DB error: x")
+        fields = cols["harvestCheckpoints"].update_one.call_args.args[1]["$set"]
+        assert "stage" not in fields
+
+    def test_list_resumable_runs_uses_two_queries(self):
+        cols = {"harvestCheckpoints": MagicMock(), "harvestRuns": MagicMock()}
+        db = _db(cols)
+        cols["harvestCheckpoints"].aggregate.return_value = [{"_id": "HR-1", "remaining": 3}]
+        cols["harvestRuns"].find.return_value.sort.return_value.limit.return_value = [
+            {"harvest_run_id": "HR-1", "status": "running", "total": 10},
+        ]
+        runs = cp_mod.list_resumable_runs(db)
+        assert runs == [{"harvest_run_id": "HR-1", "status": "running", "total": 10,
+                         "remaining": 3, "created_at": None}]
+
+
+class _MemoryCheckpoints:
+    """In-memory stand-in for HarvestCheckpoints shared across 'attempts'."""
+
+    runs: dict = {}
+
+    def __init__(self, db, run_id):
+        self.run_id = run_id
+        self.points = self.runs.setdefault(run_id, {})
+
+    def start(self, urls, created_by=None):
+        for url in urls:
+            self.points.setdefault(url, {
+                "url": url, "stage": PENDING, "path": None, "final_url": None, "error": None,
+                "record_ids": [], "record_files": [], "devices_extracted": 0, "db_inserted": 0,
+            })
+        return {u: dict(c) for u, c in self.points.items()}
+
+    def mark_scraped(self, url, path, final_url):
+        self.points[url].update(stage=SCRAPED, path=path, final_url=final_url, error=None)
+
+    def mark_scrape_failed(self, url, error):
+        self.points[url]["error"] = error
+
+    def mark_extracted(self, url, ids, files):
+        self.points[url].update(stage=EXTRACTED, record_ids=ids, record_files=files,
+                                devices_extracted=len(ids), error=None)
+
+    def mark_extract_failed(self, url, error):
+        self.points[url].update(error=error, devices_extracted=0)
+
+    def mark_persisted(self, url, inserted, error=None):
+        self.points[url].update(db_inserted=inserted, error=error)
+        if error is None:
+            self.points[url]["stage"] = PERSISTED
+
+    def finish(self, summary):
+        pass
+
+
+@pytest.fixture
+def harness(tmp_path, monkeypatch):
+    _MemoryCheckpoints.runs = {}
+    monkeypatch.setattr(cp_mod, "HarvestCheckpoints", _MemoryCheckpoints)
+    monkeypatch.setattr("orchestrator._DEFAULT_OUTPUT_DIR", str(tmp_path / "out"))
+    monkeypatch.setattr("orchestrator._DEFAULT_HTML_DIR", str(tmp_path / "html"))
+
+    inserted_ids = set()
+    devices = MagicMock()
+
+    def insert_one(record):
+        if record["_id"] in inserted_ids:
+            raise DuplicateKeyError("dup")
+        inserted_ids.add(record["_id"])
+
+    devices.insert_one.side_effect = insert_one
+    db = _db({"devices": devices})
+    monkeypatch.setattr("database.db_connection.get_db", lambda *a, **k: db)
+
+    def scrape(urls, out_dir, on_fetched=None):
+        meta = []
+        for u in urls:
+            path = tmp_path / (u.rsplit("/", 1)[-1] + ".html")
+            path.write_text("<html></html>")
+            meta.append({"url": u, "final_url": u, "path": str(path), "error": None})
+        return meta
+
+    scraped = []
+
+    def scrape_spy(urls, out_dir, on_fetched=None):
+        scraped.extend(urls)
+        return scrape(urls, out_dir)
+
+    monkeypatch.setattr("pipeline.runner._scrape_urls_with_meta", scrape_spy)
+    return {"scraped": scraped, "inserted": inserted_ids, "devices": devices}
+
+
+def _extract_ok(paths, harvest_run_id, source_urls=None, progress_callback=None, result_callback=None):
+    results = []
+    for p in paths:
+        r = FileExtractionResult(path=p, source_url=source_urls[p],
+                                 records=[{"brandName": "B", "versionModelNumber": p[-8:]}])
+        result_callback(r)
+        results.append(r)
+    return results
+
+
+class TestResumableBatch:
+    URLS = ["https://x/one", "https://x/two", "https://x/three"]
+
+    def test_crash_mid_extraction_then_resume(self, harness):
+        from orchestrator import resume_harvest_batch, run_harvest_batch
+
+        def crash_after_first(paths, harvest_run_id, source_urls=None,
+                              progress_callback=None, result_callback=None):
+            p = paths[0]
+            result_callback(FileExtractionResult(path=p, source_url=source_urls[p],
+                                                 records=[{"brandName": "B"}]))
+            raise MemoryError("ollama OOM")
+
+        with patch("pipeline.parallel_batch.process_html_files_parallel", side_effect=crash_after_first):
+            with pytest.raises(MemoryError):
+                run_harvest_batch(self.URLS, run_id="HR-T")
+        points = _MemoryCheckpoints.runs["HR-T"]
+        assert points["https://x/one"]["stage"] == EXTRACTED
+        assert points["https://x/two"]["stage"] == SCRAPED
+        assert harness["devices"].insert_one.call_count == 0
+
+        harness["scraped"].clear()
+        with patch("pipeline.parallel_batch.process_html_files_parallel", side_effect=_extract_ok) as ex, \
+             patch("pipeline.checkpoints.get_run_urls", return_value=self.URLS):
+            summary = resume_harvest_batch("HR-T")
+
+        assert harness["scraped"] == []  # nothing re-scraped
+        assert len(ex.call_args.args[0]) == 2  # only two/three re-extracted
+        assert summary["resumed"] is True
+        assert summary["incomplete"] == 0
+        assert summary["succeeded"] == 3
+        assert all(p["stage"] == PERSISTED for p in points.values())
+
+    def test_resume_after_persist_crash_is_idempotent(self, harness):
+        from orchestrator import run_harvest_batch
+
+        with patch("pipeline.parallel_batch.process_html_files_parallel", side_effect=_extract_ok):
+            first = run_harvest_batch(self.URLS, run_id="HR-I")
+        assert first["incomplete"] == 0
+        # Simulate a crash between insert and checkpoint write
+        point = _MemoryCheckpoints.runs["HR-I"]["https://x/two"]
+        point["stage"] = EXTRACTED
+        inserted_before = len(harness["inserted"])
+
+        with patch("pipeline.parallel_batch.process_html_files_parallel", side_effect=_extract_ok) as ex:
+            again = run_harvest_batch(self.URLS, run_id="HR-I")
+        assert ex.call_args.args[0] == []
+        assert len(harness["inserted"]) == inserted_before
+        assert again["results"][1]["db_inserted"] == 1
+        assert point["stage"] == PERSISTED
+
+    def test_records_reload_from_json_on_resume(self, harness):
+        from orchestrator import _load_checkpointed_records, run_harvest_batch
+
+        with patch("pipeline.parallel_batch.process_html_files_parallel", side_effect=_extract_ok):
+            run_harvest_batch(self.URLS[:1], run_id="HR-J")
+        point = _MemoryCheckpoints.runs["HR-J"]["https://x/one"]
+        records = _load_checkpointed_records(point)
+        assert [str(r["_id"]) for r in records] == point["record_ids"]
+        with open(point["record_files"][0], encoding="utf-8") as f:
+            assert "_id" not in json.load(f)
+
+    def test_failed_scrape_is_retried_on_resume(self, harness, monkeypatch):
+        from orchestrator import run_harvest_batch
+
+        def failing_scrape(urls, out_dir, on_fetched=None):
+            return [{"url": u, "final_url": None, "path": None, "error": "timeout"} for u in urls]
+
+        with patch("pipeline.runner._scrape_urls_with_meta", side_effect=failing_scrape), \
+             patch("pipeline.parallel_batch.process_html_files_parallel", side_effect=_extract_ok):
+            first = run_harvest_batch(self.URLS[:1], run_id="HR-S")
+        assert first["incomplete"] == 1
+        assert first["results"][0]["error"] == "timeout"
+
+        with patch("pipeline.parallel_batch.process_html_files_parallel", side_effect=_extract_ok):
+            second = run_harvest_batch(self.URLS[:1], run_id="HR-S")
+        assert harness["scraped"] == self.URLS[:1]
+        assert second["incomplete"] == 0
@@ -0,0 +1,235 @@
+"""Distributed extraction: coordinator, extract_page workers and failure handling.
+
+The job store is SQLite in tmp_path; _process_single_ollama is mocked.
+"""
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from jobs.store import CANCELLED, COMPLETED, SQLiteJobStore
+from jobs.worker import Worker
+from pipeline import distributed, parallel_batch
+from pipeline.distributed import iter_html_pages_distributed, process_html_files_distributed
+from pipeline.parallel_batch import HtmlPage
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    s.retry_delay_seconds = 0
+    return s
+
+
+@pytest.fixture
+def pages(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"site{i}.com__device__{i}.html"
+        path.write_text(f"<html><body>Device {i} é</body></html>", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def _job_ids(store):
+    return [row["job_id"] for row in store._connect().execute("SELECT job_id FROM jobs")]
+
+
+def _start_worker(store, stop, worker_id="host0"):
+    worker = Worker(store, worker_id=worker_id, poll_interval=0.01, lease_seconds=1, job_types=["extract_page"])
+    thread = threading.Thread(target=worker.run_forever, args=(stop,), daemon=True)
+    thread.start()
+    return thread
+
+
+def fake_extract(html_path, source_url=None, harvest_run_id=None, raw_html=None):
+    return [{"brandName": raw_html, "source_url": source_url, "_harvest": {"run": harvest_run_id}}]
+
+
+@pytest.fixture
+def workers(store):
+    """Two extract_page workers on background threads."""
+    stop = threading.Event()
+    with patch("pipeline.runner._process_single_ollama", side_effect=fake_extract):
+        threads = [_start_worker(store, stop, f"host{i}") for i in range(2)]
+        yield
+        stop.set()
+        for t in threads:
+            t.join()
+
+
+def test_html_round_trips_through_the_payload():
+    html = "<p>Stent – 6 mm</p>" * 100
+    assert distributed.decode_html(distributed.encode_html(html)) == html
+    assert len(distributed.encode_html(html)) < len(html)
+
+
+def test_pages_are_extracted_by_workers(store, pages, workers):
+    seen, progress = [], []
+    results = process_html_files_distributed(
+        pages, "HR-DIST", source_urls={pages[0]: "https://site0.com/p"}, store=store, poll_interval=0.01,
+        progress_callback=lambda done, total: progress.append((done, total)), result_callback=seen.append,
+        timeout=10,
+    )
+    by_path = {r.path: r for r in results}
+    assert sorted(by_path) == sorted(pages)
+    assert by_path[pages[0]].records[0]["source_url"] == "https://site0.com/p"
+    assert by_path[pages[1]].records[0]["brandName"] == "<html><body>Device 1 é</body></html>"
+    assert by_path[pages[2]].records[0]["_harvest"] == {"run": "HR-DIST"}
+    assert all(r.error is None and "extract.total" in r.timings for r in results)
+    assert seen == results
+    assert progress[-1] == (3, 3)
+
+
+def test_dead_worker_page_is_reclaimed(store, pages):
+    """A worker that claims a page and dies loses it when its lease lapses."""
+    results, stop = [], threading.Event()
+    coordinator = threading.Thread(target=lambda: results.extend(process_html_files_distributed(
+        pages[:1], "HR-DIST", store=store, poll_interval=0.01, timeout=10)))
+    with patch.object(distributed, "DISTRIBUTED_MAX_ATTEMPTS", 2), \
+         patch("pipeline.runner._process_single_ollama", side_effect=fake_extract):
+        coordinator.start()
+        while not (ghost := store.claim("ghost", lease_seconds=0.05, job_types=["extract_page"])):
+            time.sleep(0.01)
+        worker = _start_worker(store, stop)
+        coordinator.join()
+        stop.set()
+        worker.join()
+
+    assert results[0].error is None
+    job = store.get(ghost["job_id"])
+    assert job["status"] == COMPLETED
+    assert job["attempts"] == 2
+    assert job["result"]["worker"] == "host0"
+
+
+def test_worker_without_ollama_hands_the_page_on(store, pages):
+    with patch("pipeline.runner._process_single_ollama", return_value=[]), \
+         patch("pipeline.ollama_pool.available", return_value=False):
+        job_id = store.enqueue("extract_page", {"name": pages[0], "source_url": None, "harvest_run_id": "HR",
+                                                "html_z": distributed.encode_html("<html></html>")},
+                               max_attempts=2)
+        Worker(store, job_types=["extract_page"]).run_once()
+    job = store.get(job_id)
+    assert job["status"] == "queued"
+    assert "Ollama is unavailable" in job["error"]
+
+
+def test_failed_page_becomes_an_error_result(store, pages):
+    with patch.object(distributed, "DISTRIBUTED_MAX_ATTEMPTS", 1), \
+         patch("pipeline.runner._process_single_ollama", return_value=[]), \
+         patch("pipeline.ollama_pool.available", return_value=False):
+        stop = threading.Event()
+        thread = _start_worker(store, stop)
+        try:
+            results = process_html_files_distributed(pages[:1], "HR", store=store, poll_interval=0.01, timeout=10)
+        finally:
+            stop.set()
+            thread.join()
+    assert results[0].records == []
+    assert "Ollama is unavailable" in results[0].error
+
+
+def test_timeout_cancels_unclaimed_pages(store, pages):
+    start = time.monotonic()
+    results = process_html_files_distributed(pages, "HR", store=store, poll_interval=0.01, timeout=0.05)
+    assert time.monotonic() - start < 5
+    assert all("within 0.05s" in r.error for r in results)
+    assert {j["status"] for j in store.get_many(_job_ids(store))} == {CANCELLED}
+
+
+def test_dead_last_attempt_fails_without_any_worker(store, pages):
+    """No worker is left to reclaim the page: the coordinator fails it itself."""
+    results = []
+    coordinator = threading.Thread(target=lambda: results.extend(process_html_files_distributed(
+        pages[:1], "HR", store=store, poll_interval=0.01, timeout=30)))
+    with patch.object(distributed, "DISTRIBUTED_MAX_ATTEMPTS", 1):
+        coordinator.start()
+        while not store.claim("ghost", lease_seconds=0.05, job_types=["extract_page"]):
+            time.sleep(0.01)
+        start = time.monotonic()
+        coordinator.join(timeout=10)
+    assert not coordinator.is_alive()
+    assert time.monotonic() - start < 10
+    assert "Lease expired after 1 attempt(s)" in results[0].error
+
+
+def test_parallel_batch_bounds_a_batch_with_no_workers(store, pages):
+    with patch.object(distributed, "EXTRACT_MODE", "distributed"), \
+         patch.object(distributed, "DISTRIBUTED_TIMEOUT", 0.05), \
+         patch.object(distributed, "DISTRIBUTED_POLL_SECONDS", 0.01), \
+         patch("jobs.store.get_job_store", return_value=store):
+        results = parallel_batch.process_html_files_parallel(pages, "HR")
+    assert all("within 0.05s" in r.error for r in results)
+    assert {j["status"] for j in store.get_many(_job_ids(store))} == {CANCELLED}
+
+
+def test_raising_progress_callback_cancels_the_rest(store, pages, workers):
+    def stop_after_first(done, total):
+        raise RuntimeError("job cancelled")
+
+    with pytest.raises(RuntimeError):
+        process_html_files_distributed(pages, "HR", store=store, poll_interval=0.01,
+                                       progress_callback=stop_after_first, timeout=10)
+    statuses = [j["status"] for j in store.get_many(_job_ids(store))]
+    assert statuses.count(COMPLETED) >= 1
+    assert set(statuses) <= {COMPLETED, CANCELLED, "running"}
+
+
+def test_unreadable_file_is_reported_without_a_job(store, tmp_path):
+    results = process_html_files_distributed([str(tmp_path / "missing.html")], "HR", store=store, timeout=1)
+    assert "cannot read" in results[0].error
+    assert _job_ids(store) == []
+
+
+def test_page_stream_is_extracted_by_workers_in_a_bounded_window(store, workers):
+    pages = (HtmlPage(f"p{i}.html", None, f"<p>{i}</p>") for i in range(5))
+    queued = []
+    enqueue = store.enqueue
+
+    def tracking_enqueue(*args, **kwargs):
+        queued.append(sum(j["status"] not in ("completed", "failed", "cancelled")
+                          for j in store.get_many(_job_ids(store))))
+        return enqueue(*args, **kwargs)
+
+    with patch.object(store, "enqueue", side_effect=tracking_enqueue):
+        results = list(iter_html_pages_distributed(pages, "HR-ARC", max_pending=2, store=store,
+                                                   poll_interval=0.01, timeout=10))
+    assert sorted(r.path for r in results) == [f"p{i}.html" for i in range(5)]
+    assert all(r.records[0]["brandName"] == f"<p>{r.path[1]}</p>" for r in results)
+    assert max(queued) < 2
+
+
+def test_closing_the_page_stream_cancels_queued_pages(store):
+    """An ingest that stops reading results leaves nothing queued."""
+    def finish_one():
+        while not (job := store.claim("w", job_types=["extract_page"])):
+            time.sleep(0.01)
+        store.complete(job["job_id"], "w", {"records": []})
+
+    pages = [HtmlPage(f"p{i}.html", None, "<p></p>") for i in range(3)]
+    stream = iter_html_pages_distributed(pages, "HR", store=store, poll_interval=0.01)
+    worker = threading.Thread(target=finish_one)
+    worker.start()
+    assert next(stream).error is None
+    stream.close()
+    worker.join()
+    statuses = sorted(j["status"] for j in store.get_many(_job_ids(store)))
+    assert statuses == [CANCELLED, CANCELLED, COMPLETED]
+
+
+def test_archive_pages_delegate_in_distributed_mode():
+    pages = [HtmlPage("a.html", None, "<p></p>")]
+    with patch.object(distributed, "EXTRACT_MODE", "distributed"), \
+         patch.object(distributed, "iter_html_pages_distributed", return_value=iter(["r"])) as remote:
+        assert list(parallel_batch.iter_html_pages_parallel(pages, "HR", max_pending=4)) == ["r"]
+    assert remote.call_args.args == (pages, "HR")
+    assert remote.call_args.kwargs == {"max_pending": 4, "timeout": distributed.DISTRIBUTED_TIMEOUT}
+
+
+def test_parallel_batch_delegates_in_distributed_mode(pages):
+    with patch.object(distributed, "EXTRACT_MODE", "distributed"), \
+         patch.object(distributed, "process_html_files_distributed", return_value=["r"]) as remote:
+        assert parallel_batch.process_html_files_parallel(pages, "HR") == ["r"]
+    assert remote.call_args.args[:2] == (pages, "HR")
@@ -25,31 +25,26 @@ def test_thread_local_last_model():
     assert results["B"] == "llama-3.3-70b-versatile"
 
 
-def test_non_blocking_sem_falls_through_when_saturated():
-    """When Ollama semaphore is saturated, _llm_request skips to the next model."""
-    # Pre-acquire the Ollama slot so the first model in the chain can't be used
-    llm_extractor._provider_sems["ollama"].acquire()
-    try:
-        # Mock Groq env key so the chain will try it
-        with patch.dict("os.environ", {"GROQ_API_KEY": "fake-key"}):
-            # Mock _openai_request to return a canned response for Groq
-            with patch.object(llm_extractor, "_openai_request") as mock_openai:
-                mock_openai.return_value = {"device_name": "FALLBACK"}
-                result = llm_extractor._llm_request(
-                    system_msg="sys",
-                    user_msg="user",
-                    schema={},
-                    timeout=5,
-                )
-        assert result == {"device_name": "FALLBACK"}
-        # The chain must have fallen through Ollama to any cloud provider
-        chosen = get_last_model()
-        chosen_provider = next(
-            e["provider"] for e in llm_extractor.MODEL_CHAIN if e["model"] == chosen
-        )
-        assert chosen_provider in {"groq", "nvidia"}
-    finally:
-        llm_extractor._provider_sems["ollama"].release()
+def test_non_blocking_acquire_falls_through_when_saturated(saturated_ollama):
+    """When every Ollama endpoint is full, _llm_request skips to the next model."""
+    # Mock Groq env key so the chain will try it
+    with patch.dict("os.environ", {"GROQ_API_KEY": "fake-key"}):
+        # Mock _openai_request to return a canned response for Groq
+        with patch.object(llm_extractor, "_openai_request") as mock_openai:
+            mock_openai.return_value = {"device_name": "FALLBACK"}
+            result = llm_extractor._llm_request(
+                system_msg="sys",
+                user_msg="user",
+                schema={},
+                timeout=5,
+            )
+    assert result == {"device_name": "FALLBACK"}
+    # The chain must have fallen through Ollama to any cloud provider
+    chosen = get_last_model()
+    chosen_provider = next(
+        e["provider"] for e in llm_extractor.MODEL_CHAIN if e["model"] == chosen
+    )
+    assert chosen_provider in {"groq", "nvidia"}
 
 
 def test_disabled_models_respected_across_threads():
@@ -62,7 +57,7 @@ def test_disabled_models_respected_across_threads():
     seen_models = []
     lock = threading.Lock()
 
-    def fake_openai_request(url, api_key, model, messages, timeout, _retry=False):
+    def fake_openai_request(url, api_key, model, messages, timeout=60, schema=None, provider="openai"):
         with lock:
             seen_models.append(model)
         return {"device_name": "OK"}
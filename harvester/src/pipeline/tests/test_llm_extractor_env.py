@@ -3,17 +3,17 @@ import os
 
 
 def test_ollama_url_defaults_to_localhost(monkeypatch):
+    monkeypatch.delenv("OLLAMA_URLS", raising=False)
     monkeypatch.delenv("OLLAMA_URL", raising=False)
-    import pipeline.llm_extractor as llm_extractor
-    importlib.reload(llm_extractor)
-    assert llm_extractor.OLLAMA_URL == "http://localhost:11434/api/chat"
+    from pipeline import ollama_pool
+    assert [e.url for e in ollama_pool._endpoints_from_env()] == ["http://localhost:11434/api/chat"]
 
 
 def test_ollama_url_respects_env_override(monkeypatch):
+    monkeypatch.delenv("OLLAMA_URLS", raising=False)
     monkeypatch.setenv("OLLAMA_URL", "http://ollama:11434/api/chat")
-    import pipeline.llm_extractor as llm_extractor
-    importlib.reload(llm_extractor)
-    assert llm_extractor.OLLAMA_URL == "http://ollama:11434/api/chat"
+    from pipeline import ollama_pool
+    assert [e.url for e in ollama_pool._endpoints_from_env()] == ["http://ollama:11434/api/chat"]
 
 
 def test_model_chain_is_local_first_capability_ordered():
@@ -0,0 +1,123 @@
+"""LLM record/replay: log format, miss policies and the _llm_request hook."""
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pipeline import llm_extractor, llm_replay
+from pipeline.llm_replay import ReplayLog, ReplayMiss, request_key
+
+SCHEMA = {"type": "object"}
+
+
+@pytest.fixture
+def replay_log(tmp_path):
+    path = str(tmp_path / "llm_replay.jsonl")
+    yield path
+    llm_replay.configure(mode="off", miss="fail", latency=0, path="llm_replay.jsonl")
+
+
+@pytest.fixture
+def chain():
+    """Only the local model, answered by a fake _ollama_request."""
+    with llm_extractor._disabled_lock:
+        llm_extractor._disabled_models.clear()
+    with patch.object(llm_extractor, "MODEL_CHAIN", [{"provider": "ollama", "model": "gemma4:e4b"}]), \
+         patch.object(llm_extractor, "_ollama_request") as ollama:
+        yield ollama
+
+
+def test_request_key_ignores_dict_order():
+    a = request_key([{"role": "user", "content": "x"}], {"type": "object", "required": ["a"]})
+    b = request_key([{"content": "x", "role": "user"}], {"required": ["a"], "type": "object"})
+    assert a == b
+    assert a != request_key([{"role": "user", "content": "y"}], SCHEMA)
+
+
+class TestReplayLog:
+    def test_append_is_compact_and_later_entry_wins(self, tmp_path):
+        path = tmp_path / "log.jsonl"
+        log = ReplayLog(str(path))
+        log.append("k1", "ollama", "gemma4:e4b", {"device_name": "A"}, 1.23456)
+        log.append("k1", "groq", "llama", {"device_name": "B"}, 0.5)
+
+        lines = path.read_text().splitlines()
+        assert lines[0] == '{"k":"k1","p":"ollama","m":"gemma4:e4b","s":1.235,"r":{"device_name":"A"}}'
+        assert ReplayLog(str(path)).get("k1")["r"] == {"device_name": "B"}
+
+    def test_unreadable_lines_are_skipped(self, tmp_path):
+        path = tmp_path / "log.jsonl"
+        path.write_text(json.dumps({"k": "k1", "p": "ollama", "m": "m", "s": 0, "r": {}}) + "\n{\"k\": \"k2\", \"r")
+        log = ReplayLog(str(path))
+        assert len(log) == 1
+        assert log.get("k2") is None
+
+
+class TestLlmRequest:
+    def test_record_then_replay_without_the_chain(self, replay_log, chain):
+        chain.return_value = {"device_name": "Stent"}
+        llm_replay.configure(mode="record", path=replay_log)
+        assert llm_extractor._llm_request("sys", "page", SCHEMA) == {"device_name": "Stent"}
+
+        llm_replay.configure(mode="replay", path=replay_log)
+        chain.reset_mock()
+        llm_extractor._set_last_model(None)
+        result = llm_extractor._llm_request("sys", "page", SCHEMA)
+
+        assert result == {"device_name": "Stent"}
+        chain.assert_not_called()
+        assert llm_extractor.get_last_model() == "gemma4:e4b"
+
+    def test_replayed_responses_are_copies(self, replay_log, chain):
+        chain.return_value = {"device_name": "Stent"}
+        llm_replay.configure(mode="record", path=replay_log)
+        llm_extractor._llm_request("sys", "page", SCHEMA)["_description_source"] = "x"
+
+        llm_replay.configure(mode="replay")
+        llm_extractor._llm_request("sys", "page", SCHEMA)["_description_source"] = "y"
+        assert llm_extractor._llm_request("sys", "page", SCHEMA) == {"device_name": "Stent"}
+
+    def test_failed_chain_is_not_recorded(self, replay_log, chain):
+        chain.return_value = None
+        llm_replay.configure(mode="record", path=replay_log)
+        assert llm_extractor._llm_request("sys", "page", SCHEMA) is None
+        assert len(llm_replay.get_log()) == 0
+
+    def test_miss_fail_raises(self, replay_log, chain):
+        llm_replay.configure(mode="replay", path=replay_log, miss="fail")
+        with pytest.raises(ReplayMiss):
+            llm_extractor._llm_request("sys", "unseen", SCHEMA)
+        chain.assert_not_called()
+
+    def test_miss_live_falls_through_without_recording(self, replay_log, chain):
+        chain.return_value = {"device_name": "Live"}
+        llm_replay.configure(mode="replay", path=replay_log, miss="live")
+        assert llm_extractor._llm_request("sys", "unseen", SCHEMA) == {"device_name": "Live"}
+        assert len(llm_replay.get_log()) == 0
+
+    def test_miss_record_falls_through_and_records(self, replay_log, chain):
+        chain.return_value = {"device_name": "Live"}
+        llm_replay.configure(mode="replay", path=replay_log, miss="record")
+        llm_extractor._llm_request("sys", "unseen", SCHEMA)
+        chain.reset_mock()
+
+        assert llm_extractor._llm_request("sys", "unseen", SCHEMA) == {"device_name": "Live"}
+        chain.assert_not_called()
+
+    def test_recorded_latency_is_simulated(self, replay_log, chain):
+        log = ReplayLog(replay_log)
+        log.append(request_key([{"role": "system", "content": "sys"}, {"role": "user", "content": "page"}],
+                               SCHEMA), "ollama", "gemma4:e4b", {"device_name": "Slow"}, 0.05)
+        llm_replay.configure(mode="replay", path=replay_log, latency="recorded")
+
+        start = time.monotonic()
+        llm_extractor._llm_request("sys", "page", SCHEMA)
+        assert time.monotonic() - start >= 0.05
+
+
+def test_configure_rejects_unknown_values():
+    with pytest.raises(ValueError):
+        llm_replay.configure(mode="rewind")
+    with pytest.raises(ValueError):
+        llm_replay.configure(miss="ignore")
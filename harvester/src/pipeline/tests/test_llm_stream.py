@@ -0,0 +1,224 @@
+"""Streamed LLM replies: incremental validation, wire formats and early aborts."""
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pipeline import llm_extractor, llm_stream, metrics
+from pipeline.llm_stream import JsonStreamValidator, StreamAbort, read_json_stream
+
+ROWS = llm_extractor.PRODUCT_ROWS_SCHEMA
+FIELDS = llm_extractor.PAGE_FIELDS_SCHEMA
+
+
+def _ndjson(text: str, chunk: int = 7, stats: dict | None = None) -> list[bytes]:
+    lines = [json.dumps({"message": {"content": text[i:i + chunk]}, "done": False}).encode()
+             for i in range(0, len(text), chunk)]
+    lines.append(json.dumps({"message": {"content": ""}, "done": True, **(stats or {})}).encode())
+    return lines
+
+
+def _sse(text: str, chunk: int = 7) -> list[str]:
+    lines = []
+    for i in range(0, len(text), chunk):
+        lines += [f"data: {json.dumps({'choices': [{'delta': {'content': text[i:i + chunk]}}]})}", ""]
+    return lines + ['data: {"choices": [{"delta": {}, "finish_reason": "stop"}]}', "data: [DONE]"]
+
+
+def _feed(schema, text, max_chars=100_000):
+    validator = JsonStreamValidator(schema, max_chars)
+    for i in range(0, len(text), 5):
+        validator.feed(text[i:i + 5])
+    return validator
+
+
+class TestValidator:
+    def test_pretty_printed_reply_parses(self):
+        doc = {"products": [{"model_number": "AB-12", "catalog_number": None,
+                             "diameter": "3 mm", "length": "8 mm"}]}
+        validator = _feed(ROWS, json.dumps(doc, indent=2))
+        assert validator.complete
+        assert validator.result() == doc
+
+    def test_text_after_the_root_object_is_ignored(self):
+        validator = _feed(FIELDS, '{"device_name": "Stent \\"X\\" {1}"}\n\n\n  trailing')
+        assert validator.result() == {"device_name": 'Stent "X" {1}'}
+
+    def test_prose_before_json_aborts(self):
+        with pytest.raises(StreamAbort) as exc:
+            _feed(FIELDS, "Sure! Here is the JSON: {}")
+        assert exc.value.reason == "schema"
+
+    def test_wrong_value_type_aborts(self):
+        with pytest.raises(StreamAbort) as exc:
+            _feed(FIELDS, '{"device_name": "A", "deviceKit": "yes"}')
+        assert exc.value.reason == "schema"
+        assert "deviceKit" in str(exc.value)
+
+    def test_wrong_array_item_type_aborts(self):
+        with pytest.raises(StreamAbort):
+            _feed(ROWS, '{"products": ["AB-12"]}')
+
+    def test_whitespace_loop_aborts(self):
+        with pytest.raises(StreamAbort) as exc:
+            _feed(FIELDS, '{"device_name": "A",' + "\n" * 1000)
+        assert exc.value.reason == "repetition"
+
+    def test_repeated_phrase_aborts(self):
+        with pytest.raises(StreamAbort) as exc:
+            _feed(FIELDS, '{"description": "' + "sterile, single use, " * 60)
+        assert exc.value.reason == "repetition"
+
+    def test_length_budget(self):
+        with pytest.raises(StreamAbort) as exc:
+            _feed(FIELDS, '{"description": "' + "x" * 200, max_chars=100)
+        assert exc.value.reason == "length"
+
+
+class TestReadJsonStream:
+    def test_ndjson_with_stats(self):
+        done = []
+        result = read_json_stream(_ndjson('{"device_name": "Stent"}', stats={"eval_count": 9}),
+                                  FIELDS, 1024, 60, on_done=done.append)
+        assert result == {"device_name": "Stent"}
+        assert done[0]["eval_count"] == 9
+
+    def test_sse(self):
+        assert read_json_stream(_sse('{"products": []}'), ROWS, 4096, 60, sse=True) == {"products": []}
+
+    def test_stops_reading_at_text_after_the_object(self):
+        def lines():
+            yield json.dumps({"message": {"content": '{"device_name": null}'}}).encode()
+            yield json.dumps({"message": {"content": " \n"}}).encode()
+            yield json.dumps({"message": {"content": "Hope this helps"}}).encode()
+            raise AssertionError("read past the end of the reply")
+
+        assert read_json_stream(lines(), FIELDS, 1024, 60) == {"device_name": None}
+
+    def test_trailing_whitespace_is_bounded(self):
+        lines = _ndjson('{"device_name": null}' + "\n" * 400, chunk=len('{"device_name": null}'))
+        done = []
+        assert read_json_stream(lines, FIELDS, 1024, 60, on_done=done.append) == {"device_name": None}
+        assert done == []
+
+    def test_truncated_reply_is_a_parse_error(self):
+        with pytest.raises(ValueError):
+            read_json_stream(_ndjson('{"device_name": "Ste'), FIELDS, 1024, 60)
+
+    def test_read_timeout_is_a_stall(self):
+        import requests
+
+        def lines():
+            yield json.dumps({"message": {"content": "{"}}).encode()
+            raise requests.ConnectionError("Read timed out.")
+
+        with pytest.raises(StreamAbort) as exc:
+            read_json_stream(lines(), FIELDS, 1024, 60)
+        assert exc.value.reason == "stall"
+
+    def test_overall_timeout(self):
+        with patch.object(llm_stream.time, "monotonic", side_effect=[0, 0, 61]):
+            with pytest.raises(StreamAbort) as exc:
+                read_json_stream(_ndjson('{"device_name": "Stent"}', chunk=3), FIELDS, 1024, 60)
+        assert exc.value.reason == "timeout"
+
+
+class TestOllamaRequest:
+    @pytest.fixture(autouse=True)
+    def _streaming(self):
+        with patch.object(llm_stream, "STREAM_PROVIDERS", frozenset({"ollama"})):
+            yield
+
+    def _post(self, lines):
+        response = MagicMock()
+        response.raise_for_status.return_value = None
+        response.iter_lines.return_value = iter(lines)
+        return patch.object(llm_extractor.requests, "post", return_value=response), response
+
+    def test_streams_with_a_stall_read_timeout(self):
+        post_patch, response = self._post(_ndjson('{"device_name": "Stent"}'))
+        with post_patch as post:
+            assert llm_extractor._ollama_request("m", [], FIELDS, timeout=300) == {"device_name": "Stent"}
+        assert post.call_args.kwargs["json"]["stream"] is True
+        assert post.call_args.kwargs["stream"] is True
+        assert post.call_args.kwargs["timeout"] == llm_stream.http_timeout(300)
+        response.close.assert_called_once()
+
+    def test_abort_closes_the_connection_and_falls_through(self):
+        metrics.reset_metrics()
+        post_patch, response = self._post(_ndjson('{"device_name": ' + " " * 2000))
+        with post_patch:
+            assert llm_extractor._ollama_request("m", [], FIELDS) is None
+        response.close.assert_called_once()
+        assert metrics.LLM_STREAM_ABORTS.value(provider="ollama", reason="repetition") == 1
+
+
+class TestReadTimeouts:
+    """Against a real socket: the stall limit applies between tokens, not before the first."""
+
+    @pytest.fixture
+    def server(self):
+        import threading
+        import time
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        pauses = {}
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _chunk(self, text):
+                data = (text + "\n").encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                time.sleep(pauses["first"])  # model load + prompt evaluation
+                self.send_response(200)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                lines = _ndjson('{"device_name": "Stent"}', chunk=8)
+                self._chunk(lines[0].decode())
+                time.sleep(pauses["between"])
+                try:
+                    for line in lines[1:]:
+                        self._chunk(line.decode())
+                    self.wfile.write(b"0\r\n\r\n")
+                except OSError:
+                    pass
+
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        yield f"http://127.0.0.1:{httpd.server_port}/api/chat", pauses
+        httpd.shutdown()
+        httpd.server_close()
+
+    def _request(self, url):
+        import requests
+        response = requests.post(url, json={}, stream=True, timeout=llm_stream.http_timeout(5))
+        return llm_extractor._read_stream(response, "ollama", "m", FIELDS, 5)
+
+    def test_slow_first_token_is_not_a_stall(self, server):
+        url, pauses = server
+        pauses.update(first=0.5, between=0)
+        with patch.object(llm_stream, "STALL_SECONDS", 0.2):
+            assert self._request(url) == {"device_name": "Stent"}
+
+    def test_stall_between_tokens_aborts(self, server):
+        metrics.reset_metrics()
+        url, pauses = server
+        pauses.update(first=0, between=1.0)
+        with patch.object(llm_stream, "STALL_SECONDS", 0.2):
+            assert self._request(url) is None
+        assert metrics.LLM_STREAM_ABORTS.value(provider="ollama", reason="stall") == 1
+
+
+def test_stream_providers_setting():
+    assert llm_stream._parse_providers("ollama") == {"ollama"}
+    assert llm_stream._parse_providers("ollama, groq") == {"ollama", "groq"}
+    assert llm_stream._parse_providers("all") == set(llm_stream.PROVIDERS)
+    assert llm_stream._parse_providers("off") == frozenset()
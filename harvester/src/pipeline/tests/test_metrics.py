@@ -0,0 +1,126 @@
+"""Unit tests for the in-process metrics registry and its instrumentation."""
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pipeline import llm_extractor, metrics
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    metrics.reset_metrics()
+    yield
+    metrics.reset_metrics()
+
+
+class TestRegistry:
+    def test_counter_sums_across_threads(self):
+        c = metrics.counter("test_threads_total", "t", ("worker",))
+
+        def work():
+            for _ in range(1000):
+                c.inc(worker="w")
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # Shards of exited threads are folded in, not lost
+        assert c.value(worker="w") == 8000
+        assert c.value(worker="w") == 8000
+
+    def test_counter_rejects_negative(self):
+        c = metrics.counter("test_negative_total", "t")
+        with pytest.raises(ValueError):
+            c.inc(-1)
+
+    def test_labels_must_match(self):
+        c = metrics.counter("test_labels_total", "t", ("provider",))
+        with pytest.raises(ValueError):
+            c.inc(model="x")
+
+    def test_reregistering_returns_same_metric(self):
+        assert metrics.counter("test_same_total", "t") is metrics.counter("test_same_total", "t")
+        with pytest.raises(ValueError):
+            metrics.histogram("test_same_total", "t")
+
+    def test_gauge_inc_dec(self):
+        g = metrics.gauge("test_gauge", "t")
+        g.inc()
+        g.inc()
+        g.dec()
+        assert g.value() == 1
+
+    def test_histogram_buckets_are_cumulative(self):
+        h = metrics.histogram("test_seconds", "t", buckets=(0.1, 1.0))
+        for v in (0.05, 0.5, 0.5, 5.0):
+            h.observe(v)
+        snap = h.snapshot()
+        assert snap["count"] == 4
+        assert snap["sum"] == pytest.approx(6.05)
+        assert list(snap["buckets"].values()) == [1, 3, 4]
+
+    def test_render_text_format(self):
+        metrics.counter("test_render_total", "Rendered things.", ("kind",)).inc(kind='a"b')
+        metrics.histogram("test_render_seconds", "Render time.", buckets=(1.0,)).observe(0.5)
+        text = metrics.render_latest()
+        assert "# TYPE test_render_total counter" in text
+        assert 'test_render_total{kind="a\\"b"} 1' in text
+        assert 'test_render_seconds_bucket{le="1"} 1' in text
+        assert 'test_render_seconds_bucket{le="+Inf"} 1' in text
+        assert "test_render_seconds_count 1" in text
+
+    def test_failing_callback_does_not_break_render(self):
+        metrics.gauge_callback("test_broken", "t", lambda: 1 / 0)
+        assert "fivos_llm_requests_total" in metrics.render_latest()
+
+
+class TestInstrumentation:
+    def test_saturation_and_success_counted(self, saturated_ollama):
+        with patch.dict("os.environ", {"GROQ_API_KEY": "fake-key", "NVIDIA_API_KEY": ""}), \
+             patch.object(llm_extractor, "_openai_request", return_value={"ok": True}):
+            llm_extractor._llm_request("sys", "user", {}, timeout=5)
+
+        assert metrics.LLM_SATURATED.value(provider="ollama") == 1
+        successes = [
+            k for k, v in metrics.LLM_REQUESTS.values().items() if k[2] == "success" and v == 1
+        ]
+        assert successes and successes[0][0] == "groq"
+        assert metrics.LLM_SECONDS.snapshot(provider="groq")["count"] == 1
+        assert metrics.LLM_INFLIGHT.value(provider="groq") == 0
+
+    def test_fallback_and_exhaustion_counted(self):
+        with patch.dict("os.environ", {"GROQ_API_KEY": "", "NVIDIA_API_KEY": ""}), \
+             patch.object(llm_extractor, "_ollama_request", return_value=None):
+            assert llm_extractor._llm_request("sys", "user", {}, timeout=5) is None
+        assert sum(metrics.LLM_FALLBACKS.values().values()) >= 1
+        assert metrics.LLM_CHAIN_EXHAUSTED.value() == 1
+
+    def test_disable_counted_once(self):
+        try:
+            llm_extractor._disable_model("metrics-test-model")
+            llm_extractor._disable_model("metrics-test-model")
+            assert metrics.LLM_MODELS_DISABLED.value(model="metrics-test-model") == 1
+            assert "fivos_llm_disabled_models" in metrics.render_latest()
+        finally:
+            llm_extractor._disabled_models.discard("metrics-test-model")
+
+    def test_gudid_calls_counted_by_status(self):
+        from validators import gudid_client
+
+        response = MagicMock(status_code=429)
+        with patch("validators.gudid_client.requests.get", return_value=response):
+            gudid_client.lookup_by_di("00643169001763")
+        assert metrics.GUDID_REQUESTS.value(endpoint="lookup", outcome="429") == 1
+        assert metrics.GUDID_SECONDS.snapshot(endpoint="lookup")["count"] == 1
+
+    def test_mongo_listener_observes_latency(self):
+        from database.db_connection import _CommandLatencyListener
+
+        listener = _CommandLatencyListener()
+        listener.succeeded(MagicMock(duration_micros=2500, command_name="find"))
+        listener.failed(MagicMock(duration_micros=1000, command_name="insert"))
+        assert metrics.MONGO_SECONDS.snapshot(command="find", outcome="ok")["sum"] == pytest.approx(0.0025)
+        assert metrics.MONGO_SECONDS.snapshot(command="insert", outcome="error")["count"] == 1
@@ -0,0 +1,128 @@
+"""Ollama options, residency helpers and response stats."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pipeline import llm_extractor, llm_replay, llm_stream, metrics, ollama_backend, ollama_pool
+
+URL = "http://localhost:11434/api/chat"
+
+
+def _response(payload: dict) -> MagicMock:
+    response = MagicMock()
+    response.json.return_value = payload
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestOptions:
+    def test_payload_sets_keep_alive_and_options(self, monkeypatch):
+        monkeypatch.setenv("OLLAMA_NUM_THREAD", "6")
+        payload = ollama_backend.chat_payload(URL, "gemma4:e4b", [{"role": "user", "content": "x"}],
+                                              llm_extractor.PRODUCT_ROWS_SCHEMA, 8192)
+        assert payload["stream"] is False
+        assert payload["keep_alive"] == ollama_backend.OLLAMA_KEEP_ALIVE
+        assert payload["options"] == {"num_ctx": 8192, "num_predict": 4096, "num_thread": 6}
+
+    def test_num_predict_by_schema(self):
+        assert ollama_backend.num_predict(llm_extractor.PRODUCT_ROWS_SCHEMA) == 4096
+        assert ollama_backend.num_predict(llm_extractor.PAGE_FIELDS_SCHEMA) == 1024
+        assert ollama_backend.num_predict(None) == 1024
+
+    def test_remote_server_picks_its_own_threads(self, monkeypatch):
+        monkeypatch.delenv("OLLAMA_NUM_THREAD", raising=False)
+        assert ollama_backend.num_thread("http://ollama:11434/api/chat") is None
+        assert ollama_backend.num_thread(URL) >= 1
+
+    def test_context_fits_longest_prompt_in_whole_steps(self, monkeypatch):
+        monkeypatch.setattr(ollama_backend, "OLLAMA_NUM_CTX", 0)
+        size = ollama_backend.context_size(9000)
+        assert size % 2048 == 0
+        assert size >= 9000 / 3 + 4096
+        assert ollama_backend.context_size(10_000_000) == ollama_backend.OLLAMA_MAX_CTX
+        monkeypatch.setattr(ollama_backend, "OLLAMA_NUM_CTX", 4096)
+        assert ollama_backend.context_size(9000) == 4096
+
+    def test_every_pass_uses_the_same_context(self):
+        """A changed num_ctx makes Ollama reload the model, so it must not vary per request."""
+        sent = []
+        with patch.object(llm_stream, "STREAM_PROVIDERS", frozenset()), \
+             patch.object(llm_extractor.requests, "post",
+                          side_effect=lambda url, json, **kwargs: sent.append(json) or _response(
+                              {"message": {"content": "{}"}})):
+            llm_extractor._ollama_request("m", [{"role": "user", "content": "short"}],
+                                          llm_extractor.PAGE_FIELDS_SCHEMA)
+            llm_extractor._ollama_request("m", [{"role": "user", "content": "x" * 8000}],
+                                          llm_extractor.PRODUCT_ROWS_SCHEMA)
+        assert sent[0]["options"]["num_ctx"] == sent[1]["options"]["num_ctx"] == llm_extractor.OLLAMA_NUM_CTX
+
+
+class TestStats:
+    def test_record_stats_from_response_fields(self):
+        metrics.reset_metrics()
+        stats = ollama_backend.record_stats("gemma4:e4b", {
+            "total_duration": 5_000_000_000,
+            "load_duration": 1_500_000_000,
+            "prompt_eval_count": 2000,
+            "prompt_eval_duration": 1_000_000_000,
+            "eval_count": 100,
+            "eval_duration": 2_000_000_000,
+        })
+        assert stats == {
+            "load_seconds": 1.5, "total_seconds": 5.0,
+            "prompt_seconds": 1.0, "prompt_tokens": 2000, "completion_tokens": 100,
+            "prompt_tokens_per_s": 2000.0, "completion_tokens_per_s": 50.0,
+        }
+        assert metrics.OLLAMA_TOKENS.value(model="gemma4:e4b", kind="completion") == 100
+        assert "fivos_ollama_tokens_per_second_bucket" in metrics.render_latest()
+
+    def test_missing_fields_are_tolerated(self):
+        stats = ollama_backend.record_stats("m", {"message": {"content": "{}"}})
+        assert stats["completion_tokens_per_s"] is None
+        assert stats["load_seconds"] == 0.0
+
+
+class TestResidency:
+    def test_load_and_unload_use_keep_alive(self):
+        with patch.object(ollama_backend.requests, "post",
+                          return_value=_response({"load_duration": 2_000_000_000})) as post:
+            assert ollama_backend.load_model("http://h:11434/api/chat", "gemma4:e4b") == 2.0
+            assert ollama_backend.unload_model("http://h:11434/api/chat", "gemma4:e4b") is True
+
+        load, unload = post.call_args_list
+        assert load.args[0] == "http://h:11434/api/chat"
+        assert load.kwargs["json"] == {"model": "gemma4:e4b", "messages": [],
+                                       "keep_alive": ollama_backend.OLLAMA_KEEP_ALIVE}
+        assert unload.kwargs["json"]["keep_alive"] == 0
+
+    def test_loaded_models_reads_ps(self):
+        ps = {"models": [{"name": "gemma4:e4b", "size": 1, "size_vram": 1, "expires_at": "t", "digest": "d"}]}
+        with patch.object(ollama_backend.requests, "get", return_value=_response(ps)) as get:
+            assert ollama_backend.loaded_models(URL) == [
+                {"name": "gemma4:e4b", "size": 1, "size_vram": 1, "expires_at": "t"}]
+        assert get.call_args.args[0] == "http://localhost:11434/api/ps"
+
+    def test_load_failure_returns_none(self):
+        with patch.object(ollama_backend.requests, "post",
+                          side_effect=ollama_backend.requests.ConnectionError("down")):
+            assert ollama_backend.load_model(URL, "m") is None
+
+
+class TestWarmLocalModel:
+    @pytest.fixture(autouse=True)
+    def _enabled(self):
+        with llm_extractor._disabled_lock:
+            llm_extractor._disabled_models.clear()
+        yield
+        llm_replay.configure(mode="off")
+
+    def test_loads_the_chain_model(self):
+        with patch.object(ollama_backend, "load_model", return_value=1.0) as load:
+            assert llm_extractor.warm_local_model() == 1.0
+        load.assert_called_once_with(ollama_pool.endpoints()[0].url, "gemma4:e4b")
+
+    def test_skipped_when_replaying(self):
+        llm_replay.configure(mode="replay")
+        with patch.object(ollama_backend, "load_model") as load:
+            assert llm_extractor.warm_local_model() is None
+        load.assert_not_called()
@@ -0,0 +1,117 @@
+"""Ollama endpoint pool: parsing, least-outstanding balancing, ejection and re-admission."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from pipeline import llm_extractor, llm_stream, ollama_backend, ollama_pool
+from pipeline.ollama_pool import Endpoint, OllamaPool, parse_endpoints
+
+GPU1 = "http://gpu1:11434/api/chat"
+GPU2 = "http://gpu2:11434/api/chat"
+
+
+def test_parse_endpoints():
+    endpoints = parse_endpoints(f"{GPU1}*2, http://gpu2:11434 ,http://gpu3:11434/*3,", 1)
+    assert [(e.url, e.capacity) for e in endpoints] == [
+        (GPU1, 2), (GPU2, 1), ("http://gpu3:11434/api/chat", 3),
+    ]
+
+
+def test_empty_pool_is_an_error():
+    with pytest.raises(ValueError):
+        OllamaPool([])
+
+
+class TestBalancing:
+    def test_least_outstanding_for_its_cap(self):
+        pool = OllamaPool([Endpoint(GPU1, 2), Endpoint(GPU2, 1)])
+        picks = [pool.acquire() for _ in range(4)]
+        assert [e.url if e else None for e in picks] == [GPU1, GPU2, GPU1, None]
+        pool.release(picks[1])
+        assert pool.acquire().url == GPU2
+
+    def test_down_endpoint_is_skipped_by_the_others(self):
+        pool = OllamaPool([Endpoint(GPU1, 1), Endpoint(GPU2, 1)])
+        gpu1 = pool.acquire()
+        pool.release(gpu1)
+        pool.mark_down(gpu1)
+        assert pool.available()
+        assert pool.acquire().url == GPU2
+        assert pool.acquire() is None
+
+
+class TestReadmission:
+    def test_probe_readmits_after_the_retry_time(self):
+        pool = OllamaPool([Endpoint(GPU1, 1)])
+        endpoint = pool.endpoints[0]
+        pool.mark_down(endpoint)
+        assert not pool.available()
+        with patch.object(ollama_backend, "is_up") as is_up:
+            assert pool.acquire() is None
+        is_up.assert_not_called()
+
+        endpoint.retry_at = 0
+        with patch.object(ollama_backend, "is_up", return_value=True):
+            assert pool.acquire() is endpoint
+        assert endpoint.up
+
+    def test_failed_probe_doubles_the_wait(self):
+        pool = OllamaPool([Endpoint(GPU1, 1)])
+        endpoint = pool.endpoints[0]
+        pool.mark_down(endpoint)
+        endpoint.retry_at = 0
+        with patch.object(ollama_backend, "is_up", return_value=False):
+            assert pool.acquire() is None
+        assert endpoint.backoff == 2 * ollama_pool.OLLAMA_RETRY_SECONDS
+        assert not pool.available()
+
+    def test_check_health_probes_every_endpoint(self):
+        pool = OllamaPool([Endpoint(GPU1, 1), Endpoint(GPU2, 1)])
+        with patch.object(ollama_backend, "is_up", side_effect=lambda url: url == GPU2):
+            assert pool.check_health() == {GPU1: False, GPU2: True}
+        assert pool.acquire().url == GPU2
+
+
+def _ok(content):
+    response = MagicMock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = {"message": {"content": content}}
+    return response
+
+
+class TestChain:
+    @pytest.fixture(autouse=True)
+    def _two_servers(self):
+        ollama_pool.configure(f"{GPU1},{GPU2}")
+        with patch.object(llm_extractor, "MODEL_CHAIN", [{"provider": "ollama", "model": "gemma4:e4b"}]), \
+             patch.object(llm_stream, "STREAM_PROVIDERS", frozenset()):
+            yield
+
+    def test_reconfigured_capacity_is_usable(self):
+        ollama_pool.configure(f"{GPU1}*3")
+        held = [ollama_pool.acquire(), ollama_pool.acquire()]
+        with patch.object(llm_extractor.requests, "post", return_value=_ok('{"device_name": "Stent"}')):
+            assert llm_extractor._llm_request("s", "u", {}, timeout=5) == {"device_name": "Stent"}
+        for endpoint in held:
+            ollama_pool.release(endpoint)
+        assert ollama_pool.endpoints()[0].inflight == 0
+
+    def test_refused_endpoint_leaves_the_provider_enabled(self):
+        def post(url, json, **kwargs):
+            if url == GPU1:
+                raise requests.ConnectionError("refused")
+            return _ok('{"device_name": "Stent"}')
+
+        with patch.object(llm_extractor.requests, "post", side_effect=post) as sent:
+            assert llm_extractor._llm_request("s", "u", {}, timeout=5) is None
+            assert llm_extractor._llm_request("s", "u", {}, timeout=5) == {"device_name": "Stent"}
+        assert [c.args[0] for c in sent.call_args_list] == [GPU1, GPU2]
+        assert not llm_extractor._is_disabled("ollama")
+        assert [e.up for e in ollama_pool.endpoints()] == [False, True]
+
+    def test_warm_loads_every_endpoint_in_rotation(self):
+        ollama_pool.mark_down(ollama_pool.endpoints()[0])
+        with patch.object(ollama_backend, "load_model", return_value=2.5) as load:
+            assert llm_extractor.warm_local_model() == 2.5
+        load.assert_called_once_with(GPU2, "gemma4:e4b")
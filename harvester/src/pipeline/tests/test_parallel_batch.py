@@ -146,3 +146,38 @@ def test_worker_receives_harvest_run_id():
         )
 
     assert received_ids == ["HR-EXPECTED"] * 3
+
+
+def test_results_carry_per_file_timings():
+    from pipeline.tracing import span
+
+    def fake_worker(path, source_url=None, harvest_run_id=None):
+        with span("llm.page_fields"):
+            pass
+        return [{"device_name": f"D-{path}"}]
+
+    with patch("pipeline.runner._process_single_ollama", side_effect=fake_worker):
+        results = process_html_files_parallel(["a.html", "b.html"], harvest_run_id="hr-test")
+
+    for r in results:
+        assert set(r.timings) == {"llm.page_fields", "extract.total"}
+
+
+def test_raising_progress_callback_cancels_pending_files():
+    started = []
+
+    def fake_worker(path, source_url=None, harvest_run_id=None):
+        started.append(path)
+        time.sleep(0.02)
+        return []
+
+    def stop(completed, total):
+        raise RuntimeError("cancelled")
+
+    paths = [f"f{i}.html" for i in range(40)]
+    with patch("pipeline.runner._process_single_ollama", side_effect=fake_worker):
+        try:
+            process_html_files_parallel(paths, harvest_run_id="hr-test", progress_callback=stop)
+        except RuntimeError:
+            pass
+    assert len(started) < len(paths)
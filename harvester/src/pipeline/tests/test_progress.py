@@ -0,0 +1,174 @@
+"""Tests for the progress hub and the per-run harvest tracker."""
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from pipeline.parallel_batch import process_html_files_parallel
+from pipeline.progress import (
+    HarvestProgress,
+    ProgressHub,
+    note_model_result,
+    track,
+)
+
+
+class TestProgressHub:
+    def test_latest_value_per_channel(self):
+        hub = ProgressHub()
+        assert hub.latest("job-1") == (0, None)
+        hub.publish("job-1", {"n": 1})
+        hub.publish("job-1", {"n": 2})
+        assert hub.latest("job-1") == (2, {"n": 2})
+        assert hub.latest("job-2") == (0, None)
+
+    def test_oldest_channels_evicted(self):
+        hub = ProgressHub(max_channels=2)
+        for i in range(3):
+            hub.publish(f"job-{i}", {"n": i})
+        assert hub.latest("job-0") == (0, None)
+        assert hub.latest("job-2")[1] == {"n": 2}
+
+    def test_publish_from_thread_wakes_async_subscriber(self):
+        hub = ProgressHub()
+
+        async def scenario():
+            sub = hub.subscribe("job-1")
+            threading.Timer(0.05, hub.publish, args=("job-1", {"n": 1})).start()
+            woke = await sub.wait(2.0)
+            sub.close()
+            return woke, sub.latest()
+
+        woke, latest = asyncio.run(scenario())
+        assert woke is True
+        assert latest == (1, {"n": 1})
+
+    def test_wait_times_out_without_publish(self):
+        hub = ProgressHub()
+
+        async def scenario():
+            sub = hub.subscribe("job-1")
+            try:
+                return await sub.wait(0.01)
+            finally:
+                sub.close()
+
+        assert asyncio.run(scenario()) is False
+
+    def test_publish_without_subscribers_never_blocks(self):
+        hub = ProgressHub()
+        sub = hub.subscribe("job-1")
+        sub.close()
+        for i in range(1000):
+            hub.publish("job-1", {"n": i})
+        assert hub.latest("job-1")[0] == 1000
+
+
+class TestHarvestProgress:
+    def test_snapshot_counts_stages_and_models(self):
+        hub = ProgressHub()
+        progress = HarvestProgress("job-1", hub=hub)
+        progress.begin_stage("extract", 3)
+        progress.item_done("extract", "https://x/a", True)
+        progress.item_done("extract", "https://x/b", False)
+        progress.model_result("gemma4:e4b", True)
+        progress.model_result("gemma4:e4b", False)
+        progress.model_result("llama-3.1-8b-instant", True)
+
+        snap = hub.latest("job-1")[1]
+        assert snap["stage"] == "extract"
+        assert snap["stages"]["extract"] == {"done": 1, "failed": 1, "total": 3}
+        assert snap["current_url"] == "https://x/b"
+        assert snap["models"]["gemma4:e4b"] == {"success": 1, "failure": 1, "success_rate": 0.5}
+        assert snap["models"]["llama-3.1-8b-instant"]["success_rate"] == 1.0
+        assert (snap["progress"], snap["total"]) == (2, 3)
+
+    def test_job_store_writes_are_throttled(self):
+        writes = []
+
+        class Store:
+            def __setitem__(self, job_id, value):
+                writes.append((job_id, value))
+
+        progress = HarvestProgress("job-1", job_store=Store(), job_id="job-1",
+                                   hub=ProgressHub(), store_interval=60)
+        progress.begin_stage("extract", 10)
+        for i in range(10):
+            progress.item_done("extract", f"https://x/{i}", True)
+        progress.finish()
+        # Stage transitions are forced through; per-item updates are not
+        assert len(writes) == 2
+        assert writes[-1][1]["result"]["stage"] == "done"
+
+    def test_worker_notes_never_write_to_the_store(self):
+        writes = []
+
+        class Store:
+            def __setitem__(self, job_id, value):
+                writes.append(value)
+
+        progress = HarvestProgress("job-1", job_store=Store(), job_id="job-1",
+                                   hub=ProgressHub(), store_interval=0)
+        progress.file_started("https://x/a")
+        progress.model_result("gemma4:e4b", True)
+        assert writes == []
+        progress.item_done("extract", "https://x/a", True)
+        assert writes[-1]["result"]["models"]["gemma4:e4b"]["success"] == 1
+
+    def test_concurrent_items_write_once_per_interval(self):
+        import threading
+
+        writes = []
+        barrier = threading.Barrier(8)
+
+        class Store:
+            def __setitem__(self, job_id, value):
+                writes.append(value)
+
+        progress = HarvestProgress("job-1", job_store=Store(), job_id="job-1",
+                                   hub=ProgressHub(), store_interval=60)
+
+        def done(i):
+            barrier.wait()
+            progress.item_done("extract", f"https://x/{i}", True)
+
+        threads = [threading.Thread(target=done, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(writes) == 1
+
+    def test_store_errors_propagate(self):
+        class CancelledStore:
+            def __setitem__(self, job_id, value):
+                raise RuntimeError("cancelled")
+
+        progress = HarvestProgress("job-1", job_store=CancelledStore(), job_id="job-1",
+                                   hub=ProgressHub())
+        with pytest.raises(RuntimeError):
+            progress.begin_stage("scrape", 1)
+
+    def test_note_is_noop_without_tracker(self):
+        note_model_result("gemma4:e4b", True)  # must not raise
+
+    def test_parallel_workers_report_to_callers_tracker(self):
+        hub = ProgressHub()
+        progress = HarvestProgress("job-1", hub=hub)
+
+        def fake_worker(path, source_url=None, harvest_run_id=None):
+            note_model_result("gemma4:e4b", path != "bad.html")
+            return [{"device_name": path}]
+
+        with patch("pipeline.runner._process_single_ollama", side_effect=fake_worker), \
+             track(progress):
+            process_html_files_parallel(
+                ["a.html", "b.html", "bad.html"],
+                harvest_run_id="hr-test",
+                source_urls={"a.html": "https://x/a"},
+            )
+
+        models = hub.latest("job-1")[1]["models"]
+        assert models["gemma4:e4b"]["success"] == 2
+        assert models["gemma4:e4b"]["failure"] == 1
@@ -0,0 +1,86 @@
+"""Prompt template registry and the static-prefix layout."""
+from unittest.mock import patch
+
+import pytest
+
+from pipeline import llm_extractor, llm_replay, prompts
+from pipeline.prompts import PromptTemplate
+
+
+@pytest.fixture
+def pins():
+    saved = dict(prompts._pinned)
+    yield
+    prompts._pinned.clear()
+    prompts._pinned.update(saved)
+
+
+class TestRegistry:
+    def test_newest_version_by_default(self, pins):
+        prompts._pinned.clear()
+        assert prompts.active_versions() == {"description": 2, "page_fields": 2, "product_rows": 2}
+
+    def test_pin_and_unpin(self, pins):
+        prompts.pin("page_fields", 1)
+        assert prompts.get("page_fields").version == 1
+        prompts.pin("page_fields", None)
+        assert prompts.get("page_fields").version == 2
+
+    def test_unknown_name_or_version(self):
+        with pytest.raises(KeyError):
+            prompts.get("summary")
+        with pytest.raises(KeyError):
+            prompts.get("page_fields", 9)
+
+    def test_register_new_version(self, pins):
+        template = PromptTemplate("page_fields", 3, "sys", "Page text:\n{visible_text}")
+        prompts.register(template)
+        try:
+            assert prompts.get("page_fields") is template
+            with pytest.raises(ValueError):
+                prompts.register(template)
+        finally:
+            del prompts._templates["page_fields"][3]
+
+    def test_env_pins(self, pins, monkeypatch):
+        monkeypatch.setenv("LLM_PROMPT_VERSIONS", "page_fields:1, product_rows:1")
+        prompts._pin_from_env()
+        assert prompts.active_versions() == {"description": 2, "page_fields": 1, "product_rows": 1}
+
+
+class TestLayout:
+    FIELDS = {"device_name": "Zilver", "manufacturer": "Cook", "model_number": "Z-1",
+              "visible_text": "Zilver PTX drug-eluting stent", "table_text": "ZISV6-35"}
+
+    @pytest.mark.parametrize("name", ["description", "page_fields", "product_rows"])
+    def test_static_prefix_holds_all_instructions(self, name):
+        _, v1_user = prompts.get(name, 1).render(**self.FIELDS)
+        system, user = prompts.get(name, 2).render(**self.FIELDS)
+        # Same instructions; only the per-call values stay in the user message
+        for paragraph in system.split("\n\n"):
+            assert paragraph in v1_user
+        assert user.endswith(self.FIELDS["table_text" if name == "product_rows" else "visible_text"])
+        assert "Zilver" not in system
+
+    def test_system_message_is_identical_across_pages(self):
+        a = prompts.get("page_fields").render(visible_text="page one")
+        b = prompts.get("page_fields").render(visible_text="page two")
+        assert a[0] == b[0]
+        assert a[1] != b[1]
+
+    def test_version_1_is_byte_stable(self):
+        """Replay logs recorded before version 2 are keyed by this exact layout."""
+        system, user = prompts.get("page_fields", 1).render(visible_text="X")
+        key = llm_replay.request_key([{"role": "system", "content": system}, {"role": "user", "content": user}],
+                                     llm_extractor.PAGE_FIELDS_SCHEMA)
+        assert key == "f249e11f0469ec415dc54f97eda875b88ac99100470c17532120cb9205bea9e2"
+
+
+def test_extractor_sends_the_active_template(pins):
+    prompts._pinned.clear()
+    with patch.object(llm_extractor, "_llm_request", return_value={"products": []}) as request:
+        llm_extractor.extract_product_rows("ZISV6-35 6 mm", device_name="Zilver")
+    system, user, schema = request.call_args.args
+    assert system == prompts.get("product_rows").system
+    assert user == "The device is: Zilver\n\nTable/specs text:\nZISV6-35 6 mm"
+    assert schema is llm_extractor.PRODUCT_ROWS_SCHEMA
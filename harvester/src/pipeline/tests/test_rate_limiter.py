@@ -0,0 +1,154 @@
+"""Cloud rate limiting: token buckets, header-driven holds and the chain's use of them."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from pipeline import llm_extractor, metrics, rate_limiter
+from pipeline.rate_limiter import RateLimiter, TokenBucket, parse_duration
+
+GROQ_CHAIN = [
+    {"provider": "groq", "model": "llama-3.3-70b-versatile", "env_key": "GROQ_API_KEY"},
+    {"provider": "groq", "model": "llama-3.1-8b-instant", "env_key": "GROQ_API_KEY"},
+]
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("7.66s", 7.66), ("2m59.5s", 179.5), ("1h2m3s", 3723), ("120ms", 0.12), ("30", 30.0), ("soon", None),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == (pytest.approx(seconds) if seconds is not None else None)
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    bucket.updated = 0.0
+    assert bucket.take(0.0) == 0.0
+    assert bucket.take(0.0) == 0.0
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0.0
+
+
+class TestObserve:
+    def test_exhausted_remaining_holds_until_reset(self):
+        limiter = RateLimiter({})
+        wait = limiter.observe("m", {"X-RateLimit-Remaining-Requests": "0", "X-RateLimit-Reset-Requests": "2m",
+                                     "x-ratelimit-remaining-tokens": "5000", "x-ratelimit-reset-tokens": "1s"})
+        assert wait == 120
+        assert limiter.reserve("groq", "m") == pytest.approx(120, abs=1)
+
+    def test_429_prefers_retry_after_then_message_hint(self):
+        limiter = RateLimiter({})
+        assert limiter.observe("a", {"retry-after": "3"}, 429, "Please try again in 9s") == 3
+        assert limiter.observe("b", {}, 429, "Please try again in 1m26.4s.") == pytest.approx(86.4)
+        assert limiter.observe("c", {}, 429, "slow down") == rate_limiter._DEFAULT_HOLD_SECONDS
+
+    def test_ordinary_response_sets_no_hold(self):
+        limiter = RateLimiter({})
+        assert limiter.observe("m", {"x-ratelimit-remaining-requests": "14"}) == 0
+        assert limiter.held_for("m") == 0
+
+
+def _http_error(status: int, headers: dict, message: str) -> requests.HTTPError:
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers
+    response.json.return_value = {"error": {"message": message}}
+    response.raise_for_status.side_effect = requests.HTTPError(response=response)
+    return response
+
+
+class TestOpenAIRequest:
+    @pytest.fixture(autouse=True)
+    def _fresh(self):
+        rate_limiter.configure()
+        yield
+        rate_limiter.configure()
+        with llm_extractor._disabled_lock:
+            llm_extractor._disabled_models.clear()
+            llm_extractor._disabled_until.clear()
+
+    def test_short_429_holds_without_sleeping(self):
+        response = _http_error(429, {"retry-after": "2"}, "Rate limit reached. Please try again in 2s")
+        with patch.object(llm_extractor.requests, "post", return_value=response) as post, \
+             patch.object(llm_extractor.time, "sleep") as sleep:
+            assert llm_extractor._openai_request("u", "k", "m", [], provider="groq") is None
+        post.assert_called_once()
+        sleep.assert_not_called()
+        assert 0 < rate_limiter.held_for("m") <= 2
+        assert not llm_extractor._is_disabled("m")
+
+    def test_daily_quota_disables_until_reset(self):
+        response = _http_error(429, {}, "Rate limit reached on requests per day (RPD). Please try again in 7m12s")
+        with patch.object(llm_extractor.requests, "post", return_value=response):
+            llm_extractor._openai_request("u", "k", "m", [], provider="groq")
+        assert llm_extractor._is_disabled("m")
+
+        with patch.object(llm_extractor.time, "monotonic", return_value=llm_extractor._disabled_until["m"] + 1):
+            assert not llm_extractor._is_disabled("m")
+        assert "m" not in llm_extractor._disabled_models
+
+
+class TestChain:
+    @pytest.fixture(autouse=True)
+    def _groq_only(self):
+        rate_limiter.configure({"groq": 6000, "nvidia": 6000})
+        with llm_extractor._disabled_lock:
+            llm_extractor._disabled_models.clear()
+        with patch.object(llm_extractor, "MODEL_CHAIN", GROQ_CHAIN), \
+             patch.dict("os.environ", {"GROQ_API_KEY": "k"}):
+            yield
+        rate_limiter.configure()
+
+    def test_held_model_is_skipped_for_the_next(self):
+        rate_limiter._limiter.hold("llama-3.3-70b-versatile", 30)
+        with patch.object(llm_extractor, "_openai_request", return_value={"device_name": "X"}) as request:
+            assert llm_extractor._llm_request("s", "u", {}) == {"device_name": "X"}
+        assert request.call_args.args[2] == "llama-3.1-8b-instant"
+
+    def test_waits_outside_the_slot_when_everything_is_held(self):
+        metrics.reset_metrics()
+        rate_limiter._limiter.hold("llama-3.3-70b-versatile", 0.05)
+        rate_limiter._limiter.hold("llama-3.1-8b-instant", 0.2)
+        slots = []
+        real_sleep = llm_extractor.time.sleep
+
+        def sleep(seconds):
+            slots.append(llm_extractor._provider_sems["groq"]._value)
+            real_sleep(seconds)
+
+        with patch.object(llm_extractor, "_openai_request", return_value={"device_name": "X"}) as request, \
+             patch.object(llm_extractor.time, "sleep", side_effect=sleep):
+            assert llm_extractor._llm_request("s", "u", {}, timeout=5) == {"device_name": "X"}
+        assert slots == [llm_extractor.GROQ_CONCURRENCY]
+        assert request.call_args.args[2] == "llama-3.3-70b-versatile"
+        assert metrics.LLM_RATE_LIMITED.value(provider="groq", action="deferred") == 2
+
+    def test_throttled_model_is_retried_after_its_hold(self):
+        calls = []
+
+        def request(url, api_key, model, messages, timeout, schema=None, provider=None):
+            calls.append(model)
+            if len(calls) <= 2:
+                rate_limiter._limiter.hold(model, 0.05)
+                return None
+            return {"device_name": model}
+
+        with patch.object(llm_extractor, "_openai_request", side_effect=request):
+            result = llm_extractor._llm_request("s", "u", {}, timeout=5)
+        assert calls == ["llama-3.3-70b-versatile", "llama-3.1-8b-instant", "llama-3.3-70b-versatile"]
+        assert result == {"device_name": "llama-3.3-70b-versatile"}
+
+    def test_gives_up_when_the_wait_exceeds_the_timeout(self):
+        rate_limiter._limiter.hold("llama-3.3-70b-versatile", 30)
+        rate_limiter._limiter.hold("llama-3.1-8b-instant", 30)
+        with patch.object(llm_extractor, "_openai_request") as request, \
+             patch.object(llm_extractor.time, "sleep") as sleep:
+            assert llm_extractor._llm_request("s", "u", {}, timeout=5) is None
+        request.assert_not_called()
+        sleep.assert_not_called()
+
+    def test_failed_model_is_not_retried(self):
+        with patch.object(llm_extractor, "_openai_request", return_value=None) as request:
+            assert llm_extractor._llm_request("s", "u", {}, timeout=5) is None
+        assert request.call_count == 2
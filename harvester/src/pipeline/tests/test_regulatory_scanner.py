@@ -0,0 +1,71 @@
+"""Fuzz and pathological-input tests for the single-pass regulatory scanner.
+
+The reference below is the original multi-pass loop (each field's pattern
+list searched independently); the scanner must agree with it on every
+generated text and stay fast on inputs built to trigger backtracking.
+"""
+import random
+import time
+
+import pytest
+
+from pipeline.regulatory_parser import _FIELD_PATTERNS, parse_regulatory_from_text
+
+_FRAGMENTS = [
+    "single use", "single-use", "single patient use", "disposable", "do not reuse",
+    "must not be reused", "Federal (USA) law restricts this device to sale by or on the order of a physician",
+    "federal law", "restricts", "practitioner", "Prescription use only", "Rx only", "rx  ONLY",
+    "supplied sterile", "Contents are sterile", "contents are", "sterile packaging", "provided sterile",
+    "contains natural rubber latex", "not made with natural rubber latex", "made with natural rubber latex",
+    "contains latex", "latex-free", "does not contain natural rubber latex",
+    "sterilize before use", "must be sterilized", "requires sterilization",
+    "over-the-counter", "OTC", "otc", "without a prescription",
+    "The catheter", "is indicated for", "PTA of the femoral artery.", "Caution:", "\n", ".", ",",
+]
+
+
+def _reference(text):
+    if not text or not text.strip():
+        return {}
+    result = {}
+    for field, patterns in _FIELD_PATTERNS.items():
+        if any(p.search(text) for p in patterns):
+            result[field] = True
+    return result
+
+
+def test_fuzz_matches_multipass_reference():
+    rng = random.Random(20260419)
+    for _ in range(2000):
+        text = " ".join(rng.choice(_FRAGMENTS) for _ in range(rng.randint(1, 25)))
+        assert parse_regulatory_from_text(text) == _reference(text), text
+
+
+def test_long_verbatim_ifu_text_matches_reference():
+    rng = random.Random(7)
+    text = " ".join(rng.choice(_FRAGMENTS) for _ in range(20_000))
+    assert parse_regulatory_from_text(text) == _reference(text)
+
+
+def test_key_order_matches_historical_order():
+    text = "OTC. Latex-free. Rx only. Single use."
+    assert list(parse_regulatory_from_text(text)) == ["singleUse", "rx", "labeledNoNRL", "otc"]
+
+
+@pytest.mark.parametrize("text", [
+    "Federal law " * 20_000,
+    "Federal law restricts " * 20_000,
+    "contents are " * 20_000,
+    "federal law" + " x" * 100_000 + " restricts" + " y" * 100_000,
+], ids=["repeated-law", "repeated-restricts", "repeated-contents", "long-gaps"])
+def test_pathological_inputs_stay_fast(text):
+    start = time.perf_counter()
+    parse_regulatory_from_text(text)
+    assert time.perf_counter() - start < 2.0
+
+
+def test_span_is_bounded():
+    far = "Federal law" + " filler" * 100 + " restricts sale to a physician."
+    near = "Federal law restricts sale to a physician."
+    assert "rx" not in parse_regulatory_from_text(far)
+    assert parse_regulatory_from_text(near)["rx"] is True
@@ -219,3 +219,48 @@ class TestProcessBatchOllama:
         assert summary["processed"] == 1
         assert summary["succeeded"] == 3
         assert summary["ollama_extracted"] == 3
+
+
+class TestProcessSingleOllamaInMemory:
+    def test_raw_html_is_used_instead_of_reading_the_path(self):
+        """Archive members have no file on disk; the name only labels the page."""
+        from pipeline.runner import _process_single_ollama
+
+        with patch("pipeline.llm_extractor.extract_all_fields", return_value=[]) as extract:
+            assert _process_single_ollama("pages.tar/a.html", raw_html="<html><body>Stent</body></html>") == []
+        assert extract.call_args.args[0] == "Stent"
+
+
+class TestWriteRecordsToDb:
+    def _records(self, tmp_path, n):
+        paths = []
+        for i in range(n):
+            path = tmp_path / f"r{i}.json"
+            path.write_text(f'{{"brandName": "B{i}"}}', encoding="utf-8")
+            paths.append(str(path))
+        return paths
+
+    def test_inserts_update_dashboard_counters(self, tmp_path):
+        from unittest.mock import MagicMock
+        from pipeline.runner import write_records_to_db
+
+        db = MagicMock()
+        with patch("database.db_connection.get_db", return_value=db), \
+             patch("database.dashboard_stats.record_devices_inserted") as record, \
+             patch("database.dashboard_stats.rebuild_stats") as rebuild:
+            assert write_records_to_db(self._records(tmp_path, 2)) == 2
+        assert [r["brandName"] for r in record.call_args.args[1]] == ["B0", "B1"]
+        rebuild.assert_not_called()
+
+    def test_overwrite_rebuilds_dashboard_counters(self, tmp_path):
+        from unittest.mock import MagicMock
+        from pipeline.runner import write_records_to_db
+
+        db = MagicMock()
+        with patch("database.db_connection.get_db", return_value=db), \
+             patch("database.dashboard_stats.record_devices_inserted") as record, \
+             patch("database.dashboard_stats.rebuild_stats") as rebuild:
+            assert write_records_to_db(self._records(tmp_path, 1), overwrite=True) == 1
+        db["devices"].drop.assert_called_once()
+        rebuild.assert_called_once_with(db)
+        record.assert_not_called()
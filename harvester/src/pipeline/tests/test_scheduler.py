@@ -0,0 +1,157 @@
+"""Priority lanes: reserved interactive slots, ordering, aging and the LLM/browser gates."""
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from pipeline import llm_extractor, metrics, scheduler
+from pipeline.scheduler import BULK, INTERACTIVE, PriorityScheduler, work_class
+
+
+@pytest.fixture(autouse=True)
+def _registry():
+    saved = dict(scheduler._schedulers)
+    yield
+    scheduler._schedulers.clear()
+    scheduler._schedulers.update(saved)
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _queue(sched, cls, granted: list):
+    """Start a thread waiting for a *cls* slot; it appends *cls* to *granted* once admitted."""
+    def wait():
+        sched.acquire(cls)
+        granted.append(cls)
+
+    before = sched.queue_depth()[cls]
+    thread = threading.Thread(target=wait, daemon=True)
+    thread.start()
+    _wait_for(lambda: sched.queue_depth()[cls] > before)
+    return thread
+
+
+def test_work_class_is_scoped():
+    assert scheduler.current_class() == BULK
+    with work_class(INTERACTIVE):
+        assert scheduler.current_class() == INTERACTIVE
+    assert scheduler.current_class() == BULK
+    with pytest.raises(ValueError):
+        with work_class("urgent"):
+            pass
+
+
+class TestSlots:
+    def test_reserved_slot_is_interactive_only(self):
+        sched = PriorityScheduler("test", bulk_slots=1, reserved=1)
+        assert sched.acquire(BULK)
+        assert not sched.acquire(BULK, timeout=0.02)
+        assert sched.acquire(INTERACTIVE, timeout=0.02)
+        assert sched.active() == {INTERACTIVE: 1, BULK: 1}
+        assert sched.queue_depth() == {INTERACTIVE: 0, BULK: 0}
+
+    def test_interactive_goes_first(self):
+        sched = PriorityScheduler("test", bulk_slots=1, reserved=0)
+        sched.acquire(BULK)
+        granted = []
+        threads = [_queue(sched, BULK, granted), _queue(sched, INTERACTIVE, granted)]
+        sched.release(BULK)
+        _wait_for(lambda: granted)
+        sched.release(granted[0])
+        _wait_for(lambda: len(granted) == 2)
+        assert granted == [INTERACTIVE, BULK]
+        for t in threads:
+            t.join()
+
+    def test_aged_bulk_work_is_not_starved(self):
+        sched = PriorityScheduler("test", bulk_slots=1, reserved=0, aging_seconds=0)
+        sched.acquire(BULK)
+        granted = []
+        threads = [_queue(sched, BULK, granted), _queue(sched, INTERACTIVE, granted)]
+        sched.release(BULK)
+        _wait_for(lambda: granted)
+        assert granted == [BULK]
+        sched.release(BULK)
+        for t in threads:
+            t.join()
+
+    def test_aged_bulk_work_still_leaves_the_reserve(self):
+        sched = PriorityScheduler("test", bulk_slots=1, reserved=1, aging_seconds=0)
+        sched.acquire(BULK)
+        assert not sched.acquire(BULK, timeout=0.02)
+        assert sched.queue_depth()[BULK] == 0
+
+    def test_queue_depth_is_exported(self):
+        sched = PriorityScheduler("test_export", bulk_slots=1, reserved=0)
+        sched.acquire(BULK)
+        thread = _queue(sched, BULK, [])
+        text = metrics.render_latest()
+        assert 'fivos_scheduler_queue_depth{resource="test_export",work_class="bulk"} 1' in text
+        assert 'fivos_scheduler_active{resource="test_export",work_class="bulk"} 1' in text
+        sched.release(BULK)
+        thread.join()
+        assert scheduler.queue_depths()["test_export"] == {INTERACTIVE: 0, BULK: 0}
+
+
+class TestAsync:
+    def test_slot_granted_from_another_thread_wakes_the_loop(self):
+        sched = PriorityScheduler("test", bulk_slots=1, reserved=0)
+        sched.acquire(BULK)
+        threading.Timer(0.05, sched.release, args=(BULK,)).start()
+
+        async def fetch():
+            async with sched.slot_async(BULK):
+                return sched.active()[BULK]
+
+        assert asyncio.run(fetch()) == 1
+        assert sched.active()[BULK] == 0
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        sched = PriorityScheduler("test", bulk_slots=1, reserved=0)
+        sched.acquire(BULK)
+
+        async def give_up():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(sched.acquire_async(BULK), 0.02)
+
+        asyncio.run(give_up())
+        assert sched.queue_depth()[BULK] == 0
+        sched.release(BULK)
+        assert sched.acquire(BULK, timeout=0)
+
+
+class TestGates:
+    def test_interactive_llm_request_uses_the_reserve(self):
+        sched = PriorityScheduler("llm_test", bulk_slots=1, reserved=1)
+        sched.acquire(BULK)
+        with patch.object(llm_extractor, "_llm_scheduler", sched), \
+             patch.object(llm_extractor, "_walk_chain", return_value=({"device_name": "X"}, None)):
+            with work_class(INTERACTIVE):
+                assert llm_extractor._llm_request("s", "u", {}, timeout=5) == {"device_name": "X"}
+        assert sched.active() == {INTERACTIVE: 0, BULK: 1}
+
+    def test_browser_fetch_holds_a_scrape_slot(self):
+        from web_scraper import scraper
+
+        sched = PriorityScheduler("scrape_test", bulk_slots=1, reserved=1)
+        sched.acquire(BULK)
+        engine = scraper.BrowserEngine(rate_limit_delay_s=0)
+        held = []
+
+        async def fetch(url):
+            held.append(sched.active())
+            return scraper.FetchResult(url=url, ok=True, elapsed_ms=1)
+
+        with patch.object(scraper, "_scrape_scheduler", sched), \
+             patch.object(engine, "_fetch_with_retries", AsyncMock(side_effect=fetch)):
+            with work_class(INTERACTIVE):
+                assert asyncio.run(engine.fetch("https://example.com")).ok
+        assert held == [{INTERACTIVE: 1, BULK: 1}]
+        assert sched.active() == {INTERACTIVE: 0, BULK: 1}
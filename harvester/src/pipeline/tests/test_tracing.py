@@ -0,0 +1,83 @@
+"""Unit tests for per-stage timing spans and run-level aggregation."""
+import threading
+from unittest.mock import patch
+
+from pipeline.tracing import StageTimings, record_stages, span, summarize_timings
+
+
+def test_span_without_recorder_is_a_noop():
+    with span("orphan"):
+        pass
+
+
+def test_span_records_into_active_recorder():
+    with record_stages() as timings:
+        with span("extract.parse"):
+            pass
+        with span("extract.parse"):
+            pass
+    assert set(timings.as_dict()) == {"extract.parse"}
+    assert timings.counts() == {"extract.parse": 2}
+
+
+def test_span_records_even_when_body_raises():
+    with record_stages() as timings:
+        try:
+            with span("llm.request.ollama"):
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+    assert "llm.request.ollama" in timings.as_dict()
+
+
+def test_span_uses_monotonic_clock():
+    with patch("pipeline.tracing.time.monotonic", side_effect=[10.0, 12.5]):
+        with record_stages() as timings:
+            with span("scrape.fetch"):
+                pass
+    assert timings.as_dict() == {"scrape.fetch": 2.5}
+
+
+def test_recorders_are_isolated_per_thread():
+    seen = {}
+
+    def worker(name):
+        with record_stages() as timings:
+            with span(name):
+                pass
+        seen[name] = set(timings.as_dict())
+
+    threads = [threading.Thread(target=worker, args=(f"s{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert seen == {f"s{i}": {f"s{i}"} for i in range(4)}
+
+
+def test_explicit_recorder_is_reused():
+    shared = StageTimings()
+    with record_stages(shared):
+        with span("phase.scrape"):
+            pass
+    with record_stages(shared):
+        with span("phase.persist"):
+            pass
+    assert set(shared.as_dict()) == {"phase.scrape", "phase.persist"}
+
+
+def test_summarize_timings_percentiles():
+    per_file = [{"llm.page_fields": float(s)} for s in range(1, 21)]
+    per_file.append({"write_json": 0.01})
+    summary = summarize_timings(per_file)
+    stage = summary["llm.page_fields"]
+    assert stage["count"] == 20
+    assert stage["total"] == 210.0
+    assert stage["p50"] == 10.0
+    assert stage["p95"] == 19.0
+    assert stage["max"] == 20.0
+    assert summary["write_json"]["count"] == 1
+
+
+def test_summarize_timings_skips_empty_breakdowns():
+    assert summarize_timings([{}, None]) == {}
@@ -0,0 +1,110 @@
+"""Lightweight per-stage timing for the harvest pipeline.
+
+Code marks a stage with ``with span("llm.page_fields"):``. Elapsed
+monotonic time is added to whichever ``StageTimings`` recorder is active in
+the current context (set by ``record_stages()``); with no recorder active a
+span costs two clock reads. Recorders live in a ContextVar, so each
+extraction worker thread gets its own breakdown, and asyncio tasks started
+under a recorder (the Playwright scrape) report into it.
+
+When ``FIVOS_OTEL_TRACING=true`` and the ``opentelemetry`` package is
+installed, every span is also exported as an OpenTelemetry span.
+"""
+import contextvars
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from opentelemetry import trace as _otel_trace
+except ImportError:  # optional dependency
+    _otel_trace = None
+
+_OTEL_ENABLED = os.getenv("FIVOS_OTEL_TRACING", "false").lower() == "true"
+_tracer = _otel_trace.get_tracer("fivos.harvester") if (_otel_trace and _OTEL_ENABLED) else None
+
+_recorder: contextvars.ContextVar["StageTimings | None"] = contextvars.ContextVar(
+    "stage_timings", default=None,
+)
+
+
+class StageTimings:
+    """Accumulated seconds per stage name. Safe to share across threads/tasks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seconds: dict[str, float] = {}
+        self._counts: dict[str, int] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._seconds[stage] = self._seconds.get(stage, 0.0) + seconds
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    def as_dict(self) -> dict[str, float]:
+        """{stage: total seconds}, rounded to the millisecond."""
+        with self._lock:
+            return {stage: round(s, 3) for stage, s in self._seconds.items()}
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+@contextmanager
+def record_stages(recorder: StageTimings | None = None):
+    """Make *recorder* (or a new one) the active recorder for this context."""
+    recorder = recorder if recorder is not None else StageTimings()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a pipeline stage; report it to the active recorder (and OTel)."""
+    otel_cm = _tracer.start_as_current_span(name, attributes=attributes) if _tracer else None
+    if otel_cm is not None:
+        otel_cm.__enter__()
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        elapsed = time.monotonic() - start
+        recorder = _recorder.get()
+        if recorder is not None:
+            recorder.add(name, elapsed)
+        if otel_cm is not None:
+            otel_cm.__exit__(None, None, None)
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already-sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_timings(per_item: list[dict[str, float]]) -> dict[str, dict]:
+    """Aggregate per-file breakdowns into per-stage count/total/p50/p95/max."""
+    by_stage: dict[str, list[float]] = {}
+    for timings in per_item:
+        for stage, seconds in (timings or {}).items():
+            by_stage.setdefault(stage, []).append(seconds)
+
+    summary = {}
+    for stage, values in sorted(by_stage.items()):
+        values.sort()
+        summary[stage] = {
+            "count": len(values),
+            "total": round(sum(values), 3),
+            "p50": round(_percentile(values, 50), 3),
+            "p95": round(_percentile(values, 95), 3),
+            "max": round(values[-1], 3),
+        }
+    return summary
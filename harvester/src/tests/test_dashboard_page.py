@@ -0,0 +1,164 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from unittest.mock import patch, MagicMock
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+
+def _db(collections):
+    mock_db = MagicMock()
+    mock_db.__getitem__ = MagicMock(side_effect=lambda key: collections.setdefault(key, MagicMock()))
+    return mock_db
+
+
+def _validation(status, ts, **extra):
+    return {"_id": ObjectId(), "status": status, "brandName": "Brand", "device_id": ObjectId(),
+            "updated_at": ts, "sort_key": ts, "matched_fields": 3, "total_fields": 5,
+            "match_percent": 60.0, "weighted_percent": 70.0, **extra}
+
+
+class TestDashboardCursor:
+    def test_round_trip_keeps_bson_types(self):
+        from orchestrator import decode_dashboard_cursor, encode_dashboard_cursor
+        ts = datetime(2026, 5, 1, 12, 30)
+        oid = ObjectId()
+        assert decode_dashboard_cursor(encode_dashboard_cursor(ts, oid)) == (ts, oid)
+
+    def test_malformed_cursor_raises(self):
+        from orchestrator import decode_dashboard_cursor
+        with pytest.raises(ValueError):
+            decode_dashboard_cursor("not-a-cursor")
+
+
+class TestGetDashboardPage:
+    def test_unions_both_sources_with_projection_and_limit(self):
+        validation_col = MagicMock()
+        validation_col.aggregate.return_value = []
+        db = _db({"validationResults": validation_col})
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import get_dashboard_page
+            page = get_dashboard_page(limit=10)
+
+        assert page == {"items": [], "next_cursor": None}
+        pipeline = validation_col.aggregate.call_args.args[0]
+        union = next(s["$unionWith"] for s in pipeline if "$unionWith" in s)
+        assert union["coll"] == "verified_devices"
+        # Every branch projects table columns only — never the large blobs
+        for stages in (pipeline, union["pipeline"]):
+            project = next(s["$project"] for s in stages if "$project" in s)
+            assert "comparison_result" not in project
+            assert "gudid_record" not in project
+        assert pipeline[-2] == {"$sort": {"sort_key": -1, "_id": -1}}
+        assert pipeline[-1] == {"$limit": 11}
+
+    def test_status_filter_queries_single_collection(self):
+        verified_col = MagicMock()
+        verified_col.aggregate.return_value = []
+        db = _db({"verified_devices": verified_col})
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import get_dashboard_page
+            get_dashboard_page(status="matched")
+
+        pipeline = verified_col.aggregate.call_args.args[0]
+        assert not any("$unionWith" in s for s in pipeline)
+
+    def test_next_cursor_resumes_after_last_row(self):
+        ts = datetime(2026, 5, 1, tzinfo=timezone.utc)
+        docs = [_validation("mismatch", ts, companyName="ACME") for _ in range(3)]
+        validation_col = MagicMock()
+        validation_col.aggregate.return_value = list(docs)
+        db = _db({"validationResults": validation_col})
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import decode_dashboard_cursor, get_dashboard_page
+            page = get_dashboard_page(status="mismatch", limit=2)
+
+            assert len(page["items"]) == 2
+            assert decode_dashboard_cursor(page["next_cursor"])[1] == docs[1]["_id"]
+
+            validation_col.aggregate.return_value = []
+            get_dashboard_page(status="mismatch", limit=2, cursor=page["next_cursor"])
+
+        pipeline = validation_col.aggregate.call_args.args[0]
+        keyset = pipeline[2]["$match"]["$or"]
+        assert keyset[0] == {"sort_key": {"$lt": ts.replace(tzinfo=None)}}
+        assert keyset[1]["_id"] == {"$lt": docs[1]["_id"]}
+
+    def test_missing_timestamp_sorts_as_epoch(self):
+        from orchestrator import _TS_DEFAULT
+        undated = _validation("mismatch", None, sort_key=_TS_DEFAULT)
+        validation_col = MagicMock()
+        validation_col.aggregate.return_value = [undated, _validation("mismatch", None)]
+        db = _db({"validationResults": validation_col})
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import decode_dashboard_cursor, get_dashboard_page
+            page = get_dashboard_page(status="mismatch", limit=1)
+
+            pipeline = validation_col.aggregate.call_args.args[0]
+            assert pipeline[1] == {"$addFields": {"sort_key": {"$ifNull": ["$updated_at", _TS_DEFAULT]}}}
+            value, last_id = decode_dashboard_cursor(page["next_cursor"])
+            assert (value, last_id) == (_TS_DEFAULT, undated["_id"])
+
+            validation_col.aggregate.return_value = []
+            get_dashboard_page(status="mismatch", limit=1, cursor=page["next_cursor"])
+
+        keyset = validation_col.aggregate.call_args.args[0][2]["$match"]["$or"]
+        assert keyset[0] == {"sort_key": {"$lt": _TS_DEFAULT}}
+        assert keyset[1] == {"sort_key": _TS_DEFAULT, "_id": {"$lt": undated["_id"]}}
+
+    def test_non_timestamp_sort_uses_null_safe_key(self):
+        validation_col = MagicMock()
+        validation_col.aggregate.return_value = []
+        db = _db({"validationResults": validation_col})
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import get_dashboard_page
+            get_dashboard_page(sort="company_asc")
+
+        pipeline = validation_col.aggregate.call_args.args[0]
+        assert pipeline[1] == {"$addFields": {"sort_key": {"$ifNull": ["$companyName", ""]}}}
+
+    def test_rows_are_shaped_with_batched_joins(self):
+        ts = datetime(2026, 5, 1, tzinfo=timezone.utc)
+        source_id, validation_id = ObjectId(), ObjectId()
+        legacy = _validation("partial_match", ts)  # written before companyName was stored
+        matched = {"_id": ObjectId(), "status": "matched", "brandName": "B2",
+                   "companyName": "ACME", "versionModelNumber": "M-2",
+                   "source_device_id": source_id, "verified_at": ts, "sort_key": ts}
+
+        validation_col = MagicMock()
+        validation_col.aggregate.return_value = [matched, legacy]
+        validation_col.find.return_value.sort.return_value = [
+            {"_id": validation_id, "device_id": source_id},
+        ]
+        devices_col = MagicMock()
+        devices_col.find.return_value = [
+            {"_id": legacy["device_id"], "companyName": "OLDCO", "versionModelNumber": "M-1"},
+        ]
+        db = _db({"validationResults": validation_col, "devices": devices_col})
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import get_dashboard_page
+            items = get_dashboard_page()["items"]
+
+        assert items[0]["_id"] == str(validation_id)
+        assert items[0]["match_percent"] is None
+        assert "source_device_id" not in items[0]
+        assert items[1]["companyName"] == "OLDCO"
+        assert items[1]["versionModelNumber"] == "M-1"
+        assert "sort_key" not in items[1]
+        assert devices_col.find.call_count == 1
+        assert validation_col.find.call_count == 1
+
+    def test_unknown_sort_or_status_raises(self):
+        from orchestrator import get_dashboard_page
+        with pytest.raises(ValueError):
+            get_dashboard_page(sort="random")
+        with pytest.raises(ValueError):
+            get_dashboard_page(status="bogus")
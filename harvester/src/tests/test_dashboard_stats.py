@@ -0,0 +1,138 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from unittest.mock import patch, MagicMock
+
+from database import dashboard_stats as stats
+
+
+def _db(collections):
+    mock_db = MagicMock()
+    mock_db.__getitem__ = MagicMock(side_effect=lambda key: collections.setdefault(key, MagicMock()))
+    return mock_db
+
+
+def _ops(col):
+    return {op._filter["_id"]: op._doc for op in col.bulk_write.call_args.args[0]}
+
+
+DEVICE = {"_id": "dev1", "companyName": "ACME", "_harvest": {"harvest_run_id": "HR-1",
+                                                             "harvested_at": "2026-05-01T10:00:00Z"}}
+
+
+class TestIncrementalCounters:
+    def test_validation_increments_global_run_and_company(self):
+        col = MagicMock()
+        stats.record_validation(_db({stats.STATS_COLLECTION: col}), DEVICE, "matched",
+                                verified_upserted=True)
+        ops = _ops(col)
+        assert set(ops) == {"global", "run:HR-1", "company:ACME"}
+        assert ops["company:ACME"]["$inc"] == {"status.matched": 1, "matches": 1}
+        assert ops["run:HR-1"]["$setOnInsert"] == {"scope": "run", "key": "HR-1"}
+        assert col.bulk_write.call_count == 1
+
+    def test_device_inserts_are_aggregated_into_one_write(self):
+        col = MagicMock()
+        later = {**DEVICE, "_harvest": {"harvest_run_id": "HR-1", "harvested_at": "2026-05-02T00:00:00Z"}}
+        stats.record_devices_inserted(_db({stats.STATS_COLLECTION: col}), [DEVICE, later])
+        ops = _ops(col)
+        assert ops["global"]["$inc"] == {"devices": 2}
+        assert ops["global"]["$max"] == {"last_run": "2026-05-02T00:00:00Z"}
+        assert col.bulk_write.call_count == 1
+
+    def test_status_change_moves_counts(self):
+        col = MagicMock()
+        stats.record_status_change(_db({stats.STATS_COLLECTION: col}), None, "mismatch", "resolved")
+        assert _ops(col)["global"]["$inc"] == {"status.mismatch": -1, "status.resolved": 1}
+
+    def test_nothing_written_for_empty_batch_or_same_status(self):
+        col = MagicMock()
+        db = _db({stats.STATS_COLLECTION: col})
+        stats.record_devices_inserted(db, [])
+        stats.record_status_change(db, DEVICE, "resolved", "resolved")
+        col.bulk_write.assert_not_called()
+
+    def test_counter_failure_does_not_raise(self):
+        col = MagicMock()
+        col.bulk_write.side_effect = Exception("write concern")
+        stats.record_validation(_db({stats.STATS_COLLECTION: col}), DEVICE, "mismatch")
+
+
+class TestRebuild:
+    def test_rebuild_recomputes_from_source_collections(self):
+        devices, verified, validations, col = MagicMock(), MagicMock(), MagicMock(), MagicMock()
+        devices.aggregate.return_value = [
+            {"_id": {"run": "HR-1", "company": "ACME"}, "n": 3, "last_run": "2026-05-01T10:00:00Z"},
+            {"_id": {"run": "HR-2", "company": None}, "n": 1, "last_run": "2026-05-03T10:00:00Z"},
+        ]
+        verified.aggregate.return_value = [{"_id": {"run": "HR-1", "company": "ACME"}, "n": 1}]
+        validations.aggregate.return_value = [
+            {"_id": {"status": "matched", "run": "HR-1", "company": "ACME"}, "n": 1},
+            {"_id": {"status": "mismatch", "run": "HR-1", "company": "ACME"}, "n": 2},
+            {"_id": {"status": "mismatch", "run": None, "company": None}, "n": 4},
+        ]
+        col.delete_many.return_value.deleted_count = 1
+        db = _db({"devices": devices, "verified_devices": verified,
+                  "validationResults": validations, stats.STATS_COLLECTION: col})
+
+        result = stats.rebuild_stats(db)
+
+        docs = {op._doc["_id"]: op._doc for op in col.bulk_write.call_args.args[0]}
+        assert result == {"documents": 4, "removed": 1}
+        assert docs["global"]["devices"] == 4
+        assert docs["global"]["matches"] == 1
+        assert docs["global"]["status"] == {"matched": 1, "mismatch": 6}
+        assert docs["global"]["last_run"] == "2026-05-03T10:00:00Z"
+        assert docs["company:ACME"]["status"] == {"matched": 1, "mismatch": 2}
+        assert docs["run:HR-2"]["devices"] == 1
+        assert col.delete_many.call_args.args[0] == {"_id": {"$nin": list(docs)}}
+
+
+class TestGetDashboardStats:
+    def test_single_read_of_stats_document(self):
+        col = MagicMock()
+        col.find_one.return_value = {
+            "_id": "global", "devices": 10, "matches": 4, "last_run": "2026-05-01T10:00:00Z",
+            "status": {"partial_match": 3, "mismatch": 2, "gudid_deactivated": 1},
+        }
+        devices = MagicMock()
+        db = _db({stats.STATS_COLLECTION: col, "devices": devices})
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import get_dashboard_stats
+            result = get_dashboard_stats()
+
+        assert result == {"device_count": 10, "matches": 4, "partial_matches": 3, "mismatches": 2,
+                          "deactivated": 1, "resolved": 0, "last_run": "2026-05-01T10:00:00Z"}
+        assert col.find_one.call_count == 1
+        devices.count_documents.assert_not_called()
+
+    def test_builds_stats_on_first_use(self):
+        col = MagicMock()
+        col.find_one.side_effect = [None, {"_id": "global", "devices": 2}]
+        db = _db({stats.STATS_COLLECTION: col})
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import get_dashboard_stats
+            result = get_dashboard_stats()
+
+        col.bulk_write.assert_called_once()
+        assert result["device_count"] == 2
+        assert result["last_run"] == "No runs yet"
+
+
+class TestResolveUpdatesCounters:
+    def test_resolve_moves_status_to_resolved(self):
+        from bson import ObjectId
+        vid = ObjectId()
+        validations, devices, col = MagicMock(), MagicMock(), MagicMock()
+        validations.find_one.return_value = {"_id": vid, "device_id": "dev1", "status": "partial_match",
+                                             "gudid_record": {}, "comparison_result": {}}
+        devices.find_one.return_value = DEVICE
+        db = _db({"validationResults": validations, "devices": devices, stats.STATS_COLLECTION: col})
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import resolve_discrepancy
+            assert resolve_discrepancy(str(vid), {})["success"] is True
+
+        assert _ops(col)["company:ACME"]["$inc"] == {"status.partial_match": -1, "status.resolved": 1}
@@ -0,0 +1,150 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from bson import ObjectId
+
+from database import export
+
+
+def _db(collections):
+    mock_db = MagicMock()
+    mock_db.__getitem__ = MagicMock(side_effect=lambda key: collections.setdefault(key, MagicMock()))
+    return mock_db
+
+
+def _collection(docs):
+    col = MagicMock()
+    col.find.return_value.sort.return_value.batch_size.return_value = iter(docs)
+    return col
+
+
+def _devices(n):
+    return [{
+        "_id": ObjectId(), "brandName": f"Stent {i}", "companyName": "ACME", "singleUse": True,
+        "deviceSizes": [{"sizeType": "Length", "size": {"value": 10 + i, "unit": "Millimeter"}}],
+        "_harvest": {"harvest_run_id": "HR-1", "harvested_at": "2026-05-01T10:00:00Z"},
+    } for i in range(n)]
+
+
+class TestBuildExportQuery:
+    def test_filters_map_to_collection_fields(self):
+        db = _db({})
+        assert export.build_export_query(db, "devices", run_id="HR-1", company="ACME") == {
+            "_harvest.harvest_run_id": "HR-1", "companyName": "ACME"}
+        assert export.build_export_query(db, "validationResults", status="mismatch") == {"status": "mismatch"}
+
+    def test_validation_results_by_run_go_through_devices(self):
+        devices = MagicMock()
+        ids = [ObjectId(), ObjectId()]
+        devices.find.return_value = [{"_id": i} for i in ids]
+        query = export.build_export_query(_db({"devices": devices}), "validationResults", run_id="HR-1")
+        assert query == {"device_id": {"$in": ids}}
+        assert devices.find.call_args.args == ({"_harvest.harvest_run_id": "HR-1"}, {"_id": 1})
+
+    def test_validation_results_by_company_go_through_devices(self):
+        devices = MagicMock()
+        ids = [ObjectId()]
+        devices.find.return_value = [{"_id": i} for i in ids]
+        query = export.build_export_query(_db({"devices": devices}), "validationResults",
+                                          run_id="HR-1", status="mismatch", company="ACME")
+        assert query == {"status": "mismatch", "device_id": {"$in": ids}}
+        assert devices.find.call_args.args == (
+            {"_harvest.harvest_run_id": "HR-1", "companyName": "ACME"}, {"_id": 1})
+
+    @pytest.mark.parametrize("collection,kwargs", [
+        ("users", {}),
+        ("devices", {"status": "mismatch"}),
+        ("verified_devices", {"status": "matched"}),
+    ])
+    def test_rejects_unknown_collection_or_filter(self, collection, kwargs):
+        with pytest.raises(ValueError):
+            export.build_export_query(_db({}), collection, **kwargs)
+
+
+class TestStreamExport:
+    def test_csv_has_header_and_one_chunk_per_batch(self):
+        docs = _devices(5)
+        db = _db({"devices": _collection(docs)})
+
+        chunks = list(export.stream_export(db, "devices", "csv", {}, batch_size=2))
+
+        assert len(chunks) == 3
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+        header = rows[0]
+        assert header == export.EXPORT_COLUMNS["devices"]
+        first = dict(zip(header, rows[1]))
+        assert first["_id"] == str(docs[0]["_id"])
+        assert first["singleUse"] == "true"
+        assert first["_harvest.harvest_run_id"] == "HR-1"
+        assert json.loads(first["deviceSizes"])[0]["size"]["value"] == 10
+        assert first["catalogNumber"] == ""
+
+    @pytest.mark.parametrize("text", ["=1+1", "+1", "-2+3", "@SUM(A1)", "\tx", "\rx"])
+    def test_csv_escapes_formula_text(self, text):
+        docs = _devices(1)
+        docs[0]["deviceDescription"] = text
+        docs[0]["deviceCountInBase"] = -1
+        db = _db({"devices": _collection(docs)})
+
+        rows = list(csv.reader(io.StringIO(b"".join(export.stream_export(db, "devices", "csv", {})).decode())))
+
+        row = dict(zip(rows[0], rows[1]))
+        assert row["deviceDescription"] == "'" + text
+        assert row["deviceCountInBase"] == "-1"
+
+    def test_empty_csv_is_just_the_header(self):
+        db = _db({"devices": _collection([])})
+        out = b"".join(export.stream_export(db, "devices", "csv", {}))
+        assert out.decode().strip() == ",".join(export.EXPORT_COLUMNS["devices"])
+
+    def test_ndjson_writes_full_documents(self):
+        when = datetime(2026, 5, 1, tzinfo=timezone.utc)
+        docs = [{"_id": ObjectId(), "status": "mismatch", "created_at": when,
+                 "comparison_result": {"brandName": {"status": "match"}}}]
+        db = _db({"validationResults": _collection(docs)})
+
+        lines = b"".join(export.stream_export(db, "validationResults", "ndjson", {})).splitlines()
+
+        assert len(lines) == 1
+        row = json.loads(lines[0])
+        assert row["_id"] == str(docs[0]["_id"])
+        assert row["created_at"] == "2026-05-01T00:00:00+00:00"
+        assert row["comparison_result"] == {"brandName": {"status": "match"}}
+
+    def test_xlsx_round_trips_through_openpyxl(self):
+        from openpyxl import load_workbook
+
+        docs = _devices(3)
+        docs[0]["deviceDescription"] = "=HYPERLINK(\"x\")\x07"
+        docs[1]["deviceDescription"] = "@SUM(1)"
+        db = _db({"verified_devices": _collection(docs)})
+
+        data = b"".join(export.stream_export(db, "verified_devices", "xlsx", {}, batch_size=2))
+
+        ws = load_workbook(io.BytesIO(data), read_only=True).active
+        rows = list(ws.iter_rows(values_only=True))
+        assert list(rows[0]) == export.EXPORT_COLUMNS["verified_devices"]
+        assert len(rows) == 4
+        first = dict(zip(rows[0], rows[1]))
+        assert first["brandName"] == "Stent 0"
+        assert first["singleUse"] is True
+        assert first["deviceDescription"] == "=HYPERLINK(\"x\")"
+        assert dict(zip(rows[0], rows[2]))["deviceDescription"] == "@SUM(1)"
+
+    def test_reads_through_a_batched_cursor(self):
+        col = _collection([])
+        db = _db({"devices": col})
+        list(export.stream_export(db, "devices", "ndjson", {"companyName": "ACME"}, batch_size=250))
+        col.find.assert_called_once_with({"companyName": "ACME"})
+        col.find.return_value.sort.return_value.batch_size.assert_called_once_with(250)
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            export.stream_export(_db({}), "devices", "parquet", {})
@@ -91,6 +91,83 @@ class TestRunValidationNotFound:
         assert result["not_found"] == 0
 
 
+class TestRunValidationLookups:
+    def _db(self, devices, inserted):
+        collections = {"devices": MagicMock(), "validationResults": MagicMock()}
+        collections["devices"].find.return_value = devices
+        collections["validationResults"].insert_one.side_effect = lambda doc: inserted.append(doc)
+        mock_db = MagicMock()
+        mock_db.__getitem__ = MagicMock(side_effect=lambda key: collections.setdefault(key, MagicMock()))
+        return mock_db
+
+    def test_lookup_errors_are_counted_and_skipped(self):
+        import requests
+
+        inserted = []
+        devices = [{"_id": "dev1", "catalogNumber": "CAT-001"}, {"_id": "dev2", "catalogNumber": "CAT-002"}]
+
+        def fake_fetch(catalog_number=None, version_model_number=None):
+            if catalog_number == "CAT-001":
+                raise requests.HTTPError("429 Client Error: Too Many Requests")
+            return None, None
+
+        with patch("database.db_connection.get_db", return_value=self._db(devices, inserted)), \
+             patch("validators.gudid_client.fetch_gudid_record", side_effect=fake_fetch):
+            from orchestrator import run_validation
+            result = run_validation()
+
+        assert result["success"] is True
+        assert result["lookup_errors"] == 1
+        assert result["mismatches"] == 1
+        assert [doc["device_id"] for doc in inserted] == ["dev2"]
+
+    def test_cancel_check_stops_between_devices(self):
+        import pytest
+
+        class Cancelled(Exception):
+            pass
+
+        inserted = []
+        devices = [{"_id": f"dev{i}", "catalogNumber": f"CAT-{i}"} for i in range(3)]
+        checks = []
+
+        def cancel_check():
+            checks.append(1)
+            if len(checks) == 2:
+                raise Cancelled()
+
+        with patch("database.db_connection.get_db", return_value=self._db(devices, inserted)), \
+             patch("validators.gudid_client.fetch_gudid_record", return_value=(None, None)):
+            from orchestrator import run_validation
+            with pytest.raises(Cancelled):
+                run_validation(cancel_check=cancel_check)
+
+        assert [doc["device_id"] for doc in inserted] == ["dev0"]
+
+    def test_concurrent_lookups_keep_device_order(self):
+        import threading
+        import time
+
+        inserted = []
+        devices = [{"_id": f"dev{i}", "catalogNumber": f"CAT-{i}"} for i in range(8)]
+        threads = set()
+
+        def fake_fetch(catalog_number=None, version_model_number=None):
+            threads.add(threading.current_thread().name)
+            # Later devices answer first
+            time.sleep(0.002 * (8 - int(catalog_number.split("-")[1])))
+            return None, None
+
+        with patch("database.db_connection.get_db", return_value=self._db(devices, inserted)), \
+             patch("validators.gudid_client.fetch_gudid_record", side_effect=fake_fetch):
+            from orchestrator import run_validation
+            result = run_validation(workers=4)
+
+        assert result["mismatches"] == 8
+        assert [doc["device_id"] for doc in inserted] == [d["_id"] for d in devices]
+        assert len(threads) > 1
+
+
 class TestMigrateGudidNotFound:
     def test_updates_gudid_not_found_to_mismatch(self):
         mock_result = MagicMock()
@@ -135,3 +212,36 @@ class TestMigrateGudidNotFound:
             from orchestrator import migrate_gudid_not_found
             result = migrate_gudid_not_found()
         assert result == {"matched": 0, "modified": 0}
+
+
+class TestBackfillValidationCompanies:
+    def test_copies_company_from_device_and_nulls_orphans(self):
+        vr_col = MagicMock()
+        vr_col.find.return_value.batch_size.return_value = iter([
+            {"_id": "vr1", "device_id": "d1"},
+            {"_id": "vr2", "device_id": "gone"},
+        ])
+        vr_col.bulk_write.return_value.modified_count = 2
+        dev_col = MagicMock()
+        dev_col.find.return_value = [{"_id": "d1", "companyName": "Acme"}]
+
+        mock_db = MagicMock()
+        mock_db.__getitem__ = MagicMock(side_effect=lambda key: {"validationResults": vr_col, "devices": dev_col}[key])
+
+        with patch("database.db_connection.get_db", return_value=mock_db):
+            from orchestrator import backfill_validation_companies
+            result = backfill_validation_companies()
+
+        assert vr_col.find.call_args.args[0] == {"companyName": {"$exists": False}}
+        ops = vr_col.bulk_write.call_args.args[0]
+        assert [(op._filter, op._doc) for op in ops] == [
+            ({"_id": "vr1"}, {"$set": {"companyName": "Acme"}}),
+            ({"_id": "vr2"}, {"$set": {"companyName": None}}),
+        ]
+        assert result == {"modified": 2}
+
+    def test_returns_zero_on_db_error(self):
+        with patch("database.db_connection.get_db", side_effect=Exception("DB down")):
+            from orchestrator import backfill_validation_companies
+            result = backfill_validation_companies()
+        assert result == {"modified": 0}
@@ -0,0 +1,125 @@
+"""Query-count regression tests: list/backfill paths must not issue per-row lookups."""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from collections import Counter
+from unittest.mock import patch, MagicMock
+
+from bson import ObjectId
+
+_QUERY_METHODS = ("find", "find_one", "aggregate", "insert_one", "update_one", "bulk_write", "count_documents")
+
+
+class _CountingDB:
+    """MagicMock-backed DB that counts round trips per (collection, method)."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.collections = {}
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            col = MagicMock()
+            for method in _QUERY_METHODS:
+                getattr(col, method).side_effect = self._counted(name, method, getattr(col, method))
+            self.collections[name] = col
+        return self.collections[name]
+
+    def _counted(self, name, method, mock):
+        def call(*args, **kwargs):
+            self.calls[(name, method)] += 1
+            return mock.return_value
+        return call
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+
+def _matched_results(n):
+    return [{"_id": ObjectId(), "device_id": ObjectId(), "gudid_di": f"DI-{i}",
+             "gudid_record": {"catalogNumber": f"C-{i}"}} for i in range(n)]
+
+
+class TestGetDiscrepanciesQueries:
+    def test_one_round_trip_regardless_of_rows(self):
+        db = _CountingDB()
+        rows = [{"_id": ObjectId(), "status": "mismatch", "device_id": ObjectId(),
+                 "_device": [{"companyName": "ACME", "versionModelNumber": f"M-{i}"}]}
+                for i in range(50)]
+        db["validationResults"].aggregate.return_value = iter(rows)
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import get_discrepancies
+            results = get_discrepancies(limit=50)
+
+        assert len(results) == 50
+        assert results[7]["versionModelNumber"] == "M-7"
+        assert "_device" not in results[0]
+        assert db.calls == Counter({("validationResults", "aggregate"): 1})
+
+    def test_pipeline_limits_before_lookup(self):
+        db = _CountingDB()
+        db["validationResults"].aggregate.return_value = iter([])
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import get_discrepancies
+            get_discrepancies(limit=20)
+
+        pipeline = db["validationResults"].aggregate.call_args.args[0]
+        stages = [next(iter(stage)) for stage in pipeline]
+        assert stages == ["$match", "$sort", "$limit", "$lookup"]
+        assert pipeline[2] == {"$limit": 20}
+
+
+class TestBackfillQueries:
+    def test_round_trips_scale_with_chunks_not_rows(self):
+        db = _CountingDB()
+        results = _matched_results(1200)
+        cursor = MagicMock()
+        cursor.batch_size.return_value = iter(results)
+        db["validationResults"].find.return_value = cursor
+
+        def devices_find(query, *args, **kwargs):
+            db.calls[("devices", "find")] += 1
+            return [{"_id": i, "versionModelNumber": "M", "catalogNumber": None}
+                    for i in query["_id"]["$in"]]
+        db["devices"].find.side_effect = devices_find
+        db["verified_devices"].bulk_write.return_value.upserted_ids = {0: "x", 1: "y"}
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import backfill_verified_devices
+            result = backfill_verified_devices()
+
+        assert result == {"success": True, "verified_count": 1200}
+        chunks = 3  # 500 + 500 + 200
+        assert db.calls[("devices", "find")] == chunks
+        assert db.calls[("verified_devices", "bulk_write")] == chunks
+        assert db.calls[("devices", "find_one")] == 0
+        assert db.calls[("verified_devices", "update_one")] == 0
+        # matched-results scan + per chunk: device fetch, upserts, stats counters
+        assert db.total == 1 + chunks * 3
+
+    def test_gudid_fields_merged_and_missing_devices_skipped(self):
+        db = _CountingDB()
+        results = _matched_results(2)
+        cursor = MagicMock()
+        cursor.batch_size.return_value = iter(results)
+        db["validationResults"].find.return_value = cursor
+        kept = results[0]["device_id"]
+        db["devices"].find.return_value = [{"_id": kept, "versionModelNumber": "M", "catalogNumber": None}]
+        db["verified_devices"].bulk_write.return_value.upserted_ids = {}
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import backfill_verified_devices
+            result = backfill_verified_devices()
+
+        assert result["verified_count"] == 1
+        ops = db["verified_devices"].bulk_write.call_args.args[0]
+        assert len(ops) == 1
+        record = ops[0]._doc["$set"]
+        assert record["catalogNumber"] == "C-0"
+        assert record["source_device_id"] == kept
+        assert record["gudid_di"] == "DI-0"
+        # No upserts -> no stats write
+        assert db.calls[("dashboardStats", "bulk_write")] == 0
@@ -0,0 +1,80 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import json
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from bson import Decimal128, ObjectId
+from bson.int64 import Int64
+
+from database import serialization
+from database.serialization import dumps, to_jsonable
+
+OID = ObjectId("65f0c0ffee0000000000abcd")
+WHEN = datetime(2026, 5, 1, 10, 0, 0, tzinfo=timezone.utc)
+
+DOC = {
+    "_id": OID,
+    "created_at": WHEN,
+    "comparison_result": {"brandName": {"status": "match", "harvested": "A", "gudid": "A"}},
+    "history": [{"at": WHEN, "by": OID}, WHEN, OID],
+    "price": Decimal128("12.50"),
+    "count": Int64(3),
+    "tags": ("a", "b"),
+}
+EXPECTED = {
+    "_id": "65f0c0ffee0000000000abcd",
+    "created_at": "2026-05-01T10:00:00+00:00",
+    "comparison_result": {"brandName": {"status": "match", "harvested": "A", "gudid": "A"}},
+    "history": [{"at": "2026-05-01T10:00:00+00:00", "by": "65f0c0ffee0000000000abcd"},
+                "2026-05-01T10:00:00+00:00", "65f0c0ffee0000000000abcd"],
+    "price": "12.50",
+    "count": 3,
+    "tags": ["a", "b"],
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request):
+    if request.param == "orjson" and serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    if request.param == "json":
+        with patch.object(serialization, "orjson", None):
+            yield request.param
+    else:
+        yield request.param
+
+
+class TestSerialization:
+    def test_bson_types_converted_in_one_pass(self, encoder):
+        assert to_jsonable(DOC) == EXPECTED
+
+    def test_dumps_is_compact_utf8_json(self, encoder):
+        out = dumps({"name": "Stent ø5mm", "_id": OID})
+        assert isinstance(out, bytes)
+        assert out == '{"name":"Stent ø5mm","_id":"65f0c0ffee0000000000abcd"}'.encode("utf-8")
+
+    def test_naive_datetime_matches_isoformat(self, encoder):
+        naive = datetime(2026, 5, 1, 10, 0, 0, 123456)
+        assert json.loads(dumps({"t": naive})) == {"t": naive.isoformat()}
+
+    def test_non_finite_floats_become_null(self, encoder):
+        out = dumps({"a": float("nan"), "b": [float("inf"), -float("inf")], "c": {1.5, float("nan")}})
+        assert json.loads(out) in (
+            {"a": None, "b": [None, None], "c": [1.5, None]},
+            {"a": None, "b": [None, None], "c": [None, 1.5]},
+        )
+
+    def test_integers_beyond_64_bits_raise(self, encoder):
+        assert json.loads(dumps({"n": 2 ** 64 - 1, "m": -(2 ** 63)})) == {"n": 2 ** 64 - 1, "m": -(2 ** 63)}
+        with pytest.raises(TypeError):
+            dumps({"n": 2 ** 64})
+        with pytest.raises(TypeError):
+            dumps([-(2 ** 63) - 1])
+
+    def test_serialize_record_delegates(self):
+        from orchestrator import _serialize_record
+        assert _serialize_record(DOC) == EXPECTED
+
@@ -1,5 +1,7 @@
 import re
 
+from normalizers.cache import cached_normalizer
+
 
 COMPANY_ALIASES = {
     "Medtronic":         ["Medtronic", "Covidien LP", "Covidien"],
@@ -31,6 +33,7 @@ for _canonical, _variants in COMPANY_ALIASES.items():
         _REVERSE_INDEX[_normalize(_variant)] = _canonical
 
 
+@cached_normalizer("canonical_company")
 def canonical_company(raw: str | None) -> str | None:
     if not raw or not isinstance(raw, str):
         return None
@@ -1,11 +1,28 @@
+import time
+
 import requests
 from bs4 import BeautifulSoup
 
+from pipeline import metrics
+
 
 SEARCH_URL = "https://accessgudid.nlm.nih.gov/devices/search"
 LOOKUP_URL = "https://accessgudid.nlm.nih.gov/api/v3/devices/lookup.json"
 
 
+def _get(endpoint, url, params):
+    """requests.get with call/latency metrics labelled by *endpoint*."""
+    start = time.monotonic()
+    outcome = "error"
+    try:
+        response = requests.get(url, params=params, timeout=15)
+        outcome = str(response.status_code)
+        return response
+    finally:
+        metrics.GUDID_REQUESTS.inc(endpoint=endpoint, outcome=outcome)
+        metrics.GUDID_SECONDS.observe(time.monotonic() - start, endpoint=endpoint)
+
+
 def search_gudid_di(catalog_number=None, version_model_number=None):
     """Search the GUDID HTML search page to find a Device Identifier (DI).
 
@@ -16,7 +33,7 @@ def search_gudid_di(catalog_number=None, version_model_number=None):
     if not query:
         return None
 
-    response = requests.get(SEARCH_URL, params={"query": query}, timeout=15)
+    response = _get("search", SEARCH_URL, {"query": query})
     response.raise_for_status()
 
     soup = BeautifulSoup(response.text, "html.parser")
@@ -131,7 +148,7 @@ def fetch_gudid_record(catalog_number=None, version_model_number=None):
     if not di:
         return None, None
 
-    response = requests.get(LOOKUP_URL, params={"di": di}, timeout=15)
+    response = _get("lookup", LOOKUP_URL, {"di": di})
     response.raise_for_status()
 
     data = response.json()
@@ -175,7 +192,7 @@ def lookup_by_di(di):
         return None
 
     try:
-        response = requests.get(LOOKUP_URL, params={"di": di}, timeout=15)
+        response = _get("lookup", LOOKUP_URL, {"di": di})
         response.raise_for_status()
         data = response.json()
         return data.get("gudid", {}).get("device")
@@ -0,0 +1,96 @@
+"""Precomputed review view stored on each validation result.
+
+``build_review_snapshot()`` turns a validation result and its device into
+exactly what /review/{id} renders — the header fields and one row per
+compared field — so the review page is a single projected read instead of
+two full documents plus a Python rebuild on every request.
+
+Bump ``REVIEW_SNAPSHOT_VERSION`` whenever the shape or the row logic
+changes; readers rebuild snapshots with an older version on first view.
+"""
+from validators.comparison_validator import FieldStatus
+
+REVIEW_SNAPSHOT_VERSION = 1
+
+COMPARED_FIELDS = [
+    ("versionModelNumber", "Version / Model Number"),
+    ("catalogNumber", "Catalog Number"),
+    ("brandName", "Brand Name"),
+    ("companyName", "Company Name"),
+    ("deviceDescription", "Device Description"),
+    ("MRISafetyStatus", "MRI Safety Status"),
+    ("singleUse", "Single Use"),
+    ("rx", "Prescription (Rx)"),
+    ("gmdnPTName", "GMDN Term"),
+    ("gmdnCode", "GMDN Code"),
+    ("productCodes", "FDA Product Codes"),
+    ("deviceCountInBase", "Pack Quantity"),
+    ("issuingAgency", "Issuing Agency"),
+    ("lotBatch", "Labeled: Lot / Batch"),
+    ("serialNumber", "Labeled: Serial Number"),
+    ("manufacturingDate", "Labeled: Manufacturing Date"),
+    ("expirationDate", "Labeled: Expiration Date"),
+    ("premarketSubmissions", "Premarket Submissions"),
+    ("deviceSizes", "Device Sizes"),
+]
+
+# Device fields shown outside the comparison table
+HEADER_FIELDS = ("brandName", "versionModelNumber", "deviceClass",
+                 "indicationsForUse", "contraindications")
+
+
+def field_status(comp_entry: dict) -> str:
+    if "status" in comp_entry:
+        return comp_entry["status"]
+    legacy = comp_entry.get("match")
+    if legacy is True:
+        return FieldStatus.MATCH
+    if legacy is False:
+        return FieldStatus.MISMATCH
+    return FieldStatus.NOT_COMPARED
+
+
+def build_review_snapshot(validation: dict, device: dict | None) -> dict:
+    """Review view of *validation* (a validationResults document)."""
+    device = device or {}
+    comparison = validation.get("comparison_result") or {}
+    gudid_record = validation.get("gudid_record") or {}
+
+    fields = []
+    for field_key, field_label in COMPARED_FIELDS:
+        comp = comparison.get(field_key, {})
+
+        if comp:
+            # Trust the comparison snapshot. The device doc may have been backfilled
+            # from GUDID after validation ran (gudid_sourced_fields), so falling back
+            # to it would falsely show GUDID values on the harvested side.
+            comp_h = comp.get("harvested")
+            comp_g = comp.get("gudid")
+            harvested_val = comp_h if comp_h not in (None, "", []) else "N/A"
+            gudid_val = comp_g if comp_g not in (None, "", []) else "N/A"
+        else:
+            # No comparison ran (e.g., gudid_deactivated). Fall back to source docs.
+            harvested_val = device.get(field_key, "N/A")
+            gudid_val = gudid_record.get(field_key, "N/A")
+
+        similarity = None
+        if field_key == "deviceDescription":
+            similarity = comp.get("similarity") if comp.get("similarity") is not None else comp.get("description_similarity", 0)
+
+        fields.append({
+            "key": field_key,
+            "label": field_label,
+            "harvested": harvested_val,
+            "gudid": gudid_val,
+            "status": field_status(comp),
+            "alias_group": comp.get("alias_group"),
+            "similarity": similarity,
+            "per_type": comp.get("per_type") if field_key == "deviceSizes" else None,
+        })
+
+    return {
+        "schema_version": REVIEW_SNAPSHOT_VERSION,
+        "device": {k: device.get(k) for k in HEADER_FIELDS},
+        "gudid_publish_date": gudid_record.get("publishDate"),
+        "fields": fields,
+    }
@@ -0,0 +1,151 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from unittest.mock import MagicMock, patch
+
+from bson import ObjectId
+
+from validators.review_snapshot import (
+    COMPARED_FIELDS,
+    REVIEW_SNAPSHOT_VERSION,
+    build_review_snapshot,
+)
+
+
+def _db(collections):
+    mock_db = MagicMock()
+    mock_db.__getitem__ = MagicMock(side_effect=lambda key: collections.setdefault(key, MagicMock()))
+    return mock_db
+
+
+VALIDATION = {
+    "status": "partial_match",
+    "gudid_record": {"publishDate": "2024-02-01", "catalogNumber": "CAT-G"},
+    "comparison_result": {
+        "brandName": {"status": "match", "harvested": "Acme", "gudid": "ACME"},
+        "companyName": {"status": "corporate_alias", "harvested": "Covidien", "gudid": "Medtronic",
+                        "alias_group": "Medtronic"},
+        "deviceDescription": {"match": False, "harvested": "a", "gudid": "", "description_similarity": 0.4},
+        "deviceSizes": {"status": "mismatch", "harvested": [], "gudid": [{"size": 1}], "per_type": {"Length": "x"}},
+    },
+}
+DEVICE = {"_id": "dev1", "brandName": "Acme", "versionModelNumber": "M-1", "catalogNumber": "CAT-H",
+          "deviceClass": "II", "indicationsForUse": "Use it"}
+
+
+class TestBuildReviewSnapshot:
+    def test_one_row_per_compared_field(self):
+        snapshot = build_review_snapshot(VALIDATION, DEVICE)
+        assert snapshot["schema_version"] == REVIEW_SNAPSHOT_VERSION
+        assert [row["key"] for row in snapshot["fields"]] == [key for key, _ in COMPARED_FIELDS]
+        assert snapshot["gudid_publish_date"] == "2024-02-01"
+        assert snapshot["device"]["deviceClass"] == "II"
+        assert "catalogNumber" not in snapshot["device"]
+
+    def test_rows_mirror_comparison_result(self):
+        rows = {row["key"]: row for row in build_review_snapshot(VALIDATION, DEVICE)["fields"]}
+        assert rows["companyName"]["status"] == "corporate_alias"
+        assert rows["companyName"]["alias_group"] == "Medtronic"
+        # Legacy match/description_similarity shape
+        assert rows["deviceDescription"]["status"] == "mismatch"
+        assert rows["deviceDescription"]["similarity"] == 0.4
+        assert rows["deviceDescription"]["gudid"] == "N/A"
+        assert rows["deviceSizes"]["harvested"] == "N/A"
+        assert rows["deviceSizes"]["per_type"] == {"Length": "x"}
+
+    def test_uncompared_fields_fall_back_to_source_documents(self):
+        rows = {row["key"]: row for row in build_review_snapshot(VALIDATION, DEVICE)["fields"]}
+        assert rows["catalogNumber"] == {
+            "key": "catalogNumber", "label": "Catalog Number", "harvested": "CAT-H", "gudid": "CAT-G",
+            "status": "not_compared", "alias_group": None, "similarity": None, "per_type": None,
+        }
+
+
+class TestGetReviewView:
+    def test_current_snapshot_is_a_single_projected_read(self):
+        vid = ObjectId()
+        validations, devices = MagicMock(), MagicMock()
+        validations.find_one.return_value = {
+            "_id": vid, "status": "mismatch", "gudid_di": "DI-1", "device_id": "dev1",
+            "review_snapshot": build_review_snapshot(VALIDATION, DEVICE),
+        }
+        db = _db({"validationResults": validations, "devices": devices})
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import get_review_view
+            view = get_review_view(str(vid))
+
+        assert validations.find_one.call_count == 1
+        assert "review_snapshot" in validations.find_one.call_args.args[1]
+        assert "comparison_result" not in validations.find_one.call_args.args[1]
+        devices.find_one.assert_not_called()
+        validations.update_one.assert_not_called()
+        assert view["validation"]["status"] == "mismatch"
+        assert view["validation"]["gudid_publish_date"] == "2024-02-01"
+        assert view["device"]["versionModelNumber"] == "M-1"
+        assert len(view["fields"]) == len(COMPARED_FIELDS)
+
+    def test_missing_or_outdated_snapshot_is_rebuilt_and_stored(self):
+        vid = ObjectId()
+        validations, devices = MagicMock(), MagicMock()
+        stale = {"_id": vid, "status": "mismatch", "device_id": "dev1",
+                 "review_snapshot": {"schema_version": REVIEW_SNAPSHOT_VERSION - 1}}
+        validations.find_one.side_effect = [stale, {**VALIDATION, "_id": vid}]
+        devices.find_one.return_value = DEVICE
+        db = _db({"validationResults": validations, "devices": devices})
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import get_review_view
+            view = get_review_view(str(vid))
+
+        stored = validations.update_one.call_args.args[1]["$set"]["review_snapshot"]
+        assert stored["schema_version"] == REVIEW_SNAPSHOT_VERSION
+        assert view["fields"] == stored["fields"]
+        assert view["device"]["brandName"] == "Acme"
+
+    def test_unknown_id_returns_none(self):
+        validations = MagicMock()
+        validations.find_one.return_value = None
+        with patch("database.db_connection.get_db", return_value=_db({"validationResults": validations})):
+            from orchestrator import get_review_view
+            assert get_review_view(str(ObjectId())) is None
+
+
+class TestSnapshotWrites:
+    def test_run_validation_stores_snapshot_with_merged_device(self):
+        from orchestrator import run_validation
+
+        mock_db = MagicMock()
+        mock_db["devices"].find.return_value = [{"_id": "dev1", "brandName": None, "catalogNumber": "Y",
+                                                 "versionModelNumber": "Z"}]
+        gudid = {"brandName": "GUDID Brand", "versionModelNumber": "Z",
+                 "deviceRecordStatus": "Published", "publishDate": "2024-01-01"}
+
+        with patch("database.db_connection.get_db", return_value=mock_db), \
+             patch("validators.gudid_client.fetch_gudid_record", return_value=("DI-1", gudid)), \
+             patch("orchestrator._merge_gudid_into_device"):
+            run_validation(overwrite=False)
+
+        doc = mock_db["validationResults"].insert_one.call_args.args[0]
+        snapshot = doc["review_snapshot"]
+        assert snapshot["schema_version"] == REVIEW_SNAPSHOT_VERSION
+        assert snapshot["gudid_publish_date"] == "2024-01-01"
+        # The GUDID merge that follows the insert is reflected in the header
+        assert snapshot["device"]["brandName"] == "GUDID Brand"
+
+    def test_resolve_invalidates_snapshot(self):
+        vid = ObjectId()
+        validations, devices = MagicMock(), MagicMock()
+        validations.find_one.return_value = {"_id": vid, "device_id": "dev1", "status": "mismatch",
+                                             "gudid_record": {}, "comparison_result": {}}
+        devices.find_one.return_value = DEVICE
+        db = _db({"validationResults": validations, "devices": devices})
+
+        with patch("database.db_connection.get_db", return_value=db):
+            from orchestrator import resolve_discrepancy
+            assert resolve_discrepancy(str(vid), {})["success"] is True
+
+        update = validations.update_one.call_args.args[1]
+        assert update["$set"]["status"] == "resolved"
+        assert update["$unset"] == {"review_snapshot": ""}
@@ -2,17 +2,29 @@ import asyncio
 import time
 import os
 import re
+import sys
 from dataclasses import dataclass, asdict
 from typing import Optional, Dict, Any, List
 from urllib.parse import urlparse
 
 from playwright.async_api import async_playwright, TimeoutError as PWTimeoutError
 
+_SRC_DIR = os.path.join(os.path.dirname(__file__), os.pardir)
+if os.path.abspath(_SRC_DIR) not in sys.path:
+    sys.path.insert(0, os.path.abspath(_SRC_DIR))
+
+from pipeline import metrics, scheduler
+from pipeline.tracing import span
+
 
 # ====== CONFIG: where to save HTML ======
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 OUT_HTML_DIR = os.path.join(BASE_DIR, "..", "web-scraper", "out_html")
 
+# Pages fetched at once by all engines in the process: SCRAPE_BULK_SLOTS for
+# batches, plus slots reserved for interactive single harvests (see pipeline.scheduler)
+_scrape_scheduler = scheduler.PriorityScheduler("scrape", int(os.getenv("SCRAPE_BULK_SLOTS") or 3))
+
 
 @dataclass
 class FetchResult:
@@ -124,9 +136,25 @@ class BrowserEngine:
             await self._playwright.stop()
 
     async def fetch(self, url: str) -> FetchResult:
-        async with self._sem:
-            await self.rate_limiter.wait()
-            return await self._fetch_with_retries(url)
+        work_class = scheduler.current_class()
+        with span("scrape.wait"):
+            await self._sem.acquire()
+        try:
+            with span("scrape.queue", work_class=work_class):
+                await _scrape_scheduler.acquire_async(work_class)
+            try:
+                with span("scrape.rate_limit"):
+                    await self.rate_limiter.wait()
+                with span("scrape.fetch", url=url):
+                    result = await self._fetch_with_retries(url)
+            finally:
+                _scrape_scheduler.release(work_class)
+        finally:
+            self._sem.release()
+        metrics.PAGES_SCRAPED.inc(outcome="ok" if result.ok else "error")
+        if result.elapsed_ms is not None:
+            metrics.SCRAPE_SECONDS.observe(result.elapsed_ms / 1000)
+        return result
 
     async def _fetch_with_retries(self, url: str) -> FetchResult:
         start = time.monotonic()
@@ -0,0 +1,120 @@
+"""Benchmark normalize_measurement against the pre-engine implementation.
+
+Collects every table cell that looks like a measurement (a number followed
+by letters or a quote) from the saved pages in web-scraper/out_html, then
+times both parsers over the same cells with the normalizer cache bypassed.
+
+Usage:
+    python scripts/bench_measurements.py [--rounds 20]
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "harvester", "src"))
+
+from bs4 import BeautifulSoup
+
+from normalizers.unit_conversions import normalize_measurement, normalize_measurement_column
+
+_OUT_HTML = os.path.join(os.path.dirname(__file__), os.pardir, "harvester", "src", "web-scraper", "out_html")
+_CELL_RE = re.compile(r"\d\s*[a-zA-Z\"]")
+
+_LEGACY_UNITS = {
+    'mm': ('mm', lambda x: x), 'cm': ('mm', lambda x: x * 10), 'm': ('mm', lambda x: x * 1000),
+    'in': ('mm', lambda x: x * 25.4), 'inches': ('mm', lambda x: x * 25.4), 'inch': ('mm', lambda x: x * 25.4),
+    '"': ('mm', lambda x: x * 25.4), 'ft': ('mm', lambda x: x * 304.8), 'feet': ('mm', lambda x: x * 304.8),
+    'foot': ('mm', lambda x: x * 304.8), 'fr': ('mm', lambda x: x / 3), 'french': ('mm', lambda x: x / 3),
+    'g': ('g', lambda x: x), 'grams': ('g', lambda x: x), 'kg': ('g', lambda x: x * 1000),
+    'lbs': ('g', lambda x: x * 453.592), 'lb': ('g', lambda x: x * 453.592),
+    'ounces': ('g', lambda x: x * 28.3495), 'oz': ('g', lambda x: x * 28.3495),
+    'ml': ('mL', lambda x: x), 'l': ('mL', lambda x: x * 1000), 'liters': ('mL', lambda x: x * 1000),
+    'cc': ('mL', lambda x: x), 'fl oz': ('mL', lambda x: x * 29.5735),
+    'mmhg': ('mmHg', lambda x: x), 'kpa': ('mmHg', lambda x: x * 7.50062), 'psi': ('mmHg', lambda x: x * 51.7149),
+    'atm': ('mmHg', lambda x: x * 760), 'bar': ('mmHg', lambda x: x * 750.062),
+}
+
+
+def legacy_normalize_measurement(raw_value):
+    """The per-call re.match + lambda-table implementation this engine replaced."""
+    if not raw_value or not isinstance(raw_value, str):
+        return {"value": None, "unit": None, "raw": raw_value}
+    raw_value = raw_value.strip()
+    range_match = re.match(r"([\d.]+)\s*[-–—to]+\s*([\d.]+)\s*(fl oz|[a-zA-Z°\"]+)", raw_value)
+    if range_match:
+        low, high = float(range_match.group(1)), float(range_match.group(2))
+        unit_key = range_match.group(3).strip().rstrip(".").lower()
+        if unit_key in _LEGACY_UNITS:
+            canonical_unit, converter = _LEGACY_UNITS[unit_key]
+            return {"value": round(converter(round((low + high) / 2, 4)), 4), "unit": canonical_unit,
+                    "is_range": True, "range_low": round(converter(low), 4), "range_high": round(converter(high), 4)}
+    match = re.match(r"([\d.]+)\s*(fl oz|[a-zA-Z°\"]+)", raw_value)
+    if not match:
+        return {"value": None, "unit": None, "raw": raw_value}
+    value = float(match.group(1))
+    unit = match.group(2).strip().rstrip(".")
+    if unit.lower() in _LEGACY_UNITS:
+        canonical_unit, converter = _LEGACY_UNITS[unit.lower()]
+        return {"value": round(converter(value), 4), "unit": canonical_unit, "raw": raw_value}
+    return {"value": value, "unit": unit, "raw": raw_value}
+
+
+def collect_cells() -> list[str]:
+    cells = []
+    for path in sorted(glob.glob(os.path.join(_OUT_HTML, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            soup = BeautifulSoup(f.read(), "html.parser")
+        for td in soup.find_all(["td", "th"]):
+            text = td.get_text(" ", strip=True)
+            if text and len(text) <= 40 and _CELL_RE.search(text):
+                cells.append(text)
+    return cells
+
+
+def _time(func, cells, rounds) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for cell in cells:
+            try:
+                func(cell)
+            except ValueError:
+                pass  # legacy parser raises on values like "1.2.3"
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    cells = collect_cells()
+    if not cells:
+        print(f"No measurement cells found under {_OUT_HTML}")
+        return
+
+    legacy_s = _time(legacy_normalize_measurement, cells, args.rounds)
+    engine_s = _time(normalize_measurement.uncached, cells, args.rounds)
+    column = normalize_measurement_column(cells)
+    legacy_failed = 0
+    for cell in cells:
+        try:
+            if legacy_normalize_measurement(cell)["value"] is None:
+                legacy_failed += 1
+        except ValueError:
+            legacy_failed += 1
+
+    calls = len(cells) * args.rounds
+    print(f"Cells:          {len(cells)} x {args.rounds} rounds")
+    print(f"Legacy:         {legacy_s:.3f}s ({calls / legacy_s:,.0f} cells/s)")
+    print(f"Engine:         {engine_s:.3f}s ({calls / engine_s:,.0f} cells/s)")
+    print(f"Speedup:        {legacy_s / engine_s:.2f}x")
+    print(f"Parsed:         {column.parsed}")
+    print(f"Unknown unit:   {column.unknown_unit}")
+    print(f"Failed:         {column.failed} (legacy: {legacy_failed})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark parse_regulatory_from_text against the previous multi-pass scan.
+
+Builds long warning texts from the visible text of the saved pages in
+web-scraper/out_html (repeated to IFU length) plus a few adversarial
+inputs, then times the single-pass scanner against the original loop over
+seven pattern lists with unbounded ``.*?`` spans.
+
+Usage:
+    python scripts/bench_regulatory.py [--rounds 5]
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "harvester", "src"))
+
+from bs4 import BeautifulSoup
+
+from pipeline.regulatory_parser import _FIELD_PATTERNS, parse_regulatory_from_text
+
+_OUT_HTML = os.path.join(os.path.dirname(__file__), os.pardir, "harvester", "src", "web-scraper", "out_html")
+
+# The two spans that were unbounded before the scanner was introduced.
+_LEGACY_OVERRIDES = {
+    "rx": [re.compile(r"federal\s+(?:\(usa\)\s+)?law.*?restricts.*?(?:physician|practitioner)", re.IGNORECASE)],
+    "deviceSterile": [re.compile(r"contents\s+are\s*.*?\bsterile\b", re.IGNORECASE)],
+}
+
+
+def legacy_parse(text):
+    if not text or not text.strip():
+        return {}
+    result = {}
+    for field, patterns in _FIELD_PATTERNS.items():
+        candidates = _LEGACY_OVERRIDES.get(field, []) + [
+            p for p in patterns if "{0," not in p.pattern
+        ]
+        for pattern in candidates:
+            if pattern.search(text):
+                result[field] = True
+                break
+    return result
+
+
+def build_texts() -> dict[str, str]:
+    pages = []
+    for path in sorted(glob.glob(os.path.join(_OUT_HTML, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append(BeautifulSoup(f.read(), "html.parser").get_text(" ", strip=True))
+    corpus = " ".join(pages)
+    return {
+        "out_html corpus": corpus,
+        "out_html x4": " ".join([corpus] * 4),
+        "repeated 'Federal law'": "Federal law " * 4_000,
+        "repeated 'contents are'": "contents are " * 4_000,
+    }
+
+
+def _time(func, text, rounds) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(text)
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, text in build_texts().items():
+        legacy_s = _time(legacy_parse, text, args.rounds)
+        scanner_s = _time(parse_regulatory_from_text, text, args.rounds)
+        same = legacy_parse(text) == parse_regulatory_from_text(text)
+        print(
+            f"{label:<26} {len(text):>9,} chars  legacy {legacy_s * 1000:9.2f} ms  "
+            f"scanner {scanner_s * 1000:8.2f} ms  ({legacy_s / scanner_s:6.1f}x)  same={same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark database.serialization against the recursive _serialize_record.
+
+Reads validation result documents from MongoDB (the collection the
+dashboard, discrepancy and review endpoints serve) and times both paths:
+
+    to dicts:   legacy _serialize_record   vs  to_jsonable()
+    to bytes:   legacy + json.dumps        vs  dumps()
+
+``--synthetic N`` builds N validation-shaped documents instead, for
+machines without a database.
+
+Usage:
+    python scripts/bench_serialization.py [--limit 2000] [--rounds 10]
+    python scripts/bench_serialization.py --synthetic 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "harvester", "src"))
+
+from bson import ObjectId
+
+from database import serialization
+from database.serialization import dumps, to_jsonable
+from validators.review_snapshot import COMPARED_FIELDS, build_review_snapshot
+
+
+def legacy_serialize_record(record: dict) -> dict:
+    """The per-key isinstance walk the serialization module replaced."""
+    out = {}
+    for k, v in record.items():
+        if isinstance(v, ObjectId):
+            out[k] = str(v)
+        elif isinstance(v, datetime):
+            out[k] = v.isoformat()
+        elif isinstance(v, dict):
+            out[k] = legacy_serialize_record(v)
+        elif isinstance(v, list):
+            out[k] = [legacy_serialize_record(i) if isinstance(i, dict) else i for i in v]
+        else:
+            out[k] = v
+    return out
+
+
+def load_documents(limit: int) -> list[dict]:
+    from database.db_connection import get_db
+    return list(get_db()["validationResults"].find().limit(limit))
+
+
+def synthetic_documents(n: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    docs = []
+    for i in range(n):
+        gudid = {key: f"GUDID {label} {i}" for key, label in COMPARED_FIELDS}
+        gudid["deviceSizes"] = [{"sizeType": "Length", "size": {"value": 10.5 + i % 7, "unit": "Millimeter"}}] * 3
+        gudid["productCodes"] = [{"productCode": "DQY", "productCodeName": "Catheter"}]
+        doc = {
+            "_id": ObjectId(),
+            "device_id": ObjectId(),
+            "brandName": f"Brand {i}",
+            "status": "partial_match",
+            "matched_fields": 14,
+            "total_fields": 19,
+            "match_percent": 73.7,
+            "gudid_di": f"0088{i:010d}",
+            "gudid_record": gudid,
+            "comparison_result": {
+                key: {"status": "match" if j % 3 else "mismatch", "harvested": f"value {i}",
+                      "gudid": gudid[key] if isinstance(gudid[key], str) else "list"}
+                for j, (key, _) in enumerate(COMPARED_FIELDS)
+            },
+            "created_at": now,
+            "updated_at": now,
+        }
+        doc["review_snapshot"] = build_review_snapshot(doc, {"brandName": doc["brandName"]})
+        docs.append(doc)
+    return docs
+
+
+def _time(func, docs, rounds) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for doc in docs:
+            func(doc)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=2000, help="Validation results to read")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Use N generated documents instead of MongoDB")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    docs = synthetic_documents(args.synthetic) if args.synthetic else load_documents(args.limit)
+    if not docs:
+        print("No validation results found; run a validation or pass --synthetic N")
+        return
+
+    # The legacy walk missed datetimes inside lists and Decimal128 values
+    differing = sum(
+        1 for doc in docs
+        if to_jsonable(doc) != json.loads(json.dumps(legacy_serialize_record(doc), default=str))
+    )
+
+    legacy_dicts = _time(legacy_serialize_record, docs, args.rounds)
+    fast_dicts = _time(to_jsonable, docs, args.rounds)
+    legacy_bytes = _time(lambda d: json.dumps(legacy_serialize_record(d), default=str).encode("utf-8"), docs, args.rounds)
+    fast_bytes = _time(dumps, docs, args.rounds)
+
+    calls = len(docs) * args.rounds
+    size = sum(len(dumps(doc)) for doc in docs) / len(docs)
+    print(f"Encoder:        {'orjson' if serialization.orjson else 'json (orjson not installed)'}")
+    print(f"Documents:      {len(docs)} x {args.rounds} rounds, {size:,.0f} bytes avg")
+    print(f"Dicts legacy:   {legacy_dicts:.3f}s ({calls / legacy_dicts:,.0f} docs/s)")
+    print(f"Dicts fast:     {fast_dicts:.3f}s ({calls / fast_dicts:,.0f} docs/s)")
+    print(f"Dicts speedup:  {legacy_dicts / fast_dicts:.2f}x")
+    print(f"Bytes legacy:   {legacy_bytes:.3f}s ({calls / legacy_bytes:,.0f} docs/s)")
+    print(f"Bytes fast:     {fast_bytes:.3f}s ({calls / fast_bytes:,.0f} docs/s)")
+    print(f"Bytes speedup:  {legacy_bytes / fast_bytes:.2f}x")
+    print(f"Differing docs: {differing}")
+
+
+if __name__ == "__main__":
+    main()
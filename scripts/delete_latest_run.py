@@ -1,9 +1,13 @@
-"""Delete the most recent harvest run from devices, validationResults, and verified_devices."""
+"""Delete the most recent harvest run from devices, validationResults, and verified_devices.
+
+The dashboard counters are rebuilt afterwards so they match what is left.
+"""
 import os
 import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "harvester", "src"))
 
+from database.dashboard_stats import rebuild_stats
 from database.db_connection import get_db
 from orchestrator import get_latest_run_id
 
@@ -36,6 +40,8 @@ def main():
     vd = db["verified_devices"].delete_many({"source_device_id": {"$in": device_ids}})
     dv = db["devices"].delete_many({"_harvest.harvest_run_id": run_id})
     print(f"Deleted: devices={dv.deleted_count}, validationResults={v.deleted_count}, verified_devices={vd.deleted_count}")
+    rebuild_stats(db)
+    print("Rebuilt dashboard stats.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+"""CSRF exemptions cover only the read-only job endpoints."""
+from fastapi.testclient import TestClient
+
+from app import main
+
+
+def test_job_cancel_requires_csrf_token():
+    resp = TestClient(main.app).post("/api/jobs/abc123/cancel")
+    assert resp.status_code == 403
+    assert "CSRF" in resp.text
+
+
+def test_exemptions_match_exact_job_paths():
+    exempt = lambda path: any(p.fullmatch(path) for p in main._CSRF_EXEMPT)
+    assert exempt("/api/jobs/abc123")
+    assert exempt("/api/jobs/abc123/events")
+    assert not exempt("/api/jobs/abc123/cancel")
+    assert not exempt("/api/jobs")
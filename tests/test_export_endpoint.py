@@ -0,0 +1,57 @@
+"""GET /api/export/{collection} streams the export with download headers."""
+from unittest.mock import MagicMock, patch
+
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+from app import main
+from app.routes import api
+
+
+def _logged_in(monkeypatch):
+    monkeypatch.setattr(api, "require_api_login", lambda request: ({"role": "reviewer"}, None))
+
+
+def _db(docs):
+    col = MagicMock()
+    col.find.return_value.sort.return_value.batch_size.return_value = iter(docs)
+    db = MagicMock()
+    db.__getitem__ = MagicMock(return_value=col)
+    return db, col
+
+
+def test_streams_csv_attachment(monkeypatch):
+    _logged_in(monkeypatch)
+    db, col = _db([{"_id": ObjectId(), "status": "mismatch", "brandName": "Stent"}])
+    device_id = ObjectId()
+    devices = MagicMock()
+    devices.find.return_value = [{"_id": device_id}]
+    db.__getitem__ = MagicMock(side_effect=lambda key: devices if key == "devices" else col)
+
+    with patch("database.db_connection.get_db", return_value=db):
+        resp = TestClient(main.app).get("/api/export/validationResults?format=csv&status=mismatch&company=ACME")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert resp.headers["content-disposition"].startswith('attachment; filename="validationResults-')
+    assert resp.text.splitlines()[1].split(",")[2] == "Stent"
+    devices.find.assert_called_once_with({"companyName": "ACME"}, {"_id": 1})
+    col.find.assert_called_once_with({"status": "mismatch", "device_id": {"$in": [device_id]}})
+
+
+def test_bad_requests_are_rejected_before_streaming(monkeypatch):
+    _logged_in(monkeypatch)
+    db, _ = _db([])
+    client = TestClient(main.app)
+
+    with patch("database.db_connection.get_db", return_value=db):
+        assert client.get("/api/export/users").status_code == 400
+        assert client.get("/api/export/devices?format=pdf").status_code == 400
+        resp = client.get("/api/export/devices?status=matched")
+
+    assert resp.status_code == 400
+    assert "cannot be filtered by status" in resp.json()["error"]
+
+
+def test_requires_login():
+    assert TestClient(main.app).get("/api/export/devices").status_code == 401
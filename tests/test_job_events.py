@@ -0,0 +1,92 @@
+"""The job SSE stream: hub snapshots, store fallback and the final event."""
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.routes import api
+from jobs.store import SQLiteJobStore
+from pipeline.progress import ProgressHub
+
+
+def _frames(store, hub, job_id):
+    async def collect():
+        job = store.get(job_id)
+        return [frame async for frame in api._job_events(store, hub, job_id, job)]
+
+    out = []
+    for frame in asyncio.run(collect()):
+        if frame.startswith(":"):
+            continue
+        event, data = frame.strip().split("\n")
+        out.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return out
+
+
+def _store(tmp_path):
+    return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def _finish_on_second_read(store, monkeypatch, finish):
+    """Make the job finish between the stream's first and second store reads."""
+    monkeypatch.setattr(api, "_SSE_STORE_POLL_SECONDS", 0.05)
+    monkeypatch.setattr(api, "_SSE_MIN_INTERVAL_SECONDS", 0)
+    reads = {"n": 0}
+    real_get = store.get
+
+    def get(job_id):
+        reads["n"] += 1
+        if reads["n"] == 2:
+            finish(job_id)
+        return real_get(job_id)
+
+    monkeypatch.setattr(store, "get", get)
+
+
+def test_finished_job_sends_single_done_event(tmp_path):
+    store = _store(tmp_path)
+    job_id = store.enqueue("harvest_batch", {"urls": []})
+    store.claim("w1")
+    store.complete(job_id, "w1", {"total": 0})
+
+    frames = _frames(store, ProgressHub(), job_id)
+    assert frames == [("done", store.get(job_id))]
+
+
+def test_streams_hub_progress_then_done(tmp_path, monkeypatch):
+    store = _store(tmp_path)
+    hub = ProgressHub()
+    job_id = store.enqueue("harvest_batch", {"urls": ["https://x/a"]})
+    store.claim("w1")
+    hub.publish(job_id, {"stage": "extract", "progress": 0, "total": 1})
+    _finish_on_second_read(store, monkeypatch,
+                           lambda jid: store.complete(jid, "w1", {"total": 1, "succeeded": 1}))
+
+    frames = _frames(store, hub, job_id)
+
+    assert frames[0] == ("progress", {
+        "job_id": job_id, "status": "running",
+        "result": {"stage": "extract", "progress": 0, "total": 1},
+    })
+    assert frames[-1][0] == "done"
+    assert frames[-1][1]["status"] == "completed"
+
+
+def test_falls_back_to_store_progress_without_hub_events(tmp_path, monkeypatch):
+    store = _store(tmp_path)
+    job_id = store.enqueue("harvest_batch", {"urls": []})
+    store.claim("w1")
+    store.heartbeat(job_id, "w1", progress={"progress": 1, "total": 2})
+    _finish_on_second_read(store, monkeypatch, lambda jid: store.mark_cancelled(jid, "w1"))
+
+    frames = _frames(store, ProgressHub(), job_id)
+    assert frames[0][0] == "progress"
+    assert frames[0][1]["result"] == {"progress": 1, "total": 2}
+    assert frames[-1][0] == "done"
+    assert frames[-1][1]["status"] == "cancelled"
+
+
+def test_events_require_login():
+    resp = TestClient(main.app).get("/api/jobs/abc/events")
+    assert resp.status_code == 401
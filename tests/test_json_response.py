@@ -0,0 +1,19 @@
+"""FastJSONResponse encodes MongoDB documents without pre-conversion."""
+import json
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from app import main  # noqa: F401  (puts harvester/src on sys.path)
+from app.services.json_response import FastJSONResponse
+
+
+def test_renders_bson_types():
+    oid = ObjectId()
+    when = datetime(2026, 5, 1, 10, 0, tzinfo=timezone.utc)
+    response = FastJSONResponse({"items": [{"_id": oid, "created_at": when}]}, status_code=201)
+
+    assert response.status_code == 201
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"items": [{"_id": str(oid), "created_at": "2026-05-01T10:00:00+00:00"}]}
+
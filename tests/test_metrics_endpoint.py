@@ -0,0 +1,40 @@
+"""The /metrics endpoint bypasses session/CSRF and labels requests by route."""
+from fastapi.testclient import TestClient
+
+from app import main
+from pipeline import metrics
+
+
+def _client():
+    return TestClient(main.app)
+
+
+def test_metrics_served_without_session_cookie():
+    resp = _client().get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "set-cookie" not in resp.headers
+    assert "# TYPE fivos_http_requests_total counter" in resp.text
+
+
+def test_metrics_post_is_not_csrf_checked():
+    # Pure-ASGI short circuit: no CSRF 403 even without a token
+    assert _client().post("/metrics").status_code == 200
+
+
+def test_requests_labelled_by_route_template():
+    metrics.reset_metrics()
+    client = _client()
+    client.get("/auth/login")
+    client.get("/no/such/page")
+    assert metrics.HTTP_REQUESTS.value(method="GET", route="/auth/login", status="200") == 1
+    assert metrics.HTTP_REQUESTS.value(method="GET", route="unmatched", status="404") == 1
+
+
+def test_token_required_when_configured(monkeypatch):
+    monkeypatch.setenv("METRICS_TOKEN", "s3cret")
+    app = main.MetricsMiddleware(main.app)
+    client = TestClient(app)
+    assert client.get("/metrics").status_code == 401
+    ok = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert ok.status_code == 200